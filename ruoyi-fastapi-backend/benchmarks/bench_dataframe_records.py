@@ -0,0 +1,150 @@
+"""
+DataFrame 转换为批量写库参数的性能基准
+
+对比 add_dataframe_to_table_dao 原逐行实现（iterrows + 逐单元格 pd.isna）与列式实现在各更新模式下的
+Python 侧准备耗时（不含数据库执行），输出每秒处理行数。
+
+运行方式（在 ruoyi-fastapi-backend 目录下）：
+    python -m benchmarks.bench_dataframe_records
+"""
+
+import re
+import time
+from collections.abc import Callable
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+from module_tushare.dao.tushare_dao import TushareDataDao
+
+ROW_COUNTS = (1000, 5000, 20000)
+UPDATE_MODES = {'0': 'INSERT', '1': 'INSERT_IGNORE', '2': 'UPSERT', '3': 'DELETE_INSERT'}
+UNIQUE_KEY_FIELDS = ['ts_code', 'trade_date']
+REPEAT = 3
+
+
+def build_daily_frame(rows: int) -> pd.DataFrame:
+    """
+    构造与 daily/pro_bar 接口结构一致的行情数据（含少量缺失值）
+    """
+    rng = np.random.default_rng(0)
+    close = rng.uniform(5, 50, rows).round(2)
+    df = pd.DataFrame(
+        {
+            'ts_code': [f'{i % 5000:06d}.SZ' for i in range(rows)],
+            'trade_date': [f'2025{(i // 5000) % 12 + 1:02d}{(i // 5000) % 28 + 1:02d}' for i in range(rows)],
+            'open': close * 0.99,
+            'high': close * 1.02,
+            'low': close * 0.97,
+            'close': close,
+            'pre_close': close * 1.01,
+            'change': close * 0.01,
+            'pct_chg': rng.normal(0, 2, rows).round(4),
+            'vol': rng.uniform(1e4, 1e7, rows).round(0),
+            'amount': rng.uniform(1e5, 1e9, rows).round(3),
+        }
+    )
+    df.loc[df.sample(frac=0.02, random_state=0).index, 'pre_close'] = np.nan
+    return df
+
+
+def legacy_prepare(df: pd.DataFrame, update_mode: str) -> tuple[list[dict], list[dict]]:
+    """
+    原实现：iterrows 逐行构建参数，DELETE_INSERT 模式再次 iterrows 并嵌套遍历列映射提取唯一键
+    """
+    df_columns = []
+    col_mapping = {}
+    for col in df.columns:
+        safe_col = re.sub(r'[^a-zA-Z0-9_]', '_', str(col))
+        if not safe_col or safe_col[0].isdigit():
+            safe_col = f'col_{safe_col}'
+        df_columns.append(safe_col)
+        col_mapping[col] = safe_col
+    create_time = datetime.now()
+    values_list = []
+    for _, row in df.iterrows():
+        row_dict = {
+            'task_id': 1,
+            'config_id': 1,
+            'api_code': 'daily',
+            'download_date': '20250101',
+            'create_time': create_time,
+        }
+        for orig_col, safe_col in zip(df.columns, df_columns, strict=True):
+            value = row[orig_col]
+            row_dict[safe_col] = None if pd.isna(value) else value
+        values_list.append(row_dict)
+    unique_key_values = []
+    if update_mode == '3':
+        for _, row in df.iterrows():
+            key_dict = {}
+            for key_field in UNIQUE_KEY_FIELDS:
+                for orig_col, safe_col in col_mapping.items():
+                    if safe_col == key_field:
+                        value = row[orig_col]
+                        key_dict[key_field] = None if pd.isna(value) else value
+                        break
+            if key_dict:
+                unique_key_values.append(key_dict)
+    return values_list, unique_key_values
+
+
+def columnar_prepare(df: pd.DataFrame, update_mode: str) -> tuple[list[dict], list[dict]]:
+    """
+    列式实现：与 add_dataframe_to_table_dao 当前逻辑一致
+    """
+    system_values = {
+        'task_id': 1,
+        'config_id': 1,
+        'api_code': 'daily',
+        'download_date': '20250101',
+        'create_time': datetime.now(),
+    }
+    df_columns, column_arrays = TushareDataDao.dataframe_to_column_arrays(df)
+    values_list = TushareDataDao.column_arrays_to_records(system_values, df_columns, column_arrays)
+    unique_key_values = []
+    if update_mode == '3':
+        column_array_map = dict(zip(df_columns, column_arrays, strict=True))
+        key_arrays = [column_array_map[key_field] for key_field in UNIQUE_KEY_FIELDS]
+        unique_key_values = [
+            dict(zip(UNIQUE_KEY_FIELDS, key_row, strict=True)) for key_row in zip(*key_arrays, strict=True)
+        ]
+    return values_list, unique_key_values
+
+
+def measure(
+    func: Callable[[pd.DataFrame, str], tuple[list[dict], list[dict]]], df: pd.DataFrame, update_mode: str
+) -> float:
+    """
+    返回最优一次的每秒处理行数
+    """
+    best = float('inf')
+    for _ in range(REPEAT):
+        start = time.perf_counter()
+        func(df, update_mode)
+        best = min(best, time.perf_counter() - start)
+    return len(df) / best
+
+
+def main() -> None:
+    print(f'{"行数":>8} {"更新模式":<14} {"原实现(行/秒)":>16} {"列式实现(行/秒)":>16} {"提升":>8}')
+    for rows in ROW_COUNTS:
+        df = build_daily_frame(rows)
+        # 两种实现结果必须一致（create_time 除外）
+        legacy_values, legacy_keys = legacy_prepare(df, '3')
+        columnar_values, columnar_keys = columnar_prepare(df, '3')
+        strip = lambda records: [{k: v for k, v in r.items() if k != 'create_time'} for r in records]  # noqa: E731
+        assert strip(legacy_values) == strip(columnar_values)
+        assert legacy_keys == columnar_keys
+        for update_mode, mode_name in UPDATE_MODES.items():
+            legacy_rate = measure(legacy_prepare, df, update_mode)
+            columnar_rate = measure(columnar_prepare, df, update_mode)
+            print(
+                f'{rows:>8} {update_mode + " " + mode_name:<14} {legacy_rate:>16,.0f} {columnar_rate:>16,.0f} '
+                f'{columnar_rate / legacy_rate:>7.1f}x'
+            )
+
+
+if __name__ == '__main__':
+    main()
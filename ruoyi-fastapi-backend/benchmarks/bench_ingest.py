@@ -0,0 +1,321 @@
+"""
+Tushare数据采集吞吐基准（使用模拟接口，无需 token 和网络）
+
+对每种更新模式分别测量：
+- 接口受限：模拟接口带调用延迟和错误注入时，execute_workflow 端到端每秒写入行数；
+- 转换：add_dataframe_to_table_dao 写库前的 Python 侧处理（批内去重、列式转换、构建批量参数），不访问数据库；
+- 写库：add_dataframe_to_table_dao 按交易日分批写入空表（首次）和再次写入相同数据（重复）的每秒行数；
+- 端到端：模拟接口无延迟时 execute_workflow 每秒写入行数（受转换和写库限制）。
+
+流程包含 股票列表(stock_basic) -> 交易日历(trade_cal) -> 按交易日遍历日线(daily) -> 按股票遍历日线(pro_bar)，
+模拟接口按 DUPLICATE_RATE 返回重复行。基准使用配置的数据库，运行时创建的接口配置、流程、任务、运行记录和
+tushare_bench_ 前缀的数据表在结束时删除。
+
+运行方式（在 ruoyi-fastapi-backend 目录下，--env 指定环境，默认 dev）：
+    python -m benchmarks.bench_ingest
+"""
+
+import asyncio
+import json
+import time
+import unicodedata
+
+import pandas as pd
+from sqlalchemy import delete, select, text
+
+from benchmarks.fake_tushare import FakeTushareProvider
+from config.database import AsyncSessionLocal, async_engine
+from config.env import TushareConfig
+from module_tushare.dao.tushare_dao import TushareDataDao
+from module_tushare.dao.tushare_schema_registry import TushareSchemaRegistry
+from module_tushare.entity.do.tushare_do import (
+    TushareApiConfig,
+    TushareDownloadCheckpoint,
+    TushareDownloadLog,
+    TushareDownloadRun,
+    TushareDownloadStat,
+    TushareDownloadTask,
+    TushareWorkflowConfig,
+    TushareWorkflowStep,
+)
+from module_tushare.task.tushare_client import TushareClient
+from module_tushare.task.tushare_download_task import ensure_table_exists, execute_workflow
+from module_tushare.task.tushare_log_sink import TushareLogSink
+
+STOCK_COUNT = 1000
+TRADE_START = '20240102'
+TRADE_END = '20240229'
+LOOP_CONCURRENCY = 8
+# 接口受限场景的模拟调用延迟（秒）和错误比例
+API_LATENCY = (0.01, 0.03)
+API_ERROR_RATE = 0.01
+DUPLICATE_RATE = 0.01
+UPDATE_MODES = {'0': 'INSERT', '1': 'INSERT_IGNORE', '2': 'UPSERT', '3': 'DELETE_INSERT'}
+TABLE_PREFIX = 'tushare_bench_'
+BENCH_NAME = '采集吞吐基准'
+# 流程步骤：(步骤名, 接口代码, 步骤参数, 是否遍历, 唯一键)
+WORKFLOW_STEPS = (
+    ('股票列表', 'stock_basic', {'list_status': 'L'}, False, ['ts_code']),
+    (
+        '交易日历',
+        'trade_cal',
+        {'exchange': 'SSE', 'start_date': TRADE_START, 'end_date': TRADE_END, 'is_open': '1'},
+        False,
+        ['exchange', 'cal_date'],
+    ),
+    ('日线', 'daily', {'trade_date': '${交易日历.cal_date}'}, True, ['ts_code', 'trade_date']),
+    (
+        '个股日线',
+        'pro_bar',
+        {'ts_code': '${股票列表.ts_code}', 'start_date': TRADE_START, 'end_date': TRADE_END},
+        True,
+        ['ts_code', 'trade_date'],
+    ),
+)
+DAILY_UNIQUE_KEYS = ['ts_code', 'trade_date']
+
+
+def bench_table(api_code: str) -> str:
+    return f'{TABLE_PREFIX}{api_code}'
+
+
+def build_daily_frames(provider: FakeTushareProvider) -> list[pd.DataFrame]:
+    """
+    按交易日获取全市场日线（与遍历日线步骤的写入批次一致）
+    """
+    calendar = provider.trade_cal(start_date=TRADE_START, end_date=TRADE_END, is_open='1')
+    return [provider.daily(trade_date=trade_date) for trade_date in calendar['cal_date']]
+
+
+def prepare_records(df: pd.DataFrame, update_mode: str) -> int:
+    """
+    add_dataframe_to_table_dao 写库前的 Python 侧处理，返回待写入行数
+    """
+    if update_mode in ('1', '2', '3'):
+        df, _ = TushareDataDao.deduplicate_by_unique_keys(df, DAILY_UNIQUE_KEYS, TushareConfig.tushare_dedup_keep)
+    system_values = {'task_id': 0, 'config_id': 0, 'api_code': 'daily', 'download_date': TRADE_END, 'create_time': None}
+    df_columns, column_arrays = TushareDataDao.dataframe_to_column_arrays(df)
+    records = TushareDataDao.column_arrays_to_records(system_values, df_columns, column_arrays)
+    if update_mode == '3':
+        column_array_map = dict(zip(df_columns, column_arrays, strict=True))
+        key_rows = list(zip(*(column_array_map[key] for key in DAILY_UNIQUE_KEYS), strict=True))
+        TushareDataDao.build_key_delete_statements(bench_table('daily'), DAILY_UNIQUE_KEYS, key_rows)
+    return len(records)
+
+
+def bench_transform(frames: list[pd.DataFrame], update_mode: str, repeat: int = 3) -> float:
+    """
+    返回最优一次的每秒处理行数（按接口返回行数计）
+    """
+    rows = sum(len(df) for df in frames)
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for df in frames:
+            prepare_records(df, update_mode)
+        best = min(best, time.perf_counter() - start)
+    return rows / best
+
+
+async def drop_bench_tables() -> None:
+    async with AsyncSessionLocal() as session:
+        for _, api_code, _, _, _ in WORKFLOW_STEPS:
+            await session.execute(text(f'DROP TABLE IF EXISTS {bench_table(api_code)}'))
+            TushareSchemaRegistry.invalidate(bench_table(api_code))
+        await session.commit()
+
+
+async def bench_db(frames: list[pd.DataFrame], update_mode: str) -> tuple[float, float]:
+    """
+    按交易日分批写入空表，再写入一次相同数据，返回两次写入的每秒行数
+    """
+    await drop_bench_tables()
+    table_name = bench_table('daily')
+    rows = sum(len(df) for df in frames)
+    rates = []
+    async with AsyncSessionLocal() as session:
+        await ensure_table_exists(session, table_name, 'daily', frames[0])
+        await session.commit()
+        for _ in range(2):
+            start = time.perf_counter()
+            for df in frames:
+                await TushareDataDao.add_dataframe_to_table_dao(
+                    session,
+                    table_name,
+                    df,
+                    0,
+                    0,
+                    'daily',
+                    TRADE_END,
+                    update_mode=update_mode,
+                    unique_key_fields=DAILY_UNIQUE_KEYS,
+                )
+                await session.commit()
+            rates.append(rows / (time.perf_counter() - start))
+    return rates[0], rates[1]
+
+
+async def create_workflow(update_mode: str) -> int:
+    """
+    创建基准使用的接口配置、流程、步骤和任务，返回任务ID
+    """
+    async with AsyncSessionLocal() as session:
+        workflow = TushareWorkflowConfig(workflow_name=BENCH_NAME, status='0')
+        session.add(workflow)
+        await session.flush()
+        for order, (step_name, api_code, params, loop, unique_keys) in enumerate(WORKFLOW_STEPS, start=1):
+            config = TushareApiConfig(api_name=f'{BENCH_NAME}-{api_code}', api_code=api_code, status='0')
+            session.add(config)
+            await session.flush()
+            session.add(
+                TushareWorkflowStep(
+                    workflow_id=workflow.workflow_id,
+                    step_order=order,
+                    step_name=step_name,
+                    config_id=config.config_id,
+                    step_params=json.dumps(params, ensure_ascii=False),
+                    data_table_name=bench_table(api_code),
+                    loop_mode='1' if loop else '0',
+                    loop_concurrency=LOOP_CONCURRENCY,
+                    update_mode=update_mode,
+                    unique_key_fields=json.dumps(unique_keys),
+                    status='0',
+                )
+            )
+        task = TushareDownloadTask(
+            task_name=BENCH_NAME, workflow_id=workflow.workflow_id, task_type='workflow', save_to_db='1', status='0'
+        )
+        session.add(task)
+        await session.commit()
+        return task.task_id
+
+
+async def delete_workflow(task_id: int) -> None:
+    """
+    删除基准创建的配置、流程、任务及运行记录
+    """
+    async with AsyncSessionLocal() as session:
+        task = await session.get(TushareDownloadTask, task_id)
+        if task is None:
+            return
+        workflow_id = task.workflow_id
+        config_ids = select(TushareWorkflowStep.config_id).where(TushareWorkflowStep.workflow_id == workflow_id)
+        run_ids = select(TushareDownloadRun.run_id).where(TushareDownloadRun.task_id == task_id)
+        await session.execute(delete(TushareApiConfig).where(TushareApiConfig.config_id.in_(config_ids)))
+        await session.execute(delete(TushareDownloadCheckpoint).where(TushareDownloadCheckpoint.run_id.in_(run_ids)))
+        for model in (TushareDownloadRun, TushareDownloadLog, TushareDownloadStat, TushareDownloadTask):
+            await session.execute(delete(model).where(model.task_id == task_id))
+        await session.execute(delete(TushareWorkflowStep).where(TushareWorkflowStep.workflow_id == workflow_id))
+        await session.execute(delete(TushareWorkflowConfig).where(TushareWorkflowConfig.workflow_id == workflow_id))
+        await session.commit()
+
+
+async def bench_workflow(provider: FakeTushareProvider, update_mode: str) -> tuple[float, int, int, str]:
+    """
+    使用模拟接口执行一次流程，返回 (每秒写入行数, 写入行数, 批内去重丢弃行数, 运行状态)
+
+    注入错误时失败的遍历组合不写入数据，运行状态为 FAILED，写入行数只包含成功的组合。
+    """
+    await drop_bench_tables()
+    provider.reset_stats()
+    task_id = await create_workflow(update_mode)
+    try:
+        async with AsyncSessionLocal() as session:
+            task = await session.get(TushareDownloadTask, task_id)
+            dedup_token = TushareDataDao.begin_dedup_count()
+            start = time.perf_counter()
+            try:
+                async with TushareLogSink(async_engine) as log_sink:
+                    await execute_workflow(session, task, TRADE_END, log_sink=log_sink)
+            finally:
+                elapsed = time.perf_counter() - start
+                TushareDataDao.end_dedup_count(dedup_token)
+            run = (
+                await session.execute(select(TushareDownloadRun).where(TushareDownloadRun.task_id == task_id))
+            ).scalar_one()
+            written = run.total_records or 0
+            return written / elapsed, written, run.dedup_records or 0, run.status
+    finally:
+        await delete_workflow(task_id)
+
+
+def display_width(value: str) -> int:
+    return sum(2 if unicodedata.east_asian_width(char) in ('W', 'F') else 1 for char in value)
+
+
+def print_row(columns: list[str], widths: list[int]) -> None:
+    """
+    按显示宽度对齐输出一行（首列左对齐，其余右对齐）
+    """
+    cells = []
+    for position, (column, width) in enumerate(zip(columns, widths, strict=True)):
+        padding = ' ' * max(0, width - display_width(column))
+        cells.append(column + padding if position == 0 else padding + column)
+    print(' '.join(cells))
+
+
+async def main() -> None:
+    if not TushareConfig.tushare_token:
+        # 模拟接口不校验 token，流程执行只要求 token 非空
+        TushareConfig.tushare_token = 'benchmark'
+    api_provider = FakeTushareProvider(
+        STOCK_COUNT,
+        latency=API_LATENCY,
+        error_rate=API_ERROR_RATE,
+        error_apis={'daily'},
+        duplicate_rate=DUPLICATE_RATE,
+    )
+    local_provider = FakeTushareProvider(STOCK_COUNT, duplicate_rate=DUPLICATE_RATE)
+    frames = build_daily_frames(local_provider)
+    print(
+        f'股票数 {STOCK_COUNT}，交易日 {len(frames)} 个（{TRADE_START}-{TRADE_END}），'
+        f'日线每批 {len(frames[0])} 行（含重复行比例 {DUPLICATE_RATE}），遍历并发数 {LOOP_CONCURRENCY}'
+    )
+    headers = [
+        '更新模式',
+        '接口受限(行/秒)',
+        '转换(行/秒)',
+        '写库首次(行/秒)',
+        '写库重复(行/秒)',
+        '端到端(行/秒)',
+        '写入行数',
+        '去重丢弃',
+    ]
+    widths = [16, 16, 14, 16, 16, 14, 10, 10]
+    try:
+        TushareClient.set_provider(api_provider)
+        api_results = {mode: await bench_workflow(api_provider, mode) for mode in UPDATE_MODES}
+        print(
+            f'接口受限场景：模拟延迟 {API_LATENCY[0] * 1000:.0f}-{API_LATENCY[1] * 1000:.0f}ms，日线错误比例 {API_ERROR_RATE}，'
+            f'每次流程调用 {api_provider.call_count} 次、失败 {api_provider.error_count} 次，'
+            f'运行状态 {"/".join(result[3] for result in api_results.values())}'
+        )
+        print_row(headers, widths)
+        TushareClient.set_provider(local_provider)
+        for mode, mode_name in UPDATE_MODES.items():
+            transform_rate = bench_transform(frames, mode)
+            db_first_rate, db_repeat_rate = await bench_db(frames, mode)
+            e2e_rate, written, dropped, status = await bench_workflow(local_provider, mode)
+            if status != 'SUCCESS':
+                raise RuntimeError(f'更新模式 {mode} 的流程执行失败（运行状态 {status}）')
+            print_row(
+                [
+                    f'{mode} {mode_name}',
+                    f'{api_results[mode][0]:,.0f}',
+                    f'{transform_rate:,.0f}',
+                    f'{db_first_rate:,.0f}',
+                    f'{db_repeat_rate:,.0f}',
+                    f'{e2e_rate:,.0f}',
+                    str(written),
+                    str(dropped),
+                ],
+                widths,
+            )
+    finally:
+        TushareClient.set_provider(None)
+        await drop_bench_tables()
+        await async_engine.dispose()
+
+
+if __name__ == '__main__':
+    asyncio.run(main())
@@ -0,0 +1,399 @@
+"""
+模拟Tushare接口（无需 token 和网络）
+
+返回确定性的合成数据，字段与 Tushare 接口一致，支持 stock_basic、trade_cal、daily、adj_factor，
+ts.pro_bar 通过 api.daily / api.adj_factor 调用，因此也支持 pro_bar。同一参数的调用结果固定，
+可配置调用延迟、错误注入和返回数据中的重复行，用于离线测量采集吞吐：
+
+    provider = FakeTushareProvider(stock_count=500, latency=(0.01, 0.03), error_rate=0.01)
+    TushareClient.set_provider(provider)
+"""
+
+import json
+import random
+import threading
+import time
+import zlib
+from datetime import date, datetime, timedelta
+from functools import partial
+from typing import Any
+
+import numpy as np
+import pandas as pd
+
+from module_tushare.task.tushare_client import TushareClient
+
+STOCK_BASIC_FIELDS = (
+    'ts_code',
+    'symbol',
+    'name',
+    'area',
+    'industry',
+    'cnspell',
+    'market',
+    'exchange',
+    'list_status',
+    'list_date',
+)
+TRADE_CAL_FIELDS = ('exchange', 'cal_date', 'is_open', 'pretrade_date')
+DAILY_FIELDS = (
+    'ts_code',
+    'trade_date',
+    'open',
+    'high',
+    'low',
+    'close',
+    'pre_close',
+    'change',
+    'pct_chg',
+    'vol',
+    'amount',
+)
+ADJ_FACTOR_FIELDS = ('ts_code', 'trade_date', 'adj_factor')
+
+# 合成股票名称的前后两部分（名称，拼音首字母）
+_NAME_PREFIXES = (
+    ('平安', 'pa'),
+    ('浦发', 'pf'),
+    ('万科', 'wk'),
+    ('中国', 'zg'),
+    ('华夏', 'hx'),
+    ('招商', 'zs'),
+    ('东方', 'df'),
+    ('长江', 'cj'),
+    ('海通', 'ht'),
+    ('国泰', 'gt'),
+)
+_NAME_SUFFIXES = (
+    ('银行', 'yh', '银行'),
+    ('地产', 'dc', '全国地产'),
+    ('科技', 'kj', '软件服务'),
+    ('医药', 'yy', '化学制药'),
+    ('能源', 'ny', '电力'),
+    ('证券', 'zq', '证券'),
+    ('电子', 'dz', '元器件'),
+    ('汽车', 'qc', '汽车整车'),
+)
+_AREAS = ('深圳', '上海', '北京', '浙江', '江苏', '广东', '四川', '湖北')
+# 默认交易日历范围（未指定开始/结束日期时使用）
+CALENDAR_START = '20150101'
+CALENDAR_END = '20251231'
+# _weekday 返回值中的星期六、星期日（交易日历按工作日开市）
+SATURDAY = 5
+SUNDAY = 6
+
+
+class FakeTushareError(Exception):
+    """
+    模拟接口注入的错误
+    """
+
+
+def _stable_hash(*parts: Any) -> int:
+    return zlib.crc32(json.dumps(parts, sort_keys=True, default=str).encode())
+
+
+def _parse_date(value: str) -> date:
+    return datetime.strptime(value, '%Y%m%d').date()
+
+
+def _format_ordinals(ordinals: np.ndarray) -> list[str]:
+    return [date.fromordinal(int(ordinal)).strftime('%Y%m%d') for ordinal in ordinals]
+
+
+def _weekday(ordinals: np.ndarray) -> np.ndarray:
+    # date.toordinal() 中 0001-01-01 为星期一，返回 0-6 分别为星期一至星期日
+    return (ordinals - 1) % 7
+
+
+def _noise(ordinals: np.ndarray, phase: np.ndarray, salt: float) -> np.ndarray:
+    """
+    由日期和股票相位确定的 [-1, 1) 伪随机数（向量化，同一输入结果固定）
+    """
+    value = np.sin(ordinals * 12.9898 + phase * 78.233 + salt) * 43758.5453
+    return (value - np.floor(value)) * 2 - 1
+
+
+class FakeTushareProvider:
+    """
+    模拟Tushare Pro接口客户端，与 TushareClient 接口兼容（pro.daily(...)、pro.query('daily', ...)）
+
+    交易日历为工作日；日线价格由股票代码和交易日期按固定公式生成，前收盘价与上一交易日收盘价一致。
+    错误按接口和参数确定是否注入：error_once 为 False 时同一参数每次都失败，为 True 时只有首次调用失败。
+    """
+
+    def __init__(
+        self,
+        stock_count: int = 500,
+        seed: int = 0,
+        latency: float | tuple[float, float] = 0.0,
+        error_rate: float = 0.0,
+        error_apis: set[str] | None = None,
+        error_message: str = '模拟接口错误',
+        error_once: bool = False,
+        duplicate_rate: float = 0.0,
+    ) -> None:
+        """
+        :param stock_count: 股票数量
+        :param seed: 随机种子（影响价格、延迟、错误注入和重复行）
+        :param latency: 每次调用的延迟（秒），为元组时在区间内均匀取值
+        :param error_rate: 注入错误的调用比例
+        :param error_apis: 注入错误的接口，为空时所有接口
+        :param error_message: 注入错误的信息（含“每分钟最多访问”等字样时按频率限制错误重试）
+        :param error_once: 是否只有同一参数的首次调用失败
+        :param duplicate_rate: 返回数据中追加的重复行比例（模拟接口返回重复数据）
+        """
+        self.seed = seed
+        self.latency = latency
+        self.error_rate = error_rate
+        self.error_apis = error_apis
+        self.error_message = error_message
+        self.error_once = error_once
+        self.duplicate_rate = duplicate_rate
+        self.call_count = 0
+        self.error_count = 0
+        self.row_count = 0
+        self._lock = threading.Lock()
+        self._failed_keys: set[int] = set()
+        self._stocks = self._build_stocks(stock_count)
+        codes = self._stocks['ts_code'].tolist()
+        self._stock_index = {code: i for i, code in enumerate(codes)}
+        hashes = np.array([_stable_hash(seed, code) for code in codes], dtype=np.int64)
+        self._phase = (hashes % 6283) / 1000.0
+        self._base_price = 5 + (hashes // 7 % 9500) / 100.0
+        self._adj_base = 1 + (hashes // 11 % 20) / 10.0
+
+    @staticmethod
+    def _build_stocks(stock_count: int) -> pd.DataFrame:
+        rows = []
+        for i in range(stock_count):
+            if i % 2 == 0:
+                symbol, exchange, suffix = f'{i // 2 + 1:06d}', 'SZSE', 'SZ'
+            else:
+                symbol, exchange, suffix = f'{600000 + i // 2:06d}', 'SSE', 'SH'
+            prefix_name, prefix_spell = _NAME_PREFIXES[i % len(_NAME_PREFIXES)]
+            suffix_name, suffix_spell, industry = _NAME_SUFFIXES[i // len(_NAME_PREFIXES) % len(_NAME_SUFFIXES)]
+            list_date = date(1991, 1, 1) + timedelta(days=(i * 97) % 10000)
+            rows.append(
+                (
+                    f'{symbol}.{suffix}',
+                    symbol,
+                    prefix_name + suffix_name,
+                    _AREAS[i % len(_AREAS)],
+                    industry,
+                    prefix_spell + suffix_spell,
+                    '主板',
+                    exchange,
+                    'L',
+                    list_date.strftime('%Y%m%d'),
+                )
+            )
+        return pd.DataFrame(rows, columns=list(STOCK_BASIC_FIELDS))
+
+    def reset_stats(self) -> None:
+        with self._lock:
+            self.call_count = 0
+            self.error_count = 0
+            self.row_count = 0
+            self._failed_keys.clear()
+
+    def query(self, api_name: str, fields: str = '', **kwargs: Any) -> pd.DataFrame:
+        """
+        调用模拟接口
+
+        :param api_name: 接口名称
+        :param fields: 返回字段（逗号分隔，为空时返回全部字段）
+        :param kwargs: 接口参数
+        :return: 接口返回数据
+        """
+        params = {key: value for key, value in kwargs.items() if value not in (None, '')}
+        key = _stable_hash(self.seed, api_name, params)
+        started = time.perf_counter()
+        failed = True
+        try:
+            self._sleep(key)
+            self._inject_error(api_name, key)
+            handler = getattr(self, f'_api_{api_name}', None)
+            if handler is None:
+                raise FakeTushareError(f'请指定正确的接口名: {api_name}')
+            df = self._add_duplicates(handler(**params), key)
+            if fields:
+                df = df[[field.strip() for field in fields.split(',') if field.strip() in df.columns]]
+            with self._lock:
+                self.row_count += len(df)
+            failed = False
+            return df
+        finally:
+            with self._lock:
+                self.call_count += 1
+                if failed:
+                    self.error_count += 1
+            TushareClient.record_latency(api_name, (time.perf_counter() - started) * 1000, failed)
+
+    def __getattr__(self, name: str) -> Any:
+        if name.startswith('_'):
+            raise AttributeError(name)
+        return partial(self.query, name)
+
+    def _sleep(self, key: int) -> None:
+        if isinstance(self.latency, tuple):
+            low, high = self.latency
+            delay = low + (high - low) * random.Random(key).random()
+        else:
+            delay = self.latency
+        if delay > 0:
+            time.sleep(delay)
+
+    def _inject_error(self, api_name: str, key: int) -> None:
+        if self.error_rate <= 0 or (self.error_apis is not None and api_name not in self.error_apis):
+            return
+        if random.Random(key ^ 0x5EED).random() >= self.error_rate:
+            return
+        if self.error_once:
+            with self._lock:
+                if key in self._failed_keys:
+                    return
+                self._failed_keys.add(key)
+        raise FakeTushareError(self.error_message)
+
+    def _add_duplicates(self, df: pd.DataFrame, key: int) -> pd.DataFrame:
+        count = int(len(df) * self.duplicate_rate)
+        if count <= 0:
+            return df
+        positions = np.random.default_rng(key).choice(len(df), size=count, replace=False)
+        return pd.concat([df, df.iloc[positions]], ignore_index=True)
+
+    def _select_stocks(self, ts_code: str | None) -> np.ndarray:
+        if not ts_code:
+            return np.arange(len(self._stocks))
+        codes = [code.strip() for code in str(ts_code).split(',')]
+        return np.array([self._stock_index[code] for code in codes if code in self._stock_index], dtype=np.int64)
+
+    @staticmethod
+    def _trade_ordinals(start_date: str | None, end_date: str | None) -> np.ndarray:
+        start = _parse_date(start_date or CALENDAR_START).toordinal()
+        end = _parse_date(end_date or CALENDAR_END).toordinal()
+        ordinals = np.arange(start, end + 1, dtype=np.int64)
+        return ordinals[_weekday(ordinals) < SATURDAY]
+
+    @staticmethod
+    def _previous_trade_ordinals(ordinals: np.ndarray) -> np.ndarray:
+        return ordinals - np.where(_weekday(ordinals) == 0, 3, 1)
+
+    def _close(self, stocks: np.ndarray, ordinals: np.ndarray) -> np.ndarray:
+        phase = self._phase[stocks]
+        trend = 1 + 0.25 * np.sin(ordinals / 37 + phase) + 0.1 * np.sin(ordinals / 11 + 2 * phase)
+        return np.round(self._base_price[stocks] * trend * (1 + 0.02 * _noise(ordinals, phase, 0.0)), 2)
+
+    def _api_stock_basic(self, exchange: str | None = None, list_status: str | None = None, **_: Any) -> pd.DataFrame:
+        df = self._stocks
+        if exchange:
+            df = df[df['exchange'] == exchange]
+        if list_status:
+            df = df[df['list_status'] == list_status]
+        return df.reset_index(drop=True)
+
+    def _api_trade_cal(
+        self,
+        exchange: str = 'SSE',
+        start_date: str | None = None,
+        end_date: str | None = None,
+        is_open: str | int | None = None,
+        **_: Any,
+    ) -> pd.DataFrame:
+        start = _parse_date(start_date or CALENDAR_START).toordinal()
+        end = _parse_date(end_date or CALENDAR_END).toordinal()
+        ordinals = np.arange(end, start - 1, -1, dtype=np.int64)
+        weekday = _weekday(ordinals)
+        opened = (weekday < SATURDAY).astype(np.int64)
+        previous = ordinals - np.select([weekday == 0, weekday == SUNDAY], [3, 2], 1)
+        df = pd.DataFrame(
+            {
+                'exchange': exchange,
+                'cal_date': _format_ordinals(ordinals),
+                'is_open': opened,
+                'pretrade_date': _format_ordinals(previous),
+            }
+        )
+        if is_open is not None:
+            df = df[df['is_open'] == int(is_open)].reset_index(drop=True)
+        return df
+
+    def _api_daily(
+        self,
+        ts_code: str | None = None,
+        trade_date: str | None = None,
+        start_date: str | None = None,
+        end_date: str | None = None,
+        offset: int | None = None,
+        limit: int | None = None,
+        **_: Any,
+    ) -> pd.DataFrame:
+        stocks, ordinals = self._grid(ts_code, trade_date, start_date, end_date)
+        previous = self._previous_trade_ordinals(ordinals)
+        close = self._close(stocks, ordinals)
+        pre_close = self._close(stocks, previous)
+        phase = self._phase[stocks]
+        open_ = np.round(pre_close * (1 + 0.01 * _noise(ordinals, phase, 1.0)), 2)
+        high = np.round(np.maximum(open_, close) * (1 + 0.01 * np.abs(_noise(ordinals, phase, 2.0))), 2)
+        low = np.round(np.minimum(open_, close) * (1 - 0.01 * np.abs(_noise(ordinals, phase, 3.0))), 2)
+        vol = np.round(5e5 * (1.2 + _noise(ordinals, phase, 4.0)), 2)
+        change = np.round(close - pre_close, 2)
+        df = pd.DataFrame(
+            {
+                'ts_code': self._stocks['ts_code'].to_numpy()[stocks],
+                'trade_date': _format_ordinals(ordinals),
+                'open': open_,
+                'high': high,
+                'low': low,
+                'close': close,
+                'pre_close': pre_close,
+                'change': change,
+                'pct_chg': np.round(change / pre_close * 100, 4),
+                'vol': vol,
+                'amount': np.round(vol * close / 10, 3),
+            }
+        )
+        return self._page(df, offset, limit)
+
+    def _api_adj_factor(
+        self,
+        ts_code: str | None = None,
+        trade_date: str | None = None,
+        start_date: str | None = None,
+        end_date: str | None = None,
+        **_: Any,
+    ) -> pd.DataFrame:
+        stocks, ordinals = self._grid(ts_code, trade_date, start_date, end_date)
+        # 每年除权一次，复权因子逐年增加
+        years = (ordinals - _parse_date(CALENDAR_START).toordinal()) // 365
+        return pd.DataFrame(
+            {
+                'ts_code': self._stocks['ts_code'].to_numpy()[stocks],
+                'trade_date': _format_ordinals(ordinals),
+                'adj_factor': np.round(self._adj_base[stocks] + 0.05 * years, 3),
+            }
+        )
+
+    def _grid(
+        self, ts_code: str | None, trade_date: str | None, start_date: str | None, end_date: str | None
+    ) -> tuple[np.ndarray, np.ndarray]:
+        """
+        按参数生成 (股票序号, 交易日序数) 组合，按交易日期倒序、股票代码升序排列
+        """
+        stocks = self._select_stocks(ts_code)
+        if trade_date:
+            ordinals = self._trade_ordinals(trade_date, trade_date)
+        elif ts_code:
+            ordinals = self._trade_ordinals(start_date, end_date)
+        else:
+            # Tushare 不允许不指定股票代码和交易日期查询全市场全部历史，此时只返回最近一个交易日
+            ordinals = self._trade_ordinals(end_date or CALENDAR_END, end_date or CALENDAR_END)
+        ordinals = ordinals[::-1]
+        return np.tile(stocks, len(ordinals)), np.repeat(ordinals, len(stocks))
+
+    @staticmethod
+    def _page(df: pd.DataFrame, offset: int | None, limit: int | None) -> pd.DataFrame:
+        start = int(offset or 0)
+        end = start + int(limit) if limit else None
+        return df.iloc[start:end].reset_index(drop=True)
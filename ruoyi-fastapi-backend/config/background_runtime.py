@@ -0,0 +1,136 @@
+import asyncio
+import threading
+from collections.abc import Awaitable, Callable
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, TypeVar
+
+from sqlalchemy.ext.asyncio import create_async_engine
+
+from config.database import ASYNC_SQLALCHEMY_DATABASE_URL
+from config.env import DataBaseConfig
+from utils.log_util import logger
+
+T = TypeVar('T')
+
+
+class _WorkerRuntime:
+    """
+    后台工作线程持有的事件循环和数据库引擎
+    """
+
+    __slots__ = ('engine', 'loop')
+
+    def __init__(self) -> None:
+        self.loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(self.loop)
+        self.engine = create_async_engine(
+            ASYNC_SQLALCHEMY_DATABASE_URL,
+            echo=DataBaseConfig.db_echo,
+            max_overflow=DataBaseConfig.db_background_max_overflow,
+            pool_size=DataBaseConfig.db_background_pool_size,
+            pool_recycle=DataBaseConfig.db_pool_recycle,
+            pool_timeout=DataBaseConfig.db_pool_timeout,
+        )
+
+    def dispose(self) -> None:
+        """
+        释放数据库连接池（需在事件循环空闲时调用）
+
+        :return: None
+        """
+        try:
+            self.loop.run_until_complete(self.engine.dispose())
+        except Exception as e:
+            logger.warning(f'释放后台任务数据库连接池失败: {e}')
+
+
+class BackgroundRuntime:
+    """
+    后台任务运行时
+
+    数据下载、回测、模型训练、因子计算等后台任务统一在固定数量的工作线程中执行。每个工作线程首次执行任务时
+    创建一个事件循环和数据库引擎，之后一直复用，不再为每次任务重新建立连接池；
+    所有后台任务合计的数据库连接数不超过 db_background_workers * (db_background_pool_size + db_background_max_overflow)。
+    工作线程都在忙时，新提交的任务排队等待。
+    """
+
+    _executor: ThreadPoolExecutor | None = None
+    _lock = threading.Lock()
+    _local = threading.local()
+    _runtimes: list[_WorkerRuntime] = []
+
+    @classmethod
+    def get_executor(cls) -> ThreadPoolExecutor:
+        """
+        获取后台任务线程池（首次调用时创建）
+
+        :return: 线程池
+        """
+        if cls._executor is None:
+            with cls._lock:
+                if cls._executor is None:
+                    max_workers = max(1, DataBaseConfig.db_background_workers)
+                    cls._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='background-job')
+                    logger.info(f'后台任务线程池已创建，最大线程数: {max_workers}')
+        return cls._executor
+
+    @classmethod
+    def submit(cls, job: Callable[..., Awaitable[T]], *args: Any, **kwargs: Any) -> 'Future[T]':
+        """
+        提交后台任务，在工作线程的事件循环中执行
+
+        :param job: 协程函数，第一个参数为工作线程的数据库引擎，其余参数为 args、kwargs
+        :return: 任务结果的 Future
+        """
+        return cls.get_executor().submit(cls._run_in_worker, job, *args, **kwargs)
+
+    @classmethod
+    def run(cls, job: Callable[..., Awaitable[T]], *args: Any, **kwargs: Any) -> T:
+        """
+        提交后台任务并等待执行完成（供调度器和后台线程中的同步入口调用）
+
+        :param job: 协程函数，第一个参数为工作线程的数据库引擎，其余参数为 args、kwargs
+        :return: 任务结果
+        """
+        if getattr(cls._local, 'runtime', None) is not None:
+            # 已在工作线程中（同步入口嵌套调用），直接执行，避免占用另一个工作线程等待自身
+            return cls._run_in_worker(job, *args, **kwargs)
+        return cls.submit(job, *args, **kwargs).result()
+
+    @classmethod
+    def _run_in_worker(cls, job: Callable[..., Awaitable[T]], *args: Any, **kwargs: Any) -> T:
+        runtime = getattr(cls._local, 'runtime', None)
+        if runtime is None:
+            runtime = _WorkerRuntime()
+            cls._local.runtime = runtime
+            with cls._lock:
+                cls._runtimes.append(runtime)
+            logger.info(f'后台任务线程 {threading.current_thread().name} 已创建事件循环和数据库连接池')
+        return runtime.loop.run_until_complete(job(runtime.engine, *args, **kwargs))
+
+    @classmethod
+    def shutdown(cls) -> None:
+        """
+        关闭后台任务线程池，取消尚未开始的任务并释放空闲工作线程的数据库连接池
+
+        :return: None
+        """
+        with cls._lock:
+            executor = cls._executor
+            cls._executor = None
+            runtimes = list(cls._runtimes)
+            cls._runtimes.clear()
+        if executor is None:
+            return
+        executor.shutdown(wait=False, cancel_futures=True)
+
+        # 连接绑定在各工作线程的事件循环上，需在该循环中释放；调用方可能运行在另一个事件循环中，改用独立线程执行
+        def dispose_idle_engines() -> None:
+            for runtime in runtimes:
+                if not runtime.loop.is_running() and not runtime.loop.is_closed():
+                    runtime.dispose()
+
+        dispose_thread = threading.Thread(target=dispose_idle_engines, name='background-job-dispose', daemon=True)
+        dispose_thread.start()
+        dispose_thread.join(timeout=DataBaseConfig.db_pool_timeout)
+        logger.info('后台任务线程池已关闭')
@@ -52,6 +52,9 @@ class DataBaseSettings(BaseSettings):
     db_pool_size: int = 50
     db_pool_recycle: int = 3600
     db_pool_timeout: int = 30
+    db_background_workers: int = 4
+    db_background_pool_size: int = 5
+    db_background_max_overflow: int = 5
 
     @computed_field
     @property
@@ -79,6 +82,26 @@ class TushareSettings(BaseSettings):
     """
 
     tushare_token: str = ''
+    tushare_api_max_workers: int = 8
+    tushare_api_timeout: float = 60
+    tushare_api_url: str = 'http://api.tushare.pro'
+    tushare_api_quota_retries: int = 3
+    tushare_rate_limit_redis: bool = True
+    tushare_pg_copy_threshold: int = 1000
+    tushare_schema_cache_ttl: int = 600
+    tushare_cache_enabled: bool = True
+    tushare_cache_dir: str = 'vf_admin/tushare_cache'
+    tushare_parquet_compression: str = 'zstd'
+    tushare_parquet_row_group_size: int = 100000
+    tushare_parquet_flush_rows: int = 500000
+    tushare_parquet_compact_file_size: int = 64 * 1024 * 1024
+    tushare_workflow_max_parallel_steps: int = 4
+    tushare_log_flush_size: int = 500
+    tushare_log_flush_interval: float = 5
+    tushare_kline_cache_size: int = 500
+    tushare_kline_cache_ttl: int = 3600
+    tushare_hot_field_backfill_batch_size: int = 10000
+    tushare_dedup_keep: Literal['first', 'last'] = 'last'
 
 
 class GenSettings:
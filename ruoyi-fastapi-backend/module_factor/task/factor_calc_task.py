@@ -1,13 +1,12 @@
-import asyncio
 from datetime import datetime
 from typing import Any
 
-from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, async_sessionmaker
 
 from datetime import datetime
 
+from config.background_runtime import BackgroundRuntime
 from config.database import AsyncSessionLocal
-from config.env import DataBaseConfig
 from module_factor.dao.factor_dao import FactorCalcLogDao, FactorDefinitionDao, FactorTaskDao
 from module_factor.entity.do.factor_do import FactorCalcLog
 from module_factor.entity.vo.factor_vo import FactorTaskModel
@@ -138,40 +137,13 @@ async def run_factor_task(task_id: int, session: AsyncSession | None = None) ->
 
 def run_factor_task_sync(task_id: int) -> None:
     """
-    同步入口，供调度器调用（与 Tushare 下载任务类似，独立事件循环和连接池）
+    同步入口，供调度器调用（在后台任务工作线程中执行，复用该线程的事件循环和连接池）
     """
-    from urllib.parse import quote_plus
 
-    loop = asyncio.new_event_loop()
-    asyncio.set_event_loop(loop)
+    async def run_with_session(engine: AsyncEngine) -> None:
+        ThreadSessionLocal = async_sessionmaker(autocommit=False, autoflush=False, bind=engine)
+        async with ThreadSessionLocal() as session:
+            await run_factor_task(task_id, session=session)
 
-    try:
-        async_db_url = (
-            f'mysql+asyncmy://{DataBaseConfig.db_username}:{quote_plus(DataBaseConfig.db_password)}@'
-            f'{DataBaseConfig.db_host}:{DataBaseConfig.db_port}/{DataBaseConfig.db_database}'
-        )
-        if DataBaseConfig.db_type == 'postgresql':
-            async_db_url = (
-                f'postgresql+asyncpg://{DataBaseConfig.db_username}:{quote_plus(DataBaseConfig.db_password)}@'
-                f'{DataBaseConfig.db_host}:{DataBaseConfig.db_port}/{DataBaseConfig.db_database}'
-            )
-
-        thread_engine = create_async_engine(
-            async_db_url,
-            echo=DataBaseConfig.db_echo,
-            max_overflow=DataBaseConfig.db_max_overflow,
-            pool_size=DataBaseConfig.db_pool_size,
-            pool_recycle=DataBaseConfig.db_pool_recycle,
-            pool_timeout=DataBaseConfig.db_pool_timeout,
-        )
-        ThreadSessionLocal = async_sessionmaker(autocommit=False, autoflush=False, bind=thread_engine)
-
-        async def run_with_session() -> None:
-            async with ThreadSessionLocal() as session:
-                await run_factor_task(task_id, session=session)
-
-        loop.run_until_complete(run_with_session())
-        loop.run_until_complete(thread_engine.dispose())
-    finally:
-        loop.close()
+    BackgroundRuntime.run(run_with_session)
 
@@ -1,11 +1,9 @@
-import asyncio
 import threading
 from typing import Any
-from urllib.parse import quote_plus
 
-from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlalchemy.ext.asyncio import AsyncEngine, async_sessionmaker
 
-from config.env import DataBaseConfig
+from config.background_runtime import BackgroundRuntime
 from module_factor.entity.vo.factor_vo import ModelTrainRequestModel
 from module_factor.service.model_train_service import ModelTrainService
 from utils.log_util import logger
@@ -16,62 +14,27 @@ def run_model_train_task_sync(
 ) -> None:
     """
     同步执行模型训练任务（在线程中运行）
-    在新线程中创建新的事件循环和数据库连接，避免事件循环冲突
+    在后台任务工作线程中执行，复用该线程的事件循环和数据库连接池
 
     :param db_session_factory: 数据库会话工厂（保留参数以兼容调用，但实际不使用）
     :param task_id: 任务ID
     :param request: 训练请求
     """
-    # 在新线程中创建新的事件循环
-    loop = asyncio.new_event_loop()
-    asyncio.set_event_loop(loop)
-    
-    try:
-        # 在新线程中创建新的数据库引擎和会话
-        # 这样可以避免事件循环冲突
-        async_db_url = (
-            f'mysql+asyncmy://{DataBaseConfig.db_username}:{quote_plus(DataBaseConfig.db_password)}@'
-            f'{DataBaseConfig.db_host}:{DataBaseConfig.db_port}/{DataBaseConfig.db_database}'
-        )
-        if DataBaseConfig.db_type == 'postgresql':
-            async_db_url = (
-                f'postgresql+asyncpg://{DataBaseConfig.db_username}:{quote_plus(DataBaseConfig.db_password)}@'
-                f'{DataBaseConfig.db_host}:{DataBaseConfig.db_port}/{DataBaseConfig.db_database}'
-            )
-        
-        # 创建新的引擎，绑定到当前线程的事件循环
-        thread_engine = create_async_engine(
-            async_db_url,
-            echo=DataBaseConfig.db_echo,
-            max_overflow=DataBaseConfig.db_max_overflow,
-            pool_size=DataBaseConfig.db_pool_size,
-            pool_recycle=DataBaseConfig.db_pool_recycle,
-            pool_timeout=DataBaseConfig.db_pool_timeout,
-        )
-        ThreadSessionLocal = async_sessionmaker(autocommit=False, autoflush=False, bind=thread_engine)
-        
-        # 使用新会话运行训练任务
-        async def run_async():
-            async with ThreadSessionLocal() as db:
-                try:
-                    logger.info(f'开始执行模型训练任务，任务ID：{task_id}')
-                    result = await ModelTrainService.train_model_service(db, request, task_id)
-                    if result.is_success:
-                        logger.info(f'模型训练任务执行成功，任务ID：{task_id}')
-                    else:
-                        logger.error(f'模型训练任务执行失败，任务ID：{task_id}，错误：{result.message}')
-                except Exception as e:
-                    logger.error(f'模型训练任务执行异常，任务ID：{task_id}，错误：{str(e)}', exc_info=True)
-        
-        # 运行异步函数
-        loop.run_until_complete(run_async())
-        
-        # 清理引擎
-        loop.run_until_complete(thread_engine.dispose())
-    finally:
-        # 清理事件循环
-        loop.close()
-        asyncio.set_event_loop(None)
+    # 使用工作线程的数据库引擎创建会话运行训练任务
+    async def run_async(engine: AsyncEngine) -> None:
+        ThreadSessionLocal = async_sessionmaker(autocommit=False, autoflush=False, bind=engine)
+        async with ThreadSessionLocal() as db:
+            try:
+                logger.info(f'开始执行模型训练任务，任务ID：{task_id}')
+                result = await ModelTrainService.train_model_service(db, request, task_id)
+                if result.is_success:
+                    logger.info(f'模型训练任务执行成功，任务ID：{task_id}')
+                else:
+                    logger.error(f'模型训练任务执行失败，任务ID：{task_id}，错误：{result.message}')
+            except Exception as e:
+                logger.error(f'模型训练任务执行异常，任务ID：{task_id}，错误：{str(e)}', exc_info=True)
+
+    BackgroundRuntime.run(run_async)
 
 
 def execute_model_train_task(db_session_factory: Any, task_id: int, request: ModelTrainRequestModel) -> None:
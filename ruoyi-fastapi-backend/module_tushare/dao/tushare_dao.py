@@ -1,17 +1,26 @@
+import itertools
+import re
+import uuid
 from collections.abc import Sequence
+from contextvars import ContextVar, Token
 from typing import Any
 from datetime import datetime
 
+import numpy as np
 import pandas as pd
-from sqlalchemy import delete, select, update
+from sqlalchemy import Integer, case, delete, func, insert, literal, select, update
+from sqlalchemy.dialects.mysql import insert as mysql_insert
+from sqlalchemy.dialects.postgresql import insert as pg_insert
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from common.vo import PageModel
 from module_tushare.entity.do.tushare_do import (
     TushareApiConfig,
     TushareData,
+    TushareDownloadCheckpoint,
     TushareDownloadLog,
     TushareDownloadRun,
+    TushareDownloadStat,
     TushareDownloadTask,
     TushareWorkflowConfig,
     TushareWorkflowStep,
@@ -29,10 +38,21 @@ from module_tushare.entity.vo.tushare_vo import (
     TushareWorkflowStepModel,
     TushareWorkflowStepPageQueryModel,
 )
+from module_tushare.dao.tushare_data_hot_field import TushareDataHotFieldDao
+from module_tushare.dao.tushare_kline_cache import TushareKlineCache
+from module_tushare.dao.tushare_schema_registry import TushareSchemaRegistry
+from module_tushare.dao.tushare_stock_index import TushareStockSearchIndex
+from module_tushare.dao.tushare_table_layout import TushareTableLayout
 from utils.common_util import CamelCaseUtil
 from utils.page_util import PageUtil
 
 
+# 单条批量删除语句的参数个数上限（asyncpg 上限 32767，MySQL 上限 65535）
+DELETE_BATCH_MAX_PARAMS = 30000
+# 当前下载运行写入前批内去重丢弃的行数（由 begin_dedup_count 开启统计）
+_dedup_dropped: ContextVar[dict[str, int] | None] = ContextVar('tushare_dedup_dropped', default=None)
+
+
 class TushareApiConfigDao:
     """
     Tushare接口配置管理模块数据库操作层
@@ -475,8 +495,26 @@ class TushareDownloadLogDao:
         db.add(log)
         await db.flush()
         await db.refresh(log)
+        await TushareDownloadStatDao.add_log_stats_dao(
+            db, [{key: getattr(log, key) for key in ('task_id', 'step_id', 'status', 'record_count', 'duration')}]
+        )
         return log
 
+    @classmethod
+    async def add_logs_dao(cls, db: AsyncSession, logs: Sequence[dict[str, Any]]) -> int:
+        """
+        批量新增日志信息（单条 executemany 语句）
+
+        :param db: orm对象
+        :param logs: 日志字段字典列表（各字典的字段需一致）
+        :return: 新增条数
+        """
+        if not logs:
+            return 0
+        await db.execute(insert(TushareDownloadLog), list(logs))
+        await TushareDownloadStatDao.add_log_stats_dao(db, logs)
+        return len(logs)
+
     @classmethod
     async def delete_log_dao(cls, db: AsyncSession, log_ids: Sequence[int]) -> int:
         """
@@ -486,7 +524,11 @@ class TushareDownloadLogDao:
         :param log_ids: 日志id列表
         :return: 删除结果
         """
+        task_ids = (
+            await db.execute(select(TushareDownloadLog.task_id).where(TushareDownloadLog.log_id.in_(log_ids)).distinct())
+        ).scalars().all()
         result = await db.execute(delete(TushareDownloadLog).where(TushareDownloadLog.log_id.in_(log_ids)))
+        await TushareDownloadStatDao.rebuild_stats_dao(db, task_ids)
         return result.rowcount
 
     @classmethod
@@ -498,8 +540,170 @@ class TushareDownloadLogDao:
         :return: 删除结果
         """
         result = await db.execute(delete(TushareDownloadLog))
+        await db.execute(delete(TushareDownloadStat))
         return result.rowcount
 
+    @classmethod
+    async def get_log_stats_by_step(cls, db: AsyncSession, task_id: int) -> dict[int, dict[str, int]]:
+        """
+        按步骤分组统计任务的下载日志（单条分组查询，统计表无数据时使用）
+
+        :param db: orm对象
+        :param task_id: 任务ID
+        :return: 步骤ID到统计信息的映射，键0为任务合计
+        """
+        result = await db.execute(
+            select(TushareDownloadLog.step_id, *TushareDownloadStatDao.log_aggregate_columns())
+            .where(TushareDownloadLog.task_id == task_id)
+            .group_by(TushareDownloadLog.step_id)
+        )
+        stats: dict[int, dict[str, int]] = {}
+        total = dict.fromkeys(STAT_COUNTER_COLUMNS, 0)
+        for row in result.mappings():
+            values = {key: int(row[key] or 0) for key in STAT_COUNTER_COLUMNS}
+            for key, value in values.items():
+                total[key] += value
+            if row['step_id'] is not None:
+                stats[row['step_id']] = values
+        if total['log_count']:
+            stats[0] = total
+        return stats
+
+
+# 下载日志统计表的累计字段
+STAT_COUNTER_COLUMNS = ('log_count', 'success_count', 'fail_count', 'total_records', 'total_duration', 'duration_count')
+
+
+class TushareDownloadStatDao:
+    """
+    Tushare下载日志统计表数据库操作层（按任务和步骤累计，step_id 为0的行是任务合计）
+    """
+
+    @classmethod
+    def log_aggregate_columns(cls) -> list[Any]:
+        """
+        由下载日志计算统计字段的聚合表达式（字段顺序同 STAT_COUNTER_COLUMNS）
+
+        :return: 聚合表达式列表
+        """
+        return [
+            func.count(TushareDownloadLog.log_id).label('log_count'),
+            func.sum(case((TushareDownloadLog.status == '0', 1), else_=0)).label('success_count'),
+            func.sum(case((TushareDownloadLog.status == '1', 1), else_=0)).label('fail_count'),
+            func.coalesce(func.sum(TushareDownloadLog.record_count), 0).label('total_records'),
+            func.coalesce(func.sum(TushareDownloadLog.duration), 0).label('total_duration'),
+            func.count(TushareDownloadLog.duration).label('duration_count'),
+        ]
+
+    @classmethod
+    def aggregate_logs(cls, logs: Sequence[dict[str, Any]]) -> list[dict[str, Any]]:
+        """
+        将一批日志汇总为统计增量（每个任务一行合计，流程步骤日志另按步骤各一行）
+
+        :param logs: 日志字段字典列表
+        :return: 统计增量列表，按 (task_id, step_id) 排序
+        """
+        increments: dict[tuple[int, int], dict[str, Any]] = {}
+        for log in logs:
+            task_id = log.get('task_id')
+            if task_id is None:
+                continue
+            step_id = log.get('step_id')
+            keys = [(task_id, 0)] if step_id is None else [(task_id, 0), (task_id, step_id)]
+            for key in keys:
+                values = increments.get(key)
+                if values is None:
+                    values = increments[key] = {'task_id': key[0], 'step_id': key[1], **dict.fromkeys(STAT_COUNTER_COLUMNS, 0)}
+                values['log_count'] += 1
+                values['success_count'] += log.get('status') == '0'
+                values['fail_count'] += log.get('status') == '1'
+                values['total_records'] += log.get('record_count') or 0
+                if log.get('duration') is not None:
+                    values['total_duration'] += log['duration']
+                    values['duration_count'] += 1
+        # 按主键顺序写入，避免并发写入不同批次时互相等待行锁形成死锁
+        return [increments[key] for key in sorted(increments)]
+
+    @classmethod
+    async def add_log_stats_dao(cls, db: AsyncSession, logs: Sequence[dict[str, Any]]) -> None:
+        """
+        将一批日志累加到统计表（与日志写入在同一事务中执行）
+
+        :param db: orm对象
+        :param logs: 日志字段字典列表
+        :return: None
+        """
+        from config.env import DataBaseConfig
+
+        increments = cls.aggregate_logs(logs)
+        if not increments:
+            return
+        now = datetime.now()
+        for values in increments:
+            values['update_time'] = now
+        if DataBaseConfig.db_type == 'postgresql':
+            stmt = pg_insert(TushareDownloadStat)
+            stmt = stmt.on_conflict_do_update(
+                index_elements=[TushareDownloadStat.task_id, TushareDownloadStat.step_id],
+                set_={
+                    **{key: getattr(TushareDownloadStat, key) + getattr(stmt.excluded, key) for key in STAT_COUNTER_COLUMNS},
+                    'update_time': stmt.excluded.update_time,
+                },
+            )
+        else:
+            stmt = mysql_insert(TushareDownloadStat)
+            stmt = stmt.on_duplicate_key_update(
+                **{key: getattr(TushareDownloadStat, key) + getattr(stmt.inserted, key) for key in STAT_COUNTER_COLUMNS},
+                update_time=stmt.inserted.update_time,
+            )
+        await db.execute(stmt, increments)
+
+    @classmethod
+    async def get_task_stats_dao(cls, db: AsyncSession, task_id: int) -> dict[int, dict[str, int]]:
+        """
+        获取任务及其各步骤的累计统计
+
+        :param db: orm对象
+        :param task_id: 任务ID
+        :return: 步骤ID到统计信息的映射，键0为任务合计
+        """
+        rows = (
+            await db.execute(select(TushareDownloadStat).where(TushareDownloadStat.task_id == task_id))
+        ).scalars().all()
+        return {row.step_id: {key: getattr(row, key) or 0 for key in STAT_COUNTER_COLUMNS} for row in rows}
+
+    @classmethod
+    async def rebuild_stats_dao(cls, db: AsyncSession, task_ids: Sequence[int]) -> None:
+        """
+        由下载日志重建任务的统计（删除日志后调用）
+
+        :param db: orm对象
+        :param task_ids: 任务ID列表
+        :return: None
+        """
+        if not task_ids:
+            return
+        await db.execute(delete(TushareDownloadStat).where(TushareDownloadStat.task_id.in_(task_ids)))
+        columns = ['task_id', 'step_id', *STAT_COUNTER_COLUMNS, 'update_time']
+        aggregates = [*cls.log_aggregate_columns(), func.now()]
+        in_tasks = TushareDownloadLog.task_id.in_(task_ids)
+        await db.execute(
+            insert(TushareDownloadStat).from_select(
+                columns,
+                select(TushareDownloadLog.task_id, literal(0, Integer), *aggregates)
+                .where(in_tasks)
+                .group_by(TushareDownloadLog.task_id),
+            )
+        )
+        await db.execute(
+            insert(TushareDownloadStat).from_select(
+                columns,
+                select(TushareDownloadLog.task_id, TushareDownloadLog.step_id, *aggregates)
+                .where(in_tasks, TushareDownloadLog.step_id.is_not(None))
+                .group_by(TushareDownloadLog.task_id, TushareDownloadLog.step_id),
+            )
+        )
+
 
 class TushareDownloadRunDao:
     """
@@ -542,6 +746,7 @@ class TushareDownloadRunDao:
         total_records: int | None = None,
         success_records: int | None = None,
         fail_records: int | None = None,
+        dedup_records: int | None = None,
         error_message: str | None = None,
         set_start_time: bool = False,
         set_end_time: bool = False,
@@ -549,6 +754,36 @@ class TushareDownloadRunDao:
         """
         更新运行记录的状态/进度/统计信息
         """
+        values = cls.build_run_status_values(
+            status=status,
+            progress=progress,
+            total_records=total_records,
+            success_records=success_records,
+            fail_records=fail_records,
+            dedup_records=dedup_records,
+            error_message=error_message,
+            set_start_time=set_start_time,
+            set_end_time=set_end_time,
+        )
+        await cls.update_run_values(db, run_id, values)
+        return run_id
+
+    @classmethod
+    def build_run_status_values(
+        cls,
+        status: str | None = None,
+        progress: int | None = None,
+        total_records: int | None = None,
+        success_records: int | None = None,
+        fail_records: int | None = None,
+        dedup_records: int | None = None,
+        error_message: str | None = None,
+        set_start_time: bool = False,
+        set_end_time: bool = False,
+    ) -> dict[str, Any]:
+        """
+        生成运行记录的更新字段（开始/结束时间取调用时刻），参数为空的字段不更新
+        """
         values: dict[str, Any] = {}
         if status is not None:
             values['status'] = status
@@ -560,6 +795,8 @@ class TushareDownloadRunDao:
             values['success_records'] = success_records
         if fail_records is not None:
             values['fail_records'] = fail_records
+        if dedup_records is not None:
+            values['dedup_records'] = dedup_records
         if error_message is not None:
             values['error_message'] = error_message
         now = datetime.now()
@@ -569,10 +806,114 @@ class TushareDownloadRunDao:
             values['end_time'] = now
         if values:
             values['update_time'] = now
+        return values
+
+    @classmethod
+    async def update_run_values(cls, db: AsyncSession, run_id: int, values: dict[str, Any]) -> None:
+        """
+        按字段字典更新运行记录
+
+        :param db: orm对象
+        :param run_id: 运行ID
+        :param values: 更新字段
+        :return: None
+        """
+        if values:
+            await db.execute(update(TushareDownloadRun).where(TushareDownloadRun.run_id == run_id).values(**values))
+
+    @classmethod
+    async def get_run_by_id(cls, db: AsyncSession, run_id: int) -> TushareDownloadRun | None:
+        """
+        根据运行ID获取运行记录
+
+        :param db: orm对象
+        :param run_id: 运行ID
+        :return: 运行记录
+        """
+        return (
+            await db.execute(select(TushareDownloadRun).where(TushareDownloadRun.run_id == run_id))
+        ).scalars().first()
+
+    @classmethod
+    async def get_latest_run_by_task_id(cls, db: AsyncSession, task_id: int) -> TushareDownloadRun | None:
+        """
+        获取任务最近一次的运行记录
+
+        :param db: orm对象
+        :param task_id: 任务ID
+        :return: 运行记录
+        """
+        return (
             await db.execute(
-                update(TushareDownloadRun).where(TushareDownloadRun.run_id == run_id).values(**values)
+                select(TushareDownloadRun)
+                .where(TushareDownloadRun.task_id == task_id)
+                .order_by(TushareDownloadRun.run_id.desc())
+                .limit(1)
             )
-        return run_id
+        ).scalars().first()
+
+
+class TushareDownloadCheckpointDao:
+    """
+    Tushare下载任务运行检查点数据库操作层
+    """
+
+    @classmethod
+    async def get_completed_combo_keys(cls, db: AsyncSession, run_id: int, step_id: int) -> set[str]:
+        """
+        获取运行中某个步骤已提交的参数组合键
+
+        :param db: orm对象
+        :param run_id: 运行ID
+        :param step_id: 步骤ID
+        :return: 参数组合键集合
+        """
+        result = await db.execute(
+            select(TushareDownloadCheckpoint.combo_key).where(
+                TushareDownloadCheckpoint.run_id == run_id,
+                TushareDownloadCheckpoint.step_id == step_id,
+            )
+        )
+        return set(result.scalars().all())
+
+    @classmethod
+    async def add_checkpoint_dao(
+        cls, db: AsyncSession, run_id: int, step_id: int, combo_key: str, combo_index: int, record_count: int
+    ) -> None:
+        """
+        记录参数组合检查点（与该组合的数据在同一保存点内写入，随数据一起提交或回滚）
+
+        :param db: orm对象
+        :param run_id: 运行ID
+        :param step_id: 步骤ID
+        :param combo_key: 参数组合键
+        :param combo_index: 参数组合序号
+        :param record_count: 写入记录数
+        :return: None
+        """
+        db.add(
+            TushareDownloadCheckpoint(
+                run_id=run_id,
+                step_id=step_id,
+                combo_key=combo_key,
+                combo_index=combo_index,
+                record_count=record_count,
+                create_time=datetime.now(),
+            )
+        )
+        await db.flush()
+
+    @classmethod
+    async def delete_checkpoints_by_run_id(cls, db: AsyncSession, run_id: int) -> int:
+        """
+        删除运行的全部检查点（运行成功后不再需要续跑）
+
+        :param db: orm对象
+        :param run_id: 运行ID
+        :return: 删除的行数
+        """
+        result = await db.execute(delete(TushareDownloadCheckpoint).where(TushareDownloadCheckpoint.run_id == run_id))
+        return result.rowcount
 
 
 class TushareDataDao:
@@ -620,6 +961,7 @@ class TushareDataDao:
         """
         db.add(data)
         await db.flush()
+        await TushareDataHotFieldDao.fill_new_rows(db, [data])
         return data
 
     @classmethod
@@ -633,8 +975,35 @@ class TushareDataDao:
         """
         db.add_all(data_list)
         await db.flush()
+        await TushareDataHotFieldDao.fill_new_rows(db, data_list)
         return data_list
 
+    @classmethod
+    async def get_date_ranges(
+        cls, db: AsyncSession, table_name: str, key_fields: list[str], date_field: str = 'trade_date'
+    ) -> dict[tuple, tuple[Any, Any]]:
+        """
+        按键字段分组查询数据表中已有数据的最早和最大日期
+
+        :param db: orm对象
+        :param table_name: 表名（需已通过表结构缓存校验存在）
+        :param key_fields: 分组键字段（为空时查询整表的日期范围）
+        :param date_field: 日期字段
+        :return: {键字段取值元组: (最早日期, 最大日期)}
+        """
+        from sqlalchemy import text
+        from config.env import DataBaseConfig
+
+        quote = '"' if DataBaseConfig.db_type == 'postgresql' else '`'
+        key_cols = [f'{quote}{col}{quote}' for col in key_fields]
+        date_col = f'{quote}{date_field}{quote}'
+        select_cols = ', '.join([*key_cols, f'MIN({date_col})', f'MAX({date_col})'])
+        sql = f'SELECT {select_cols} FROM {quote}{table_name}{quote}'
+        if key_cols:
+            sql += f' GROUP BY {", ".join(key_cols)}'
+        result = await db.execute(text(sql))
+        return {tuple(row[:-2]): (row[-2], row[-1]) for row in result.fetchall() if row[-1] is not None}
+
     @classmethod
     async def detect_unique_keys(cls, db: AsyncSession, table_name: str) -> list[str]:
         """
@@ -644,49 +1013,15 @@ class TushareDataDao:
         :param table_name: 表名
         :return: 唯一键字段列表
         """
-        from sqlalchemy import text
-        from config.env import DataBaseConfig
         import re
         
         # 验证表名，防止SQL注入
         if not re.match(r'^[a-zA-Z_][a-zA-Z0-9_]*$', table_name):
             raise ValueError(f'无效的表名: {table_name}')
         
-        unique_keys = []
-        
-        if DataBaseConfig.db_type == 'postgresql':
-            # PostgreSQL: 查询主键和唯一索引
-            query_sql = """
-                SELECT DISTINCT ccu.column_name
-                FROM information_schema.table_constraints tc
-                JOIN information_schema.constraint_column_usage ccu 
-                    ON tc.constraint_name = ccu.constraint_name
-                    AND tc.table_schema = ccu.table_schema
-                WHERE tc.table_schema = 'public'
-                    AND tc.table_name = :table_name
-                    AND tc.constraint_type IN ('PRIMARY KEY', 'UNIQUE')
-                ORDER BY ccu.column_name
-            """
-            result = await db.execute(text(query_sql), {'table_name': table_name})
-            unique_keys = [row[0] for row in result.fetchall()]
-        else:
-            # MySQL: 查询主键和唯一索引
-            query_sql = """
-                SELECT DISTINCT kcu.column_name
-                FROM information_schema.key_column_usage kcu
-                JOIN information_schema.table_constraints tc
-                    ON kcu.constraint_name = tc.constraint_name
-                    AND kcu.table_schema = tc.table_schema
-                    AND kcu.table_name = tc.table_name
-                WHERE kcu.table_schema = DATABASE()
-                    AND kcu.table_name = :table_name
-                    AND tc.constraint_type IN ('PRIMARY KEY', 'UNIQUE')
-                ORDER BY kcu.ordinal_position, kcu.column_name
-            """
-            result = await db.execute(text(query_sql), {'table_name': table_name})
-            unique_keys = [row[0] for row in result.fetchall()]
-        
-        return unique_keys
+        # 表结构（主键和唯一约束）从进程级缓存中获取
+        schema = await TushareSchemaRegistry.get_schema(db, table_name)
+        return schema.unique_key_columns() if schema is not None else []
 
     @classmethod
     async def get_unique_key_fields(
@@ -707,8 +1042,6 @@ class TushareDataDao:
         :param primary_key_fields_str: 主键字段JSON字符串（可选，优先使用此参数避免访问 config 对象）
         :return: 唯一键字段列表
         """
-        from sqlalchemy import text
-        from config.env import DataBaseConfig
         from utils.log_util import logger
         
         # 第一优先级：步骤配置的唯一键字段
@@ -716,29 +1049,8 @@ class TushareDataDao:
             logger.debug(f'使用步骤配置的唯一键字段: {step_unique_key_fields}')
             return step_unique_key_fields
         
-        # 检查表是否存在
-        table_exists = False
-        if DataBaseConfig.db_type == 'postgresql':
-            check_sql = """
-                SELECT EXISTS (
-                    SELECT FROM information_schema.tables 
-                    WHERE table_schema = 'public' 
-                    AND table_name = :table_name
-                )
-            """
-        else:
-            check_sql = """
-                SELECT COUNT(*) as count
-                FROM information_schema.tables 
-                WHERE table_schema = DATABASE()
-                AND table_name = :table_name
-            """
-        
-        result = await db.execute(text(check_sql), {'table_name': table_name})
-        if DataBaseConfig.db_type == 'postgresql':
-            table_exists = result.scalar()
-        else:
-            table_exists = result.scalar() > 0
+        # 检查表是否存在（使用表结构缓存）
+        table_exists = await TushareSchemaRegistry.table_exists(db, table_name)
         
         # 第二优先级：如果表已存在，且接口配置的主键字段也有，则优先使用接口配置的主键字段
         # 优先使用传入的 primary_key_fields_str，避免访问 config 对象导致延迟加载
@@ -814,99 +1126,17 @@ class TushareDataDao:
         :param columns: 列名列表
         :return: 是否存在唯一约束
         """
-        from sqlalchemy import text
-        from config.env import DataBaseConfig
         from utils.log_util import logger
         
         if not columns or len(columns) == 0:
             return False
         
         try:
-            if DataBaseConfig.db_type == 'postgresql':
-                # PostgreSQL: 检查唯一约束或唯一索引
-                # 注意：CREATE UNIQUE INDEX 创建的是索引（在 pg_index），不是约束（pg_constraint）
-                # 两者都支持 ON CONFLICT，需同时检查
-                columns_sorted = sorted(columns)
-                columns_array_str = '{' + ','.join([f'"{col}"' for col in columns_sorted]) + '}'
-
-                # 1) 检查 pg_constraint 中的唯一约束
-                # 2) 检查 pg_index 中的唯一索引（CREATE UNIQUE INDEX 创建的不在 pg_constraint 中）
-                check_sql = f"""
-                    SELECT (
-                        SELECT EXISTS (
-                            SELECT 1
-                            FROM pg_constraint c
-                            JOIN pg_class t ON c.conrelid = t.oid
-                            JOIN pg_namespace n ON t.relnamespace = n.oid
-                            WHERE n.nspname = 'public'
-                            AND t.relname = :table_name
-                            AND c.contype = 'u'
-                            AND array_length(c.conkey, 1) = :col_count
-                            AND (
-                                SELECT array_agg(a.attname::text ORDER BY a.attname)
-                                FROM pg_attribute a
-                                WHERE a.attrelid = c.conrelid
-                                AND a.attnum = ANY(c.conkey)
-                            ) = '{columns_array_str}'::text[]
-                        )
-                        OR EXISTS (
-                            SELECT 1
-                            FROM pg_index i
-                            JOIN pg_class t ON i.indrelid = t.oid
-                            JOIN pg_namespace n ON t.relnamespace = n.oid
-                            WHERE n.nspname = 'public'
-                            AND t.relname = :table_name
-                            AND i.indisunique = true
-                            AND (
-                                SELECT array_agg(a.attname::text ORDER BY a.attname)
-                                FROM pg_attribute a
-                                WHERE a.attrelid = i.indrelid
-                                AND a.attnum = ANY(i.indkey)
-                                AND a.attnum > 0
-                            ) = '{columns_array_str}'::text[]
-                        )
-                    )
-                """
-
-                result = await db.execute(
-                    text(check_sql),
-                    {
-                        'table_name': table_name,
-                        'col_count': len(columns)
-                    }
-                )
-                exists = result.scalar()
-                result_bool = bool(exists) if exists is not None else False
-                logger.debug(f'表 {table_name} 唯一约束/索引检查: 字段 {columns} -> {result_bool}')
-                return result_bool
-            else:
-                # MySQL: 检查唯一索引
-                check_sql = """
-                    SELECT COUNT(*) > 0
-                    FROM information_schema.statistics
-                    WHERE table_schema = DATABASE()
-                    AND table_name = :table_name
-                    AND index_name IN (
-                        SELECT index_name
-                        FROM information_schema.statistics
-                        WHERE table_schema = DATABASE()
-                        AND table_name = :table_name
-                        AND non_unique = 0
-                        GROUP BY index_name
-                        HAVING COUNT(*) = :col_count
-                        AND GROUP_CONCAT(column_name ORDER BY seq_in_index) = :columns
-                    )
-                """
-                columns_str = ','.join(columns)
-                result = await db.execute(
-                    text(check_sql),
-                    {
-                        'table_name': table_name,
-                        'col_count': len(columns),
-                        'columns': columns_str
-                    }
-                )
-                return result.scalar() > 0
+            # 唯一约束和 CREATE UNIQUE INDEX 创建的唯一索引都支持 ON CONFLICT，表结构缓存中两者都包含
+            schema = await TushareSchemaRegistry.get_schema(db, table_name)
+            result_bool = schema is not None and schema.has_unique_index(columns)
+            logger.debug(f'表 {table_name} 唯一约束/索引检查: 字段 {columns} -> {result_bool}')
+            return result_bool
         except Exception as e:
             logger.warning(f'检查表 {table_name} 的唯一约束时出错: {e}，假设不存在')
             return False
@@ -942,45 +1172,14 @@ class TushareDataDao:
                 return
 
         try:
-            # 检查表是否存在
-            if DataBaseConfig.db_type == 'postgresql':
-                check_sql = """
-                    SELECT EXISTS (
-                        SELECT FROM information_schema.tables
-                        WHERE table_schema = 'public'
-                        AND table_name = :table_name
-                    )
-                """
-            else:
-                check_sql = """
-                    SELECT COUNT(*) > 0
-                    FROM information_schema.tables
-                    WHERE table_schema = DATABASE()
-                    AND table_name = :table_name
-                """
-            result = await db.execute(text(check_sql), {'table_name': table_name})
-            table_exists = result.scalar() if DataBaseConfig.db_type == 'postgresql' else result.scalar() > 0
-            if not table_exists:
+            # 检查表是否存在（使用表结构缓存）
+            schema = await TushareSchemaRegistry.get_schema(db, table_name)
+            if schema is None:
                 logger.debug(f'ensure_unique_index: 表 {table_name} 不存在，跳过创建唯一索引（由 ensure_table_exists 负责建表）')
                 return
 
             # 检查表中是否包含 unique_key_fields 中的每一列
-            if DataBaseConfig.db_type == 'postgresql':
-                cols_sql = """
-                    SELECT column_name
-                    FROM information_schema.columns
-                    WHERE table_schema = 'public'
-                    AND table_name = :table_name
-                """
-            else:
-                cols_sql = """
-                    SELECT column_name
-                    FROM information_schema.columns
-                    WHERE table_schema = DATABASE()
-                    AND table_name = :table_name
-                """
-            result = await db.execute(text(cols_sql), {'table_name': table_name})
-            existing_columns = {row[0] for row in result.fetchall()}
+            existing_columns = schema.column_set
             missing = [c for c in unique_key_fields if c not in existing_columns]
             if missing:
                 logger.warning(
@@ -989,7 +1188,7 @@ class TushareDataDao:
                 return
 
             # 若已存在唯一约束则直接返回
-            if await cls._check_unique_constraint_exists(db, table_name, unique_key_fields):
+            if schema.has_unique_index(unique_key_fields):
                 logger.debug(f'表 {table_name} 在字段 {unique_key_fields} 上已有唯一约束，无需创建')
                 return
 
@@ -1011,10 +1210,278 @@ class TushareDataDao:
 
             await db.execute(text(create_sql))
             await db.flush()
+            TushareSchemaRegistry.invalidate(table_name)
             logger.info(f'已为表 {table_name} 在字段 {unique_key_fields} 上创建唯一索引: {index_name}')
         except Exception as e:
+            # 失败原因可能是缓存的表结构已过期（如索引已被其他进程创建），重新加载
+            TushareSchemaRegistry.invalidate(table_name)
             logger.warning(f'ensure_unique_index: 为表 {table_name} 创建唯一索引失败: {e}')
 
+    @classmethod
+    def sanitize_column_name(cls, col: Any) -> str:
+        """
+        将 DataFrame 列名转换为安全的数据库列名（只保留字母、数字和下划线，不以数字开头）
+
+        :param col: 原始列名
+        :return: 安全列名
+        """
+        safe_col = re.sub(r'[^a-zA-Z0-9_]', '_', str(col))
+        if not safe_col or safe_col[0].isdigit():
+            safe_col = f'col_{safe_col}'
+        return safe_col
+
+    @classmethod
+    def dataframe_to_column_arrays(cls, df: pd.DataFrame) -> tuple[list[str], list[np.ndarray]]:
+        """
+        按列将 DataFrame 转换为对象数组（列式转换，替代逐行 iterrows）
+
+        每列只做一次类型转换：数值转换为 Python 原生类型，NaN/NaT/None 统一替换为 None。
+
+        :param df: pandas DataFrame
+        :return: (安全列名列表, 与列名一一对应的对象数组列表)
+        """
+        df_columns = [cls.sanitize_column_name(col) for col in df.columns]
+        column_arrays = []
+        for position in range(df.shape[1]):
+            series = df.iloc[:, position]
+            values = series.to_numpy(dtype=object, copy=True)
+            null_mask = series.isna().to_numpy()
+            if null_mask.any():
+                values[null_mask] = None
+            column_arrays.append(values)
+        return df_columns, column_arrays
+
+    @classmethod
+    def deduplicate_by_unique_keys(
+        cls, df: pd.DataFrame, unique_key_fields: list[str], keep: str = 'last'
+    ) -> tuple[pd.DataFrame, int]:
+        """
+        按唯一键对同一批数据去重（向量化，避免同一条写入语句中多行冲突同一唯一键）
+
+        唯一键中的系统列（任务ID、接口代码等）在同一批中取值相同，只按数据中的列判断；
+        唯一键含空值的行在数据库中不会冲突，予以保留。
+
+        :param df: pandas DataFrame
+        :param unique_key_fields: 唯一键字段列表（安全列名）
+        :param keep: 重复时保留的行（'first' 首条，'last' 末条）
+        :return: (去重后的 DataFrame, 丢弃的行数)
+        """
+        key_columns = [col for col in df.columns if cls.sanitize_column_name(col) in unique_key_fields]
+        if not key_columns or len(df) < 2:
+            return df, 0
+        keys = df[key_columns]
+        duplicated = keys.duplicated(keep=keep).to_numpy() & keys.notna().all(axis=1).to_numpy()
+        dropped = int(duplicated.sum())
+        if not dropped:
+            return df, 0
+        return df[~duplicated], dropped
+
+    @classmethod
+    def begin_dedup_count(cls) -> Token:
+        """
+        开始统计当前下载运行（及其创建的协程）批内去重丢弃的行数
+
+        :return: 结束统计时传给 end_dedup_count 的令牌
+        """
+        return _dedup_dropped.set({'dropped': 0})
+
+    @classmethod
+    def get_dedup_count(cls) -> int:
+        """
+        获取当前下载运行批内去重丢弃的行数
+
+        :return: 丢弃的行数（未开启统计时为0）
+        """
+        counter = _dedup_dropped.get()
+        return counter['dropped'] if counter else 0
+
+    @classmethod
+    def end_dedup_count(cls, token: Token) -> None:
+        """
+        结束统计
+
+        :param token: begin_dedup_count 返回的令牌
+        :return: None
+        """
+        _dedup_dropped.reset(token)
+
+    @classmethod
+    def column_arrays_to_records(
+        cls, system_values: dict[str, Any], df_columns: list[str], column_arrays: list[np.ndarray]
+    ) -> list[dict[str, Any]]:
+        """
+        由列数组构建批量执行参数（每行一个字典，系统列取固定值）
+
+        :param system_values: 系统列及其取值（每行相同）
+        :param df_columns: 安全列名列表
+        :param column_arrays: 列数组列表
+        :return: 参数字典列表
+        """
+        all_columns = list(system_values.keys()) + df_columns
+        system_tuple = tuple(system_values.values())
+        return [dict(zip(all_columns, system_tuple + row, strict=True)) for row in zip(*column_arrays, strict=True)]
+
+    @classmethod
+    def build_key_delete_statements(
+        cls,
+        table_name: str,
+        key_fields: list[str],
+        key_rows: Sequence[Sequence[Any]],
+        quote_char: str = '"',
+        max_params: int = DELETE_BATCH_MAX_PARAMS,
+    ) -> list[tuple[str, dict[str, Any]]]:
+        """
+        构建按唯一键批量删除的语句（MySQL 和 PostgreSQL 通用）
+
+        键值完整的行使用 IN 列表（复合键使用行值 IN：(a, b) IN ((:k0_0, :k0_1), ...)），
+        含 NULL 的行无法用 IN 匹配，改用 IS NULL 条件的 OR 组合；两类语句都按参数个数上限分批。
+
+        :param table_name: 表名（调用方已校验）
+        :param key_fields: 唯一键字段列表
+        :param key_rows: 唯一键值列表（每行一个元组，与 key_fields 顺序一致）
+        :param quote_char: 标识符引号（PostgreSQL 为双引号，MySQL 为反引号）
+        :param max_params: 单条语句的参数个数上限
+        :return: (删除语句, 参数字典) 列表
+        """
+        quoted_table = f'{quote_char}{table_name}{quote_char}'
+        quoted_fields = [f'{quote_char}{field}{quote_char}' for field in key_fields]
+        key_count = len(key_fields)
+        batch_size = max(1, max_params // key_count)
+
+        # 去重并保持顺序，区分是否含 NULL
+        full_rows: list[tuple] = []
+        null_rows: list[tuple] = []
+        for key_row in dict.fromkeys(tuple(row) for row in key_rows):
+            (null_rows if any(value is None for value in key_row) else full_rows).append(key_row)
+
+        statements = []
+        target = quoted_fields[0] if key_count == 1 else '(' + ', '.join(quoted_fields) + ')'
+        for batch_start in range(0, len(full_rows), batch_size):
+            params = {}
+            row_placeholders = []
+            for row_index, key_row in enumerate(full_rows[batch_start:batch_start + batch_size]):
+                names = [f'k{row_index}_{field_index}' for field_index in range(key_count)]
+                params.update(zip(names, key_row, strict=True))
+                placeholders = ', '.join([f':{name}' for name in names])
+                row_placeholders.append(placeholders if key_count == 1 else f'({placeholders})')
+            statements.append((f'DELETE FROM {quoted_table} WHERE {target} IN ({", ".join(row_placeholders)})', params))
+
+        for batch_start in range(0, len(null_rows), batch_size):
+            params = {}
+            row_conditions = []
+            for row_index, key_row in enumerate(null_rows[batch_start:batch_start + batch_size]):
+                conditions = []
+                for field_index, (field, value) in enumerate(zip(quoted_fields, key_row, strict=True)):
+                    if value is None:
+                        conditions.append(f'{field} IS NULL')
+                    else:
+                        name = f'n{row_index}_{field_index}'
+                        conditions.append(f'{field} = :{name}')
+                        params[name] = value
+                row_conditions.append('(' + ' AND '.join(conditions) + ')')
+            statements.append((f'DELETE FROM {quoted_table} WHERE {" OR ".join(row_conditions)}', params))
+
+        return statements
+
+    @classmethod
+    async def copy_merge_postgresql(
+        cls,
+        db: AsyncSession,
+        table_name: str,
+        system_values: dict[str, Any],
+        df_columns: list[str],
+        column_arrays: list[np.ndarray],
+        update_mode: str,
+        unique_key_fields: list[str] | None,
+    ) -> int | None:
+        """
+        PostgreSQL 批量写入：通过 COPY 将数据流式写入临时暂存表，再用一条集合语句合并到目标表
+
+        - '0': INSERT ... SELECT
+        - '1': INSERT ... SELECT ... ON CONFLICT DO NOTHING
+        - '2': INSERT ... SELECT DISTINCT ON ... ON CONFLICT DO UPDATE（批内重复键保留最后一条）
+        - '3': DELETE ... USING 暂存表，再 INSERT ... SELECT
+        整个过程在保存点中执行，失败时回滚保存点并返回 None，由调用方回退到逐条参数的批量执行方式。
+
+        :param db: orm对象
+        :param table_name: 目标表名（调用方已校验）
+        :param system_values: 系统列及其取值（每行相同）
+        :param df_columns: 安全列名列表
+        :param column_arrays: 与列名对应的列数组
+        :param update_mode: 更新方式
+        :param unique_key_fields: 唯一键字段列表
+        :return: 写入的记录数，失败时返回None
+        """
+        from sqlalchemy import text
+        from utils.log_util import logger
+
+        all_columns = list(system_values.keys()) + df_columns
+        row_count = len(column_arrays[0]) if column_arrays else 0
+        if row_count == 0:
+            return 0
+        stage_name = f'_stage_{uuid.uuid4().hex[:16]}'
+        col_names = ', '.join([f'"{col}"' for col in all_columns])
+        records = zip(
+            *[itertools.repeat(value, row_count) for value in system_values.values()], *column_arrays, strict=False
+        )
+
+        savepoint = await db.begin_nested()
+        try:
+            # 暂存表只包含需要写入的列，类型与目标表一致；__row_no 记录数据原始顺序
+            await db.execute(text(f'CREATE TEMP TABLE "{stage_name}" AS SELECT {col_names} FROM "{table_name}" WITH NO DATA'))
+            await db.execute(text(f'ALTER TABLE "{stage_name}" ADD COLUMN "__row_no" BIGSERIAL'))
+            connection = await db.connection()
+            raw_connection = await connection.get_raw_connection()
+            await raw_connection.driver_connection.copy_records_to_table(
+                stage_name, records=records, columns=all_columns
+            )
+
+            insert_sql = f'INSERT INTO "{table_name}" ({col_names}) SELECT {col_names} FROM "{stage_name}"'
+            written_rows = row_count
+            if update_mode == '1' and unique_key_fields and await cls._check_unique_constraint_exists(
+                db, table_name, unique_key_fields
+            ):
+                conflict_cols = ', '.join([f'"{col}"' for col in unique_key_fields])
+                result = await db.execute(
+                    text(f'{insert_sql} ORDER BY "__row_no" ON CONFLICT ({conflict_cols}) DO NOTHING')
+                )
+                written_rows = result.rowcount if result.rowcount is not None and result.rowcount >= 0 else row_count
+            elif update_mode == '2' and unique_key_fields:
+                conflict_cols = ', '.join([f'"{col}"' for col in unique_key_fields])
+                update_cols = [col for col in all_columns if col not in unique_key_fields]
+                update_set = ', '.join([f'"{col}" = EXCLUDED."{col}"' for col in update_cols])
+                # 同一条语句中同一键只能更新一次，批内重复键按原始顺序保留最后一条（与逐条执行结果一致）
+                await db.execute(
+                    text(
+                        f'INSERT INTO "{table_name}" ({col_names}) '
+                        f'SELECT DISTINCT ON ({conflict_cols}) {col_names} FROM "{stage_name}" '
+                        f'ORDER BY {conflict_cols}, "__row_no" DESC '
+                        f'ON CONFLICT ({conflict_cols}) DO {"UPDATE SET " + update_set if update_set else "NOTHING"}'
+                    )
+                )
+            elif update_mode == '3' and unique_key_fields:
+                key_cols = ', '.join([f'"{col}"' for col in unique_key_fields])
+                join_conditions = ' AND '.join([f't."{col}" = s."{col}"' for col in unique_key_fields])
+                await db.execute(
+                    text(
+                        f'DELETE FROM "{table_name}" AS t '
+                        f'USING (SELECT DISTINCT {key_cols} FROM "{stage_name}") AS s WHERE {join_conditions}'
+                    )
+                )
+                await db.execute(text(f'{insert_sql} ORDER BY "__row_no"'))
+            else:
+                await db.execute(text(f'{insert_sql} ORDER BY "__row_no"'))
+
+            await db.execute(text(f'DROP TABLE "{stage_name}"'))
+            await savepoint.commit()
+        except Exception as copy_error:
+            await savepoint.rollback()
+            logger.warning(f'表 {table_name} COPY 批量写入失败，回退到普通批量写入: {copy_error}')
+            return None
+
+        logger.debug(f'表 {table_name} 通过 COPY 暂存表写入 {written_rows} 条数据（共 {row_count} 条，更新模式: {update_mode}）')
+        return written_rows
+
     @classmethod
     async def add_dataframe_to_table_dao(
         cls, db: AsyncSession, table_name: str, df: pd.DataFrame, task_id: int, config_id: int, api_code: str, download_date: str,
@@ -1042,10 +1509,9 @@ class TushareDataDao:
         :return: 插入的记录数
         """
         from sqlalchemy import text
-        from config.env import DataBaseConfig
+        from config.env import DataBaseConfig, TushareConfig
         from utils.log_util import logger
         import json
-        import re
         from datetime import datetime
 
         if df is None or df.empty:
@@ -1054,21 +1520,25 @@ class TushareDataDao:
         # 验证表名，只允许字母、数字和下划线
         if not re.match(r'^[a-zA-Z_][a-zA-Z0-9_]*$', table_name):
             raise ValueError(f'无效的表名: {table_name}')
-
-        # 准备列名（系统列 + DataFrame 列）
-        system_columns = ['task_id', 'config_id', 'api_code', 'download_date', 'create_time']
-        
-        # 清理和验证 DataFrame 列名
-        df_columns = []
-        col_mapping = {}  # 原始列名 -> 安全列名的映射
-        for col in df.columns:
-            safe_col = re.sub(r'[^a-zA-Z0-9_]', '_', str(col))
-            if not safe_col or safe_col[0].isdigit():
-                safe_col = f'col_{safe_col}'
-            df_columns.append(safe_col)
-            col_mapping[col] = safe_col
-        
-        all_columns = system_columns + df_columns
+        # 固定存储结构的分区表：分区字段不是 YYYYMMDD 的行无法落入年度分区，会导致整批写入失败
+        df = TushareTableLayout.drop_invalid_partition_rows(table_name, df)
+        if df.empty:
+            return 0
+        # 写入股票基础信息时标记搜索索引过期，下载任务结束后重新加载
+        TushareStockSearchIndex.mark_stale(table_name, api_code)
+        # 写入日K线时记录股票及最早日期，下载任务结束后追加到K线缓存
+        TushareKlineCache.record_writes(table_name, df)
+
+        # 准备列名（系统列 + DataFrame 列），列名清理与 NaN 处理按列一次完成
+        system_values = {
+            'task_id': task_id,
+            'config_id': config_id,
+            'api_code': api_code,
+            'download_date': download_date,
+            'create_time': datetime.now(),
+        }
+        system_columns = list(system_values.keys())
+        all_columns = system_columns + [cls.sanitize_column_name(col) for col in df.columns]
 
         # 确定唯一键字段（使用新的优先级逻辑）
         # 传递提前提取的 primary_key_fields_str，避免访问 config 对象导致延迟加载
@@ -1096,30 +1566,30 @@ class TushareDataDao:
         # 若为需要唯一键的更新模式，确保表上存在对应唯一索引（无则创建）
         if update_mode in ('1', '2', '3') and unique_key_fields:
             await cls.ensure_unique_index(db, table_name, unique_key_fields)
+            # 写入前按唯一键批内去重：UPSERT 同一语句中两行冲突同一唯一键会报错，其余模式也只会做无用功
+            df, dropped = cls.deduplicate_by_unique_keys(df, unique_key_fields, TushareConfig.tushare_dedup_keep)
+            if dropped:
+                counter = _dedup_dropped.get()
+                if counter is not None:
+                    counter['dropped'] += dropped
+                logger.info(
+                    f'表 {table_name} 写入前按唯一键 {unique_key_fields} 批内去重，'
+                    f'丢弃 {dropped} 条（保留{"首条" if TushareConfig.tushare_dedup_keep == "first" else "末条"}）'
+                )
 
-        # 准备批量插入数据
-        values_list = []
-        create_time = datetime.now()
-        
-        for idx, row in df.iterrows():
-            row_dict = {
-                'task_id': task_id,
-                'config_id': config_id,
-                'api_code': api_code,
-                'download_date': download_date,
-                'create_time': create_time,
-            }
-            
-            # 添加 DataFrame 的列值
-            for orig_col, safe_col in zip(df.columns, df_columns):
-                value = row[orig_col]
-                # 处理 NaN 值
-                if pd.isna(value):
-                    row_dict[safe_col] = None
-                else:
-                    row_dict[safe_col] = value
-            
-            values_list.append(row_dict)
+        df_columns, column_arrays = cls.dataframe_to_column_arrays(df)
+
+        # PostgreSQL 大批量数据优先使用 COPY + 暂存表集合合并，失败时回退到下面的批量参数方式
+        copy_threshold = TushareConfig.tushare_pg_copy_threshold
+        if DataBaseConfig.db_type == 'postgresql' and 0 < copy_threshold <= len(df):
+            copied_rows = await cls.copy_merge_postgresql(
+                db, table_name, system_values, df_columns, column_arrays, update_mode, unique_key_fields
+            )
+            if copied_rows is not None:
+                return copied_rows
+
+        # 准备批量插入数据（由列数组直接构建，避免逐行逐单元格处理）
+        values_list = cls.column_arrays_to_records(system_values, df_columns, column_arrays)
 
         if not values_list:
             return 0
@@ -1279,98 +1749,21 @@ class TushareDataDao:
             if not unique_key_fields:
                 raise ValueError('DELETE_INSERT 模式需要唯一键字段')
             
-            # 从 DataFrame 中提取唯一键的值
-            unique_key_values = []
-            for idx, row in df.iterrows():
-                key_dict = {}
-                for key_field in unique_key_fields:
-                    # 查找对应的 DataFrame 列
-                    found = False
-                    for orig_col, safe_col in col_mapping.items():
-                        if safe_col == key_field:
-                            value = row[orig_col]
-                            if pd.isna(value):
-                                key_dict[key_field] = None
-                            else:
-                                key_dict[key_field] = value
-                            found = True
-                            break
-                    if not found:
-                        # 如果找不到，可能是系统列
-                        if key_field in system_columns:
-                            if key_field == 'task_id':
-                                key_dict[key_field] = task_id
-                            elif key_field == 'config_id':
-                                key_dict[key_field] = config_id
-                            elif key_field == 'api_code':
-                                key_dict[key_field] = api_code
-                            elif key_field == 'download_date':
-                                key_dict[key_field] = download_date
-                if key_dict:
-                    unique_key_values.append(key_dict)
+            # 从列数组中提取唯一键的值（系统列取固定值）
+            column_array_map = dict(zip(df_columns, column_arrays, strict=True))
+            key_arrays = [
+                column_array_map[key_field] if key_field in column_array_map else [system_values[key_field]] * len(df)
+                for key_field in unique_key_fields
+            ]
+            key_rows = list(zip(*key_arrays, strict=True))
             
-            # 构建 DELETE 语句
-            if unique_key_values:
-                if DataBaseConfig.db_type == 'postgresql':
-                    # PostgreSQL: 使用 IN 子句或 OR 条件
-                    delete_conditions = []
-                    for key_dict in unique_key_values:
-                        conditions = []
-                        for key_field, key_value in key_dict.items():
-                            if key_value is None:
-                                conditions.append(f'"{key_field}" IS NULL')
-                            else:
-                                conditions.append(f'"{key_field}" = :{key_field}_{len(delete_conditions)}')
-                        delete_conditions.append('(' + ' AND '.join(conditions) + ')')
-                    
-                    # 简化：使用 IN 子句（如果唯一键是单个字段）
-                    if len(unique_key_fields) == 1:
-                        key_field = unique_key_fields[0]
-                        key_values = [kv[key_field] for kv in unique_key_values if key_field in kv]
-                        if key_values:
-                            placeholders = ', '.join([f':val_{i}' for i in range(len(key_values))])
-                            delete_sql = f'DELETE FROM "{table_name}" WHERE "{key_field}" IN ({placeholders})'
-                            delete_params = {f'val_{i}': val for i, val in enumerate(key_values)}
-                            await db.execute(text(delete_sql), delete_params)
-                    else:
-                        # 多个字段的唯一键，需要逐个删除
-                        for key_dict in unique_key_values:
-                            conditions = []
-                            delete_params = {}
-                            for idx, (key_field, key_value) in enumerate(key_dict.items()):
-                                if key_value is None:
-                                    conditions.append(f'"{key_field}" IS NULL')
-                                else:
-                                    param_name = f'key_{idx}'
-                                    conditions.append(f'"{key_field}" = :{param_name}')
-                                    delete_params[param_name] = key_value
-                            delete_sql = f'DELETE FROM "{table_name}" WHERE ' + ' AND '.join(conditions)
-                            await db.execute(text(delete_sql), delete_params)
-                else:
-                    # MySQL: 使用 IN 子句
-                    if len(unique_key_fields) == 1:
-                        key_field = unique_key_fields[0]
-                        key_values = [kv[key_field] for kv in unique_key_values if key_field in kv]
-                        if key_values:
-                            placeholders = ', '.join([f':val_{i}' for i in range(len(key_values))])
-                            delete_sql = f'DELETE FROM `{table_name}` WHERE `{key_field}` IN ({placeholders})'
-                            delete_params = {f'val_{i}': val for i, val in enumerate(key_values)}
-                            await db.execute(text(delete_sql), delete_params)
-                    else:
-                        # 多个字段的唯一键，需要逐个删除
-                        for key_dict in unique_key_values:
-                            conditions = []
-                            delete_params = {}
-                            for idx, (key_field, key_value) in enumerate(key_dict.items()):
-                                if key_value is None:
-                                    conditions.append(f'`{key_field}` IS NULL')
-                                else:
-                                    param_name = f'key_{idx}'
-                                    conditions.append(f'`{key_field}` = :{param_name}')
-                                    delete_params[param_name] = key_value
-                            delete_sql = f'DELETE FROM `{table_name}` WHERE ' + ' AND '.join(conditions)
-                            await db.execute(text(delete_sql), delete_params)
-                
+            # 按唯一键批量删除（单列用 IN 列表，复合键用行值 IN 列表，按参数上限分批）
+            if key_rows:
+                quote_char = '"' if DataBaseConfig.db_type == 'postgresql' else '`'
+                for delete_sql, delete_params in cls.build_key_delete_statements(
+                    table_name, unique_key_fields, key_rows, quote_char
+                ):
+                    await db.execute(text(delete_sql), delete_params)
                 await db.flush()
             
             # 执行普通 INSERT
@@ -0,0 +1,323 @@
+import json
+import re
+from typing import Any
+
+from sqlalchemy import Double, String, column, func, literal_column, select, text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from config.env import DataBaseConfig
+from module_tushare.dao.tushare_schema_registry import TushareSchemaRegistry
+from module_tushare.entity.do.tushare_do import TushareApiConfig, TushareData
+
+DATA_TABLE = TushareData.__tablename__
+# 热点字段在通用表中的列名前缀
+HOT_COLUMN_PREFIX = 'hf_'
+# 热点字段类型 -> (PostgreSQL 列类型, MySQL 列类型)
+HOT_FIELD_TYPES = {
+    'string': ('varchar(64)', 'varchar(64)'),
+    'number': ('double precision', 'double'),
+}
+# 数值类型热点列在 information_schema.columns.data_type 中的取值
+_NUMBER_DATA_TYPES = {'double precision', 'double'}
+# 字符串类型热点字段的最大长度（超出部分截断）
+HOT_STRING_LENGTH = 64
+# 列名 hf_ 前缀 + 字段名、索引名 idx_tushare_data_hf_ 前缀 + 字段名均不超过数据库标识符长度限制
+_HOT_FIELD_PATTERN = re.compile(r'^[a-z_][a-z0-9_]{0,39}$')
+
+
+class TushareDataHotFieldDao:
+    """
+    通用表 tushare_data 热点字段数据库操作层
+
+    接口配置的热点字段（如 ts_code、trade_date）在通用表中提取为带类型的独立列（hf_ 前缀），
+    并按 (api_code, 热点列) 建 B-tree 索引，get_data_content_list 按字段过滤时在数据库中走索引，不再取出 JSON 后在 Python 中筛选。
+    热点列在所有接口间共享，列类型以首次创建时为准，保存接口配置时拒绝与已有列类型冲突的热点字段类型。
+    热点列为普通列（PostgreSQL 不支持虚拟生成列，新增存储生成列会重写整表），
+    已有数据按数据ID分批回填，通过本模块写入的新数据在插入后立即回填。
+    """
+
+    @classmethod
+    def parse_hot_fields(cls, hot_fields: str | None) -> dict[str, str]:
+        """
+        解析接口配置的热点字段
+
+        :param hot_fields: JSON数组（如 ["ts_code", "trade_date"]，类型为 string）或
+                           JSON对象（如 {"ts_code": "string", "close": "number"}）
+        :return: 字段名 -> 类型
+        """
+        if hot_fields is None or not hot_fields.strip():
+            return {}
+        try:
+            parsed = json.loads(hot_fields)
+        except json.JSONDecodeError as e:
+            raise ValueError(f'热点字段不是有效的JSON: {e}') from e
+        if isinstance(parsed, list):
+            parsed = dict.fromkeys(parsed, 'string')
+        if not isinstance(parsed, dict):
+            raise ValueError('热点字段必须是JSON数组或JSON对象')
+        for field, field_type in parsed.items():
+            if not isinstance(field, str) or not _HOT_FIELD_PATTERN.match(field):
+                raise ValueError(f'无效的热点字段名: {field}（只能包含小写字母、数字和下划线，且不超过40个字符）')
+            if field_type not in HOT_FIELD_TYPES:
+                raise ValueError(f'热点字段 {field} 的类型无效: {field_type}（可选：{"、".join(HOT_FIELD_TYPES)}）')
+        return parsed
+
+    @classmethod
+    def column_name(cls, field: str) -> str:
+        return f'{HOT_COLUMN_PREFIX}{field}'
+
+    @classmethod
+    def extract_expression(cls, field: str, field_type: str) -> str:
+        """
+        从 data_content 提取字段值的SQL表达式（字段不存在、为 null 或类型不符时为 NULL）
+
+        :param field: 字段名（已校验）
+        :param field_type: 字段类型
+        :return: SQL表达式
+        """
+        if DataBaseConfig.db_type == 'postgresql':
+            if field_type == 'number':
+                return (
+                    f"CASE WHEN jsonb_typeof(data_content -> '{field}') = 'number' "
+                    f"THEN (data_content ->> '{field}')::double precision END"
+                )
+            return f"LEFT(data_content ->> '{field}', {HOT_STRING_LENGTH})"
+        value = f'JSON_EXTRACT(data_content, \'$."{field}"\')'
+        if field_type == 'number':
+            return f"CASE WHEN JSON_TYPE({value}) IN ('INTEGER', 'UNSIGNED INTEGER', 'DOUBLE', 'DECIMAL') THEN {value} + 0 END"
+        return f"LEFT(NULLIF(JSON_UNQUOTE({value}), 'null'), {HOT_STRING_LENGTH})"
+
+    @classmethod
+    async def get_hot_columns(cls, db: AsyncSession) -> dict[str, str]:
+        """
+        获取通用表中已有的热点列及其实际类型
+
+        :param db: orm对象
+        :return: 热点列名 -> 字段类型（number 或 string）
+        """
+        schema = await TushareSchemaRegistry.get_schema(db, DATA_TABLE)
+        if schema is None:
+            return {}
+        return {
+            col: 'number' if schema.column_types.get(col) in _NUMBER_DATA_TYPES else 'string'
+            for col in schema.columns
+            if col.startswith(HOT_COLUMN_PREFIX)
+        }
+
+    @classmethod
+    async def get_type_conflicts(cls, db: AsyncSession, fields: dict[str, str]) -> dict[str, str]:
+        """
+        获取与通用表中已有热点列类型不一致的热点字段
+
+        :param db: orm对象
+        :param fields: 字段名 -> 类型
+        :return: 字段名 -> 已有热点列的类型
+        """
+        hot_columns = await cls.get_hot_columns(db)
+        return {
+            field: hot_columns[cls.column_name(field)]
+            for field, field_type in fields.items()
+            if cls.column_name(field) in hot_columns and hot_columns[cls.column_name(field)] != field_type
+        }
+
+    @classmethod
+    async def get_api_hot_fields(cls, db: AsyncSession, api_code: str) -> dict[str, str]:
+        """
+        获取接口配置的热点字段
+
+        :param db: orm对象
+        :param api_code: 接口代码
+        :return: 字段名 -> 类型（配置无效时为空）
+        """
+        hot_fields = (
+            await db.execute(select(TushareApiConfig.hot_fields).where(TushareApiConfig.api_code == api_code).limit(1))
+        ).scalar()
+        try:
+            return cls.parse_hot_fields(hot_fields)
+        except ValueError:
+            return {}
+
+    @classmethod
+    async def ensure_columns(cls, db: AsyncSession, fields: dict[str, str]) -> list[str]:
+        """
+        为热点字段创建缺少的列和 (api_code, 热点列) 索引（列类型以首次创建时为准）
+
+        :param db: orm对象
+        :param fields: 字段名 -> 类型
+        :return: 新创建的列名列表
+        """
+        existing = await cls.get_hot_columns(db)
+        is_postgresql = DataBaseConfig.db_type == 'postgresql'
+        created = []
+        for field, field_type in fields.items():
+            col = cls.column_name(field)
+            if col in existing:
+                continue
+            col_type = HOT_FIELD_TYPES[field_type][0 if is_postgresql else 1]
+            comment = f'热点字段 {field}（由 data_content 提取）'
+            if is_postgresql:
+                await db.execute(text(f'ALTER TABLE {DATA_TABLE} ADD COLUMN IF NOT EXISTS {col} {col_type}'))
+                await db.execute(text(f"COMMENT ON COLUMN {DATA_TABLE}.{col} IS '{comment}'"))
+                await db.execute(
+                    text(f'CREATE INDEX IF NOT EXISTS idx_{DATA_TABLE}_{col} ON {DATA_TABLE} (api_code, {col})')
+                )
+            else:
+                await db.execute(text(f"ALTER TABLE {DATA_TABLE} ADD COLUMN {col} {col_type} COMMENT '{comment}'"))
+                await db.execute(text(f'CREATE INDEX idx_{DATA_TABLE}_{col} ON {DATA_TABLE} (api_code, {col})'))
+            created.append(col)
+        if created:
+            TushareSchemaRegistry.invalidate(DATA_TABLE)
+        return created
+
+    @classmethod
+    async def get_data_id_range(cls, db: AsyncSession, api_code: str) -> tuple[int | None, int | None]:
+        """
+        获取接口数据的数据ID范围
+
+        :param db: orm对象
+        :param api_code: 接口代码
+        :return: (最小数据ID, 最大数据ID)，无数据时为 (None, None)
+        """
+        row = (
+            await db.execute(
+                select(func.min(TushareData.data_id), func.max(TushareData.data_id)).where(
+                    TushareData.api_code == api_code
+                )
+            )
+        ).first()
+        return (row[0], row[1]) if row else (None, None)
+
+    @classmethod
+    async def fill_hot_columns(
+        cls, db: AsyncSession, api_code: str, fields: dict[str, str], start_id: int, end_id: int
+    ) -> int:
+        """
+        按数据ID区间从 data_content 回填热点列
+
+        :param db: orm对象
+        :param api_code: 接口代码
+        :param fields: 字段名 -> 类型（对应的列需已存在）
+        :param start_id: 起始数据ID（含）
+        :param end_id: 结束数据ID（含）
+        :return: 更新的行数
+        """
+        if not fields:
+            return 0
+        # 按热点列的实际类型提取，列类型与配置不一致时不会写入无法转换的值
+        hot_columns = await cls.get_hot_columns(db)
+        assignments = ', '.join(
+            f'{cls.column_name(field)} = '
+            f'{cls.extract_expression(field, hot_columns.get(cls.column_name(field), field_type))}'
+            for field, field_type in fields.items()
+        )
+        result = await db.execute(
+            text(
+                f'UPDATE {DATA_TABLE} SET {assignments} '
+                f'WHERE api_code = :api_code AND data_id BETWEEN :start_id AND :end_id'
+            ),
+            {'api_code': api_code, 'start_id': start_id, 'end_id': end_id},
+        )
+        return result.rowcount
+
+    @classmethod
+    async def fill_new_rows(cls, db: AsyncSession, data_list: list[TushareData]) -> None:
+        """
+        回填刚插入（已 flush）的数据的热点列
+
+        :param db: orm对象
+        :param data_list: 数据对象列表
+        :return: None
+        """
+        hot_columns = await cls.get_hot_columns(db)
+        if not hot_columns:
+            return
+        ids_by_api: dict[str, list[int]] = {}
+        for data in data_list:
+            ids_by_api.setdefault(data.api_code, []).append(data.data_id)
+        for api_code, data_ids in ids_by_api.items():
+            fields = {
+                field: field_type
+                for field, field_type in (await cls.get_api_hot_fields(db, api_code)).items()
+                if cls.column_name(field) in hot_columns
+            }
+            await cls.fill_hot_columns(db, api_code, fields, min(data_ids), max(data_ids))
+
+    @classmethod
+    def value_type(cls, value: Any) -> str:
+        """
+        按过滤取值推断字段类型（数值为 number，其余为 string）
+
+        :param value: 字段取值（列表/元组/集合时按第一个元素）
+        :return: 字段类型
+        """
+        if isinstance(value, list | tuple | set):
+            value = next(iter(value), None)
+        return 'number' if isinstance(value, int | float) and not isinstance(value, bool) else 'string'
+
+    @classmethod
+    def field_condition(cls, field: str, value: Any, field_type: str = 'string', use_hot_column: bool = False) -> Any:
+        """
+        构造按字段过滤的条件：字段已提取为热点列时比较热点列（走索引），否则在数据库中按 JSON 路径比较
+
+        :param field: 字段名
+        :param value: 字段取值（列表/元组/集合时为 IN 条件，None 时为字段有值）
+        :param field_type: 字段类型（使用热点列时为热点列的实际类型）
+        :param use_hot_column: 是否比较热点列（热点列需已存在且是该接口配置的热点字段，否则可能未回填）
+        :return: 过滤条件
+        """
+        if use_hot_column:
+            target = column(cls.column_name(field), Double() if field_type == 'number' else String())
+        elif field_type == 'number' and _HOT_FIELD_PATTERN.match(field):
+            # 按数值比较时只取 JSON 中的数值，避免非数值内容转换失败
+            target = literal_column(cls.extract_expression(field, field_type), Double())
+        elif field_type == 'number':
+            target = TushareData.data_content[field].as_float()
+        else:
+            target = TushareData.data_content[field].as_string()
+        if value is None:
+            return target.is_not(None)
+        if isinstance(value, list | tuple | set):
+            return target.in_(list(value))
+        return target == value
+
+    @classmethod
+    async def get_data_content_list(
+        cls,
+        db: AsyncSession,
+        api_code: str,
+        field_filters: dict[str, Any] | None = None,
+        download_date: str | None = None,
+        latest_download: bool = False,
+        limit: int | None = None,
+    ) -> list[Any]:
+        """
+        按接口代码和字段取值查询通用表中的数据内容（过滤在数据库中完成）
+
+        :param db: orm对象
+        :param api_code: 接口代码
+        :param field_filters: 字段名 -> 取值（列表为 IN 条件，None 为字段有值），
+                              已提取为热点列的字段按热点列过滤，其余字段按接口配置的类型或取值类型在 JSON 中过滤
+        :param download_date: 下载日期
+        :param latest_download: 是否只查询该接口最近一次下载的数据
+        :param limit: 最多返回条数
+        :return: 数据内容列表（按数据ID倒序）
+        """
+        stmt = select(TushareData.data_content).where(TushareData.api_code == api_code)
+        if download_date:
+            stmt = stmt.where(TushareData.download_date == download_date)
+        if latest_download:
+            latest_date = (
+                select(func.max(TushareData.download_date)).where(TushareData.api_code == api_code).scalar_subquery()
+            )
+            stmt = stmt.where(TushareData.download_date == latest_date)
+        if field_filters:
+            api_hot_fields = await cls.get_api_hot_fields(db, api_code)
+            hot_columns = await cls.get_hot_columns(db) if api_hot_fields else {}
+            for field, value in field_filters.items():
+                hot_column_type = hot_columns.get(cls.column_name(field)) if field in api_hot_fields else None
+                field_type = hot_column_type or api_hot_fields.get(field) or cls.value_type(value)
+                stmt = stmt.where(cls.field_condition(field, value, field_type, hot_column_type is not None))
+        stmt = stmt.order_by(TushareData.data_id.desc())
+        if limit:
+            stmt = stmt.limit(limit)
+        return list((await db.execute(stmt)).scalars().all())
@@ -0,0 +1,247 @@
+import threading
+import time
+from bisect import bisect_left, bisect_right
+from collections import OrderedDict
+from collections.abc import Sequence
+from contextvars import ContextVar, Token
+from typing import Any
+
+import numpy as np
+import pandas as pd
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession
+
+from config.env import TushareConfig
+from module_tushare.entity.do.tushare_do import TushareProBar
+from utils.log_util import logger
+
+KLINE_TABLE = TushareProBar.__tablename__
+# 缓存的价格字段（按顺序存为 float64 数组，缺失值为 NaN）
+KLINE_FIELDS = ('open', 'high', 'low', 'close', 'pct_chg')
+_KLINE_COLUMNS = [getattr(TushareProBar, field) for field in KLINE_FIELDS]
+
+# 当前下载运行写入的日K线：股票代码 -> 写入的最早交易日期（由 begin_run 开启记录）
+_run_changes: ContextVar[dict[str, str] | None] = ContextVar('tushare_kline_run_changes', default=None)
+
+
+class KlineSeries:
+    """
+    单只股票按交易日期升序排列的日K线（日期列表 + 各价格字段的 float64 数组），构建后只读
+    """
+
+    __slots__ = ('dates', 'loaded_at', 'ts_code', 'values')
+
+    def __init__(
+        self, ts_code: str, dates: list[str], values: dict[str, np.ndarray], loaded_at: float | None = None
+    ) -> None:
+        """
+        :param ts_code: 股票代码
+        :param dates: 交易日期列表（YYYYMMDD，升序）
+        :param values: 价格字段 -> 与日期一一对应的数组
+        :param loaded_at: 从数据库完整加载的时间，为空时取当前时间
+        """
+        self.ts_code = ts_code
+        self.dates = dates
+        self.values = values
+        self.loaded_at = time.monotonic() if loaded_at is None else loaded_at
+
+    @classmethod
+    def from_rows(cls, ts_code: str, rows: Sequence[Sequence[Any]]) -> 'KlineSeries':
+        """
+        由 (trade_date, open, high, low, close, pct_chg) 行构建
+
+        :param ts_code: 股票代码
+        :param rows: 按交易日期升序排列的数据行
+        :return: K线序列
+        """
+        matrix = np.array([row[1:] for row in rows], dtype=np.float64).reshape(len(rows), len(KLINE_FIELDS))
+        values = {field: matrix[:, i].copy() for i, field in enumerate(KLINE_FIELDS)}
+        return cls(ts_code, [str(row[0]) for row in rows], values)
+
+    def __len__(self) -> int:
+        return len(self.dates)
+
+    def merged(self, since: str, tail: 'KlineSeries') -> 'KlineSeries':
+        """
+        用从 since 起重新读取的K线替换该日期及之后的部分（有效期仍从完整加载时算起）
+
+        :param since: 重新读取的起始交易日期
+        :param tail: 重新读取的K线
+        :return: 新的K线序列
+        """
+        cut = bisect_left(self.dates, since)
+        values = {field: np.concatenate([self.values[field][:cut], tail.values[field]]) for field in KLINE_FIELDS}
+        return KlineSeries(self.ts_code, self.dates[:cut] + tail.dates, values, self.loaded_at)
+
+    def columns(self, start_date: str | None = None, end_date: str | None = None) -> dict[str, list]:
+        """
+        截取日期区间内的K线，按字段返回列表（NaN 转为 None）
+
+        :param start_date: 开始日期（含）
+        :param end_date: 结束日期（含）
+        :return: trade_date 及各价格字段 -> 列表
+        """
+        lo = bisect_left(self.dates, start_date) if start_date else 0
+        hi = bisect_right(self.dates, end_date) if end_date else len(self.dates)
+        hi = max(lo, hi)
+        result: dict[str, list] = {'trade_date': self.dates[lo:hi]}
+        for field in KLINE_FIELDS:
+            segment = self.values[field][lo:hi]
+            missing = np.isnan(segment)
+            if missing.any():
+                result[field] = [
+                    None if is_missing else value
+                    for value, is_missing in zip(segment.tolist(), missing.tolist(), strict=True)
+                ]
+            else:
+                result[field] = segment.tolist()
+        return result
+
+
+class TushareKlineCache:
+    """
+    日K线缓存（进程级，按股票代码缓存完整的日K线序列，按最近使用淘汰）
+
+    图表请求只在缓存未命中或超过有效期时查询 tushare_pro_bar。下载任务写入日K线时记录每只股票写入的最早日期，
+    运行结束（数据已提交）后，已缓存的股票只重新读取该日期之后的K线并追加到缓存；
+    不在下载运行中的写入无法确定提交时机，直接移除相应股票的缓存。
+    """
+
+    _series: 'OrderedDict[str, KlineSeries]' = OrderedDict()
+    _lock = threading.Lock()
+
+    @classmethod
+    def _is_fresh(cls, series: KlineSeries) -> bool:
+        ttl = TushareConfig.tushare_kline_cache_ttl
+        return ttl <= 0 or time.monotonic() - series.loaded_at < ttl
+
+    @classmethod
+    def _store(cls, series: KlineSeries) -> None:
+        max_size = TushareConfig.tushare_kline_cache_size
+        if max_size <= 0:
+            return
+        with cls._lock:
+            cls._series[series.ts_code] = series
+            cls._series.move_to_end(series.ts_code)
+            while len(cls._series) > max_size:
+                cls._series.popitem(last=False)
+
+    @classmethod
+    async def get_series(cls, db: AsyncSession, ts_code: str) -> KlineSeries:
+        """
+        获取股票的完整日K线，优先使用缓存
+
+        :param db: 数据库会话
+        :param ts_code: 股票代码
+        :return: K线序列（无数据时为空序列）
+        """
+        series = cls._series.get(ts_code)
+        if series is not None and cls._is_fresh(series):
+            with cls._lock:
+                if ts_code in cls._series:
+                    cls._series.move_to_end(ts_code)
+            return series
+
+        series = await cls._load(db, ts_code)
+        cls._store(series)
+        return series
+
+    @classmethod
+    async def resolve_code(cls, db: AsyncSession, code: str) -> str | None:
+        """
+        将不带交易所后缀（或后缀不正确）的代码解析为日线表中实际存在的股票代码
+
+        :param db: 数据库会话
+        :param code: 股票代码或数字代码
+        :return: 股票代码，不存在时返回None
+        """
+        symbol = code.split('.')[0]
+        if not symbol:
+            return None
+        stmt = (
+            select(TushareProBar.ts_code)
+            .where(TushareProBar.ts_code.like(f'{symbol}.%'))
+            .order_by(TushareProBar.ts_code)
+            .limit(1)
+        )
+        return (await db.execute(stmt)).scalar()
+
+    @classmethod
+    async def _load(cls, db: AsyncSession, ts_code: str, since: str | None = None) -> KlineSeries:
+        stmt = select(TushareProBar.trade_date, *_KLINE_COLUMNS).where(TushareProBar.ts_code == ts_code)
+        if since:
+            stmt = stmt.where(TushareProBar.trade_date >= since)
+        rows = (await db.execute(stmt.order_by(TushareProBar.trade_date))).all()
+        return KlineSeries.from_rows(ts_code, rows)
+
+    @classmethod
+    def invalidate(cls, ts_code: str | None = None) -> None:
+        """
+        移除缓存
+
+        :param ts_code: 股票代码，为空时清空全部缓存
+        :return: None
+        """
+        with cls._lock:
+            if ts_code is None:
+                cls._series.clear()
+            else:
+                cls._series.pop(ts_code, None)
+
+    @classmethod
+    def record_writes(cls, table_name: str, df: pd.DataFrame) -> None:
+        """
+        写入数据时调用，记录写入日K线表的股票及最早交易日期
+
+        :param table_name: 写入的表名
+        :param df: 写入的数据
+        :return: None
+        """
+        if table_name != KLINE_TABLE or 'ts_code' not in df.columns or 'trade_date' not in df.columns:
+            return
+        earliest = df.groupby('ts_code', sort=False)['trade_date'].min()
+        changes = _run_changes.get()
+        if changes is None:
+            for ts_code in earliest.index:
+                cls.invalidate(str(ts_code))
+            return
+        for code, trade_date in earliest.astype(str).items():
+            ts_code = str(code)
+            if trade_date < changes.get(ts_code, '99999999'):
+                changes[ts_code] = trade_date
+
+    @classmethod
+    def begin_run(cls) -> Token:
+        """
+        开始记录当前下载运行（及其创建的协程）写入的日K线
+
+        :return: 结束记录时传给 end_run 的令牌
+        """
+        return _run_changes.set({})
+
+    @classmethod
+    async def end_run(cls, token: Token, bind: AsyncEngine | None) -> None:
+        """
+        结束记录，已缓存的股票重新读取写入日期之后的K线并追加到缓存（在数据提交后调用）
+
+        :param token: begin_run 返回的令牌
+        :param bind: 读取使用的数据库引擎
+        :return: None
+        """
+        changes = _run_changes.get() or {}
+        _run_changes.reset(token)
+        cached = {ts_code: since for ts_code, since in changes.items() if ts_code in cls._series}
+        if not cached:
+            return
+        try:
+            async with AsyncSession(bind=bind) as db:
+                for ts_code, since in cached.items():
+                    tail = await cls._load(db, ts_code, since)
+                    series = cls._series.get(ts_code)
+                    if series is not None:
+                        cls._store(series.merged(since, tail))
+            logger.info(f'日K线缓存已追加 {len(cached)} 只股票的新数据')
+        except Exception as e:
+            for ts_code in cached:
+                cls.invalidate(ts_code)
+            logger.warning(f'追加日K线缓存失败，已移除相应缓存: {e}')
@@ -0,0 +1,294 @@
+import re
+import threading
+import time
+from typing import NamedTuple
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from config.env import DataBaseConfig, TushareConfig
+from utils.log_util import logger
+
+_TABLE_NAME_PATTERN = re.compile(r'^[a-zA-Z_][a-zA-Z0-9_]*$')
+
+# PostgreSQL：表的全部唯一索引（含主键，主键/唯一约束也是以唯一索引实现的），按索引内顺序列出字段；
+# 排除表达式索引和部分索引（二者都不能直接作为 ON CONFLICT 的冲突目标）
+_PG_UNIQUE_INDEX_SQL = """
+    SELECT ic.relname,
+           i.indisprimary,
+           EXISTS (
+               SELECT 1 FROM pg_constraint c
+               WHERE c.conindid = i.indexrelid AND c.contype IN ('p', 'u')
+           ) AS is_constraint,
+           array_agg(a.attname::text ORDER BY k.ord) AS columns
+    FROM pg_index i
+    JOIN pg_class t ON t.oid = i.indrelid
+    JOIN pg_namespace n ON n.oid = t.relnamespace
+    JOIN pg_class ic ON ic.oid = i.indexrelid
+    CROSS JOIN LATERAL unnest(i.indkey::int2[]) WITH ORDINALITY AS k(attnum, ord)
+    JOIN pg_attribute a ON a.attrelid = i.indrelid AND a.attnum = k.attnum
+    WHERE n.nspname = 'public'
+      AND t.relname = :table_name
+      AND i.indisunique
+      AND i.indpred IS NULL
+      AND NOT (0 = ANY(i.indkey::int2[]))
+    GROUP BY ic.relname, i.indisprimary, i.indexrelid
+    ORDER BY ic.relname
+"""
+
+_PG_COLUMNS_SQL = """
+    SELECT column_name, data_type
+    FROM information_schema.columns
+    WHERE table_schema = 'public'
+      AND table_name = :table_name
+    ORDER BY ordinal_position
+"""
+
+# PostgreSQL：分区表（relkind = 'p'）及其现有分区
+_PG_PARTITIONS_SQL = """
+    SELECT c.relkind = 'p' AS is_partitioned,
+           ARRAY(
+               SELECT child.relname::text
+               FROM pg_inherits i
+               JOIN pg_class child ON child.oid = i.inhrelid
+               WHERE i.inhparent = c.oid
+           ) AS partitions
+    FROM pg_class c
+    JOIN pg_namespace n ON n.oid = c.relnamespace
+    WHERE n.nspname = 'public'
+      AND c.relname = :table_name
+"""
+
+_MYSQL_COLUMNS_SQL = """
+    SELECT column_name, data_type
+    FROM information_schema.columns
+    WHERE table_schema = DATABASE()
+      AND table_name = :table_name
+    ORDER BY ordinal_position
+"""
+
+# MySQL：唯一索引即唯一约束，主键索引名固定为 PRIMARY
+_MYSQL_UNIQUE_INDEX_SQL = """
+    SELECT index_name, column_name
+    FROM information_schema.statistics
+    WHERE table_schema = DATABASE()
+      AND table_name = :table_name
+      AND non_unique = 0
+    ORDER BY index_name, seq_in_index
+"""
+
+
+class UniqueIndexInfo(NamedTuple):
+    """
+    唯一索引信息
+    """
+
+    name: str
+    columns: tuple[str, ...]
+    is_primary: bool
+    is_constraint: bool
+
+
+class TableSchema:
+    """
+    数据表结构快照（字段及类型、主键、唯一索引、分区）
+    """
+
+    __slots__ = ('column_types', 'columns', 'loaded_at', 'partitions', 'table_name', 'unique_indexes')
+
+    def __init__(
+        self,
+        table_name: str,
+        columns: list[str],
+        unique_indexes: list[UniqueIndexInfo],
+        partitions: frozenset[str] | None = None,
+        column_types: dict[str, str] | None = None,
+    ) -> None:
+        """
+        :param table_name: 表名
+        :param columns: 字段列表
+        :param unique_indexes: 唯一索引列表
+        :param partitions: 分区表的现有分区名集合（非分区表为None）
+        :param column_types: 字段名 -> 数据类型（information_schema.columns.data_type，小写）
+        """
+        self.table_name = table_name
+        self.columns = columns
+        self.column_types = column_types or {}
+        self.unique_indexes = unique_indexes
+        self.partitions = partitions
+        self.loaded_at = time.monotonic()
+
+    @property
+    def is_partitioned(self) -> bool:
+        return self.partitions is not None
+
+    @property
+    def column_set(self) -> set[str]:
+        return set(self.columns)
+
+    @property
+    def primary_key(self) -> list[str]:
+        for index in self.unique_indexes:
+            if index.is_primary:
+                return list(index.columns)
+        return []
+
+    def has_unique_index(self, columns: list[str]) -> bool:
+        """
+        判断是否存在恰好覆盖指定字段的唯一约束/唯一索引（含主键，不区分字段顺序）
+
+        :param columns: 字段列表
+        :return: 是否存在
+        """
+        if not columns:
+            return False
+        target = frozenset(columns)
+        return any(frozenset(index.columns) == target for index in self.unique_indexes)
+
+    def unique_key_columns(self) -> list[str]:
+        """
+        获取主键和唯一约束涉及的全部字段（与原 information_schema.table_constraints 查询结果一致：
+        PostgreSQL 不含 CREATE UNIQUE INDEX 单独创建的唯一索引，按字段名排序；MySQL 按字段在约束中的位置排序）
+
+        :return: 字段列表
+        """
+        if DataBaseConfig.db_type == 'postgresql':
+            return sorted({col for index in self.unique_indexes if index.is_constraint for col in index.columns})
+        positioned = sorted(
+            (position, col)
+            for index in self.unique_indexes
+            if index.is_constraint
+            for position, col in enumerate(index.columns, start=1)
+        )
+        unique_keys = []
+        for _, col in positioned:
+            if col not in unique_keys:
+                unique_keys.append(col)
+        return unique_keys
+
+
+class TushareSchemaRegistry:
+    """
+    Tushare动态数据表结构注册表（进程级缓存）
+
+    按表名缓存表是否存在、字段、主键和唯一索引，供建表、唯一键检测、唯一索引检查等逻辑共用，
+    避免遍历模式下每个参数组合都重复查询数据库系统表。缓存失效时机：
+    1. 本进程执行建表/建索引等DDL后，由执行方调用 invalidate；
+    2. 写入数据出错或事务回滚后（表结构可能已被外部修改，或本事务中的DDL已被回滚）；
+    3. 超过 TUSHARE_SCHEMA_CACHE_TTL 秒后自动重新加载（兜底外部修改表结构的情况）；
+    4. 手动调用 refresh（提供了刷新接口）。
+    不存在的表不缓存，每次都会重新检查，确保其他进程建表后能立即感知。
+    """
+
+    _schemas: dict[str, TableSchema] = {}
+    _versions: dict[str, int] = {}
+    _generation = 0
+    _lock = threading.Lock()
+
+    @classmethod
+    def _is_fresh(cls, schema: TableSchema) -> bool:
+        ttl = TushareConfig.tushare_schema_cache_ttl
+        return ttl <= 0 or time.monotonic() - schema.loaded_at < ttl
+
+    @classmethod
+    async def get_schema(cls, db: AsyncSession, table_name: str) -> TableSchema | None:
+        """
+        获取表结构，优先使用缓存
+
+        :param db: 数据库会话
+        :param table_name: 表名
+        :return: 表结构，表不存在时返回None
+        """
+        if not _TABLE_NAME_PATTERN.match(table_name):
+            raise ValueError(f'无效的表名: {table_name}')
+        schema = cls._schemas.get(table_name)
+        if schema is not None and cls._is_fresh(schema):
+            return schema
+
+        version = (cls._generation, cls._versions.get(table_name, 0))
+        schema = await cls._load(db, table_name)
+        with cls._lock:
+            if schema is None:
+                cls._schemas.pop(table_name, None)
+            elif (cls._generation, cls._versions.get(table_name, 0)) == version:
+                # 加载期间表被标记失效时不写入缓存，避免用DDL之前的结果覆盖
+                cls._schemas[table_name] = schema
+        return schema
+
+    @classmethod
+    async def table_exists(cls, db: AsyncSession, table_name: str) -> bool:
+        """
+        判断表是否存在
+
+        :param db: 数据库会话
+        :param table_name: 表名
+        :return: 是否存在
+        """
+        return await cls.get_schema(db, table_name) is not None
+
+    @classmethod
+    async def _load(cls, db: AsyncSession, table_name: str) -> TableSchema | None:
+        if DataBaseConfig.db_type == 'postgresql':
+            result = await db.execute(text(_PG_COLUMNS_SQL), {'table_name': table_name})
+            column_types = {row[0]: str(row[1]).lower() for row in result.fetchall()}
+            columns = list(column_types)
+            if not columns:
+                return None
+            result = await db.execute(text(_PG_UNIQUE_INDEX_SQL), {'table_name': table_name})
+            unique_indexes = [
+                UniqueIndexInfo(name=row[0], columns=tuple(row[3]), is_primary=bool(row[1]), is_constraint=bool(row[2]))
+                for row in result.fetchall()
+            ]
+            partition_row = (await db.execute(text(_PG_PARTITIONS_SQL), {'table_name': table_name})).first()
+            partitions = frozenset(partition_row[1]) if partition_row is not None and partition_row[0] else None
+        else:
+            result = await db.execute(text(_MYSQL_COLUMNS_SQL), {'table_name': table_name})
+            column_types = {row[0]: str(row[1]).lower() for row in result.fetchall()}
+            columns = list(column_types)
+            if not columns:
+                return None
+            result = await db.execute(text(_MYSQL_UNIQUE_INDEX_SQL), {'table_name': table_name})
+            index_columns: dict[str, list[str]] = {}
+            for index_name, column_name in result.fetchall():
+                index_columns.setdefault(index_name, []).append(column_name)
+            unique_indexes = [
+                UniqueIndexInfo(name=name, columns=tuple(cols), is_primary=name == 'PRIMARY', is_constraint=True)
+                for name, cols in index_columns.items()
+            ]
+            partitions = None
+        logger.debug(f'已加载表 {table_name} 的结构：{len(columns)} 个字段，{len(unique_indexes)} 个唯一索引')
+        return TableSchema(table_name, columns, unique_indexes, partitions, column_types)
+
+    @classmethod
+    def invalidate(cls, table_name: str | None = None) -> None:
+        """
+        使表结构缓存失效
+
+        :param table_name: 表名，为空时清空全部缓存
+        :return: None
+        """
+        with cls._lock:
+            if table_name is None:
+                cls._generation += 1
+                cls._schemas.clear()
+            else:
+                cls._versions[table_name] = cls._versions.get(table_name, 0) + 1
+                cls._schemas.pop(table_name, None)
+
+    @classmethod
+    async def refresh(cls, db: AsyncSession, table_name: str | None = None) -> int:
+        """
+        手动刷新表结构缓存
+
+        :param db: 数据库会话
+        :param table_name: 表名，为空时刷新全部已缓存的表
+        :return: 刷新后仍存在的表数量
+        """
+        table_names = [table_name] if table_name else list(cls._schemas)
+        cls.invalidate(table_name)
+        refreshed = 0
+        for name in table_names:
+            if await cls.get_schema(db, name) is not None:
+                refreshed += 1
+        logger.info(f'已刷新Tushare数据表结构缓存，共 {refreshed} 张表')
+        return refreshed
@@ -0,0 +1,258 @@
+import threading
+import time
+from bisect import bisect_left, bisect_right
+from collections.abc import Iterable
+from typing import Any, NamedTuple
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession
+
+from config.database import async_engine
+from module_tushare.dao.tushare_data_hot_field import TushareDataHotFieldDao
+from module_tushare.dao.tushare_schema_registry import TushareSchemaRegistry
+from utils.log_util import logger
+
+try:
+    from pypinyin import Style, lazy_pinyin
+except ImportError:
+    lazy_pinyin = None
+
+# 股票基础信息的物理表及接口代码
+STOCK_BASIC_TABLE = 'tushare_stock_basic'
+STOCK_BASIC_API_CODE = 'stock_basic'
+# 搜索结果字段
+STOCK_FIELDS = ('ts_code', 'symbol', 'name', 'area', 'industry', 'list_date')
+# 拼音首字母字段（stock_basic 接口的 cnspell 字段，没有时用 pypinyin 根据名称生成）
+SPELL_FIELD = 'cnspell'
+
+
+class StockSearchEntry(NamedTuple):
+    ts_code: str | None
+    symbol: str | None
+    name: str | None
+    area: str | None
+    industry: str | None
+    list_date: str | None
+
+
+def _text_value(value: Any) -> str | None:
+    if value is None:
+        return None
+    value = str(value).strip()
+    return value or None
+
+
+def _name_initials(name: str) -> str:
+    if not name or lazy_pinyin is None:
+        return ''
+    return ''.join(lazy_pinyin(name, style=Style.FIRST_LETTER))
+
+
+class StockSearchSnapshot:
+    """
+    股票搜索索引快照（构建后只读，可在多个线程间共享）
+
+    - 前缀匹配：代码、简称代码、名称、拼音首字母的小写形式排序后二分查找；
+    - 子串匹配：每只股票的检索文本以换行拼接为一个字符串，用 str.find 逐个定位匹配位置，
+      再按各股票文本的起始偏移二分得到所属股票。
+    结果按 代码/简称代码完全相等 > 前缀匹配 > 子串匹配 排序，同一类中前缀按匹配的键、子串按股票代码排序。
+    """
+
+    __slots__ = ('_exact', '_offsets', '_prefix_ids', '_prefix_keys', '_text', 'entries')
+
+    def __init__(self, entries: list[StockSearchEntry], spells: list[str]) -> None:
+        """
+        :param entries: 股票列表（按股票代码排序）
+        :param spells: 与股票列表一一对应的拼音首字母
+        """
+        self.entries = entries
+        self._exact: dict[str, int] = {}
+        prefix_pairs: list[tuple[str, int]] = []
+        texts: list[str] = []
+        for idx, (entry, spell) in enumerate(zip(entries, spells, strict=True)):
+            keys = [
+                (entry.ts_code or '').lower(),
+                (entry.symbol or '').lower(),
+                (entry.name or '').lower(),
+                spell.lower(),
+            ]
+            for key in keys[:2]:
+                if key:
+                    self._exact.setdefault(key, idx)
+            prefix_pairs.extend((key, idx) for key in dict.fromkeys(keys) if key)
+            texts.append(' '.join(keys).replace('\n', ' '))
+        prefix_pairs.sort()
+        self._prefix_keys = [key for key, _ in prefix_pairs]
+        self._prefix_ids = [idx for _, idx in prefix_pairs]
+        self._offsets = []
+        offset = 0
+        for item in texts:
+            self._offsets.append(offset)
+            offset += len(item) + 1
+        self._text = '\n'.join(texts)
+
+    @classmethod
+    def from_rows(cls, rows: Iterable[dict[str, Any]]) -> 'StockSearchSnapshot':
+        """
+        由 stock_basic 数据行构建快照（同一股票代码只保留第一行）
+
+        :param rows: 数据行
+        :return: 索引快照
+        """
+        by_code: dict[str, tuple[StockSearchEntry, str]] = {}
+        for row in rows:
+            entry = StockSearchEntry(*(_text_value(row.get(field)) for field in STOCK_FIELDS))
+            if entry.ts_code is None or entry.ts_code in by_code:
+                continue
+            spell = _text_value(row.get(SPELL_FIELD)) or _name_initials(entry.name or '')
+            by_code[entry.ts_code] = (entry, spell)
+        ordered = [by_code[code] for code in sorted(by_code)]
+        return cls([entry for entry, _ in ordered], [spell for _, spell in ordered])
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+    def search(self, keyword: str, limit: int = 20) -> list[StockSearchEntry]:
+        """
+        按代码/名称/拼音首字母搜索股票
+
+        :param keyword: 关键字（不区分大小写）
+        :param limit: 最多返回条数
+        :return: 股票列表
+        """
+        kw = keyword.strip().lower().replace('\n', ' ')
+        if not kw or limit <= 0:
+            return []
+
+        hits: dict[int, None] = {}
+        exact = self._exact.get(kw)
+        if exact is not None:
+            hits[exact] = None
+
+        pos = bisect_left(self._prefix_keys, kw)
+        while len(hits) < limit and pos < len(self._prefix_keys) and self._prefix_keys[pos].startswith(kw):
+            hits.setdefault(self._prefix_ids[pos])
+            pos += 1
+
+        pos = self._text.find(kw)
+        while len(hits) < limit and pos >= 0:
+            idx = bisect_right(self._offsets, pos) - 1
+            hits.setdefault(idx)
+            # 同一股票只需匹配一次，直接跳到下一只股票的检索文本
+            if idx + 1 >= len(self._offsets):
+                break
+            pos = self._text.find(kw, self._offsets[idx + 1])
+
+        return [self.entries[idx] for idx in hits]
+
+
+class TushareStockSearchIndex:
+    """
+    股票搜索内存索引（进程级）
+
+    启动时从 tushare_stock_basic 表（不存在或为空时回退到通用表 tushare_data 中最近一次下载的 stock_basic 数据）加载；
+    下载任务写入股票基础信息时标记索引过期，任务结束（数据已提交）后重新加载。重新加载时先构建新快照再整体替换，
+    搜索期间不加锁。
+    """
+
+    _snapshot: StockSearchSnapshot | None = None
+    _snapshot_version = -1
+    _version = 0
+    _lock = threading.Lock()
+
+    @classmethod
+    def is_loaded(cls) -> bool:
+        return cls._snapshot is not None
+
+    @classmethod
+    def is_stale(cls) -> bool:
+        return cls._snapshot is None or cls._snapshot_version != cls._version
+
+    @classmethod
+    def mark_stale(cls, table_name: str, api_code: str | None = None) -> None:
+        """
+        写入数据时调用，写入的是股票基础信息时标记索引过期
+
+        :param table_name: 写入的表名
+        :param api_code: 接口代码
+        :return: None
+        """
+        if table_name == STOCK_BASIC_TABLE or api_code == STOCK_BASIC_API_CODE:
+            with cls._lock:
+                cls._version += 1
+
+    @classmethod
+    def search(cls, keyword: str, limit: int = 20) -> list[StockSearchEntry]:
+        """
+        搜索股票（索引尚未加载时返回空列表）
+
+        :param keyword: 关键字
+        :param limit: 最多返回条数
+        :return: 股票列表
+        """
+        snapshot = cls._snapshot
+        if snapshot is None:
+            return []
+        return snapshot.search(keyword, limit)
+
+    @classmethod
+    async def load(cls, db: AsyncSession) -> int:
+        """
+        从数据库加载股票基础信息并替换当前索引
+
+        :param db: 数据库会话
+        :return: 索引中的股票数量
+        """
+        version = cls._version
+        start = time.perf_counter()
+        rows = await cls._fetch_rows(db)
+        snapshot = StockSearchSnapshot.from_rows(rows)
+        with cls._lock:
+            # 并发加载时不用较早开始的加载结果覆盖较新的结果
+            if version >= cls._snapshot_version:
+                cls._snapshot = snapshot
+                cls._snapshot_version = version
+        logger.info(f'股票搜索索引已加载 {len(snapshot)} 只股票，耗时 {time.perf_counter() - start:.3f}秒')
+        return len(snapshot)
+
+    @classmethod
+    async def refresh(cls, bind: AsyncEngine | None = None) -> None:
+        """
+        使用独立会话重新加载索引（加载失败只记录日志，保留原索引）
+
+        :param bind: 数据库引擎，为空时使用默认引擎
+        :return: None
+        """
+        try:
+            async with AsyncSession(bind=bind or async_engine) as db:
+                await cls.load(db)
+        except Exception as e:
+            logger.warning(f'加载股票搜索索引失败: {e}')
+
+    @classmethod
+    async def refresh_if_stale(cls, bind: AsyncEngine | None = None) -> None:
+        """
+        索引已加载且被标记过期时重新加载（尚未加载时由首次搜索加载）
+
+        :param bind: 数据库引擎，为空时使用默认引擎
+        :return: None
+        """
+        if cls._snapshot is not None and cls.is_stale():
+            await cls.refresh(bind)
+
+    @classmethod
+    async def _fetch_rows(cls, db: AsyncSession) -> list[dict[str, Any]]:
+        schema = await TushareSchemaRegistry.get_schema(db, STOCK_BASIC_TABLE)
+        if schema is not None and 'ts_code' in schema.column_set:
+            columns = [field for field in (*STOCK_FIELDS, SPELL_FIELD) if field in schema.column_set]
+            result = await db.execute(text(f'SELECT {", ".join(columns)} FROM {STOCK_BASIC_TABLE}'))
+            rows = [dict(row._mapping) for row in result]
+            if rows:
+                return rows
+
+        # 回退（物理表不存在或为空）：通用表中最近一次下载的 stock_basic 数据
+        # （只取有股票代码的记录，ts_code 配置为热点字段时走热点列索引）
+        contents = await TushareDataHotFieldDao.get_data_content_list(
+            db, STOCK_BASIC_API_CODE, {'ts_code': None}, latest_download=True
+        )
+        return [content for content in contents if isinstance(content, dict)]
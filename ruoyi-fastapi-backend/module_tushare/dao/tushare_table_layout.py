@@ -0,0 +1,112 @@
+import pandas as pd
+from sqlalchemy import Table, text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from config.env import DataBaseConfig
+from module_tushare.dao.tushare_schema_registry import TushareSchemaRegistry
+from module_tushare.entity.do.tushare_do import TushareProBar
+from utils.log_util import logger
+
+
+class TushareTableLayout:
+    """
+    固定存储结构的Tushare数据表
+
+    这些表的结构由实体类定义（紧凑的主键、查询用索引），不按接口返回的 DataFrame 推断；
+    PostgreSQL 上按交易日期（YYYYMMDD）年度范围分区的表，写入前按数据中的年份自动创建缺少的分区；
+    分区字段不是 YYYYMMDD 格式的行无法落入任何年度分区（也超出字段长度），写入前丢弃并记录日志。
+    """
+
+    # 表名 -> 表定义
+    TABLES: dict[str, Table] = {TushareProBar.__tablename__: TushareProBar.__table__}
+    # 表名 -> 分区字段（YYYYMMDD 格式的交易日期，按年度范围分区）
+    PARTITION_COLUMNS: dict[str, str] = {TushareProBar.__tablename__: 'trade_date'}
+
+    @classmethod
+    def is_managed(cls, table_name: str) -> bool:
+        return table_name in cls.TABLES
+
+    @classmethod
+    def partition_name(cls, table_name: str, year: int) -> str:
+        return f'{table_name}_{year}'
+
+    @classmethod
+    def partition_years(cls, values: pd.Series) -> list[int]:
+        """
+        获取分区字段取值涉及的年份
+
+        :param values: 分区字段取值（YYYYMMDD）
+        :return: 年份列表（升序）
+        """
+        dates = values.dropna().astype(str)
+        return sorted(int(year) for year in dates[dates.str.fullmatch(r'\d{8}')].str[:4].unique())
+
+    @classmethod
+    def drop_invalid_partition_rows(cls, table_name: str, df: pd.DataFrame) -> pd.DataFrame:
+        """
+        丢弃分区字段为空或不是 YYYYMMDD 格式的行（非固定结构表或数据中没有分区字段时原样返回）
+
+        :param table_name: 表名
+        :param df: 待写入数据
+        :return: 可写入的数据
+        """
+        column = cls.PARTITION_COLUMNS.get(table_name)
+        if column is None or column not in df.columns:
+            return df
+        valid = df[column].notna() & df[column].astype(str).str.fullmatch(r'\d{8}')
+        if valid.all():
+            return df
+        invalid_values = df.loc[~valid, column].drop_duplicates().head(5).tolist()
+        logger.warning(
+            f'表 {table_name} 有 {int((~valid).sum())} 条数据的 {column} 不是 YYYYMMDD 格式，已丢弃，示例: {invalid_values}'
+        )
+        return df[valid]
+
+    @classmethod
+    async def create_table(cls, db: AsyncSession, table_name: str) -> None:
+        """
+        按实体类定义建表（PostgreSQL 上为分区表，分区由 ensure_partitions 创建）
+
+        :param db: 数据库会话
+        :param table_name: 表名
+        :return: None
+        """
+        table = cls.TABLES[table_name]
+        await db.run_sync(lambda sync_session: table.create(sync_session.connection(), checkfirst=True))
+        TushareSchemaRegistry.invalidate(table_name)
+        logger.info(f'已按固定结构创建数据表: {table_name}')
+
+    @classmethod
+    async def ensure_partitions(cls, db: AsyncSession, table_name: str, df: pd.DataFrame) -> list[str]:
+        """
+        确保分区表包含待写入数据所在年份的分区（非分区表或尚未迁移为分区表时不处理）
+
+        :param db: 数据库会话
+        :param table_name: 表名
+        :param df: 待写入数据
+        :return: 新创建的分区名列表
+        """
+        column = cls.PARTITION_COLUMNS.get(table_name)
+        if column is None or DataBaseConfig.db_type != 'postgresql' or column not in df.columns:
+            return []
+        schema = await TushareSchemaRegistry.get_schema(db, table_name)
+        if schema is None or not schema.is_partitioned:
+            return []
+
+        created = []
+        for year in cls.partition_years(df[column]):
+            partition = cls.partition_name(table_name, year)
+            if partition in schema.partitions:
+                continue
+            await db.execute(
+                text(
+                    f'CREATE TABLE IF NOT EXISTS "{partition}" PARTITION OF "{table_name}" '
+                    f"FOR VALUES FROM ('{year}0101') TO ('{year + 1}0101')"
+                )
+            )
+            created.append(partition)
+        if created:
+            await db.flush()
+            TushareSchemaRegistry.invalidate(table_name)
+            logger.info(f'已为表 {table_name} 创建分区: {created}')
+        return created
@@ -1,6 +1,6 @@
 from datetime import datetime
 
-from sqlalchemy import CHAR, BigInteger, Column, DateTime, Float, Integer, String, Text
+from sqlalchemy import CHAR, BigInteger, Column, DateTime, Double, Index, Integer, String, Text
 from sqlalchemy.dialects.postgresql import JSONB
 from sqlalchemy.types import JSON
 
@@ -23,6 +23,9 @@ class TushareApiConfig(Base):
     api_params = Column(Text, nullable=True, comment='接口参数（JSON格式）')
     data_fields = Column(Text, nullable=True, comment='数据字段（JSON格式，用于指定需要下载的字段）')
     primary_key_fields = Column(Text, nullable=True, comment='主键字段配置（JSON格式，为空则使用默认data_id主键）')
+    rate_limit = Column(Integer, nullable=True, comment='调用频率限制（每分钟最多调用次数，为空或0表示不限制）')
+    cache_ttl = Column(Integer, nullable=True, comment='响应缓存有效期（单位：秒，为空或0表示不缓存，-1表示永久缓存）')
+    hot_fields = Column(Text, nullable=True, comment='热点字段（JSON格式，在通用表中提取为带索引的独立列）')
     status = Column(CHAR(1), nullable=True, server_default='0', comment='状态（0正常 1停用）')
     create_by = Column(String(64), nullable=True, server_default="''", comment='创建者')
     create_time = Column(DateTime, nullable=True, default=datetime.now(), comment='创建时间')
@@ -49,7 +52,7 @@ class TushareDownloadTask(Base):
     end_date = Column(String(20), nullable=True, comment='结束日期（YYYYMMDD）')
     task_params = Column(Text, nullable=True, comment='任务参数（JSON格式，覆盖接口默认参数）')
     save_path = Column(String(500), nullable=True, comment='保存路径')
-    save_format = Column(String(20), nullable=True, server_default='csv', comment='保存格式（csv/excel/json）')
+    save_format = Column(String(20), nullable=True, server_default='csv', comment='保存格式（csv/excel/json/parquet）')
     save_to_db = Column(CHAR(1), nullable=True, server_default='0', comment='是否保存到数据库（0否 1是）')
     data_table_name = Column(String(100), nullable=True, comment='数据存储表名（为空则使用默认表tushare_data）')
     status = Column(CHAR(1), nullable=True, server_default='0', comment='状态（0正常 1暂停）')
@@ -76,6 +79,7 @@ class TushareDownloadLog(Base):
     log_id = Column(BigInteger, primary_key=True, nullable=False, autoincrement=True, comment='日志ID')
     task_id = Column(BigInteger, nullable=False, comment='任务ID')
     task_name = Column(String(100), nullable=False, comment='任务名称')
+    step_id = Column(BigInteger, nullable=True, comment='步骤ID（流程配置任务的步骤日志）')
     config_id = Column(BigInteger, nullable=False, comment='接口配置ID')
     api_name = Column(String(100), nullable=False, comment='接口名称')
     download_date = Column(String(20), nullable=True, comment='下载日期（YYYYMMDD）')
@@ -87,6 +91,25 @@ class TushareDownloadLog(Base):
     create_time = Column(DateTime, nullable=True, default=datetime.now(), comment='创建时间')
 
 
+class TushareDownloadStat(Base):
+    """
+    Tushare下载日志统计表（按任务和步骤累计，随日志写入更新）
+    """
+
+    __tablename__ = 'tushare_download_stat'
+    __table_args__ = {'comment': 'Tushare下载日志统计表'}
+
+    task_id = Column(BigInteger, primary_key=True, nullable=False, comment='任务ID')
+    step_id = Column(BigInteger, primary_key=True, nullable=False, comment='步骤ID（0表示任务合计）')
+    log_count = Column(Integer, nullable=True, default=0, comment='日志数')
+    success_count = Column(Integer, nullable=True, default=0, comment='成功日志数')
+    fail_count = Column(Integer, nullable=True, default=0, comment='失败日志数')
+    total_records = Column(BigInteger, nullable=True, default=0, comment='累计记录数')
+    total_duration = Column(BigInteger, nullable=True, default=0, comment='累计执行时长（秒）')
+    duration_count = Column(Integer, nullable=True, default=0, comment='记录了执行时长的日志数')
+    update_time = Column(DateTime, nullable=True, default=datetime.now(), comment='更新时间')
+
+
 class TushareDownloadRun(Base):
     """
     Tushare下载任务运行表（运行总览）
@@ -105,11 +128,28 @@ class TushareDownloadRun(Base):
     total_records = Column(Integer, nullable=True, default=0, comment='本次处理总记录数')
     success_records = Column(Integer, nullable=True, default=0, comment='成功记录数')
     fail_records = Column(Integer, nullable=True, default=0, comment='失败记录数')
+    dedup_records = Column(Integer, nullable=True, default=0, comment='写入前批内去重丢弃的记录数')
     error_message = Column(Text, nullable=True, comment='错误信息')
     create_time = Column(DateTime, nullable=True, default=datetime.now(), comment='创建时间')
     update_time = Column(DateTime, nullable=True, default=datetime.now(), comment='更新时间')
 
 
+class TushareDownloadCheckpoint(Base):
+    """
+    Tushare下载任务运行检查点表（遍历模式下已提交的参数组合）
+    """
+
+    __tablename__ = 'tushare_download_checkpoint'
+    __table_args__ = {'comment': 'Tushare下载任务运行检查点表'}
+
+    run_id = Column(BigInteger, primary_key=True, nullable=False, comment='运行ID')
+    step_id = Column(BigInteger, primary_key=True, nullable=False, comment='步骤ID')
+    combo_key = Column(String(64), primary_key=True, nullable=False, comment='参数组合键（接口参数的SHA-256）')
+    combo_index = Column(Integer, nullable=True, comment='参数组合序号')
+    record_count = Column(Integer, nullable=True, default=0, comment='写入记录数')
+    create_time = Column(DateTime, nullable=True, default=datetime.now(), comment='创建时间')
+
+
 class TushareData(Base):
     """
     Tushare数据存储表（通用表）
@@ -178,6 +218,11 @@ class TushareWorkflowStep(Base):
         layout_data = Column(JSON, nullable=True, comment='完整的布局数据（JSON格式，存储节点位置、连接线等可视化信息）')
     data_table_name = Column(String(100), nullable=True, comment='数据存储表名（为空则使用任务配置的表名或默认表名）')
     loop_mode = Column(CHAR(1), nullable=True, server_default='0', comment='遍历模式（0否 1是，开启后所有变量参数都会遍历）')
+    loop_concurrency = Column(Integer, nullable=True, server_default='1', comment='遍历并发数（遍历模式下同时进行的接口调用数，默认1）')
+    stream_mode = Column(CHAR(1), nullable=True, server_default='0', comment='流式模式（0否 1是，遍历模式下结果写库后不再保留，仅按列保留后续步骤引用的字段）')
+    incremental_mode = Column(CHAR(1), nullable=True, server_default='0', comment='增量模式（0否 1是，遍历模式下按目标表已有数据的交易日范围改写开始日期，已覆盖的组合跳过）')
+    commit_every = Column(Integer, nullable=True, comment='提交批次大小（遍历模式下每写入多少个组合或多少条记录提交一次事务，为空使用默认值）')
+    commit_unit = Column(CHAR(1), nullable=True, server_default='0', comment='提交批次单位（0按组合数 1按记录数）')
     update_mode = Column(CHAR(1), nullable=True, server_default='0', comment='数据更新方式（0仅插入 1忽略重复 2存在则更新 3先删除再插入）')
     unique_key_fields = Column(Text, nullable=True, comment='唯一键字段配置（JSON格式，为空则自动检测）')
     status = Column(CHAR(1), nullable=True, server_default='0', comment='状态（0正常 1停用）')
@@ -190,26 +235,31 @@ class TushareWorkflowStep(Base):
 
 class TushareProBar(Base):
     """
-    Tushare Pro Bar数据表
+    Tushare Pro Bar数据表（日线行情）
+
+    以 (ts_code, trade_date) 为主键，K线按股票和日期范围查询时走主键索引；
+    PostgreSQL 按交易日期年度范围分区，年度分区在写入数据时自动创建（见 TushareTableLayout）。
     """
 
     __tablename__ = 'tushare_pro_bar'
-    __table_args__ = {'comment': 'Tushare Pro Bar数据表'}
+    __table_args__ = (
+        Index('idx_pro_bar_trade_date', 'trade_date'),
+        {'comment': 'Tushare Pro Bar数据表', 'postgresql_partition_by': 'RANGE (trade_date)'},
+    )
 
-    data_id = Column(BigInteger, primary_key=True, nullable=False, autoincrement=True, comment='数据ID')
+    ts_code = Column(String(16), primary_key=True, nullable=False, comment='股票代码')
+    trade_date = Column(String(8), primary_key=True, nullable=False, comment='交易日期（YYYYMMDD）')
     task_id = Column(BigInteger, nullable=False, comment='任务ID')
     config_id = Column(BigInteger, nullable=False, comment='配置ID')
     api_code = Column(String(100), nullable=False, comment='接口代码')
     download_date = Column(String(20), nullable=True, comment='下载日期（YYYYMMDD）')
     create_time = Column(DateTime, nullable=True, default=datetime.now(), comment='创建时间')
-    ts_code = Column(String(500), nullable=True, comment='股票代码')
-    trade_date = Column(String(500), nullable=True, comment='交易日期')
-    open = Column(Float, nullable=True, comment='开盘价')
-    high = Column(Float, nullable=True, comment='最高价')
-    low = Column(Float, nullable=True, comment='最低价')
-    close = Column(Float, nullable=True, comment='收盘价')
-    pre_close = Column(Float, nullable=True, comment='昨收价')
-    change = Column(Float, nullable=True, comment='涨跌额')
-    pct_chg = Column(Float, nullable=True, comment='涨跌幅')
-    vol = Column(Float, nullable=True, comment='成交量')
-    amount = Column(Float, nullable=True, comment='成交额')
+    open = Column(Double, nullable=True, comment='开盘价')
+    high = Column(Double, nullable=True, comment='最高价')
+    low = Column(Double, nullable=True, comment='最低价')
+    close = Column(Double, nullable=True, comment='收盘价')
+    pre_close = Column(Double, nullable=True, comment='昨收价')
+    change = Column(Double, nullable=True, comment='涨跌额')
+    pct_chg = Column(Double, nullable=True, comment='涨跌幅')
+    vol = Column(Double, nullable=True, comment='成交量')
+    amount = Column(Double, nullable=True, comment='成交额')
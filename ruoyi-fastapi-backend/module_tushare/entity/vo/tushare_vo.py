@@ -20,6 +20,9 @@ class TushareApiConfigModel(BaseModel):
     api_params: str | None = Field(default=None, description='接口参数（JSON格式）')
     data_fields: str | None = Field(default=None, description='数据字段（JSON格式）')
     primary_key_fields: str | None = Field(default=None, description='主键字段配置（JSON格式，为空则使用默认data_id主键）')
+    rate_limit: int | None = Field(default=None, description='调用频率限制（每分钟最多调用次数，为空或0表示不限制）')
+    cache_ttl: int | None = Field(default=None, description='响应缓存有效期（单位：秒，为空或0表示不缓存，-1表示永久缓存）')
+    hot_fields: str | None = Field(default=None, description='热点字段（JSON格式，在通用表中提取为带索引的独立列）')
     status: Literal['0', '1'] | None = Field(default=None, description='状态（0正常 1停用）')
     create_by: str | None = Field(default=None, description='创建者')
     create_time: datetime | None = Field(default=None, description='创建时间')
@@ -76,6 +79,21 @@ class DeleteTushareApiConfigModel(BaseModel):
     config_ids: str = Field(description='需要删除的配置ID')
 
 
+class TushareApiLatencyModel(BaseModel):
+    """
+    Tushare接口调用耗时统计模型
+    """
+
+    model_config = ConfigDict(alias_generator=to_camel, from_attributes=True)
+
+    api_code: str = Field(description='接口代码')
+    call_count: int = Field(default=0, description='调用次数')
+    error_count: int = Field(default=0, description='失败次数')
+    avg_ms: float = Field(default=0.0, description='平均耗时（毫秒）')
+    p95_ms: float = Field(default=0.0, description='最近调用的P95耗时（毫秒）')
+    max_ms: float = Field(default=0.0, description='最大耗时（毫秒）')
+
+
 class TushareDownloadTaskModel(BaseModel):
     """
     Tushare下载任务表对应pydantic模型
@@ -336,6 +354,11 @@ class TushareWorkflowStepModel(BaseModel):
     layout_data: dict | list | None = Field(default=None, description='完整的布局数据（JSON格式，存储节点位置、连接线等可视化信息）')
     data_table_name: str | None = Field(default=None, description='数据存储表名（为空则使用任务配置的表名或默认表名）')
     loop_mode: Literal['0', '1'] | None = Field(default='0', description='遍历模式（0否 1是，开启后所有变量参数都会遍历）')
+    loop_concurrency: int | None = Field(default=1, description='遍历并发数（遍历模式下同时进行的接口调用数，默认1）')
+    stream_mode: Literal['0', '1'] | None = Field(default='0', description='流式模式（0否 1是，遍历模式下结果写库后不再保留，仅按列保留后续步骤引用的字段）')
+    incremental_mode: Literal['0', '1'] | None = Field(default='0', description='增量模式（0否 1是，遍历模式下按目标表已有数据的交易日范围改写开始日期，已覆盖的组合跳过）')
+    commit_every: int | None = Field(default=None, description='提交批次大小（遍历模式下每写入多少个组合或多少条记录提交一次事务，为空使用默认值）')
+    commit_unit: Literal['0', '1'] | None = Field(default='0', description='提交批次单位（0按组合数 1按记录数）')
     update_mode: Literal['0', '1', '2', '3'] | None = Field(default='0', description='数据更新方式（0仅插入 1忽略重复 2存在则更新 3先删除再插入）')
     unique_key_fields: str | None = Field(default=None, description='唯一键字段配置（JSON格式，为空则自动检测）')
     status: Literal['0', '1'] | None = Field(default=None, description='状态（0正常 1停用）')
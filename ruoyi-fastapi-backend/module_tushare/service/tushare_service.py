@@ -1,19 +1,26 @@
 from typing import Any
 
 from fastapi import Request
-from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession
 
 from common.constant import CommonConstant
 from common.vo import CrudResponseModel
+from config.background_runtime import BackgroundRuntime
+from config.env import TushareConfig
 from exceptions.exception import ServiceException
 from module_tushare.dao.tushare_dao import (
     TushareApiConfigDao,
     TushareDownloadLogDao,
+    TushareDownloadRunDao,
+    TushareDownloadStatDao,
     TushareDownloadTaskDao,
     TushareWorkflowConfigDao,
     TushareWorkflowStepDao,
 )
+from module_tushare.dao.tushare_data_hot_field import TushareDataHotFieldDao
+from module_tushare.dao.tushare_schema_registry import TushareSchemaRegistry
 from module_tushare.entity.do.tushare_do import TushareDownloadLog
+from module_tushare.task.tushare_client import TushareClient
 from module_tushare.entity.vo.tushare_vo import (
     BatchSaveWorkflowStepModel,
     DeleteTushareApiConfigModel,
@@ -27,6 +34,7 @@ from module_tushare.entity.vo.tushare_vo import (
     EditTushareWorkflowStepModel,
     TushareApiConfigModel,
     TushareApiConfigPageQueryModel,
+    TushareApiLatencyModel,
     TushareDownloadLogPageQueryModel,
     TushareDownloadTaskModel,
     TushareDownloadTaskPageQueryModel,
@@ -92,6 +100,8 @@ class TushareApiConfigService:
         """
         if not await cls.check_config_unique_services(query_db, page_object):
             raise ServiceException(message=f'新增接口配置{page_object.api_name}失败，接口代码已存在')
+        hot_fields = cls._parse_hot_fields(page_object.hot_fields)
+        await cls._check_hot_field_types(query_db, hot_fields)
         try:
             add_config = await TushareApiConfigDao.add_config_dao(query_db, page_object)
             await query_db.commit()
@@ -99,9 +109,85 @@ class TushareApiConfigService:
         except Exception as e:
             await query_db.rollback()
             raise e
+        await cls.sync_hot_fields_services(query_db, page_object.api_code, hot_fields)
 
         return CrudResponseModel(**result)
 
+    @classmethod
+    def _parse_hot_fields(cls, hot_fields: str | None) -> dict[str, str]:
+        try:
+            return TushareDataHotFieldDao.parse_hot_fields(hot_fields)
+        except ValueError as e:
+            raise ServiceException(message=str(e)) from e
+
+    @classmethod
+    async def _check_hot_field_types(cls, query_db: AsyncSession, hot_fields: dict[str, str]) -> None:
+        """
+        校验热点字段类型与通用表中已有热点列的类型一致（热点列在所有接口间共享，类型以首次创建时为准）
+
+        :param query_db: orm对象
+        :param hot_fields: 热点字段（字段名 -> 类型）
+        :return: None
+        """
+        if not hot_fields:
+            return
+        conflicts = await TushareDataHotFieldDao.get_type_conflicts(query_db, hot_fields)
+        if conflicts:
+            detail = '、'.join(f'{field}（已有列类型为 {column_type}）' for field, column_type in conflicts.items())
+            raise ServiceException(message=f'热点字段类型与通用表中已有的热点列不一致: {detail}')
+
+    @classmethod
+    async def sync_hot_fields_services(cls, query_db: AsyncSession, api_code: str, hot_fields: dict[str, str]) -> None:
+        """
+        为接口新增的热点字段在通用表中创建热点列和索引，并在后台分批回填该接口的已有数据
+
+        :param query_db: orm对象
+        :param api_code: 接口代码
+        :param hot_fields: 需要同步的热点字段（字段名 -> 类型）
+        :return: None
+        """
+        if not hot_fields:
+            return
+        try:
+            created = await TushareDataHotFieldDao.ensure_columns(query_db, hot_fields)
+            await query_db.commit()
+        except Exception as e:
+            await query_db.rollback()
+            logger.exception(f'创建通用表热点列失败: {e}')
+            raise ServiceException(message=f'接口配置已保存，但创建热点字段列失败: {e}') from e
+        if created:
+            logger.info(f'通用表已创建热点列: {created}')
+        BackgroundRuntime.submit(cls.backfill_hot_fields_job, api_code, hot_fields)
+
+    @classmethod
+    async def backfill_hot_fields_job(cls, engine: AsyncEngine, api_code: str, hot_fields: dict[str, str]) -> int:
+        """
+        按数据ID区间分批回填接口已有数据的热点列（每批单独提交，在后台任务线程中执行）
+
+        :param engine: 工作线程的数据库引擎
+        :param api_code: 接口代码
+        :param hot_fields: 需要回填的热点字段（字段名 -> 类型）
+        :return: 更新的行数
+        """
+        batch_size = max(1, TushareConfig.tushare_hot_field_backfill_batch_size)
+        updated = 0
+        try:
+            async with AsyncSession(bind=engine) as db:
+                start_id, end_id = await TushareDataHotFieldDao.get_data_id_range(db, api_code)
+                if start_id is None:
+                    return 0
+                for batch_start in range(start_id, end_id + 1, batch_size):
+                    batch_end = min(batch_start + batch_size - 1, end_id)
+                    updated += await TushareDataHotFieldDao.fill_hot_columns(
+                        db, api_code, hot_fields, batch_start, batch_end
+                    )
+                    await db.commit()
+        except Exception as e:
+            logger.exception(f'接口 {api_code} 热点字段 {list(hot_fields)} 回填失败（已回填 {updated} 行）: {e}')
+            return updated
+        logger.info(f'接口 {api_code} 热点字段 {list(hot_fields)} 回填完成，共更新 {updated} 行')
+        return updated
+
     @classmethod
     def _deal_edit_config(cls, page_object: EditTushareApiConfigModel, edit_config: dict[str, Any]) -> None:
         """
@@ -168,6 +254,20 @@ class TushareApiConfigService:
             )
             if not await cls.check_config_unique_services(query_db, check_config):
                 raise ServiceException(message=f'编辑接口配置{page_object.api_name}失败，接口代码已存在')
+            hot_fields = cls._parse_hot_fields(page_object.hot_fields)
+            await cls._check_hot_field_types(query_db, hot_fields)
+            # 只同步新增、类型变化的热点字段；接口代码变化时对应的是另一批数据，全部同步
+            old_hot_fields = {}
+            if old_config.api_code == page_object.api_code:
+                try:
+                    old_hot_fields = TushareDataHotFieldDao.parse_hot_fields(old_config.hot_fields)
+                except ValueError:
+                    old_hot_fields = {}
+            sync_hot_fields = {
+                field: field_type for field, field_type in hot_fields.items() if old_hot_fields.get(field) != field_type
+            }
+        else:
+            sync_hot_fields = {}
         try:
             # 验证config_id不为None
             if page_object.config_id is None:
@@ -211,6 +311,7 @@ class TushareApiConfigService:
         except Exception as e:
             await query_db.rollback()
             raise e
+        await cls.sync_hot_fields_services(query_db, page_object.api_code, sync_hot_fields)
 
         return CrudResponseModel(**result)
 
@@ -278,6 +379,17 @@ class TushareApiConfigService:
 
         return excel_stream
 
+    @classmethod
+    def get_api_latency_services(cls) -> list[TushareApiLatencyModel]:
+        """
+        获取Tushare接口调用耗时统计service（当前进程启动以来的累计值）
+
+        :return: 各接口的调用耗时统计列表
+        """
+        latency_stats = TushareClient.get_latency_stats()
+
+        return [TushareApiLatencyModel(api_code=api_code, **stats) for api_code, stats in latency_stats.items()]
+
 
 class TushareDownloadTaskService:
     """
@@ -703,7 +815,7 @@ class TushareDownloadTaskService:
             token = TushareConfig.tushare_token or os.getenv('TUSHARE_TOKEN', '')
             if not token:
                 raise ServiceException(message='TUSHARE_TOKEN未配置，无法校验接口')
-            pro = ts.pro_api(token)
+            pro = TushareClient.get_client(token)
             for step in steps:
                 # 与任务执行器保持一致：停用步骤、开始/结束节点不做接口预检查
                 # （开始/结束节点不需要接口配置；停用步骤执行时会被跳过）
@@ -742,7 +854,7 @@ class TushareDownloadTaskService:
             token = TushareConfig.tushare_token or os.getenv('TUSHARE_TOKEN', '')
             if not token:
                 raise ServiceException(message='TUSHARE_TOKEN未配置，无法校验接口')
-            pro = ts.pro_api(token)
+            pro = TushareClient.get_client(token)
             api_func = getattr(pro, api_code, None) or getattr(ts, api_code, None)
             if not api_func:
                 raise ServiceException(message=f'接口「{api_code}」不存在')
@@ -774,6 +886,43 @@ class TushareDownloadTaskService:
 
         return CrudResponseModel(**result)
 
+    @classmethod
+    async def resume_task_services(cls, query_db: AsyncSession, task_id: int) -> CrudResponseModel:
+        """
+        续跑下载任务最近一次未成功的运行service
+
+        :param query_db: orm对象
+        :param task_id: 下载任务id
+        :return: 续跑任务结果
+        """
+        import threading
+
+        from module_tushare.task.tushare_download_task import download_tushare_data_sync
+
+        task = await TushareDownloadTaskDao.get_task_detail_by_id(query_db, task_id)
+        if not task:
+            raise ServiceException(message='下载任务不存在')
+        if task.status != '0':
+            raise ServiceException(message='任务已暂停，无法执行')
+        if not task.workflow_id:
+            raise ServiceException(message='仅流程任务支持续跑')
+
+        # 只续跑最近一次运行：之后若已有成功的运行，旧运行的检查点不再有意义
+        run = await TushareDownloadRunDao.get_latest_run_by_task_id(query_db, task_id)
+        if not run or run.status == 'SUCCESS':
+            raise ServiceException(message='任务没有可续跑的运行记录')
+        run_id = run.run_id
+
+        def run_task():
+            try:
+                download_tushare_data_sync(task_id, resume_run_id=run_id)
+            except Exception as e:
+                logger.exception(f'续跑任务 {task_id} 的运行 {run_id} 失败: {e}')
+
+        threading.Thread(target=run_task, daemon=True).start()
+
+        return CrudResponseModel(is_success=True, message=f'运行 {run_id} 已提交续跑，请稍后查看执行日志')
+
     @classmethod
     async def get_task_statistics_services(
         cls, query_db: AsyncSession, task_id: int
@@ -785,9 +934,6 @@ class TushareDownloadTaskService:
         :param task_id: 任务ID
         :return: 任务执行统计信息
         """
-        from sqlalchemy import func, select, Integer, cast
-        from module_tushare.entity.do.tushare_do import TushareDownloadLog
-        
         # 获取任务信息
         task = await TushareDownloadTaskDao.get_task_detail_by_id(query_db, task_id)
         if not task:
@@ -796,20 +942,12 @@ class TushareDownloadTaskService:
         # 判断任务类型
         task_type = 'workflow' if task.workflow_id else 'single'
         
-        # 获取日志统计
-        log_stats_query = (
-            select(
-                func.count(TushareDownloadLog.log_id).label('total_count'),
-                func.sum(cast(TushareDownloadLog.status == '0', Integer)).label('success_count'),
-                func.sum(cast(TushareDownloadLog.status == '1', Integer)).label('fail_count'),
-                func.sum(TushareDownloadLog.record_count).label('total_records'),
-                func.avg(TushareDownloadLog.duration).label('avg_duration'),
-            )
-            .where(TushareDownloadLog.task_id == task_id)
-        )
-        
-        log_stats_result = await query_db.execute(log_stats_query)
-        log_stats = log_stats_result.first()
+        # 读取按任务和步骤累计的日志统计；统计表尚无数据时（如升级前的历史日志）由日志按步骤一次分组统计
+        stats = await TushareDownloadStatDao.get_task_stats_dao(query_db, task_id)
+        if not stats:
+            stats = await TushareDownloadLogDao.get_log_stats_by_step(query_db, task_id)
+        task_stats = stats.get(0, {})
+        duration_count = task_stats.get('duration_count', 0)
         
         statistics = {
             'task_id': task_id,
@@ -820,50 +958,51 @@ class TushareDownloadTaskService:
             'fail_count': task.fail_count or 0,
             'last_run_time': task.last_run_time.isoformat() if task.last_run_time else None,
             'log_statistics': {
-                'total_logs': log_stats.total_count or 0,
-                'success_logs': log_stats.success_count or 0,
-                'fail_logs': log_stats.fail_count or 0,
-                'total_records': log_stats.total_records or 0,
-                'avg_duration': round(log_stats.avg_duration, 2) if log_stats.avg_duration else 0,
+                'total_logs': task_stats.get('log_count', 0),
+                'success_logs': task_stats.get('success_count', 0),
+                'fail_logs': task_stats.get('fail_count', 0),
+                'total_records': task_stats.get('total_records', 0),
+                'avg_duration': round(task_stats['total_duration'] / duration_count, 2) if duration_count else 0,
             },
         }
         
         # 如果是流程配置任务，获取步骤统计
         if task_type == 'workflow' and task.workflow_id:
-            from module_tushare.dao.tushare_dao import TushareWorkflowStepDao
             steps = await TushareWorkflowStepDao.get_steps_by_workflow_id(query_db, task.workflow_id)
             
             step_statistics = []
             for step in steps:
-                step_log_query = (
-                    select(
-                        func.count(TushareDownloadLog.log_id).label('count'),
-                        func.sum(cast(TushareDownloadLog.status == '0', Integer)).label('success'),
-                        func.sum(cast(TushareDownloadLog.status == '1', Integer)).label('fail'),
-                        func.sum(TushareDownloadLog.record_count).label('records'),
-                    )
-                    .where(
-                        TushareDownloadLog.task_id == task_id,
-                        TushareDownloadLog.task_name.like(f'%[{step.step_name}]%')
-                    )
-                )
-                step_log_result = await query_db.execute(step_log_query)
-                step_log = step_log_result.first()
-                
+                step_stats = stats.get(step.step_id, {})
                 step_statistics.append({
                     'step_id': step.step_id,
                     'step_name': step.step_name,
                     'step_order': step.step_order,
-                    'log_count': step_log.count or 0,
-                    'success_count': step_log.success or 0,
-                    'fail_count': step_log.fail or 0,
-                    'total_records': step_log.records or 0,
+                    'log_count': step_stats.get('log_count', 0),
+                    'success_count': step_stats.get('success_count', 0),
+                    'fail_count': step_stats.get('fail_count', 0),
+                    'total_records': step_stats.get('total_records', 0),
                 })
             
             statistics['step_statistics'] = step_statistics
         
         return statistics
 
+    @classmethod
+    async def refresh_schema_cache_services(cls, query_db: AsyncSession, table_name: str | None = None) -> CrudResponseModel:
+        """
+        刷新数据表结构缓存service（表结构在系统外被修改后使用）
+
+        :param query_db: orm对象
+        :param table_name: 表名，为空时刷新全部已缓存的表
+        :return: 刷新结果
+        """
+        try:
+            refreshed = await TushareSchemaRegistry.refresh(query_db, table_name or None)
+        except ValueError as e:
+            raise ServiceException(message=str(e)) from e
+
+        return CrudResponseModel(is_success=True, message=f'刷新成功，共 {refreshed} 张表')
+
 
 class TushareDownloadLogService:
     """
@@ -0,0 +1,151 @@
+import asyncio
+import threading
+from collections.abc import Callable
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any
+
+from config.env import TushareConfig
+from module_tushare.task.tushare_client import TushareClient
+from module_tushare.task.tushare_rate_limiter import TushareRateLimiter
+from utils.log_util import logger
+
+
+class TushareApiTimeoutError(TimeoutError):
+    """
+    Tushare接口调用超时异常
+    """
+
+    def __init__(self, api_code: str, timeout: float) -> None:
+        self.api_code = api_code
+        self.timeout = timeout
+        super().__init__(f'Tushare接口 {api_code or "未知接口"} 调用超时（超过 {timeout} 秒）')
+
+
+class TushareApiExecutor:
+    """
+    Tushare接口调用执行器
+
+    Tushare SDK 的接口函数均为同步阻塞的HTTP调用，统一提交到进程内共享的有界线程池中执行，
+    协程只等待结果，不会阻塞事件循环。线程池在所有任务（包括各后台任务线程中的事件循环）之间共享，
+    因此线程池大小即为整个进程同时进行的Tushare接口调用上限。
+    """
+
+    _executor: ThreadPoolExecutor | None = None
+    _lock = threading.Lock()
+
+    @classmethod
+    def get_executor(cls) -> ThreadPoolExecutor:
+        """
+        获取共享线程池（首次使用时按配置创建）
+
+        :return: 线程池对象
+        """
+        if cls._executor is None:
+            with cls._lock:
+                if cls._executor is None:
+                    max_workers = max(1, TushareConfig.tushare_api_max_workers)
+                    cls._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='tushare-api')
+                    logger.info(f'Tushare接口调用线程池已创建，最大线程数: {max_workers}')
+        return cls._executor
+
+    @classmethod
+    async def call(
+        cls,
+        func: Callable[..., Any],
+        *args: Any,
+        api_code: str = '',
+        timeout: float | None = None,
+        rate_limit: int | None = None,
+        **kwargs: Any,
+    ) -> Any:
+        """
+        按接口限流后在线程池中执行接口调用并等待结果
+
+        超时从调用在线程中开始执行时计算，在线程池队列中排队等待的时间不计入超时。
+        所在协程被取消时，尚未开始执行的调用会从线程池队列中取消；已在执行的调用无法强制中断，
+        其结果会被丢弃，底层HTTP请求由接口客户端的 timeout 兜底结束。
+        遇到Tushare频率限制错误时，由限流器暂停并降低该接口速率后自动重试。
+
+        :param func: 同步的接口函数
+        :param args: 位置参数
+        :param api_code: 接口代码（用于限流、耗时统计、日志和异常信息）
+        :param timeout: 超时时间（秒），为空时使用全局配置，小于等于0表示不限制
+        :param rate_limit: 接口每分钟调用上限（为空或0表示不限制）
+        :param kwargs: 接口参数
+        :return: 接口返回结果
+        """
+        if timeout is None:
+            timeout = TushareConfig.tushare_api_timeout
+        attempt = 0
+        while True:
+            # 限流等待在协程中进行，不占用接口调用线程，也不计入调用超时
+            await TushareRateLimiter.acquire(api_code, rate_limit)
+            try:
+                result = await cls._submit(func, args, kwargs, api_code, timeout)
+            except TushareApiTimeoutError:
+                raise
+            except Exception as e:
+                if TushareRateLimiter.is_quota_error(e) and attempt < TushareConfig.tushare_api_quota_retries:
+                    attempt += 1
+                    await TushareRateLimiter.report_quota_error(api_code, e, attempt)
+                    continue
+                raise
+            TushareRateLimiter.report_success(api_code)
+            return result
+
+    @classmethod
+    async def _submit(
+        cls, func: Callable[..., Any], args: tuple, kwargs: dict, api_code: str, timeout: float | None
+    ) -> Any:
+        loop = asyncio.get_running_loop()
+        started = asyncio.Event()
+
+        def run() -> Any:
+            # 线程开始执行时通知协程开始计时，排队时间不计入超时
+            try:
+                loop.call_soon_threadsafe(started.set)
+            except RuntimeError:
+                pass
+            # 耗时统计按接口配置代码记录（如 pro_bar 内部的 daily 调用计入 pro_bar）
+            token = TushareClient.begin_api_code(api_code)
+            try:
+                return func(*args, **kwargs)
+            except Exception as e:
+                # ts.pro_bar 等封装接口把接口返回的错误替换为 IOError('ERROR.')，改抛原始错误以便识别频率限制
+                api_error = TushareClient.get_api_error()
+                if api_error is not None and api_error is not e:
+                    raise api_error from e
+                raise
+            finally:
+                TushareClient.end_api_code(token)
+
+        future = cls.get_executor().submit(run)
+        result_future = asyncio.wrap_future(future)
+        try:
+            if not timeout or timeout <= 0:
+                return await result_future
+            started_waiter = asyncio.ensure_future(started.wait())
+            try:
+                await asyncio.wait({started_waiter, result_future}, return_when=asyncio.FIRST_COMPLETED)
+            finally:
+                started_waiter.cancel()
+            return await asyncio.wait_for(result_future, timeout)
+        except asyncio.TimeoutError:
+            future.cancel()
+            logger.warning(f'Tushare接口 {api_code} 调用超时（{timeout} 秒），已放弃等待')
+            raise TushareApiTimeoutError(api_code, timeout) from None
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+
+    @classmethod
+    def shutdown(cls) -> None:
+        """
+        关闭线程池，取消队列中尚未执行的调用
+
+        :return: None
+        """
+        with cls._lock:
+            if cls._executor is not None:
+                cls._executor.shutdown(wait=False, cancel_futures=True)
+                cls._executor = None
@@ -0,0 +1,277 @@
+import json
+import threading
+import time
+from collections import deque
+from contextvars import ContextVar, Token
+from functools import partial
+from typing import Any
+
+import pandas as pd
+import requests
+from requests.adapters import HTTPAdapter
+
+from config.env import TushareConfig
+from utils.log_util import logger
+
+# 每个接口保留的最近调用耗时样本数（用于计算 p95）
+LATENCY_SAMPLE_SIZE = 1000
+
+
+class _ApiCallState:
+    """
+    接口调用执行器中一次调用的状态（接口配置代码、接口返回的最近一次错误）
+    """
+
+    __slots__ = ('api_code', 'error')
+
+    def __init__(self, api_code: str) -> None:
+        self.api_code = api_code
+        self.error: Exception | None = None
+
+
+# 当前调用的状态（由接口调用执行器在执行线程中设置，pro_bar 等封装接口按配置代码统计耗时、保留接口返回的原始错误）
+_current_call: ContextVar[_ApiCallState | None] = ContextVar('tushare_current_call', default=None)
+
+
+class TushareLatencyStats:
+    """
+    单个Tushare接口的调用耗时统计（进程累计，线程安全）
+    """
+
+    __slots__ = ('_lock', '_samples', 'call_count', 'error_count', 'max_ms', 'total_ms')
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._samples: deque[float] = deque(maxlen=LATENCY_SAMPLE_SIZE)
+        self.call_count = 0
+        self.error_count = 0
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+
+    def record(self, elapsed_ms: float, failed: bool = False) -> None:
+        """
+        记录一次调用
+
+        :param elapsed_ms: 调用耗时（毫秒）
+        :param failed: 是否调用失败
+        :return: None
+        """
+        with self._lock:
+            self.call_count += 1
+            if failed:
+                self.error_count += 1
+            self.total_ms += elapsed_ms
+            self.max_ms = max(self.max_ms, elapsed_ms)
+            self._samples.append(elapsed_ms)
+
+    def to_dict(self) -> dict[str, Any]:
+        with self._lock:
+            samples = sorted(self._samples)
+            call_count = self.call_count
+            return {
+                'call_count': call_count,
+                'error_count': self.error_count,
+                'avg_ms': round(self.total_ms / call_count, 1) if call_count else 0.0,
+                'p95_ms': round(samples[min(len(samples) - 1, int(len(samples) * 0.95))], 1) if samples else 0.0,
+                'max_ms': round(self.max_ms, 1),
+            }
+
+
+class TushareClient:
+    """
+    复用连接的Tushare Pro接口客户端
+
+    与 tushare SDK 的 DataApi 接口兼容（pro.daily(...)、pro.query('daily', ...)），也可作为 ts.pro_bar 的 api 参数，
+    避免每次调用 ts.set_token 写 token 文件、ts.pro_api 读取 token 文件。
+    客户端按 token 和超时时间在进程内复用；每个调用线程持有一个 requests 会话，HTTP 连接保持长连接复用，
+    不再为每次调用重新建立连接。每次调用按接口记录耗时，供监控查询：通过 begin_api_code 设置了接口配置代码时
+    按配置代码统计（如 pro_bar 内部调用的 daily 计入 pro_bar），否则按HTTP接口名统计。
+    通过 set_provider 可将 get_client 返回的客户端替换为接口兼容的其他实现（如基准测试使用的模拟接口）。
+    """
+
+    _provider: Any = None
+    _clients: dict[tuple[str, float], 'TushareClient'] = {}
+    _clients_lock = threading.Lock()
+    _latency: dict[str, TushareLatencyStats] = {}
+    _latency_lock = threading.Lock()
+
+    def __init__(self, token: str, timeout: float = 30) -> None:
+        """
+        :param token: Tushare token
+        :param timeout: 单次HTTP请求超时时间（秒）
+        """
+        self._token = token
+        self._timeout = timeout
+        self._local = threading.local()
+        self._sessions: list[requests.Session] = []
+        self._sessions_lock = threading.Lock()
+
+    @classmethod
+    def get_client(cls, token: str, timeout: float | None = None) -> 'TushareClient':
+        """
+        获取进程内共享的客户端
+
+        :param token: Tushare token
+        :param timeout: 单次HTTP请求超时时间（秒），为空时使用全局配置
+        :return: 客户端对象
+        """
+        if cls._provider is not None:
+            return cls._provider
+        timeout = timeout or TushareConfig.tushare_api_timeout or 30
+        key = (token, timeout)
+        client = cls._clients.get(key)
+        if client is None:
+            with cls._clients_lock:
+                client = cls._clients.get(key)
+                if client is None:
+                    client = cls(token, timeout)
+                    cls._clients[key] = client
+        return client
+
+    @classmethod
+    def set_provider(cls, provider: Any) -> None:
+        """
+        替换 get_client 返回的客户端（用于无 token、无网络的离线场景，传入None恢复为真实客户端）
+
+        :param provider: 与本类接口兼容的对象（支持 provider.query(api_name, fields, **kwargs) 和 provider.daily(...)）
+        :return: None
+        """
+        cls._provider = provider
+
+    def _get_session(self) -> requests.Session:
+        session = getattr(self._local, 'session', None)
+        if session is None:
+            session = requests.Session()
+            adapter = HTTPAdapter(pool_connections=1, pool_maxsize=1)
+            session.mount('http://', adapter)
+            session.mount('https://', adapter)
+            self._local.session = session
+            with self._sessions_lock:
+                self._sessions.append(session)
+        return session
+
+    def query(self, api_name: str, fields: str = '', **kwargs: Any) -> pd.DataFrame:
+        """
+        调用Tushare接口（请求与返回格式与 tushare SDK 一致，接口返回错误时抛出带原始错误信息的异常）
+
+        :param api_name: 接口名称
+        :param fields: 返回字段
+        :param kwargs: 接口参数
+        :return: 接口返回数据
+        """
+        req_params = {'api_name': api_name, 'token': self._token, 'params': kwargs, 'fields': fields}
+        started = time.perf_counter()
+        failed = True
+        try:
+            res = self._get_session().post(TushareConfig.tushare_api_url, json=req_params, timeout=self._timeout)
+            if res:
+                result = json.loads(res.text)
+                if result['code'] != 0:
+                    error = Exception(result['msg'])
+                    call = _current_call.get()
+                    if call is not None:
+                        call.error = error
+                    raise error
+                data = result['data']
+                failed = False
+                return pd.DataFrame(data['items'], columns=data['fields'])
+            # 非 2xx 响应与 SDK 一样返回空数据，但在耗时统计中记为失败
+            return pd.DataFrame()
+        finally:
+            self.record_latency(api_name, (time.perf_counter() - started) * 1000, failed)
+
+    def __getattr__(self, name: str) -> Any:
+        if name.startswith('_'):
+            raise AttributeError(name)
+        return partial(self.query, name)
+
+    @classmethod
+    def begin_api_code(cls, api_code: str) -> Token:
+        """
+        开始一次接口调用：设置对应的接口配置代码，之后的耗时统计计入该代码，并记录接口返回的错误
+
+        :param api_code: 接口配置代码（为空时按HTTP接口名统计）
+        :return: 结束时传给 end_api_code 的令牌
+        """
+        return _current_call.set(_ApiCallState(api_code))
+
+    @classmethod
+    def get_api_error(cls) -> Exception | None:
+        """
+        获取当前调用中接口返回的最近一次错误（ts.pro_bar 等封装接口会吞掉原始错误，改抛 IOError('ERROR.')）
+
+        :return: 接口返回的错误，没有时返回None
+        """
+        call = _current_call.get()
+        return call.error if call is not None else None
+
+    @classmethod
+    def end_api_code(cls, token: Token) -> None:
+        """
+        恢复设置前的接口配置代码
+
+        :param token: begin_api_code 返回的令牌
+        :return: None
+        """
+        _current_call.reset(token)
+
+    @classmethod
+    def record_latency(cls, api_name: str, elapsed_ms: float, failed: bool = False) -> None:
+        """
+        记录接口调用耗时（已设置接口配置代码时计入配置代码，否则计入接口名称）
+
+        :param api_name: 接口名称
+        :param elapsed_ms: 调用耗时（毫秒）
+        :param failed: 是否调用失败
+        :return: None
+        """
+        call = _current_call.get()
+        api_code = (call.api_code if call is not None else '') or api_name
+        stats = cls._latency.get(api_code)
+        if stats is None:
+            with cls._latency_lock:
+                stats = cls._latency.setdefault(api_code, TushareLatencyStats())
+        stats.record(elapsed_ms, failed)
+
+    @classmethod
+    def get_latency_stats(cls) -> dict[str, dict[str, Any]]:
+        """
+        获取各接口的调用耗时统计（进程累计）
+
+        :return: 接口名称到统计信息的映射
+        """
+        with cls._latency_lock:
+            items = list(cls._latency.items())
+        return {api_name: stats.to_dict() for api_name, stats in sorted(items)}
+
+    @classmethod
+    def format_latency_summary(cls) -> str:
+        """
+        生成各接口调用耗时统计的单行摘要（用于日志）
+
+        :return: 统计摘要，尚无调用记录时返回空字符串
+        """
+        return '; '.join(
+            f'{api_code} 调用{stats["call_count"]}次/失败{stats["error_count"]}次 '
+            f'平均{stats["avg_ms"]}ms P95 {stats["p95_ms"]}ms 最大{stats["max_ms"]}ms'
+            for api_code, stats in cls.get_latency_stats().items()
+        )
+
+    @classmethod
+    def shutdown(cls) -> None:
+        """
+        关闭所有客户端的HTTP会话
+
+        :return: None
+        """
+        with cls._clients_lock:
+            clients = list(cls._clients.values())
+            cls._clients.clear()
+        for client in clients:
+            with client._sessions_lock:
+                sessions = list(client._sessions)
+                client._sessions.clear()
+            for session in sessions:
+                session.close()
+        if clients:
+            logger.info('Tushare接口客户端HTTP会话已关闭')
@@ -3,7 +3,7 @@ import os
 import re
 import traceback
 from datetime import datetime, timedelta
-from itertools import product
+from functools import partial
 from typing import Any
 
 import pandas as pd
@@ -16,14 +16,34 @@ from config.env import DataBaseConfig, TushareConfig
 from module_tushare.dao.tushare_dao import (
     TushareApiConfigDao,
     TushareDataDao,
+    TushareDownloadCheckpointDao,
     TushareDownloadLogDao,
-    TushareDownloadRunDao,
     TushareDownloadTaskDao,
     TushareWorkflowConfigDao,
     TushareWorkflowStepDao,
 )
+from module_tushare.dao.tushare_kline_cache import TushareKlineCache
+from module_tushare.dao.tushare_schema_registry import TushareSchemaRegistry
+from module_tushare.dao.tushare_stock_index import TushareStockSearchIndex
+from module_tushare.dao.tushare_table_layout import TushareTableLayout
 from module_tushare.entity.do.tushare_do import TushareData, TushareDownloadLog
 from module_tushare.entity.vo.tushare_vo import TushareDownloadTaskModel
+from module_tushare.task.tushare_client import TushareClient
+from module_tushare.task.tushare_incremental_planner import IncrementalPlanner
+from module_tushare.task.tushare_log_sink import TushareLogSink
+from module_tushare.task.tushare_loop_executor import (
+    LoopCommitBatch,
+    LoopFetchResult,
+    ParamCombinationSet,
+    iter_prefetched,
+    make_combo_key,
+    normalize_loop_concurrency,
+    unique_in_order,
+)
+from module_tushare.task.tushare_parquet_writer import ParquetDatasetWriter
+from module_tushare.task.tushare_response_cache import ResponseCacheStats, TushareResponseCache
+from module_tushare.task.tushare_step_result import StreamingStepResult, find_referenced_fields
+from module_tushare.task.tushare_workflow_dag import WorkflowDag
 from utils.log_util import logger
 
 
@@ -84,7 +104,7 @@ def pandas_dtype_to_db_type(dtype, db_type: str = 'postgresql') -> str:
 
 async def ensure_table_exists(session: AsyncSession, table_name: str, api_code: str, df: pd.DataFrame | None = None, config=None, primary_key_fields_str: str | None = None) -> None:
     """
-    确保表存在，如果不存在则根据 DataFrame 结构创建
+    确保表存在，如果不存在则根据 DataFrame 结构创建（固定存储结构的表按实体类定义创建，分区表补齐待写入数据的分区）
 
     :param session: 数据库会话
     :param table_name: 表名
@@ -100,33 +120,22 @@ async def ensure_table_exists(session: AsyncSession, table_name: str, api_code:
     if not re.match(r'^[a-zA-Z_][a-zA-Z0-9_]*$', table_name):
         raise ValueError(f'无效的表名: {table_name}')
     
-    # 检查表是否存在
     if DataBaseConfig.db_type == 'postgresql':
-        check_sql = """
-            SELECT EXISTS (
-                SELECT FROM information_schema.tables 
-                WHERE table_schema = 'public' 
-                AND table_name = :table_name
-            )
-        """
         # PostgreSQL 表名和索引名需要用双引号转义
         table_name_escaped = f'"{table_name}"'
     else:
-        check_sql = """
-            SELECT COUNT(*) as count
-            FROM information_schema.tables 
-            WHERE table_schema = DATABASE()
-            AND table_name = :table_name
-        """
         # MySQL 表名和索引名需要用反引号转义
         table_name_escaped = f'`{table_name}`'
     
-    result = await session.execute(text(check_sql), {'table_name': table_name})
+    # 检查表是否存在（使用进程级表结构缓存，已存在的表不再重复查询系统表）
+    table_exists = await TushareSchemaRegistry.table_exists(session, table_name)
     
-    if DataBaseConfig.db_type == 'postgresql':
-        table_exists = result.scalar()
-    else:
-        table_exists = result.scalar() > 0
+    if TushareTableLayout.is_managed(table_name):
+        if not table_exists:
+            await TushareTableLayout.create_table(session, table_name)
+        if df is not None and not df.empty:
+            await TushareTableLayout.ensure_partitions(session, table_name, df)
+        return
     
     if not table_exists:
         if df is None or df.empty:
@@ -296,19 +305,23 @@ async def ensure_table_exists(session: AsyncSession, table_name: str, api_code:
             await session.execute(text(create_sql))
             await session.flush()
         
+        # 建表后使表结构缓存失效，后续按新表结构重新加载
+        TushareSchemaRegistry.invalidate(table_name)
+        
         if primary_key_fields and primary_key_columns:
             logger.info(f'已创建数据表: {table_name}，包含 {len(df.columns)} 个数据列，主键字段: {primary_key_columns}')
         else:
             logger.info(f'已创建数据表: {table_name}，包含 {len(df.columns)} 个数据列，使用默认 data_id 主键')
 
 
-async def execute_single_api(session: AsyncSession, task, download_date: str) -> None:
+async def execute_single_api(session: AsyncSession, task, download_date: str, log_sink: TushareLogSink) -> None:
     """
     执行单个接口下载
 
     :param session: 数据库会话
     :param task: 任务对象
     :param download_date: 下载日期
+    :param log_sink: 下载日志与运行状态的缓冲写入器
     :return: None
     """
     start_time = datetime.now()
@@ -334,6 +347,7 @@ async def execute_single_api(session: AsyncSession, task, download_date: str) ->
     task_task_params = task_dict.get('task_params')
     task_run_count = task_dict.get('run_count', 0) or 0
     task_success_count = task_dict.get('success_count', 0) or 0
+    task_fail_count = task_dict.get('fail_count', 0) or 0
     
     config = await TushareApiConfigDao.get_config_detail_by_id(session, task_config_id)
     if not config:
@@ -350,6 +364,8 @@ async def execute_single_api(session: AsyncSession, task, download_date: str) ->
     config_config_id = config_dict.get('config_id')
     config_data_fields = config_dict.get('data_fields')
     config_primary_key_fields = config_dict.get('primary_key_fields')
+    config_rate_limit = config_dict.get('rate_limit')
+    config_cache_ttl = config_dict.get('cache_ttl')
 
     if config_status != '0':
         logger.warning(f'接口配置 {config_api_name} 已停用')
@@ -373,15 +389,9 @@ async def execute_single_api(session: AsyncSession, task, download_date: str) ->
     # 如果需要在参数中使用日期，请在接口配置或步骤参数中明确指定
 
     # 创建运行记录（PENDING -> RUNNING）
-    # 注意：这里立即缓存 run_id，后续不再访问 ORM 对象属性，避免在 commit 之后触发延迟加载
-    run_record = await TushareDownloadRunDao.create_run_record(session, task, initial_status='PENDING')
-    run_id = run_record.run_id
-    await TushareDownloadRunDao.update_run_status(
-        session,
-        run_id,
-        status='RUNNING',
-        set_start_time=True,
-    )
+    # 运行记录由写入器立即提交，之后的状态更新和任务统计经写入器批量写入，不占用数据事务
+    run_id = await log_sink.create_run_record(task, initial_status='PENDING')
+    log_sink.update_run_status(run_id, status='RUNNING', set_start_time=True)
 
     # 调用tushare接口
     logger.info(f'开始下载任务: {task_name}, 接口: {config_api_code}, 参数: {api_params}')
@@ -394,42 +404,33 @@ async def execute_single_api(session: AsyncSession, task, download_date: str) ->
             '例如：TUSHARE_TOKEN=your_tushare_token_here'
         )
 
-    pro = ts.pro_api(ts_token)
+    pro = TushareClient.get_client(ts_token)
 
     # 动态调用接口
     # 某些接口（如 pro_bar）是 ts 模块的函数，不是 pro 对象的方法
-    api_func = getattr(pro, config_api_code, None)
+    api_func = resolve_api_func(pro, config_api_code)
     if not api_func:
-        # 尝试从 ts 模块获取（如 pro_bar）
-        api_func = getattr(ts, config_api_code, None)
-        if not api_func:
-            raise ValueError(f'接口 {config_api_code} 不存在（在 pro 对象和 ts 模块中都未找到）')
+        raise ValueError(f'接口 {config_api_code} 不存在（在 pro 对象和 ts 模块中都未找到）')
 
-    # 调用接口获取数据
+    # 调用接口获取数据（优先读取响应缓存，未命中时在共享线程池中执行，避免阻塞事件循环）
     try:
-        df = api_func(**api_params)
+        df = await TushareResponseCache.fetch(
+            api_func, api_params, config_api_code, ttl=config_cache_ttl, rate_limit=config_rate_limit
+        )
     except Exception as api_error:
         error_detail = f'Tushare接口调用失败: {str(api_error)}\n参数: {api_params}'
         logger.exception(f'任务 {task_name} Tushare接口调用异常: {error_detail}')
         # 更新运行记录为 FAILED
-        await TushareDownloadRunDao.update_run_status(
-            session,
-            run_record.run_id,
-            status='FAILED',
-            error_message=error_detail,
-            set_end_time=True,
-        )
+        log_sink.update_run_status(run_id, status='FAILED', error_message=error_detail, set_end_time=True)
         # 更新任务统计
-        await TushareDownloadTaskDao.edit_task_dao(
-            session,
+        log_sink.update_task_stats(
             task_task_id,
             {
                 'run_count': task_run_count + 1,
-                'fail_count': (task.fail_count or 0) + 1,
+                'fail_count': task_fail_count + 1,
                 'last_run_time': datetime.now(),
             },
         )
-        await session.commit()
         return
 
     if df is None or df.empty:
@@ -468,27 +469,21 @@ async def execute_single_api(session: AsyncSession, task, download_date: str) ->
                 )
                 logger.info(f'已保存 {inserted_count} 条数据到数据库表 {table_name}')
             except Exception as db_error:
+                TushareSchemaRegistry.invalidate(table_name)
                 error_detail = f'保存数据到数据库失败: {str(db_error)}'
                 logger.exception(f'任务 {task_name} 保存数据到数据库异常: {error_detail}')
-                # 更新运行记录为 FAILED
-                await TushareDownloadRunDao.update_run_status(
-                    session,
-                    run_record.run_id,
-                    status='FAILED',
-                    error_message=error_detail,
-                    set_end_time=True,
-                )
+                # 回滚未完成的数据写入，更新运行记录为 FAILED
+                await session.rollback()
+                log_sink.update_run_status(run_id, status='FAILED', error_message=error_detail, set_end_time=True)
                 # 更新任务统计
-                await TushareDownloadTaskDao.edit_task_dao(
-                    session,
+                log_sink.update_task_stats(
                     task_task_id,
                     {
                         'run_count': task_run_count + 1,
-                        'fail_count': (task.fail_count or 0) + 1,
+                        'fail_count': task_fail_count + 1,
                         'last_run_time': datetime.now(),
                     },
                 )
-                await session.commit()
                 return
 
         # 保存到文件（如果配置了保存路径）
@@ -509,6 +504,11 @@ async def execute_single_api(session: AsyncSession, task, download_date: str) ->
                 elif save_format == 'json':
                     file_path = os.path.join(save_path, f'{file_name}.json')
                     df.to_json(file_path, orient='records', force_ascii=False, indent=2)
+                elif save_format == 'parquet':
+                    # 追加到按交易日分区的数据集目录，而非按时间戳生成单个文件
+                    parquet_writer = ParquetDatasetWriter(save_path, config_api_code)
+                    parquet_writer.append(df)
+                    file_path = parquet_writer.close()
                 else:
                     file_path = os.path.join(save_path, f'{file_name}.csv')
                     df.to_csv(file_path, index=False, encoding='utf-8-sig')
@@ -537,15 +537,17 @@ async def execute_single_api(session: AsyncSession, task, download_date: str) ->
         create_time=datetime.now(),
     )
 
-    await TushareDownloadLogDao.add_log_dao(session, log)
+    # 先提交数据，再记录成功状态，避免数据提交失败时运行记录已显示成功
+    await session.commit()
+    log_sink.add_log(log)
 
     # 更新运行记录为 SUCCESS
-    await TushareDownloadRunDao.update_run_status(
-        session,
-        run_record.run_id,
+    log_sink.update_run_status(
+        run_id,
         status='SUCCESS',
         total_records=record_count,
         success_records=record_count,
+        dedup_records=TushareDataDao.get_dedup_count(),
         set_end_time=True,
     )
 
@@ -555,9 +557,7 @@ async def execute_single_api(session: AsyncSession, task, download_date: str) ->
         'success_count': task_success_count + 1,
         'last_run_time': datetime.now()
     }
-    await TushareDownloadTaskDao.edit_task_dao(session, task_task_id, update_stats_dict)
-
-    await session.commit()
+    log_sink.update_task_stats(task_task_id, update_stats_dict)
     logger.info(f'任务 {task_name} 执行成功，记录数: {record_count}, 耗时: {duration}秒')
 
 
@@ -757,14 +757,31 @@ def sanitize_dict_values(data: Any) -> Any:
         return '<Unserializable Object>'
 
 
-def generate_param_combinations(param_config: dict, previous_results: dict, previous_step_name: str = None) -> list[dict]:
+def resolve_loop_values(values: list[Any]) -> list[Any]:
+    """
+    解析遍历变量取值中的日期表达式（每个不同的取值只解析一次），解析后再次去重
+
+    :param values: 已去重的取值列表
+    :return: 解析并去重后的取值列表
+    """
+    resolved = []
+    for value in values:
+        if isinstance(value, str):
+            date_result = evaluate_date_expression(value)
+            if date_result is not None:
+                value = date_result
+        resolved.append(value)
+    return unique_in_order(resolved)
+
+
+def generate_param_combinations(param_config: dict, previous_results: dict, previous_step_name: str = None) -> ParamCombinationSet:
     """
     生成所有参数组合（笛卡尔积）
     
     :param param_config: 参数配置字典（来自 parse_step_params）
     :param previous_results: 前一步的结果数据
     :param previous_step_name: 前一步的步骤名，用于解析 previous_step 占位符
-    :return: 参数组合列表，例如：[{'ts_code': '000001.SZ', 'trade_date': '20240101'}, ...]
+    :return: 参数组合集合（可迭代，按需生成），迭代结果例如：{'ts_code': '000001.SZ', 'trade_date': '20240101'}, ...
     """
     # 收集所有参数的值列表
     param_values = {}
@@ -794,22 +811,22 @@ def generate_param_combinations(param_config: dict, previous_results: dict, prev
                 # 从前一步的结果列表中提取所有记录的该字段值
                 if step_name in previous_results:
                     records = previous_results[step_name]
-                    if isinstance(records, list):
+                    if isinstance(records, StreamingStepResult):
+                        # 流式模式的步骤结果：直接使用按列保留的去重取值
+                        field_values = records.field_values(field)
+                        if field_values is None:
+                            logger.warning(f'参数 {param_name} (遍历变量, source: {source}): 前一步 {step_name} 为流式模式，未保留字段 {field}，保留字段: {list(records.columns.keys())}')
+                        else:
+                            values = resolve_loop_values(field_values)
+                    elif isinstance(records, list):
                         if len(records) == 0:
                             logger.warning(f'参数 {param_name} (遍历变量, source: {source}): 前一步 {step_name} 的结果列表为空')
                         else:
-                            found_count = 0
-                            for record in records:
-                                if isinstance(record, dict) and field in record:
-                                    value = record[field]
-                                    # 检查是否为日期表达式并计算
-                                    if isinstance(value, str):
-                                        date_result = evaluate_date_expression(value)
-                                        if date_result is not None:
-                                            value = date_result
-                                    if value not in values:  # 去重
-                                        values.append(value)
-                                    found_count += 1
+                            # 先按哈希去重，再对每个不同的取值解析日期表达式
+                            raw_values = [record[field] for record in records if isinstance(record, dict) and field in record]
+                            found_count = len(raw_values)
+                            values = resolve_loop_values(unique_in_order(raw_values))
+                            del raw_values
                             if found_count == 0:
                                 logger.warning(f'参数 {param_name} (遍历变量, source: {source}): 前一步 {step_name} 的 {len(records)} 条记录中都没有字段 {field}，可用字段: {list(records[0].keys()) if records and isinstance(records[0], dict) else "N/A"}')
                     else:
@@ -873,6 +890,9 @@ def generate_param_combinations(param_config: dict, previous_results: dict, prev
                     # 如果使用点号格式找不到，尝试从步骤结果列表中获取第一条记录
                     if step_name in previous_results:
                         records = previous_results[step_name]
+                        if isinstance(records, StreamingStepResult):
+                            # 流式模式的步骤结果只保留了第一条完整记录
+                            records = [records.first_record] if records.first_record else []
                         if isinstance(records, list) and len(records) > 0:
                             first_record = records[0]
                             if isinstance(first_record, dict) and field in first_record:
@@ -920,11 +940,10 @@ def generate_param_combinations(param_config: dict, previous_results: dict, prev
                 single_combo[param_name] = values[0]
         # 清理字典值，确保所有值都是基本类型，避免触发 ORM 延迟加载
         sanitized_combo = sanitize_dict_values(single_combo) if single_combo else {}
-        return [sanitized_combo] if sanitized_combo else []
+        return ParamCombinationSet(list(sanitized_combo.keys()), [[value] for value in sanitized_combo.values()])
     
     # 生成笛卡尔积
     param_names = list(param_values.keys())
-    value_lists = [param_values[name] for name in param_names]
     
     # 过滤掉空列表
     empty_params = []
@@ -938,16 +957,77 @@ def generate_param_combinations(param_config: dict, previous_results: dict, prev
     if empty_params:
         logger.warning(f'以下参数没有值，无法生成参数组合: {", ".join(empty_params)}')
         logger.debug(f'前一步结果可用键: {list(previous_results.keys())}')
-        return []
+        return ParamCombinationSet([], [])
     
-    combinations = []
-    for combo in product(*value_lists):
-        combination_dict = dict(zip(param_names, combo))
-        # 清理字典值，确保所有值都是基本类型，避免触发 ORM 延迟加载
-        sanitized_dict = sanitize_dict_values(combination_dict)
-        combinations.append(sanitized_dict)
-    
-    return combinations
+    # 每个取值只清理一次（确保都是基本类型，避免触发 ORM 延迟加载），组合在迭代时按需生成
+    value_lists = [[sanitize_dict_values(value) for value in param_values[name]] for name in param_names]
+    return ParamCombinationSet(param_names, value_lists)
+
+
+async def record_download_log(session: AsyncSession, log: TushareDownloadLog, log_sink: TushareLogSink | None) -> None:
+    """
+    记录一条下载日志：有缓冲写入器时交由其批量写入，否则直接加入当前会话
+
+    :param session: 数据库会话
+    :param log: 日志对象
+    :param log_sink: 下载日志缓冲写入器
+    :return: None
+    """
+    if log_sink is not None:
+        log_sink.add_log(log)
+    else:
+        await TushareDownloadLogDao.add_log_dao(session, log)
+
+
+def resolve_api_func(pro: Any, api_code: str) -> Any:
+    """
+    根据接口代码解析Tushare接口函数
+
+    :param pro: Tushare接口客户端
+    :param api_code: 接口代码
+    :return: 可调用的接口函数，不存在时返回None
+    """
+    # pro_bar 是 ts 模块的函数，不是 pro 对象的方法，通过 api 参数复用同一个客户端（无需 ts.set_token 写 token 文件）；
+    # 重试交给接口调用执行器（频率限制时按限流器暂停后重试），不使用 pro_bar 内部不限速的立即重试
+    if api_code == 'pro_bar':
+        return partial(ts.pro_bar, api=pro, retry_count=1)
+    # 其他接口从 pro 对象获取，获取不到时尝试从 ts 模块获取
+    api_func = getattr(pro, api_code, None) if api_code else None
+    if not api_func and api_code:
+        api_func = getattr(ts, api_code, None)
+    return api_func
+
+
+def resolve_step_table_name(step_data_table_name: str | None, task_data_table_name: str | None, api_code: str) -> str:
+    """
+    确定步骤数据的目标表名：优先使用步骤配置的表名，其次使用任务配置的表名，最后使用默认表名
+
+    :param step_data_table_name: 步骤配置的表名
+    :param task_data_table_name: 任务配置的表名
+    :param api_code: 接口代码
+    :return: 表名
+    """
+    for table_name in (step_data_table_name, task_data_table_name):
+        if table_name and table_name.strip():
+            return table_name
+    return f'tushare_{api_code}'
+
+
+def select_data_fields(df: pd.DataFrame, data_fields_str: str | None) -> pd.DataFrame:
+    """
+    按接口配置的数据字段筛选列
+
+    :param df: 接口返回数据
+    :param data_fields_str: 数据字段配置（JSON数组）
+    :return: 只包含指定字段的数据，未配置或字段均不存在时返回原数据
+    """
+    if data_fields_str:
+        data_fields = json.loads(data_fields_str)
+        if isinstance(data_fields, list):
+            available_fields = [field for field in data_fields if field in df.columns]
+            if available_fields:
+                df = df[available_fields]
+    return df
 
 
 async def execute_single_step(
@@ -968,17 +1048,23 @@ async def execute_single_step(
     step_unique_key_fields: str | None = None,
     step_name: str | None = None,  # 提前提取的步骤名称，避免 commit 后访问 ORM 对象
     step_order: int | None = None,  # 提前提取的步骤顺序，避免 commit 后访问 ORM 对象
+    step_id: int | None = None,  # 提前提取的步骤ID，记录在下载日志中用于按步骤统计
     config_api_code: str | None = None,  # 提前提取的接口代码，避免 commit 后访问 ORM 对象
     config_api_name: str | None = None,  # 提前提取的接口名称，避免 commit 后访问 ORM 对象
     config_config_id: int | None = None,  # 提前提取的配置ID，避免 commit 后访问 ORM 对象
     config_data_fields: str | None = None,  # 提前提取的数据字段，避免 commit 后访问 ORM 对象
     config_primary_key_fields: str | None = None,  # 提前提取的主键字段，避免 commit 后访问 ORM 对象
+    config_rate_limit: int | None = None,  # 提前提取的接口调用频率限制，避免 commit 后访问 ORM 对象
+    config_cache_ttl: int | None = None,  # 提前提取的接口响应缓存有效期，避免 commit 后访问 ORM 对象
     task_task_id: int | None = None,  # 提前提取的任务ID，避免 commit 后访问 ORM 对象
     task_save_to_db: str = '0',  # 提前提取的是否保存到数据库，避免 commit 后访问 ORM 对象
     task_data_table_name: str | None = None,  # 提前提取的任务数据表名，避免 commit 后访问 ORM 对象
     task_save_path: str | None = None,  # 提前提取的保存路径，避免 commit 后访问 ORM 对象
     task_save_format: str | None = None,  # 提前提取的保存格式，避免 commit 后访问 ORM 对象
     log_detail: bool = True,  # 是否记录明细级下载日志（遍历模式下可关闭，仅保留汇总）
+    prefetched: LoopFetchResult | None = None,  # 遍历模式下预取的接口调用结果（为空则在此处调用接口）
+    parquet_writer: ParquetDatasetWriter | None = None,  # 遍历模式下整个步骤共用的Parquet写入器（为空则单独写入并合并）
+    log_sink: TushareLogSink | None = None,  # 下载日志缓冲写入器（为空则直接写入当前会话）
 ) -> tuple[int, pd.DataFrame | None]:
     """
     执行单个步骤（单次API调用）
@@ -1000,11 +1086,16 @@ async def execute_single_step(
     :param step_unique_key_fields: 步骤唯一键字段（提前提取，避免延迟加载）
     :param step_name: 步骤名称（提前提取，避免延迟加载）
     :param step_order: 步骤顺序（提前提取，避免延迟加载）
+    :param step_id: 步骤ID（提前提取，避免延迟加载）
     :param config_api_code: 接口代码（提前提取，避免延迟加载）
     :param config_api_name: 接口名称（提前提取，避免延迟加载）
     :param config_config_id: 配置ID（提前提取，避免延迟加载）
     :param config_data_fields: 数据字段（提前提取，避免延迟加载）
     :param config_primary_key_fields: 主键字段（提前提取，避免延迟加载）
+    :param config_rate_limit: 接口调用频率限制（每分钟最多调用次数）
+    :param config_cache_ttl: 接口响应缓存有效期（秒，为空或0表示不缓存，-1表示永久缓存）
+    :param prefetched: 预取的接口调用结果（遍历模式并发执行时使用）
+    :param parquet_writer: 步骤共用的Parquet写入器（遍历模式且保存格式为parquet时使用）
     :return: (record_count, df) 记录数和DataFrame
     """
     # 使用传入的参数，避免访问已过期的 ORM 对象属性
@@ -1020,38 +1111,31 @@ async def execute_single_step(
     current_config_data_fields = config_data_fields if config_data_fields is not None else None
     current_config_primary_key_fields = config_primary_key_fields if config_primary_key_fields is not None else None
     
-    # 动态调用接口
-    # pro_bar 是 ts 模块的函数，需要特殊处理
-    if current_config_api_code == 'pro_bar':
-        # pro_bar 是 ts 模块的函数，不是 pro 对象的方法
-        # 需要先设置 token，然后直接调用 ts.pro_bar
-        ts_token = TushareConfig.tushare_token or os.getenv('TUSHARE_TOKEN', '')
-        if ts_token:
-            ts.set_token(ts_token)
-        api_func = ts.pro_bar
-    else:
-        # 其他接口从 pro 对象获取
-        api_func = getattr(pro, current_config_api_code, None)
+    # 动态调用接口（遍历模式下接口已由有序预取执行器提前调用，无需再次解析）
+    api_func = None
+    if prefetched is None:
+        api_func = resolve_api_func(pro, current_config_api_code)
         if not api_func:
-            # 尝试从 ts 模块获取
-            api_func = getattr(ts, current_config_api_code, None)
-            if not api_func:
-                logger.error(f'步骤 {current_step_name} 的接口 {current_config_api_code} 不存在（在 pro 对象和 ts 模块中都未找到）')
-                return (0, None)
+            logger.error(f'步骤 {current_step_name} 的接口 {current_config_api_code} 不存在（在 pro 对象和 ts 模块中都未找到）')
+            return (0, None)
 
     # 调用接口获取数据
     try:
-        # 记录接口调用信息（用于调试）
-        logger.debug(f'步骤 {current_step_name} 调用接口 {current_config_api_code}，函数类型: {type(api_func)}，参数: {api_params}')
-        
-        # 检查 api_func 是否是 functools.partial（某些接口可能返回 partial 对象）
-        import functools
-        if isinstance(api_func, functools.partial):
-            logger.debug(f'接口 {current_config_api_code} 返回的是 partial 对象: {api_func}')
-            # partial 对象可以直接调用，但需要确保参数正确
-            df = api_func(**api_params)
+        if prefetched is not None:
+            # 使用预取结果；调用失败时 unwrap 会重新抛出原始异常，统一走下面的错误处理
+            df = prefetched.unwrap()
         else:
-            df = api_func(**api_params)
+            # 记录接口调用信息（用于调试）
+            logger.debug(f'步骤 {current_step_name} 调用接口 {current_config_api_code}，函数类型: {type(api_func)}，参数: {api_params}')
+            
+            # 检查 api_func 是否是 functools.partial（某些接口可能返回 partial 对象）
+            import functools
+            if isinstance(api_func, functools.partial):
+                logger.debug(f'接口 {current_config_api_code} 返回的是 partial 对象: {api_func}')
+            # 优先读取响应缓存，未命中时在共享线程池中执行，避免阻塞事件循环（超时会抛出 TushareApiTimeoutError）
+            df = await TushareResponseCache.fetch(
+                api_func, api_params, current_config_api_code, ttl=config_cache_ttl, rate_limit=config_rate_limit
+            )
     except Exception as api_error:
         # 获取完整的错误信息（包括堆栈跟踪）
         full_error = ''.join(traceback.format_exception(type(api_error), api_error, api_error.__traceback__))
@@ -1071,6 +1155,7 @@ async def execute_single_step(
             log = TushareDownloadLog(
                 task_id=current_task_task_id,
                 task_name=f'{task_name}[{current_step_name}]' + (f'[组合{combination_index}]' if combination_index is not None else ''),
+                step_id=step_id,
                 config_id=current_config_config_id,
                 api_name=current_config_api_name,
                 download_date=download_date,
@@ -1081,7 +1166,7 @@ async def execute_single_step(
                 duration=step_duration,
                 create_time=datetime.now(),
             )
-            await TushareDownloadLogDao.add_log_dao(session, log)
+            await record_download_log(session, log, log_sink)
         return (0, None)
 
     if df is None or df.empty:
@@ -1093,12 +1178,7 @@ async def execute_single_step(
 
         # 如果指定了数据字段，只保留指定字段
         # 使用提前提取的 current_config_data_fields，避免在 commit 后访问 ORM 对象导致延迟加载
-        if current_config_data_fields:
-            data_fields = json.loads(current_config_data_fields)
-            if isinstance(data_fields, list):
-                available_fields = [field for field in data_fields if field in df.columns]
-                if available_fields:
-                    df = df[available_fields]
+        df = select_data_fields(df, current_config_data_fields)
 
         # 保存到数据库（如果启用）
         # 使用提前提取的 task_save_to_db，避免在 commit 后访问 ORM 对象导致延迟加载
@@ -1108,12 +1188,7 @@ async def execute_single_step(
             try:
                 # 优先使用传入的表名参数，其次使用任务配置的表名，最后使用默认表名
                 # 注意：不再从 step 或 task 对象获取，因为可能在 commit 后访问，使用传入的参数
-                table_name = step_data_table_name if step_data_table_name and step_data_table_name.strip() else None
-                if not table_name:
-                    table_name = task_data_table_name if task_data_table_name and task_data_table_name.strip() else None
-                # 如果传入的参数都为空，直接使用默认表名，不再尝试从 task 对象获取（避免异步上下文中的延迟加载问题）
-                if not table_name or table_name.strip() == '':
-                    table_name = f'tushare_{current_config_api_code}'
+                table_name = resolve_step_table_name(step_data_table_name, task_data_table_name, current_config_api_code)
                 
                 await ensure_table_exists(session, table_name, current_config_api_code, df, config, current_config_primary_key_fields)
                 
@@ -1183,6 +1258,8 @@ async def execute_single_step(
                         f' 已保存 {inserted_count} 条数据到数据库表 {table_name}，更新模式: {update_mode}'
                     )
             except Exception as db_error:
+                # 写入失败时表结构可能已被外部修改，使缓存失效，下次重新加载
+                TushareSchemaRegistry.invalidate(table_name)
                 # 获取完整的错误信息（包括堆栈跟踪）
                 full_error = ''.join(traceback.format_exception(type(db_error), db_error, db_error.__traceback__))
                 error_detail = f'步骤 {current_step_name} 保存数据到数据库失败: {full_error}'
@@ -1213,6 +1290,7 @@ async def execute_single_step(
                     log = TushareDownloadLog(
                         task_id=current_task_task_id,
                         task_name=f'{task_name}[{current_step_name}]' + (f'[组合{combination_index}]' if combination_index is not None else ''),
+                        step_id=step_id,
                         config_id=current_config_config_id,
                         api_name=current_config_api_name,
                         download_date=download_date,
@@ -1226,14 +1304,9 @@ async def execute_single_step(
                 
                 # 在循环模式下，不应该回滚主事务，应该抛出异常让调用者处理保存点回滚
                 if not immediate_commit:
-                    # 尝试记录错误日志（使用新会话，避免影响主事务）
-                    if log_detail:
-                        try:
-                            async with AsyncSessionLocal() as new_session:
-                                await TushareDownloadLogDao.add_log_dao(new_session, log)
-                                await new_session.commit()
-                        except Exception as new_session_error:
-                            logger.error(f'使用新会话记录错误日志失败: {str(new_session_error)}')
+                    # 错误日志经写入器单独提交，不受保存点回滚影响
+                    if log_detail and log_sink is not None:
+                        log_sink.add_log(log)
                     # 抛出异常，让调用者处理保存点回滚
                     raise
                 else:
@@ -1241,18 +1314,10 @@ async def execute_single_step(
                     try:
                         await session.rollback()
                         if log_detail:
-                            await TushareDownloadLogDao.add_log_dao(session, log)
+                            await record_download_log(session, log, log_sink)
                             await session.commit()
                     except Exception as log_error:
                         logger.error(f'记录错误日志失败: {str(log_error)}')
-                        # 如果回滚后仍然失败，尝试创建新会话记录日志
-                        if log_detail:
-                            try:
-                                async with AsyncSessionLocal() as new_session:
-                                    await TushareDownloadLogDao.add_log_dao(new_session, log)
-                                    await new_session.commit()
-                            except Exception as new_session_error:
-                                logger.error(f'使用新会话记录错误日志也失败: {str(new_session_error)}')
                     return (record_count, df)
 
         # 保存到文件（如果配置了保存路径）
@@ -1277,6 +1342,15 @@ async def execute_single_step(
                 elif save_format == 'json':
                     file_path = os.path.join(save_path, f'{file_name}.json')
                     df.to_json(file_path, orient='records', force_ascii=False, indent=2)
+                elif save_format == 'parquet':
+                    # 遍历模式下各组合追加到步骤共用的写入器，由步骤结束时统一写出并合并小文件
+                    if parquet_writer is not None:
+                        parquet_writer.append(df)
+                        file_path = parquet_writer.dataset_dir
+                    else:
+                        single_writer = ParquetDatasetWriter(save_path, current_config_api_code)
+                        single_writer.append(df)
+                        file_path = single_writer.close()
                 else:
                     file_path = os.path.join(save_path, f'{file_name}.csv')
                     df.to_csv(file_path, index=False, encoding='utf-8-sig')
@@ -1305,6 +1379,7 @@ async def execute_single_step(
         log = TushareDownloadLog(
             task_id=current_task_task_id,
             task_name=f'{task_name}[{current_step_name}]' + (f'[组合{combination_index}]' if combination_index is not None else ''),
+            step_id=step_id,
             config_id=current_config_config_id,
             api_name=current_config_api_name,
             download_date=download_date,
@@ -1314,19 +1389,31 @@ async def execute_single_step(
             duration=step_duration,
             create_time=datetime.now(),
         )
-        await TushareDownloadLogDao.add_log_dao(session, log)
+        await record_download_log(session, log, log_sink)
 
     return (record_count, df)
 
 
-async def execute_workflow(session: AsyncSession, task, download_date: str, task_params_str: str = None) -> None:
+async def execute_workflow(
+    session: AsyncSession,
+    task,
+    download_date: str,
+    task_params_str: str = None,
+    resume_run_id: int | None = None,
+    *,
+    log_sink: TushareLogSink,
+) -> None:
     """
     执行流程配置，串联多个接口
 
+    步骤之间有连线时按依赖图执行，没有依赖关系的分支并行执行；否则按步骤顺序串行执行。
+
     :param session: 数据库会话
     :param task: 任务对象
     :param download_date: 下载日期
     :param task_params_str: 任务参数字符串（JSON格式），避免延迟加载问题
+    :param resume_run_id: 续跑的运行ID（为空表示新建运行），遍历模式下跳过该运行中已提交的参数组合
+    :param log_sink: 下载日志与运行状态的缓冲写入器
     :return: None
     """
     start_time = datetime.now()
@@ -1363,16 +1450,16 @@ async def execute_workflow(session: AsyncSession, task, download_date: str, task
         logger.warning(f'流程配置 {workflow.workflow_name} 已停用')
         return
 
-    # 创建运行记录（PENDING -> RUNNING）
-    # 注意：这里立即缓存 run_id，后续不再访问 ORM 对象属性，避免在 commit 之后触发延迟加载
-    run_record = await TushareDownloadRunDao.create_run_record(session, task, initial_status='PENDING')
-    run_id = run_record.run_id
-    await TushareDownloadRunDao.update_run_status(
-        session,
-        run_id,
-        status='RUNNING',
-        set_start_time=True,
-    )
+    if resume_run_id:
+        # 续跑：沿用原运行记录，检查点按运行ID记录
+        run_id = resume_run_id
+        log_sink.update_run_status(run_id, status='RUNNING')
+        logger.info(f'流程任务 {task_name} 续跑运行 {run_id}，将跳过已提交的遍历组合')
+    else:
+        # 创建运行记录（PENDING -> RUNNING）
+        # 运行记录由写入器立即提交，之后的状态更新、汇总日志和任务统计经写入器批量写入，不占用数据事务
+        run_id = await log_sink.create_run_record(task, initial_status='PENDING')
+        log_sink.update_run_status(run_id, status='RUNNING', set_start_time=True)
 
     # 获取流程步骤（按顺序）
     steps = await TushareWorkflowStepDao.get_steps_by_workflow_id(session, task_workflow_id)
@@ -1387,12 +1474,11 @@ async def execute_workflow(session: AsyncSession, task, download_date: str, task
             'TUSHARE_TOKEN未设置，请在.env.dev文件中配置TUSHARE_TOKEN环境变量。'
             '例如：TUSHARE_TOKEN=your_tushare_token_here'
         )
-    pro = ts.pro_api(ts_token)
+    pro = TushareClient.get_client(ts_token)
 
     # 用于存储前一步的结果数据，供后续步骤使用
     previous_results: dict[str, Any] = {}
     total_record_count = 0
-    previous_step_name: str = None  # 记录前一步的步骤名，用于支持 previous_step 占位符
 
     # 提前提取所有步骤的属性并缓存，避免在 commit 后访问 ORM 对象导致延迟加载问题
     # 这是关键优化：一次性加载所有属性，后续不再访问 step 对象
@@ -1425,13 +1511,37 @@ async def execute_workflow(session: AsyncSession, task, download_date: str, task
             'update_mode': step_dict.get('update_mode', '0') or '0',
             'unique_key_fields': step_dict.get('unique_key_fields'),
             'loop_mode': step_dict.get('loop_mode', '0') or '0',
+            'loop_concurrency': step_dict.get('loop_concurrency'),
+            'stream_mode': step_dict.get('stream_mode', '0') or '0',
+            'incremental_mode': step_dict.get('incremental_mode', '0') or '0',
+            'commit_every': step_dict.get('commit_every'),
+            'commit_unit': step_dict.get('commit_unit', '0') or '0',
+            'source_step_ids': step_dict.get('source_step_ids'),
+            'target_step_ids': step_dict.get('target_step_ids'),
         }
         step_cache.append(cached_step)
     
-    # 按顺序执行每个步骤（使用缓存的属性，不再访问 step 对象）
-    for cached_step in step_cache:
+    async def run_workflow_step(
+        step_position: int,
+        cached_step: dict[str, Any],
+        session: AsyncSession,
+        previous_step_name: str | None,
+        later_steps: list[dict[str, Any]],
+    ) -> None:
+        """
+        执行单个步骤（使用缓存的属性，不再访问 step 对象）
+
+        :param step_position: 步骤在执行顺序中的位置
+        :param cached_step: 步骤的缓存属性
+        :param session: 数据库会话（串行执行时为主会话，按依赖图并行执行时为步骤独立的会话）
+        :param previous_step_name: previous_step 占位符指向的步骤名
+        :param later_steps: 本步骤完成后才会执行的步骤（串行执行时为排在后面的步骤，按依赖图执行时为下游步骤）
+        :return: None
+        """
+        nonlocal workflow_failed, last_error_message, total_record_count
         # 从缓存中获取所有属性，避免访问 ORM 对象
         step = cached_step['step']  # 保留用于向后兼容，但不应再访问其属性
+        step_id = cached_step['step_id']
         step_status = cached_step['status']
         step_name = cached_step['step_name']
         step_node_type = cached_step['node_type']
@@ -1443,16 +1553,21 @@ async def execute_workflow(session: AsyncSession, task, download_date: str, task
         step_update_mode = cached_step['update_mode']
         step_unique_key_fields = cached_step['unique_key_fields']
         step_loop_mode = cached_step['loop_mode']
+        step_loop_concurrency = normalize_loop_concurrency(cached_step['loop_concurrency'])
+        step_stream_mode = cached_step['stream_mode']
+        step_incremental_mode = cached_step['incremental_mode']
+        step_commit_every = cached_step['commit_every']
+        step_commit_unit = cached_step['commit_unit']
         
         # 使用提取的值进行判断
         if step_status != '0':
             logger.warning(f'步骤 {step_name} 已停用，跳过')
-            continue
+            return
 
         # 跳过开始和结束节点（这些节点不需要接口配置）
         if step_node_type in ['start', 'end']:
             logger.info(f'步骤 {step_name} 是{step_node_type}节点，跳过执行')
-            continue
+            return
 
         step_start_time = datetime.now()
         logger.info(f'开始执行步骤: {step_name} (顺序: {step_order})')
@@ -1461,7 +1576,7 @@ async def execute_workflow(session: AsyncSession, task, download_date: str, task
         config = await TushareApiConfigDao.get_config_detail_by_id(session, step_config_id)
         if config is None:
             logger.error(f'步骤 {step_name} 的接口配置ID {step_config_id} 不存在')
-            continue
+            return
 
         # 立即提取 config 的所有属性，避免在 commit 后访问 ORM 对象导致延迟加载
         config_dict = config.__dict__.copy()
@@ -1473,10 +1588,12 @@ async def execute_workflow(session: AsyncSession, task, download_date: str, task
         config_config_id = config_dict.get('config_id')
         config_data_fields = config_dict.get('data_fields')
         config_primary_key_fields = config_dict.get('primary_key_fields')
+        config_rate_limit = config_dict.get('rate_limit')
+        config_cache_ttl = config_dict.get('cache_ttl')
 
         if config_status != '0':
             logger.warning(f'步骤 {step_name} 的接口配置 {config_api_name} 已停用')
-            continue
+            return
 
         # 解析步骤参数（可以从前一步获取数据）
         base_api_params = {}
@@ -1515,7 +1632,7 @@ async def execute_workflow(session: AsyncSession, task, download_date: str, task
             
             if not param_combinations:
                 logger.warning(f'步骤 {step_name} 没有有效的参数组合，跳过')
-                continue
+                return
             
             total_combinations = len(param_combinations)
             
@@ -1527,7 +1644,7 @@ async def execute_workflow(session: AsyncSession, task, download_date: str, task
                     loop_params_summary[param_name] = {
                         'type': 'loop',
                         'source': source,
-                        'value_count': len([c for c in param_combinations if param_name in c])
+                        'value_count': len(param_combinations.values_of(param_name))
                     }
             
             logger.info(
@@ -1537,6 +1654,15 @@ async def execute_workflow(session: AsyncSession, task, download_date: str, task
             
             # 用于合并所有组合的结果（仅用于后续步骤使用，不用于保存）
             all_dfs = []
+            # 流式模式：各组合数据写库后不再保留，只按列保留后续步骤引用的字段取值
+            stream_result: StreamingStepResult | None = None
+            if step_stream_mode == '1':
+                stream_fields = find_referenced_fields(step_name, later_steps)
+                if stream_fields is None:
+                    logger.warning(f'步骤 {step_name} 的完整结果被后续步骤引用，无法使用流式模式，将保留全部结果')
+                else:
+                    stream_result = StreamingStepResult(stream_fields)
+                    logger.info(f'步骤 {step_name} 使用流式模式，仅保留后续步骤引用的字段: {sorted(stream_fields)}')
             step_total_records = 0
             # 遍历执行统计
             loop_success_count = 0
@@ -1544,59 +1670,234 @@ async def execute_workflow(session: AsyncSession, task, download_date: str, task
             loop_skip_count = 0
             loop_execution_details = []  # 记录每个组合的执行详情
             
-            # 对每个参数组合执行步骤
-            for combo_index, combo_params in enumerate(param_combinations, 1):
-                # 清理 combo_params，确保所有值都是基本类型，避免触发 ORM 延迟加载
-                sanitized_combo_params = sanitize_dict_values(combo_params)
-                
-                # 合并基础参数和组合参数
-                api_params = base_api_params.copy()
-                api_params.update(sanitized_combo_params)
-                
-                # 任务参数覆盖步骤参数
-                if task_params_str:
+            # 解析任务参数（任务参数覆盖步骤参数）
+            task_params: dict = {}
+            if task_params_str:
+                try:
+                    parsed_task_params = json.loads(task_params_str)
+                    if isinstance(parsed_task_params, dict):
+                        task_params = parsed_task_params
+                except (json.JSONDecodeError, TypeError) as e:
+                    logger.warning(f'步骤 {step_name} 任务参数解析失败: {e}，将跳过任务参数')
+
+            # 续跑：上次运行中已提交的组合不再写库；结果未被后续步骤引用时连接口也不再调用
+            completed_combo_keys: set[str] = set()
+            if resume_run_id and step_id is not None:
+                completed_combo_keys = await TushareDownloadCheckpointDao.get_completed_combo_keys(
+                    session, run_id, step_id
+                )
+            skip_completed_fetch = find_referenced_fields(step_name, later_steps) == set()
+            # 检查点键使用未解析的参数表达式（如 today-1000），遍历参数使用各组合的取值，任务参数覆盖的参数除外
+            combo_key_expressions = {
+                param_name: param_value
+                for param_name, param_value in step_params.items()
+                if param_config.get(param_name, {}).get('type') != 'loop' and param_name not in task_params
+            }
+            loop_resumed_count = 0
+            if completed_combo_keys:
+                logger.info(f'步骤 {step_name} 上次运行已提交 {len(completed_combo_keys)} 个组合，本次跳过写库')
+
+            # 增量模式：按目标表已有数据的最大交易日改写各组合的开始日期，已覆盖的组合不再调用接口
+            incremental_planner: IncrementalPlanner | None = None
+            loop_incremental_skip_count = 0
+            if step_incremental_mode == '1':
+                if task_save_to_db != '1':
+                    logger.warning(f'步骤 {step_name} 开启了增量模式，但任务未保存到数据库，将全量下载')
+                else:
+                    incremental_table_name = resolve_step_table_name(
+                        step_data_table_name, task_data_table_name, config_api_code
+                    )
+                    incremental_planner = await IncrementalPlanner.load(
+                        session, incremental_table_name, list(loop_params_summary)
+                    )
+                    if incremental_planner is None:
+                        logger.info(f'步骤 {step_name} 的目标表 {incremental_table_name} 不存在或没有交易日字段，将全量下载')
+                    else:
+                        logger.info(
+                            f'步骤 {step_name} 增量模式：按 {incremental_planner.key_fields or "整表"} '
+                            f'查询到 {len(incremental_planner.date_ranges)} 组已有数据'
+                        )
+                        if not skip_completed_fetch:
+                            logger.warning(f'步骤 {step_name} 的结果被后续步骤引用，增量模式下后续步骤只能取到本次新下载的数据')
+
+            def iter_executable_combos():
+                """
+                按顺序生成需要执行的参数组合，不满足执行条件的组合直接记为跳过
+                """
+                nonlocal loop_skip_count, loop_resumed_count, loop_incremental_skip_count
+                for combo_index, combo_params in enumerate(param_combinations, 1):
+                    # 清理 combo_params，确保所有值都是基本类型，避免触发 ORM 延迟加载
+                    sanitized_combo_params = sanitize_dict_values(combo_params)
+
+                    # 合并基础参数和组合参数
+                    api_params = base_api_params.copy()
+                    api_params.update(sanitized_combo_params)
+                    api_params.update(task_params)
+                    combo_key = make_combo_key(api_params, combo_key_expressions)
+                    if combo_key in completed_combo_keys and skip_completed_fetch:
+                        loop_resumed_count += 1
+                        continue
+                    # 实际请求的参数：增量模式下为已有数据之前、之后的缺失区间
+                    request_params_list = [api_params]
+                    if incremental_planner is not None:
+                        request_params_list = incremental_planner.plan(api_params)
+                        if not request_params_list:
+                            loop_incremental_skip_count += 1
+                            continue
+                        if len(request_params_list) == 1:
+                            api_params = request_params_list[0]
+
+                    # 注意：不再自动添加日期参数，所有参数必须从配置中获取
+                    # 如果需要在参数中使用日期，请在接口配置或步骤参数中明确指定
+
+                    # 检查执行条件（可选）- 使用提前提取的值，在调用接口之前判断，跳过的组合不占用并发
+                    if step_condition_expr:
+                        try:
+                            condition = json.loads(step_condition_expr)
+                            should_execute = True
+                            if 'field' in condition and 'value' in condition:
+                                field = condition['field']
+                                expected_value = condition['value']
+                                if field in previous_results:
+                                    actual_value = previous_results[field]
+                                    if condition.get('operator') == 'eq':
+                                        should_execute = actual_value == expected_value
+                                    elif condition.get('operator') == 'ne':
+                                        should_execute = actual_value != expected_value
+                            if not should_execute:
+                                # 降低日志级别，避免遍历模式下产生过多 INFO 日志
+                                logger.debug(f'步骤 {step_name} 组合{combo_index} 不满足执行条件，跳过')
+                                loop_skip_count += 1
+                                # 使用清理后的参数，避免触发 ORM 延迟加载
+                                loop_execution_details.append({
+                                    'combo_index': combo_index,
+                                    'params': sanitized_combo_params,
+                                    'status': 'skipped',
+                                    'reason': '不满足执行条件'
+                                })
+                                continue
+                        except (json.JSONDecodeError, Exception) as e:
+                            logger.warning(f'步骤 {step_name} 组合{combo_index} 条件表达式解析失败: {e}，将执行')
+
+                    yield combo_index, sanitized_combo_params, api_params, combo_key, request_params_list
+
+            # 接口函数只解析一次，按组合优先读取响应缓存，未命中时在线程中调用
+            loop_api_func = resolve_api_func(pro, config_api_code)
+            loop_cache_stats = ResponseCacheStats()
+
+            async def fetch_combo(combo: tuple[int, dict, dict, str, list[dict]]) -> pd.DataFrame | None:
+                if not loop_api_func:
+                    raise AttributeError(f'接口 {config_api_code} 不存在（在 pro 对象和 ts 模块中都未找到）')
+                dfs = [
+                    await TushareResponseCache.fetch(
+                        loop_api_func,
+                        request_params,
+                        config_api_code,
+                        ttl=config_cache_ttl,
+                        rate_limit=config_rate_limit,
+                        stats=loop_cache_stats,
+                    )
+                    for request_params in combo[4]
+                ]
+                if len(dfs) == 1:
+                    return dfs[0]
+                # 增量模式下一个组合拆分为多个缺失区间请求，合并各区间的结果
+                frames = [df for df in dfs if df is not None and not df.empty]
+                return pd.concat(frames, ignore_index=True) if frames else dfs[0]
+
+            if step_loop_concurrency > 1:
+                logger.info(f'步骤 {step_name} 遍历并发数: {step_loop_concurrency}')
+
+            # Parquet保存格式：整个步骤共用一个写入器，各组合数据缓冲后按交易日分区批量写出
+            loop_parquet_writer: ParquetDatasetWriter | None = None
+            if task_save_path and task_save_format == 'parquet':
+                try:
+                    loop_parquet_writer = ParquetDatasetWriter(task_save_path, config_api_code)
+                except Exception as writer_error:
+                    logger.error(f'步骤 {step_name} 创建Parquet写入器失败: {writer_error}')
+
+            # 按步骤配置的批次大小分批提交主事务，使已写入的数据和检查点及时持久化，进程中断或失败后可从此处续跑
+            commit_batch = LoopCommitBatch(step_commit_every, step_commit_unit)
+
+            def append_step_result(df: pd.DataFrame) -> None:
+                if stream_result is not None:
+                    stream_result.append(df)
+                else:
+                    all_dfs.append(df)
+
+            def discard_commit_batch() -> None:
+                """
+                主事务回滚后，本批已写入保存点的组合随之丢失，改记为失败（检查点同时回滚，续跑时重新执行），
+                其结果数据不并入步骤结果
+                """
+                nonlocal loop_success_count, loop_fail_count, step_total_records
+                loop_success_count -= commit_batch.combo_count
+                loop_fail_count += commit_batch.combo_count
+                step_total_records -= commit_batch.record_count
+                for detail in commit_batch.details:
+                    detail.update(status='failed', record_count=0, reason='批次提交失败，已回滚')
+                commit_batch.reset()
+
+            async def commit_loop_batch() -> None:
+                """
+                提交当前批次；提交失败时回滚本批次，本批组合记为失败，续跑时重新执行
+                """
+                nonlocal workflow_failed, last_error_message
+                # 先写出已缓冲的文件数据，保证已提交检查点的组合在文件中也已落盘
+                if loop_parquet_writer is not None:
                     try:
-                        task_params = json.loads(task_params_str)
-                        if isinstance(task_params, dict):
-                            api_params.update(task_params)
-                    except (json.JSONDecodeError, TypeError) as e:
-                        logger.warning(f'步骤 {step_name} 组合{combo_index} 任务参数解析失败: {e}，将跳过任务参数')
-                
-                # 注意：不再自动添加日期参数，所有参数必须从配置中获取
-                # 如果需要在参数中使用日期，请在接口配置或步骤参数中明确指定
-                
-                # 检查执行条件（可选）- 使用提前提取的值
-                if step_condition_expr:
+                        loop_parquet_writer.flush()
+                    except Exception as file_error:
+                        logger.exception(f'步骤 {step_name} 写出Parquet数据失败: {file_error}')
+                try:
+                    await session.commit()
+                    logger.debug(
+                        f'步骤 {step_name} 已提交一批数据: {commit_batch.combo_count} 个组合，{commit_batch.record_count} 条记录'
+                    )
+                    for batch_df in commit_batch.frames:
+                        append_step_result(batch_df)
+                except Exception as commit_error:
+                    logger.error(
+                        f'步骤 {step_name} 提交批次失败: {commit_error}，'
+                        f'本批 {commit_batch.combo_count} 个组合已回滚，将在续跑时重新执行'
+                    )
                     try:
-                        condition = json.loads(step_condition_expr)
-                        should_execute = True
-                        if 'field' in condition and 'value' in condition:
-                            field = condition['field']
-                            expected_value = condition['value']
-                            if field in previous_results:
-                                actual_value = previous_results[field]
-                                if condition.get('operator') == 'eq':
-                                    should_execute = actual_value == expected_value
-                                elif condition.get('operator') == 'ne':
-                                    should_execute = actual_value != expected_value
-                        if not should_execute:
-                            # 降低日志级别，避免遍历模式下产生过多 INFO 日志
-                            logger.debug(f'步骤 {step_name} 组合{combo_index} 不满足执行条件，跳过')
-                            loop_skip_count += 1
-                            # 使用清理后的参数，避免触发 ORM 延迟加载
-                            loop_execution_details.append({
-                                'combo_index': combo_index,
-                                'params': sanitized_combo_params,
-                                'status': 'skipped',
-                                'reason': '不满足执行条件'
-                            })
-                            continue
-                    except (json.JSONDecodeError, Exception) as e:
-                        logger.warning(f'步骤 {step_name} 组合{combo_index} 条件表达式解析失败: {e}，将执行')
-                
-                # 执行单次步骤（循环模式下，使用保存点隔离每个组合，先保存数据，最后统一commit）
-                # 使用保存点可以确保某个组合失败时只回滚该组合，不影响其他组合
-                combo_start_time = datetime.now()
+                        await session.rollback()
+                        TushareSchemaRegistry.invalidate()
+                    except Exception as rollback_error:
+                        logger.warning(f'步骤 {step_name} 提交批次失败后回滚事务也失败: {rollback_error}')
+                    discard_commit_batch()
+                    workflow_failed = True
+                    last_error_message = str(commit_error)
+                commit_batch.reset()
+                # 提交和回滚都会使 ORM 对象过期，重新加载接口配置，避免后续组合访问时在异步上下文中触发延迟加载
+                try:
+                    await session.refresh(config)
+                except Exception as refresh_error:
+                    logger.warning(f'步骤 {step_name} 重新加载接口配置失败: {refresh_error}')
+
+            # 对每个参数组合执行步骤：接口调用由有序预取执行器并发进行，写库按组合顺序串行执行
+            async for (combo_index, sanitized_combo_params, api_params, combo_key, _), fetch_result in iter_prefetched(
+                iter_executable_combos(), fetch_combo, step_loop_concurrency
+            ):
+                if combo_key in completed_combo_keys:
+                    # 上次运行已提交该组合的数据，只取回结果供后续步骤引用，不再重复写库
+                    loop_resumed_count += 1
+                    try:
+                        df = fetch_result.unwrap()
+                    except Exception as fetch_error:
+                        logger.error(f'步骤 {step_name} 组合{combo_index} 续跑时取回数据失败: {fetch_error}')
+                        workflow_failed = True
+                        last_error_message = str(fetch_error)
+                        df = None
+                    if df is not None and not df.empty:
+                        append_step_result(select_data_fields(df, config_data_fields))
+                    continue
+
+                # 执行单次步骤（循环模式下，使用保存点隔离每个组合，先保存数据，按批次commit）
+                # 使用保存点可以确保某个组合失败时只回滚该组合，不影响同一批次的其他组合
+                combo_start_time = fetch_result.started_at
+                combo_in_batch = False
                 # 创建保存点，隔离每个组合的事务
                 savepoint = await session.begin_nested()
                 try:
@@ -1605,12 +1906,13 @@ async def execute_workflow(session: AsyncSession, task, download_date: str, task
                     record_count, df = await execute_single_step(
                         session, step, config, api_params, task, task_name,
                         download_date, pro, previous_results, combo_start_time, combo_index,
-                        immediate_commit=False,  # 循环模式下不立即提交，统一在循环结束后提交
+                        immediate_commit=False,  # 循环模式下不立即提交，按批次统一提交
                         step_data_table_name=step_data_table_name,
                         step_update_mode=step_update_mode,
                         step_unique_key_fields=step_unique_key_fields,
                         step_name=step_name,  # 传递提前提取的步骤名称
                         step_order=step_order,  # 传递提前提取的步骤顺序
+                        step_id=step_id,
                         config_api_code=config_api_code,  # 传递提前提取的接口代码
                         config_api_name=config_api_name,  # 传递提前提取的接口名称
                         config_config_id=config_config_id,  # 传递提前提取的配置ID
@@ -1622,12 +1924,21 @@ async def execute_workflow(session: AsyncSession, task, download_date: str, task
                         task_save_path=task_save_path,  # 传递提前提取的保存路径
                         task_save_format=task_save_format,  # 传递提前提取的保存格式
                         log_detail=False,  # 关闭组合级明细日志
+                        prefetched=fetch_result,  # 预取的接口调用结果
+                        parquet_writer=loop_parquet_writer,  # 步骤共用的Parquet写入器
+                        log_sink=log_sink,
                     )
+                    # 检查点与该组合的数据在同一保存点内写入，二者同时生效（接口调用失败的组合不记录）
+                    if step_id is not None and df is not None:
+                        await TushareDownloadCheckpointDao.add_checkpoint_dao(
+                            session, run_id, step_id, combo_key, combo_index, record_count
+                        )
                     
                     # 提交保存点（但不提交主事务）
                     await savepoint.commit()
-                    # 循环模式下不立即提交，统一在循环结束后提交，避免频繁 commit 导致的异步上下文问题
-                    logger.debug(f'步骤 {step_name} 组合{combo_index} 数据已保存（待统一提交），记录数: {record_count}')
+                    commit_batch.add(record_count)
+                    combo_in_batch = True
+                    logger.debug(f'步骤 {step_name} 组合{combo_index} 数据已保存（待批次提交），记录数: {record_count}')
                 except Exception as step_error:
                     # 回滚保存点，不影响其他组合
                     try:
@@ -1638,7 +1949,13 @@ async def execute_workflow(session: AsyncSession, task, download_date: str, task
                         # 如果保存点回滚失败，回滚整个事务
                         try:
                             await session.rollback()
-                            logger.warning(f'步骤 {step_name} 组合{combo_index} 保存点回滚失败，已回滚整个事务，之前成功的组合数据可能丢失')
+                            # 事务回滚会撤销其中执行的建表/建索引，表结构缓存随之失效
+                            TushareSchemaRegistry.invalidate()
+                            logger.warning(
+                                f'步骤 {step_name} 组合{combo_index} 保存点回滚失败，已回滚整个事务，'
+                                f'本批次之前成功的 {commit_batch.combo_count} 个组合将在续跑时重新执行'
+                            )
+                            discard_commit_batch()
                         except Exception as full_rollback_error:
                             logger.error(f'步骤 {step_name} 组合{combo_index} 回滚整个事务也失败: {full_rollback_error}')
                     
@@ -1652,7 +1969,8 @@ async def execute_workflow(session: AsyncSession, task, download_date: str, task
                 # 记录执行结果
                 combo_status = 'success' if df is not None and not df.empty else 'empty'
                 if df is not None and not df.empty:
-                    all_dfs.append(df)
+                    # 本批提交成功后才并入步骤结果，批次回滚时丢弃
+                    commit_batch.frames.append(df)
                     step_total_records += record_count
                     loop_success_count += 1
                 else:
@@ -1665,34 +1983,65 @@ async def execute_workflow(session: AsyncSession, task, download_date: str, task
                 # 记录组合执行详情
                 combo_duration = int((datetime.now() - combo_start_time).total_seconds())
                 # 使用清理后的参数，避免触发 ORM 延迟加载
-                loop_execution_details.append({
+                combo_detail = {
                     'combo_index': combo_index,
                     'params': sanitized_combo_params,
                     'status': combo_status,
                     'record_count': record_count,
                     'duration': combo_duration
-                })
-            
+                }
+                loop_execution_details.append(combo_detail)
+                if combo_in_batch:
+                    commit_batch.details.append(combo_detail)
+
+                if commit_batch.is_full:
+                    await commit_loop_batch()
+
+            # 提交最后一个不完整的批次
+            if commit_batch.combo_count > 0:
+                await commit_loop_batch()
+
+            if loop_parquet_writer is not None:
+                try:
+                    parquet_dataset_dir = loop_parquet_writer.close()
+                    logger.info(
+                        f'步骤 {step_name} 数据已保存到Parquet数据集: {parquet_dataset_dir}，'
+                        f'写入 {loop_parquet_writer.written_rows} 行'
+                    )
+                except Exception as file_error:
+                    logger.exception(f'步骤 {step_name} 写出Parquet数据集失败: {file_error}')
+
+            if loop_fail_count > 0:
+                # 有组合失败时运行记为失败并保留检查点，可续跑补齐失败的组合
+                workflow_failed = True
+                last_error_message = f'步骤 {step_name} 有 {loop_fail_count} 个参数组合执行失败'
+
             # 计算步骤总耗时
             step_duration = int((datetime.now() - step_start_time).total_seconds())
             
             # 合并所有组合的结果
-            if all_dfs:
-                combined_df = pd.concat(all_dfs, ignore_index=True)
-                # 去重（如果需要）
-                combined_df = combined_df.drop_duplicates()
-                
-                # 保存前一步的结果（供后续步骤使用）
-                previous_results[step_name] = combined_df.to_dict('records')
-                if len(previous_results[step_name]) > 0:
+            if all_dfs or (stream_result is not None and stream_result.row_count > 0):
+                if stream_result is not None:
+                    # 流式模式：直接使用列式结果，不再合并全部数据（汇总记录数为未去重的写入行数）
+                    previous_results[step_name] = stream_result
+                    first_record = stream_result.first_record
+                    step_result_count = stream_result.row_count
+                else:
+                    combined_df = pd.concat(all_dfs, ignore_index=True)
+                    # 去重（如果需要）
+                    combined_df = combined_df.drop_duplicates()
+                    
+                    # 保存前一步的结果（供后续步骤使用）
+                    previous_results[step_name] = combined_df.to_dict('records')
+                    first_record = previous_results[step_name][0] if previous_results[step_name] else None
+                    step_result_count = len(combined_df)
+                    del combined_df
+                all_dfs.clear()
+                if first_record:
                     # 保存第一条记录的主要字段，方便条件判断
-                    first_record = previous_results[step_name][0]
                     for key, value in first_record.items():
                         previous_results[f'{step_name}.{key}'] = value
                 
-                # 更新前一步步骤名，用于支持 previous_step 占位符
-                previous_step_name = step_name
-                
                 total_record_count += step_total_records
                 
                 # 记录遍历调度的统计式监控日志（仅输出一条 INFO，避免遍历模式下日志过多）
@@ -1702,9 +2051,15 @@ async def execute_workflow(session: AsyncSession, task, download_date: str, task
                     f'成功={loop_success_count}, '
                     f'失败={loop_fail_count}, '
                     f'跳过={loop_skip_count}, '
-                    f'总记录数={len(combined_df)}, '
+                    f'总记录数={step_result_count}, '
                     f'总耗时={step_duration}秒'
                 )
+                if TushareResponseCache.is_enabled(config_cache_ttl):
+                    loop_summary_message += f', 缓存命中={loop_cache_stats.hits}, 未命中={loop_cache_stats.misses}'
+                if completed_combo_keys:
+                    loop_summary_message += f', 续跑已提交={loop_resumed_count}'
+                if incremental_planner is not None:
+                    loop_summary_message += f', 增量跳过={loop_incremental_skip_count}'
                 logger.info(loop_summary_message)
                 
                 # 创建遍历调度的汇总监控日志（仅保留少量执行详情，避免日志记录过多过长）
@@ -1716,10 +2071,16 @@ async def execute_workflow(session: AsyncSession, task, download_date: str, task
                     'success_count': loop_success_count,
                     'fail_count': loop_fail_count,
                     'skip_count': loop_skip_count,
-                    'total_records': len(combined_df),
+                    'total_records': step_result_count,
                     'loop_params': loop_params_summary,
                     'execution_details': trimmed_execution_details,
                 }
+                if TushareResponseCache.is_enabled(config_cache_ttl):
+                    loop_summary_data.update(loop_cache_stats.to_dict())
+                if completed_combo_keys:
+                    loop_summary_data['resumed_count'] = loop_resumed_count
+                if incremental_planner is not None:
+                    loop_summary_data['incremental_skip_count'] = loop_incremental_skip_count
                 # 将汇总信息压缩到合理长度，避免 error_message 过长
                 loop_summary_json = json.dumps(loop_summary_data, ensure_ascii=False)
                 max_summary_length = 3000
@@ -1730,19 +2091,20 @@ async def execute_workflow(session: AsyncSession, task, download_date: str, task
                 loop_log = TushareDownloadLog(
                     task_id=task_task_id,
                     task_name=f'{task_name}[{step_name}][遍历汇总]',
+                    step_id=step_id,
                     config_id=config_config_id,
                     api_name=config_api_name,
                     download_date=download_date,
-                    record_count=len(combined_df),
+                    record_count=step_result_count,
                     file_path=None,
                     status='0' if loop_fail_count == 0 else '1',
                     error_message=loop_summary_json,  # 始终保存精简后的汇总信息
                     duration=step_duration,
                     create_time=datetime.now(),
                 )
-                await TushareDownloadLogDao.add_log_dao(session, loop_log)
+                log_sink.add_log(loop_log)
                 
-                # 循环模式下，所有组合执行完成后统一 commit，避免频繁 commit 导致的异步上下文问题
+                # 组合数据已按批次提交，此处提交剩余的数据变更（遍历汇总日志由写入器批量写入）
                 # 注意：commit 失败时不抛出异常，只记录错误并继续执行
                 try:
                     await session.commit()
@@ -1751,6 +2113,7 @@ async def execute_workflow(session: AsyncSession, task, download_date: str, task
                     logger.error(f'步骤 {step_name} 遍历模式提交事务失败: {commit_error}，将跳过 commit 继续执行')
                     try:
                         await session.rollback()
+                        TushareSchemaRegistry.invalidate()
                     except Exception as rollback_error:
                         logger.warning(f'步骤 {step_name} 遍历模式回滚事务也失败: {rollback_error}')
                     # 继续执行下一个步骤，不抛出异常
@@ -1767,6 +2130,12 @@ async def execute_workflow(session: AsyncSession, task, download_date: str, task
                     f'总记录数=0, '
                     f'总耗时={step_duration}秒'
                 )
+                if TushareResponseCache.is_enabled(config_cache_ttl):
+                    loop_summary_message += f', 缓存命中={loop_cache_stats.hits}, 未命中={loop_cache_stats.misses}'
+                if completed_combo_keys:
+                    loop_summary_message += f', 续跑已提交={loop_resumed_count}'
+                if incremental_planner is not None:
+                    loop_summary_message += f', 增量跳过={loop_incremental_skip_count}'
                 logger.warning(loop_summary_message)
                 
                 # 创建遍历调度的汇总监控日志（无数据情况，同样精简执行详情）
@@ -1783,6 +2152,12 @@ async def execute_workflow(session: AsyncSession, task, download_date: str, task
                     'execution_details': trimmed_execution_details,
                     'warning': '遍历执行完成但没有获取到任何数据',
                 }
+                if TushareResponseCache.is_enabled(config_cache_ttl):
+                    loop_summary_data.update(loop_cache_stats.to_dict())
+                if completed_combo_keys:
+                    loop_summary_data['resumed_count'] = loop_resumed_count
+                if incremental_planner is not None:
+                    loop_summary_data['incremental_skip_count'] = loop_incremental_skip_count
                 loop_summary_json = json.dumps(loop_summary_data, ensure_ascii=False)
                 max_summary_length = 3000
                 if len(loop_summary_json) > max_summary_length:
@@ -1792,6 +2167,7 @@ async def execute_workflow(session: AsyncSession, task, download_date: str, task
                 loop_log = TushareDownloadLog(
                     task_id=task_task_id,
                     task_name=f'{task_name}[{step_name}][遍历汇总]',
+                    step_id=step_id,
                     config_id=config_config_id,
                     api_name=config_api_name,
                     download_date=download_date,
@@ -1802,9 +2178,9 @@ async def execute_workflow(session: AsyncSession, task, download_date: str, task
                     duration=step_duration,
                     create_time=datetime.now(),
                 )
-                await TushareDownloadLogDao.add_log_dao(session, loop_log)
+                log_sink.add_log(loop_log)
                 
-                # 循环模式下，所有组合执行完成后统一 commit（即使没有数据也要提交日志）
+                # 循环模式下，所有组合执行完成后统一 commit（遍历汇总日志由写入器批量写入）
                 # 注意：commit 失败时不抛出异常，只记录错误并继续执行
                 try:
                     await session.commit()
@@ -1813,6 +2189,7 @@ async def execute_workflow(session: AsyncSession, task, download_date: str, task
                     logger.error(f'步骤 {step_name} 遍历模式提交事务失败: {commit_error}，将跳过 commit 继续执行')
                     try:
                         await session.rollback()
+                        TushareSchemaRegistry.invalidate()
                     except Exception as rollback_error:
                         logger.warning(f'步骤 {step_name} 遍历模式回滚事务也失败: {rollback_error}')
                     # 继续执行下一个步骤，不抛出异常
@@ -1865,7 +2242,7 @@ async def execute_workflow(session: AsyncSession, task, download_date: str, task
                                 should_execute = actual_value != expected_value
                     if not should_execute:
                         logger.info(f'步骤 {step_name} 不满足执行条件，跳过')
-                        continue
+                        return
                 except (json.JSONDecodeError, Exception) as e:
                     logger.warning(f'步骤 {step_name} 条件表达式解析失败: {e}，将执行')
             
@@ -1880,16 +2257,20 @@ async def execute_workflow(session: AsyncSession, task, download_date: str, task
                 step_unique_key_fields=step_unique_key_fields,
                 step_name=step_name,  # 传递提前提取的步骤名称
                 step_order=step_order,  # 传递提前提取的步骤顺序
+                step_id=step_id,
                 config_api_code=config_api_code,  # 传递提前提取的接口代码
                 config_api_name=config_api_name,  # 传递提前提取的接口名称
                 config_config_id=config_config_id,  # 传递提前提取的配置ID
                 config_data_fields=config_data_fields,  # 传递提前提取的数据字段
                 config_primary_key_fields=config_primary_key_fields,  # 传递提前提取的主键字段
+                config_rate_limit=config_rate_limit,  # 传递提前提取的接口调用频率限制
+                config_cache_ttl=config_cache_ttl,  # 传递提前提取的接口响应缓存有效期
                 task_task_id=task_task_id,  # 传递提前提取的任务ID
                 task_save_to_db=task_save_to_db,  # 传递提前提取的是否保存到数据库
                 task_data_table_name=task_data_table_name,  # 传递提前提取的任务数据表名
                 task_save_path=task_save_path,  # 传递提前提取的保存路径
-                task_save_format=task_save_format  # 传递提前提取的保存格式
+                task_save_format=task_save_format,  # 传递提前提取的保存格式
+                log_sink=log_sink,
             )
             
             if df is not None and not df.empty:
@@ -1901,9 +2282,6 @@ async def execute_workflow(session: AsyncSession, task, download_date: str, task
                     for key, value in first_record.items():
                         previous_results[f'{step_name}.{key}'] = value
                 
-                # 更新前一步步骤名，用于支持 previous_step 占位符
-                previous_step_name = step_name
-                
                 total_record_count += record_count
             else:
                 # 单步执行失败（df 为 None 且没有数据）
@@ -1920,58 +2298,109 @@ async def execute_workflow(session: AsyncSession, task, download_date: str, task
                 logger.error(f'步骤 {step_name} 提交事务失败: {commit_error}，将跳过 commit 继续执行')
                 try:
                     await session.rollback()
+                    TushareSchemaRegistry.invalidate()
                 except Exception as rollback_error:
                     logger.warning(f'步骤 {step_name} 回滚事务也失败: {rollback_error}')
                 # 继续执行下一个步骤，不抛出异常
 
+    workflow_dag = WorkflowDag.build(step_cache) if TushareConfig.tushare_workflow_max_parallel_steps > 1 else None
+    if workflow_dag is None:
+        # 按顺序执行每个步骤，previous_step 指向最近一个产出结果的步骤
+        previous_step_name: str | None = None
+        for step_position, cached_step in enumerate(step_cache):
+            await run_workflow_step(
+                step_position, cached_step, session, previous_step_name, step_cache[step_position + 1:]
+            )
+            if cached_step['step_name'] in previous_results:
+                previous_step_name = cached_step['step_name']
+    else:
+        # 按连线构成的依赖图执行：没有依赖关系的分支并行执行，汇合步骤等待全部前置步骤完成
+        # 同一会话不能并发使用，各步骤使用独立会话，主会话只用于运行记录和任务统计
+        await session.commit()
+
+        async def run_dag_step(step_id: int) -> None:
+            step_position = workflow_dag.positions[step_id]
+            previous_step_name = workflow_dag.previous_step_of(step_id, previous_results)
+            async with AsyncSessionLocal(bind=session.bind) as step_session:
+                await run_workflow_step(
+                    step_position,
+                    step_cache[step_position],
+                    step_session,
+                    previous_step_name,
+                    workflow_dag.descendants_of(step_id),
+                )
+
+        logger.info(
+            f'流程任务 {task_name} 按步骤依赖图执行，最大并行步骤数: {TushareConfig.tushare_workflow_max_parallel_steps}'
+        )
+        await workflow_dag.run(run_dag_step, TushareConfig.tushare_workflow_max_parallel_steps)
+
     # 计算总执行时长
     duration = int((datetime.now() - start_time).total_seconds())
 
     # 更新运行记录和任务统计
     # 重新获取任务以保证统计字段最新
     current_task = await TushareDownloadTaskDao.get_task_detail_by_id(session, task_task_id)
+    current_task_stats = (
+        {key: getattr(current_task, key) or 0 for key in ('run_count', 'success_count', 'fail_count')}
+        if current_task
+        else None
+    )
     run_update_status = 'FAILED' if workflow_failed else 'SUCCESS'
+    if not workflow_failed:
+        # 运行成功后不再需要续跑，清理检查点
+        await TushareDownloadCheckpointDao.delete_checkpoints_by_run_id(session, run_id)
+    # 先提交数据，再记录运行结果，避免数据提交失败时运行记录已显示成功
+    await session.commit()
 
-    await TushareDownloadRunDao.update_run_status(
-        session,
+    log_sink.update_run_status(
         run_id,
         status=run_update_status,
         total_records=total_record_count,
         success_records=total_record_count if not workflow_failed else 0,
         fail_records=0 if not workflow_failed else 1,
+        dedup_records=TushareDataDao.get_dedup_count(),
         error_message=last_error_message,
         set_end_time=True,
     )
 
-    if current_task:
+    if current_task_stats:
         if workflow_failed:
             update_stats_dict = {
-                'run_count': (current_task.run_count or 0) + 1,
-                'fail_count': (current_task.fail_count or 0) + 1,
+                'run_count': current_task_stats['run_count'] + 1,
+                'fail_count': current_task_stats['fail_count'] + 1,
                 'last_run_time': datetime.now(),
             }
         else:
             update_stats_dict = {
-                'run_count': (current_task.run_count or 0) + 1,
-                'success_count': (current_task.success_count or 0) + 1,
+                'run_count': current_task_stats['run_count'] + 1,
+                'success_count': current_task_stats['success_count'] + 1,
                 'last_run_time': datetime.now(),
             }
-        await TushareDownloadTaskDao.edit_task_dao(session, task_task_id, update_stats_dict)
+        log_sink.update_task_stats(task_task_id, update_stats_dict)
 
-    await session.commit()
     logger.info(
         f'流程任务 {task_name} 执行{"失败" if workflow_failed else "完成"}，'
         f'总记录数: {total_record_count}, 总耗时: {duration}秒'
     )
+    latency_summary = TushareClient.format_latency_summary()
+    if latency_summary:
+        logger.info(f'Tushare接口调用耗时统计（进程累计）: {latency_summary}')
 
 
-async def download_tushare_data(task_id: int, download_date: str | None = None, session: AsyncSession | None = None) -> None:
+async def download_tushare_data(
+    task_id: int,
+    download_date: str | None = None,
+    session: AsyncSession | None = None,
+    resume_run_id: int | None = None,
+) -> None:
     """
     下载Tushare数据的异步任务函数
 
     :param task_id: 任务ID
     :param download_date: 下载日期（YYYYMMDD格式），如果为None则使用当前日期
     :param session: 可选的数据库会话，如果为None则创建新会话
+    :param resume_run_id: 续跑的运行ID（仅流程任务有效），为空时新建运行
     :return: None
     """
     start_time = datetime.now()
@@ -1983,6 +2412,8 @@ async def download_tushare_data(task_id: int, download_date: str | None = None,
     task_name = None
     config_id = None
     api_name = None
+    # 下载日志、运行状态和任务统计的缓冲写入器，函数结束前保证全部写出
+    log_sink = TushareLogSink()
 
     try:
         if session is None:
@@ -1990,7 +2421,12 @@ async def download_tushare_data(task_id: int, download_date: str | None = None,
             session = await session_context.__aenter__()
         else:
             session_context = None
-        
+        log_sink.bind = session.bind
+        # 记录本次运行写入的日K线，结束后追加到K线缓存
+        kline_token = TushareKlineCache.begin_run()
+        # 统计本次运行写入前批内去重丢弃的行数，记录到运行记录
+        dedup_token = TushareDataDao.begin_dedup_count()
+
         try:
             # 获取任务信息
             task = await TushareDownloadTaskDao.get_task_detail_by_id(session, task_id)
@@ -2020,12 +2456,18 @@ async def download_tushare_data(task_id: int, download_date: str | None = None,
 
             # 如果任务有流程配置ID，执行流程；否则执行单个接口
             if task_workflow_id:
-                await execute_workflow(session, task, download_date, task_params_str)
+                await execute_workflow(
+                    session, task, download_date, task_params_str, resume_run_id=resume_run_id, log_sink=log_sink
+                )
             else:
-                await execute_single_api(session, task, download_date)
+                await execute_single_api(session, task, download_date, log_sink)
 
             logger.info(f'任务 {task_name} 执行完成')
+            # 本次任务写入了股票基础信息时重新加载股票搜索索引（数据已提交）
+            await TushareStockSearchIndex.refresh_if_stale(session.bind)
         finally:
+            await TushareKlineCache.end_run(kline_token, session.bind)
+            TushareDataDao.end_dedup_count(dedup_token)
             # 如果使用的是外部会话，不关闭它；否则关闭内部创建的会话
             if session_context is not None:
                 await session_context.__aexit__(None, None, None)
@@ -2066,6 +2508,7 @@ async def download_tushare_data(task_id: int, download_date: str | None = None,
                     # 先回滚事务，确保可以执行新的操作
                     try:
                         await session.rollback()
+                        TushareSchemaRegistry.invalidate()
                     except Exception as rollback_error:
                         logger.warning(f'回滚事务失败: {rollback_error}')
                     
@@ -2081,7 +2524,7 @@ async def download_tushare_data(task_id: int, download_date: str | None = None,
                                 'fail_count': (error_task.fail_count or 0) + 1,
                                 'last_run_time': datetime.now()
                             }
-                            await TushareDownloadTaskDao.edit_task_dao(session, task_id, update_stats_dict)
+                            log_sink.update_task_stats(task_id, update_stats_dict)
 
                         log = TushareDownloadLog(
                             task_id=task_id,
@@ -2096,93 +2539,38 @@ async def download_tushare_data(task_id: int, download_date: str | None = None,
                             duration=duration,
                             create_time=datetime.now(),
                         )
-
-                        await TushareDownloadLogDao.add_log_dao(session, log)
-                        await session.commit()
+                        # 错误日志经写入器使用独立事务写入，不依赖当前会话的事务状态
+                        log_sink.add_log(log)
                 except Exception as session_error:
-                    # 如果使用当前会话失败，尝试创建新会话记录日志
                     logger.warning(f'使用当前会话记录错误日志失败: {session_error}')
-                    try:
-                        async with AsyncSessionLocal() as new_session:
-                            if task_name and config_id and api_name:
-                                duration = int((datetime.now() - start_time).total_seconds())
-                                log = TushareDownloadLog(
-                                    task_id=task_id,
-                                    task_name=task_name,
-                                    config_id=config_id,
-                                    api_name=api_name,
-                                    download_date=download_date,
-                                    record_count=0,
-                                    file_path=None,
-                                    status='1',
-                                    error_message=full_error_message,
-                                    duration=duration,
-                                    create_time=datetime.now(),
-                                )
-                                await TushareDownloadLogDao.add_log_dao(new_session, log)
-                                await new_session.commit()
-                    except Exception as new_session_error:
-                        logger.error(f'使用新会话记录错误日志也失败: {new_session_error}')
             else:
                 # 会话不可用，只记录到日志文件
                 logger.warning('会话不可用，跳过数据库错误日志记录，错误信息已记录到日志文件')
         except Exception as log_error:
             logger.exception(f'记录错误日志失败: {log_error}')
             logger.error(f'记录错误日志异常堆栈:\n{traceback.format_exc()}')
+    finally:
+        await log_sink.close()
 
 
-def download_tushare_data_sync(task_id: int, download_date: str | None = None) -> None:
+def download_tushare_data_sync(task_id: int, download_date: str | None = None, resume_run_id: int | None = None) -> None:
     """
     下载Tushare数据的同步任务函数（用于定时任务调度）
-    在新线程中创建新的事件循环和数据库连接
+    在后台任务工作线程中执行，复用该线程的事件循环和数据库连接池
 
     :param task_id: 任务ID
     :param download_date: 下载日期（YYYYMMDD格式），如果为None则使用当前日期
+    :param resume_run_id: 续跑的运行ID（仅流程任务有效），为空时新建运行
     :return: None
     """
-    import asyncio
-    from urllib.parse import quote_plus
-    from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
-    from config.env import DataBaseConfig
-    
-    # 在新线程中创建新的事件循环
-    loop = asyncio.new_event_loop()
-    asyncio.set_event_loop(loop)
-    
-    try:
-        # 在新线程中创建新的数据库引擎和会话
-        # 这样可以避免事件循环冲突
-        async_db_url = (
-            f'mysql+asyncmy://{DataBaseConfig.db_username}:{quote_plus(DataBaseConfig.db_password)}@'
-            f'{DataBaseConfig.db_host}:{DataBaseConfig.db_port}/{DataBaseConfig.db_database}'
-        )
-        if DataBaseConfig.db_type == 'postgresql':
-            async_db_url = (
-                f'postgresql+asyncpg://{DataBaseConfig.db_username}:{quote_plus(DataBaseConfig.db_password)}@'
-                f'{DataBaseConfig.db_host}:{DataBaseConfig.db_port}/{DataBaseConfig.db_database}'
-            )
-        
-        # 创建新的引擎，绑定到当前线程的事件循环
-        thread_engine = create_async_engine(
-            async_db_url,
-            echo=DataBaseConfig.db_echo,
-            max_overflow=DataBaseConfig.db_max_overflow,
-            pool_size=DataBaseConfig.db_pool_size,
-            pool_recycle=DataBaseConfig.db_pool_recycle,
-            pool_timeout=DataBaseConfig.db_pool_timeout,
-        )
-        ThreadSessionLocal = async_sessionmaker(autocommit=False, autoflush=False, bind=thread_engine)
-        
-        # 使用新会话运行下载任务
-        async def download_with_new_session():
-            async with ThreadSessionLocal() as session:
-                await download_tushare_data(task_id, download_date, session=session)
-        
-        # 运行异步函数
-        loop.run_until_complete(download_with_new_session())
-        
-        # 清理引擎
-        loop.run_until_complete(thread_engine.dispose())
-    finally:
-        # 清理事件循环
-        loop.close()
+    from sqlalchemy.ext.asyncio import AsyncEngine, async_sessionmaker
+
+    from config.background_runtime import BackgroundRuntime
+
+    # 使用工作线程的数据库引擎创建会话运行下载任务
+    async def download_with_new_session(engine: AsyncEngine) -> None:
+        ThreadSessionLocal = async_sessionmaker(autocommit=False, autoflush=False, bind=engine)
+        async with ThreadSessionLocal() as session:
+            await download_tushare_data(task_id, download_date, session=session, resume_run_id=resume_run_id)
+
+    BackgroundRuntime.run(download_with_new_session)
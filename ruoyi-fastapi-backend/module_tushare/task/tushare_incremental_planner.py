@@ -0,0 +1,105 @@
+from datetime import datetime, timedelta
+from typing import Any
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from module_tushare.dao.tushare_dao import TushareDataDao
+from module_tushare.dao.tushare_schema_registry import TushareSchemaRegistry
+
+# 判断已有数据覆盖范围所用的日期字段
+INCREMENTAL_DATE_FIELD = 'trade_date'
+# 改写的接口日期区间参数
+START_DATE_PARAM = 'start_date'
+END_DATE_PARAM = 'end_date'
+# 不作为分组键的日期类参数
+_DATE_PARAMS = {INCREMENTAL_DATE_FIELD, START_DATE_PARAM, END_DATE_PARAM}
+
+
+def normalize_date(value: Any) -> str | None:
+    """
+    将日期取值规范化为 YYYYMMDD 字符串
+
+    :param value: 日期（YYYYMMDD/YYYY-MM-DD 字符串、date/datetime 或整数）
+    :return: YYYYMMDD 字符串，无法识别时返回None
+    """
+    if value is None:
+        return None
+    if hasattr(value, 'strftime'):
+        return value.strftime('%Y%m%d')
+    date_str = str(value).strip().replace('-', '')[:8]
+    try:
+        datetime.strptime(date_str, '%Y%m%d')
+    except ValueError:
+        return None
+    return date_str
+
+
+def _shift_date(date_str: str, days: int) -> str:
+    return (datetime.strptime(date_str, '%Y%m%d') + timedelta(days=days)).strftime('%Y%m%d')
+
+
+class IncrementalPlanner:
+    """
+    增量下载计划器
+
+    调用接口前按遍历键（如 ts_code）查询目标表已有数据的最早和最大交易日，只请求尚未下载的区间：
+    开始日期早于最早交易日时请求最早交易日之前的部分，结束日期晚于最大交易日（或未指定结束日期）时请求最大交易日之后的部分；
+    已有数据覆盖整个区间的组合直接跳过。
+    已有数据中间缺失的交易日不会补齐（需要时关闭增量模式全量重下）。
+    """
+
+    __slots__ = ('date_ranges', 'key_fields', 'table_name')
+
+    def __init__(self, table_name: str, key_fields: list[str], date_ranges: dict[tuple, tuple[str, str]]) -> None:
+        self.table_name = table_name
+        self.key_fields = key_fields
+        self.date_ranges = date_ranges
+
+    @classmethod
+    async def load(cls, db: AsyncSession, table_name: str, loop_param_names: list[str]) -> 'IncrementalPlanner | None':
+        """
+        加载目标表的已有数据覆盖范围
+
+        :param db: 数据库会话
+        :param table_name: 目标表名
+        :param loop_param_names: 遍历参数名（同名字段作为分组键）
+        :return: 计划器，目标表不存在或没有交易日字段时返回None
+        """
+        schema = await TushareSchemaRegistry.get_schema(db, table_name)
+        if schema is None or INCREMENTAL_DATE_FIELD not in schema.column_set:
+            return None
+        key_fields = [name for name in loop_param_names if name in schema.column_set and name not in _DATE_PARAMS]
+        date_ranges = {}
+        date_range_rows = await TushareDataDao.get_date_ranges(db, table_name, key_fields, INCREMENTAL_DATE_FIELD)
+        for key, (earliest, latest) in date_range_rows.items():
+            earliest_date = normalize_date(earliest)
+            latest_date = normalize_date(latest)
+            if earliest_date and latest_date:
+                date_ranges[tuple(str(value) for value in key)] = (earliest_date, latest_date)
+        return cls(table_name, key_fields, date_ranges)
+
+    def plan(self, api_params: dict[str, Any]) -> list[dict[str, Any]]:
+        """
+        计算组合实际需要请求的参数
+
+        :param api_params: 组合的完整接口参数
+        :return: 需要请求的参数列表：无需改写时为原参数；否则为最早交易日之前、最大交易日之后的缺失区间（0~2个），
+                 已完整覆盖时为空列表
+        """
+        start_date = normalize_date(api_params.get(START_DATE_PARAM))
+        if not start_date:
+            return [api_params]
+        date_range = self.date_ranges.get(tuple(str(api_params.get(field)) for field in self.key_fields))
+        end_date = normalize_date(api_params.get(END_DATE_PARAM))
+        if date_range is None:
+            return [api_params]
+        earliest_date, latest_date = date_range
+        if latest_date < start_date or (end_date and earliest_date > end_date):
+            # 请求区间与已有数据不重叠
+            return [api_params]
+        planned = []
+        if start_date < earliest_date:
+            planned.append({**api_params, END_DATE_PARAM: _shift_date(earliest_date, -1)})
+        if not end_date or latest_date < end_date:
+            planned.append({**api_params, START_DATE_PARAM: _shift_date(latest_date, 1)})
+        return planned
@@ -0,0 +1,192 @@
+import asyncio
+from datetime import datetime
+from typing import Any
+
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession
+
+from config.env import TushareConfig
+from module_tushare.dao.tushare_dao import TushareDownloadLogDao, TushareDownloadRunDao, TushareDownloadTaskDao
+from module_tushare.entity.do.tushare_do import TushareDownloadLog, TushareDownloadRun, TushareDownloadTask
+from utils.log_util import logger
+
+# 批量写入的下载日志字段（日志ID由数据库生成）
+LOG_COLUMNS = tuple(column.key for column in TushareDownloadLog.__table__.columns if column.key != 'log_id')
+# 写入失败后放回缓存等待重试的日志条数上限（超出时丢弃最早的日志，运行状态和任务统计始终保留）
+RETRY_LOG_LIMIT = 50000
+# 关闭时最终写入失败的重试次数及间隔（秒，按次数递增）
+CLOSE_FLUSH_RETRIES = 3
+CLOSE_FLUSH_RETRY_DELAY = 1.0
+
+
+class TushareLogSink:
+    """
+    下载日志与运行状态的缓冲写入器
+
+    下载日志、运行记录状态和任务统计先缓存在内存中，由后台定时任务或缓存条数达到阈值时批量写入：
+    日志一次 executemany 插入，同一运行记录/任务的多次更新合并为一条 UPDATE。写入使用独立的会话和事务，
+    数据写入不等待这些记账写入，数据事务回滚也不会丢失失败日志。
+    写入失败时记录放回缓存，由下一次写入重试；关闭时写出全部剩余记录，失败时按间隔重试。
+    """
+
+    def __init__(self, bind: AsyncEngine | None = None) -> None:
+        """
+        :param bind: 写入使用的数据库引擎（可在开始记录前通过 bind 属性设置）
+        """
+        self.bind = bind
+        self.flushed_logs = 0
+        self._logs: list[dict[str, Any]] = []
+        self._run_values: dict[int, dict[str, Any]] = {}
+        self._task_values: dict[int, dict[str, Any]] = {}
+        self._lock = asyncio.Lock()
+        self._timer: asyncio.Task | None = None
+        self._pending_flushes: set[asyncio.Task] = set()
+        self._closed = False
+
+    @property
+    def pending_count(self) -> int:
+        return len(self._logs) + len(self._run_values) + len(self._task_values)
+
+    async def create_run_record(self, task: TushareDownloadTask, initial_status: str = 'PENDING') -> int:
+        """
+        立即创建运行记录并提交（后续状态更新由独立会话写入，运行记录需先对其可见）
+
+        :param task: 任务对象
+        :param initial_status: 初始状态
+        :return: 运行ID
+        """
+        async with AsyncSession(bind=self.bind, expire_on_commit=False) as db:
+            run: TushareDownloadRun = await TushareDownloadRunDao.create_run_record(db, task, initial_status)
+            await db.commit()
+            return run.run_id
+
+    def add_log(self, log: TushareDownloadLog) -> None:
+        """
+        缓存一条下载日志
+
+        :param log: 日志对象（未加入任何会话）
+        :return: None
+        """
+        values = {key: getattr(log, key) for key in LOG_COLUMNS}
+        if values['create_time'] is None:
+            values['create_time'] = datetime.now()
+        self._logs.append(values)
+        self._after_add()
+
+    def update_run_status(self, run_id: int, **kwargs: Any) -> None:
+        """
+        缓存运行记录的状态更新（参数同 TushareDownloadRunDao.update_run_status，开始/结束时间取调用时刻）
+
+        :param run_id: 运行ID
+        :return: None
+        """
+        values = TushareDownloadRunDao.build_run_status_values(**kwargs)
+        if values:
+            self._run_values.setdefault(run_id, {}).update(values)
+            self._after_add()
+
+    def update_task_stats(self, task_id: int, values: dict[str, Any]) -> None:
+        """
+        缓存任务统计更新
+
+        :param task_id: 任务ID
+        :param values: 更新字段
+        :return: None
+        """
+        if values:
+            self._task_values.setdefault(task_id, {}).update(values)
+            self._after_add()
+
+    def _after_add(self) -> None:
+        if self._closed:
+            return
+        if self._timer is None and TushareConfig.tushare_log_flush_interval > 0:
+            self._timer = asyncio.create_task(self._flush_periodically())
+        if self.pending_count >= TushareConfig.tushare_log_flush_size and not self._pending_flushes:
+            # 达到阈值时在后台写入，调用方不等待；已有写入进行中时不重复发起（写入失败放回的记录仍在阈值以上）
+            flush_task = asyncio.create_task(self.flush())
+            self._pending_flushes.add(flush_task)
+            flush_task.add_done_callback(self._pending_flushes.discard)
+
+    async def _flush_periodically(self) -> None:
+        while True:
+            await asyncio.sleep(TushareConfig.tushare_log_flush_interval)
+            # 关闭时取消定时任务不会中断正在进行的写入，close 中的最终写入会等待其完成
+            await asyncio.shield(self.flush())
+
+    async def flush(self) -> bool:
+        """
+        写出当前缓存的全部记录（写入失败时记录错误并放回缓存等待重试，不影响数据写入）
+
+        :return: 是否写入成功（没有待写入记录时为True）
+        """
+        async with self._lock:
+            logs, self._logs = self._logs, []
+            run_values, self._run_values = self._run_values, {}
+            task_values, self._task_values = self._task_values, {}
+            if not (logs or run_values or task_values):
+                return True
+            if self.bind is None:
+                logger.warning(f'下载日志写入器未绑定数据库，丢弃 {len(logs)} 条日志')
+                return True
+            try:
+                async with AsyncSession(bind=self.bind) as db:
+                    await TushareDownloadLogDao.add_logs_dao(db, logs)
+                    for run_id, values in run_values.items():
+                        await TushareDownloadRunDao.update_run_values(db, run_id, values)
+                    for task_id, values in task_values.items():
+                        await TushareDownloadTaskDao.edit_task_dao(db, task_id, values)
+                    await db.commit()
+                self.flushed_logs += len(logs)
+                return True
+            except Exception as e:
+                logger.exception(
+                    f'批量写入下载日志失败（日志 {len(logs)} 条，运行记录 {len(run_values)} 条，'
+                    f'任务统计 {len(task_values)} 条），将在下次写入时重试: {e}'
+                )
+                self._restore(logs, run_values, task_values)
+                return False
+
+    def _restore(
+        self, logs: list[dict[str, Any]], run_values: dict[int, dict[str, Any]], task_values: dict[int, dict[str, Any]]
+    ) -> None:
+        """
+        将写入失败的记录放回缓存（写入期间新增的更新较新，覆盖放回的同名字段）
+        """
+        self._logs = logs + self._logs
+        if len(self._logs) > RETRY_LOG_LIMIT:
+            dropped = len(self._logs) - RETRY_LOG_LIMIT
+            self._logs = self._logs[dropped:]
+            logger.warning(f'待重试的下载日志超过 {RETRY_LOG_LIMIT} 条，丢弃最早的 {dropped} 条')
+        for run_id, values in run_values.items():
+            self._run_values[run_id] = {**values, **self._run_values.get(run_id, {})}
+        for task_id, values in task_values.items():
+            self._task_values[task_id] = {**values, **self._task_values.get(task_id, {})}
+
+    async def close(self) -> None:
+        """
+        停止定时写入并写出全部剩余记录（写入失败时按间隔重试，仍失败则放弃）
+
+        :return: None
+        """
+        self._closed = True
+        if self._timer is not None:
+            self._timer.cancel()
+            await asyncio.gather(self._timer, return_exceptions=True)
+            self._timer = None
+        if self._pending_flushes:
+            await asyncio.gather(*self._pending_flushes, return_exceptions=True)
+        for attempt in range(1, CLOSE_FLUSH_RETRIES + 1):
+            if await self.flush():
+                return
+            await asyncio.sleep(CLOSE_FLUSH_RETRY_DELAY * attempt)
+        if not await self.flush():
+            logger.error(
+                f'关闭下载日志写入器时重试 {CLOSE_FLUSH_RETRIES} 次仍写入失败，'
+                f'放弃 {len(self._logs)} 条日志、{len(self._run_values)} 条运行记录更新'
+            )
+
+    async def __aenter__(self) -> 'TushareLogSink':
+        return self
+
+    async def __aexit__(self, *exc_info: object) -> None:
+        await self.close()
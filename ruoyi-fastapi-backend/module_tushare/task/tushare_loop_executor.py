@@ -0,0 +1,251 @@
+import asyncio
+import hashlib
+import json
+import math
+from collections import deque
+from collections.abc import AsyncIterator, Awaitable, Callable, Iterable, Iterator
+from datetime import datetime
+from itertools import product
+from typing import Any, TypeVar
+
+import pandas as pd
+
+T = TypeVar('T')
+
+# 单个步骤允许的最大遍历并发数，避免配置过大导致触发Tushare频率限制
+LOOP_CONCURRENCY_MAX = 16
+
+# 遍历模式提交批次单位：按组合数 / 按记录数
+LOOP_COMMIT_UNIT_COMBO = '0'
+LOOP_COMMIT_UNIT_ROW = '1'
+# 步骤未配置提交批次大小时的默认值
+LOOP_COMMIT_EVERY_COMBOS = 200
+LOOP_COMMIT_EVERY_ROWS = 100000
+
+
+class LoopFetchResult:
+    """
+    遍历模式下单个参数组合的接口调用结果
+    """
+
+    __slots__ = ('df', 'error', 'finished_at', 'started_at')
+
+    def __init__(
+        self,
+        df: pd.DataFrame | None = None,
+        error: BaseException | None = None,
+        started_at: datetime | None = None,
+        finished_at: datetime | None = None,
+    ) -> None:
+        self.df = df
+        self.error = error
+        self.started_at = started_at or datetime.now()
+        self.finished_at = finished_at or datetime.now()
+
+    def unwrap(self) -> pd.DataFrame | None:
+        """
+        获取接口返回数据，调用失败时重新抛出原始异常
+
+        :return: 接口返回的DataFrame
+        """
+        if self.error is not None:
+            raise self.error
+        return self.df
+
+
+class LoopCommitBatch:
+    """
+    遍历模式的提交批次
+
+    累计自上次提交主事务以来已写入保存点的组合数和记录数，达到步骤配置的批次大小
+    （commit_unit 为 0 时按组合数，为 1 时按记录数）即应提交，使单个事务持有的保存点、
+    锁和未提交数据量不随遍历规模增长，提交失败时也只损失当前批次。
+    本批组合的结果数据和执行详情随批次暂存，提交成功后才并入步骤结果，回滚时据此撤销。
+    """
+
+    __slots__ = ('combo_count', 'commit_every', 'commit_unit', 'details', 'frames', 'record_count')
+
+    def __init__(self, commit_every: Any = None, commit_unit: str | None = None) -> None:
+        """
+        :param commit_every: 步骤配置的批次大小（可能为None或字符串，无效时使用默认值）
+        :param commit_unit: 步骤配置的批次单位
+        """
+        self.commit_unit = LOOP_COMMIT_UNIT_ROW if commit_unit == LOOP_COMMIT_UNIT_ROW else LOOP_COMMIT_UNIT_COMBO
+        try:
+            self.commit_every = int(commit_every)
+        except (TypeError, ValueError):
+            self.commit_every = 0
+        if self.commit_every <= 0:
+            self.commit_every = (
+                LOOP_COMMIT_EVERY_ROWS if self.commit_unit == LOOP_COMMIT_UNIT_ROW else LOOP_COMMIT_EVERY_COMBOS
+            )
+        self.combo_count = 0
+        self.record_count = 0
+        self.frames: list[pd.DataFrame] = []
+        self.details: list[dict[str, Any]] = []
+
+    def add(self, record_count: int) -> None:
+        """
+        记录一个已写入保存点的组合
+
+        :param record_count: 该组合写入的记录数
+        :return: None
+        """
+        self.combo_count += 1
+        self.record_count += record_count or 0
+
+    @property
+    def is_full(self) -> bool:
+        """
+        当前批次是否已达到批次大小
+        """
+        if self.commit_unit == LOOP_COMMIT_UNIT_ROW:
+            return self.record_count >= self.commit_every
+        return self.combo_count >= self.commit_every
+
+    def reset(self) -> None:
+        """
+        开始新的批次
+
+        :return: None
+        """
+        self.combo_count = 0
+        self.record_count = 0
+        self.frames = []
+        self.details = []
+
+
+class ParamCombinationSet:
+    """
+    遍历模式的参数组合集合（各参数取值的笛卡尔积）
+
+    只保存每个参数的去重取值，组合在迭代时按需生成，不会一次性构造全部组合字典；
+    支持 len() 和布尔判断，组合顺序与逐个展开笛卡尔积一致。
+    """
+
+    __slots__ = ('param_names', 'value_lists')
+
+    def __init__(self, param_names: list[str], value_lists: list[list[Any]]) -> None:
+        self.param_names = param_names
+        self.value_lists = value_lists
+
+    def values_of(self, param_name: str) -> list[Any]:
+        """
+        获取参数的取值列表
+
+        :param param_name: 参数名
+        :return: 取值列表，参数不存在时返回空列表
+        """
+        if param_name not in self.param_names:
+            return []
+        return self.value_lists[self.param_names.index(param_name)]
+
+    def __len__(self) -> int:
+        if not self.param_names:
+            return 0
+        return math.prod(len(values) for values in self.value_lists)
+
+    def __bool__(self) -> bool:
+        return len(self) > 0
+
+    def __iter__(self) -> Iterator[dict[str, Any]]:
+        if not self.param_names:
+            return iter(())
+        return (dict(zip(self.param_names, combo, strict=True)) for combo in product(*self.value_lists))
+
+
+def unique_in_order(values: Iterable[Any]) -> list[Any]:
+    """
+    按首次出现顺序去重（哈希去重，线性时间；不可哈希的值退化为逐个比较）
+
+    :param values: 取值序列
+    :return: 去重后的取值列表
+    """
+    seen: set = set()
+    unhashable: list[Any] = []
+    result = []
+    for value in values:
+        try:
+            if value in seen:
+                continue
+            seen.add(value)
+        except TypeError:
+            if value in unhashable:
+                continue
+            unhashable.append(value)
+        result.append(value)
+    return result
+
+
+def make_combo_key(api_params: dict[str, Any], param_expressions: dict[str, Any] | None = None) -> str:
+    """
+    计算参数组合键（用于检查点，与组合在本次运行中的序号无关，上游结果顺序变化时仍能对应）
+
+    参数中的日期表达式（如 today-1000）每天解析出的取值不同，传入未解析的表达式覆盖同名参数，
+    使隔天续跑时同一组合的键保持不变。
+
+    :param api_params: 组合的完整接口参数
+    :param param_expressions: 未解析的参数表达式（覆盖 api_params 中的同名取值）
+    :return: 参数组合键（SHA-256 十六进制字符串）
+    """
+    key_params = {**api_params, **param_expressions} if param_expressions else api_params
+    payload = json.dumps(key_params, sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+
+def normalize_loop_concurrency(value: Any) -> int:
+    """
+    规范化遍历并发数配置
+
+    :param value: 步骤配置的并发数（可能为None或字符串）
+    :return: 1 ~ LOOP_CONCURRENCY_MAX 之间的整数
+    """
+    try:
+        concurrency = int(value)
+    except (TypeError, ValueError):
+        return 1
+    return max(1, min(concurrency, LOOP_CONCURRENCY_MAX))
+
+
+async def iter_prefetched(
+    items: Iterable[T],
+    fetch: Callable[[T], Awaitable[pd.DataFrame | None]],
+    concurrency: int = 1,
+) -> AsyncIterator[tuple[T, LoopFetchResult]]:
+    """
+    有序预取执行器：接口调用并发执行，结果严格按输入顺序产出
+
+    最多同时有 concurrency 个调用在执行，调用方在处理（写库）当前结果时，后续组合的接口调用仍在进行，
+    从而让网络等待与数据库写入重叠；调用方按顺序消费，保证写库顺序和保存点事务语义不变。
+
+    :param items: 待执行的参数组合（可迭代对象，按需读取）
+    :param fetch: 异步的接口调用函数，接收单个参数组合，返回DataFrame（由调用方经接口调用执行器或响应缓存调用接口）
+    :param concurrency: 最大并发数
+    :return: (参数组合, 调用结果) 的异步迭代器
+    """
+    concurrency = normalize_loop_concurrency(concurrency)
+
+    async def _run(item: T) -> LoopFetchResult:
+        started_at = datetime.now()
+        try:
+            df = await fetch(item)
+            return LoopFetchResult(df=df, started_at=started_at, finished_at=datetime.now())
+        except Exception as e:
+            return LoopFetchResult(error=e, started_at=started_at, finished_at=datetime.now())
+
+    pending: deque[tuple[T, asyncio.Task]] = deque()
+    try:
+        for item in items:
+            pending.append((item, asyncio.ensure_future(_run(item))))
+            if len(pending) >= concurrency:
+                head_item, head_task = pending.popleft()
+                yield head_item, await head_task
+        while pending:
+            head_item, head_task = pending.popleft()
+            yield head_item, await head_task
+    finally:
+        # 消费方提前退出（异常或取消）时，取消尚未开始处理的调用，并等待其真正结束后再退出
+        for _, pending_task in pending:
+            pending_task.cancel()
+        if pending:
+            await asyncio.gather(*(pending_task for _, pending_task in pending), return_exceptions=True)
@@ -0,0 +1,163 @@
+import os
+import uuid
+from datetime import datetime
+
+import pandas as pd
+
+from config.env import TushareConfig
+from utils.log_util import logger
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:
+    pa = None
+    pq = None
+
+# 默认分区字段，数据中不含该字段时直接写入数据集根目录
+PARQUET_PARTITION_FIELD = 'trade_date'
+# 分区字段为空时使用的分区名（与 Hive 约定一致）
+PARQUET_DEFAULT_PARTITION = '__HIVE_DEFAULT_PARTITION__'
+PARQUET_FILE_PREFIX = 'part-'
+PARQUET_FILE_SUFFIX = '.parquet'
+
+
+class ParquetDatasetWriter:
+    """
+    Parquet分区数据集写入器
+
+    数据按接口代码写入 save_path/api_code 目录，含分区字段时按 Hive 风格分区
+    （如 daily/trade_date=20240102/part-*.parquet），分区字段只体现在目录名中，不写入文件。
+    追加的数据先在内存中缓冲，达到 tushare_parquet_flush_rows 行后按分区各写一个文件；
+    关闭时写出剩余数据，并合并本次写入过的分区中的小文件，避免遍历模式产生大量碎片文件。
+    """
+
+    def __init__(self, save_path: str, api_code: str, partition_field: str = PARQUET_PARTITION_FIELD) -> None:
+        """
+        :param save_path: 保存路径
+        :param api_code: 接口代码，作为数据集目录名
+        :param partition_field: 分区字段
+        """
+        if pq is None:
+            raise RuntimeError('保存为Parquet格式需要安装 pyarrow')
+        self.dataset_dir = os.path.join(save_path, api_code)
+        self.partition_field = partition_field
+        self.written_files = 0
+        self.written_rows = 0
+        self._buffer: list[pd.DataFrame] = []
+        self._buffered_rows = 0
+        self._touched_dirs: set[str] = set()
+
+    def append(self, df: pd.DataFrame) -> None:
+        """
+        追加数据，缓冲行数达到阈值时写出
+
+        :param df: 待写入的数据
+        :return: None
+        """
+        if df is None or df.empty:
+            return
+        self._buffer.append(df)
+        self._buffered_rows += len(df)
+        if self._buffered_rows >= TushareConfig.tushare_parquet_flush_rows:
+            self.flush()
+
+    def flush(self) -> None:
+        """
+        将缓冲的数据按分区写出，每个分区一个文件
+
+        :return: None
+        """
+        if not self._buffer:
+            return
+        df = pd.concat(self._buffer, ignore_index=True) if len(self._buffer) > 1 else self._buffer[0]
+        self._buffer = []
+        self._buffered_rows = 0
+
+        if self.partition_field in df.columns:
+            partition_values = df[self.partition_field].astype('string').fillna(PARQUET_DEFAULT_PARTITION)
+            for partition_value, partition_df in df.groupby(partition_values, sort=False):
+                partition_dir = os.path.join(self.dataset_dir, f'{self.partition_field}={partition_value}')
+                self._write_file(partition_dir, partition_df.drop(columns=[self.partition_field]))
+        else:
+            self._write_file(self.dataset_dir, df)
+
+    def close(self) -> str:
+        """
+        写出剩余数据并合并本次写入过的分区中的小文件
+
+        :return: 数据集目录
+        """
+        self.flush()
+        merged_count = 0
+        for directory in sorted(self._touched_dirs):
+            merged_count += self.compact_directory(directory)
+        self._touched_dirs.clear()
+        if merged_count:
+            logger.info(f'Parquet数据集 {self.dataset_dir} 已合并 {merged_count} 个小文件')
+        return self.dataset_dir
+
+    def _write_file(self, directory: str, df: pd.DataFrame) -> None:
+        os.makedirs(directory, exist_ok=True)
+        table = pa.Table.from_pandas(df, preserve_index=False)
+        write_parquet_file(table, directory)
+        self._touched_dirs.add(directory)
+        self.written_files += 1
+        self.written_rows += len(df)
+
+    @classmethod
+    def compact_directory(cls, directory: str) -> int:
+        """
+        合并目录下小于 tushare_parquet_compact_file_size 的数据文件（至少两个时才合并）
+
+        合并后的文件先写入临时文件再原子替换，随后删除被合并的文件。
+
+        :param directory: 分区目录
+        :return: 被合并的文件数
+        """
+        small_files = []
+        for name in sorted(os.listdir(directory)):
+            path = os.path.join(directory, name)
+            if (
+                name.startswith(PARQUET_FILE_PREFIX)
+                and name.endswith(PARQUET_FILE_SUFFIX)
+                and os.path.getsize(path) < TushareConfig.tushare_parquet_compact_file_size
+            ):
+                small_files.append(path)
+        if len(small_files) <= 1:
+            return 0
+
+        # 经 pandas 合并，各文件间同名列的类型差异（如整列为空、整数与浮点）由 pandas 统一
+        merged_df = pd.concat([pd.read_parquet(path) for path in small_files], ignore_index=True)
+        write_parquet_file(pa.Table.from_pandas(merged_df, preserve_index=False), directory)
+        for path in small_files:
+            os.remove(path)
+        return len(small_files)
+
+
+def write_parquet_file(table: 'pa.Table', directory: str) -> str:
+    """
+    按配置的压缩算法和行组大小写入一个Parquet文件（先写临时文件再原子替换，读取方不会读到不完整的文件）
+
+    :param table: 待写入的数据
+    :param directory: 目标目录
+    :return: 文件路径
+    """
+    file_name = (
+        f'{PARQUET_FILE_PREFIX}{datetime.now().strftime("%Y%m%d%H%M%S")}-{uuid.uuid4().hex[:8]}{PARQUET_FILE_SUFFIX}'
+    )
+    file_path = os.path.join(directory, file_name)
+    # 以点开头的临时文件会被 pyarrow/Spark 等读取方忽略
+    tmp_path = os.path.join(directory, f'.{file_name}.tmp')
+    try:
+        pq.write_table(
+            table,
+            tmp_path,
+            compression=TushareConfig.tushare_parquet_compression,
+            row_group_size=TushareConfig.tushare_parquet_row_group_size,
+        )
+        os.replace(tmp_path, file_path)
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+    return file_path
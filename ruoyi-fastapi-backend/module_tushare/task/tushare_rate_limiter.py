@@ -0,0 +1,252 @@
+import asyncio
+import re
+import threading
+import time
+
+import redis
+from redis.exceptions import RedisError
+
+from config.env import RedisConfig, TushareConfig
+from utils.log_util import logger
+
+# 令牌桶允许的突发时长（秒），即桶容量 = 每秒速率 * 突发时长
+BURST_SECONDS = 3
+# 触发频率限制后，速率最多降低到配置值的比例
+MIN_RATE_FACTOR = 0.2
+# 每次调用成功后速率恢复的步长（加性恢复）
+RATE_RECOVER_STEP = 0.02
+# Redis不可用时，回退到本地限流的时长（秒），到期后重新尝试Redis
+REDIS_RETRY_INTERVAL = 60
+
+# 令牌桶Lua脚本：原子地补充并获取一个令牌，返回需要等待的秒数（0表示获取成功）
+_ACQUIRE_SCRIPT = """
+local key = KEYS[1]
+local rate = tonumber(ARGV[1])
+local capacity = tonumber(ARGV[2])
+local t = redis.call('TIME')
+local now = tonumber(t[1]) + tonumber(t[2]) / 1000000
+local data = redis.call('HMGET', key, 'tokens', 'ts', 'blocked_until')
+local tokens = tonumber(data[1]) or capacity
+local ts = tonumber(data[2]) or now
+local blocked_until = tonumber(data[3]) or 0
+if blocked_until > now then
+  return tostring(blocked_until - now)
+end
+if rate <= 0 then
+  return '0'
+end
+tokens = math.min(capacity, tokens + math.max(0, now - ts) * rate)
+local wait = 0
+if tokens >= 1 then
+  tokens = tokens - 1
+else
+  wait = (1 - tokens) / rate
+end
+redis.call('HSET', key, 'tokens', tostring(tokens), 'ts', tostring(now))
+redis.call('EXPIRE', key, 300)
+return tostring(wait)
+"""
+
+# 暂停脚本：触发频率限制后，所有进程在 blocked_until 之前都不再获取令牌
+_BLOCK_SCRIPT = """
+local key = KEYS[1]
+local t = redis.call('TIME')
+local now = tonumber(t[1]) + tonumber(t[2]) / 1000000
+local blocked_until = now + tonumber(ARGV[1])
+local current = tonumber(redis.call('HGET', key, 'blocked_until')) or 0
+if blocked_until > current then
+  redis.call('HSET', key, 'blocked_until', tostring(blocked_until), 'tokens', '0', 'ts', tostring(now))
+end
+redis.call('EXPIRE', key, 300)
+return 1
+"""
+
+# Tushare频率限制错误信息特征（按分钟/小时的限制可以通过等待恢复，按天的限制不重试）
+_QUOTA_ERROR_PATTERNS = ('每分钟最多访问', '每小时最多访问', '访问频率', '频率超限', 'too many requests')
+_QUOTA_LIMIT_PATTERN = re.compile(r'每分钟最多访问该接口(\d+)次')
+
+
+class _ApiRateState:
+    """
+    单个接口的本地限流状态
+    """
+
+    __slots__ = ('blocked_until', 'learned_limit', 'rate_factor', 'tokens', 'updated_at')
+
+    def __init__(self) -> None:
+        self.tokens: float | None = None
+        self.updated_at = time.monotonic()
+        self.blocked_until = 0.0
+        self.rate_factor = 1.0
+        self.learned_limit: int | None = None
+
+
+class TushareRateLimiter:
+    """
+    Tushare接口调用限流器（按接口代码限流）
+
+    每个接口一个令牌桶，速率来自接口配置的每分钟调用上限。启用Redis时令牌桶存放在Redis中，
+    多个进程/后台任务共享同一个桶，合计调用量不超过上限；Redis不可用时回退到进程内令牌桶。
+    检测到Tushare频率限制错误后，会暂停该接口一段时间并降低速率（乘性降低），
+    之后每次调用成功逐步恢复（加性恢复）；错误信息中带有上限次数时，会自动学习该上限。
+    """
+
+    _states: dict[str, _ApiRateState] = {}
+    _lock = threading.Lock()
+    _redis_client: redis.Redis | None = None
+    _redis_disabled_until = 0.0
+
+    @classmethod
+    def _get_state(cls, api_code: str) -> _ApiRateState:
+        state = cls._states.get(api_code)
+        if state is None:
+            with cls._lock:
+                state = cls._states.setdefault(api_code, _ApiRateState())
+        return state
+
+    @classmethod
+    def _get_redis(cls) -> redis.Redis | None:
+        """
+        获取同步Redis客户端（在默认线程池中使用，不阻塞事件循环）
+
+        :return: Redis客户端，未启用或暂时不可用时返回None
+        """
+        if not TushareConfig.tushare_rate_limit_redis or time.monotonic() < cls._redis_disabled_until:
+            return None
+        if cls._redis_client is None:
+            with cls._lock:
+                if cls._redis_client is None:
+                    cls._redis_client = redis.Redis(
+                        host=RedisConfig.redis_host,
+                        port=RedisConfig.redis_port,
+                        username=RedisConfig.redis_username or None,
+                        password=RedisConfig.redis_password or None,
+                        db=RedisConfig.redis_database,
+                        socket_timeout=1,
+                        socket_connect_timeout=1,
+                        decode_responses=True,
+                    )
+        return cls._redis_client
+
+    @classmethod
+    def _disable_redis(cls, error: Exception) -> None:
+        cls._redis_disabled_until = time.monotonic() + REDIS_RETRY_INTERVAL
+        logger.warning(f'Tushare限流器访问Redis失败，{REDIS_RETRY_INTERVAL}秒内改用进程内限流: {error}')
+
+    @classmethod
+    def get_effective_rate(cls, api_code: str, rate_limit: int | None) -> float:
+        """
+        计算接口当前的有效速率（每秒调用次数）
+
+        :param api_code: 接口代码
+        :param rate_limit: 接口配置的每分钟调用上限（为空或0表示不限制）
+        :return: 每秒允许的调用次数，0表示不限速
+        """
+        state = cls._get_state(api_code)
+        limits = [limit for limit in (rate_limit, state.learned_limit) if limit and limit > 0]
+        if not limits:
+            return 0.0
+        return min(limits) / 60 * state.rate_factor
+
+    @classmethod
+    def _try_acquire_local(cls, api_code: str, rate: float) -> float:
+        state = cls._get_state(api_code)
+        with cls._lock:
+            now = time.monotonic()
+            capacity = max(1.0, rate * BURST_SECONDS)
+            tokens = capacity if state.tokens is None else state.tokens
+            tokens = min(capacity, tokens + (now - state.updated_at) * rate)
+            state.updated_at = now
+            if tokens >= 1:
+                state.tokens = tokens - 1
+                return 0.0
+            state.tokens = tokens
+            return (1 - tokens) / rate
+
+    @classmethod
+    def _try_acquire_redis(cls, client: redis.Redis, api_code: str, rate: float) -> float:
+        capacity = max(1.0, rate * BURST_SECONDS)
+        return float(client.eval(_ACQUIRE_SCRIPT, 1, f'tushare:rate_limit:{api_code}', rate, capacity))
+
+    @classmethod
+    async def acquire(cls, api_code: str, rate_limit: int | None = None) -> None:
+        """
+        获取一次调用许可，需要等待时异步休眠，不占用接口调用线程
+
+        :param api_code: 接口代码
+        :param rate_limit: 接口配置的每分钟调用上限（为空或0表示不限制）
+        :return: None
+        """
+        if not api_code:
+            return
+        state = cls._get_state(api_code)
+        while True:
+            rate = cls.get_effective_rate(api_code, rate_limit)
+            wait = state.blocked_until - time.monotonic()
+            if wait <= 0 and rate > 0:
+                client = cls._get_redis()
+                if client is None:
+                    wait = cls._try_acquire_local(api_code, rate)
+                else:
+                    try:
+                        wait = await asyncio.to_thread(cls._try_acquire_redis, client, api_code, rate)
+                    except RedisError as e:
+                        cls._disable_redis(e)
+                        continue
+            if wait <= 0:
+                return
+            await asyncio.sleep(min(wait, 5))
+
+    @classmethod
+    def is_quota_error(cls, error: BaseException) -> bool:
+        """
+        判断异常是否为可通过等待恢复的Tushare频率限制错误
+
+        :param error: 接口调用异常
+        :return: 是否为频率限制错误
+        """
+        message = str(error).lower()
+        return any(pattern in message for pattern in _QUOTA_ERROR_PATTERNS)
+
+    @classmethod
+    async def report_quota_error(cls, api_code: str, error: BaseException, attempt: int) -> float:
+        """
+        记录一次频率限制错误：暂停该接口并降低速率
+
+        :param api_code: 接口代码
+        :param error: 接口调用异常
+        :param attempt: 当前重试次数（从1开始）
+        :return: 暂停时长（秒）
+        """
+        backoff = min(60.0, 10.0 * 2 ** (attempt - 1))
+        state = cls._get_state(api_code)
+        match = _QUOTA_LIMIT_PATTERN.search(str(error))
+        with cls._lock:
+            state.rate_factor = max(MIN_RATE_FACTOR, state.rate_factor * 0.5)
+            state.blocked_until = max(state.blocked_until, time.monotonic() + backoff)
+            if match:
+                state.learned_limit = int(match.group(1))
+        client = cls._get_redis()
+        if client is not None:
+            try:
+                await asyncio.to_thread(client.eval, _BLOCK_SCRIPT, 1, f'tushare:rate_limit:{api_code}', backoff)
+            except RedisError as e:
+                cls._disable_redis(e)
+        logger.warning(
+            f'Tushare接口 {api_code} 触发频率限制，暂停 {backoff:.0f} 秒后重试（第{attempt}次），'
+            f'速率系数降至 {state.rate_factor:.2f}'
+        )
+        return backoff
+
+    @classmethod
+    def report_success(cls, api_code: str) -> None:
+        """
+        记录一次调用成功，逐步恢复被降低的速率
+
+        :param api_code: 接口代码
+        :return: None
+        """
+        state = cls._get_state(api_code)
+        if state.rate_factor < 1.0:
+            with cls._lock:
+                state.rate_factor = min(1.0, state.rate_factor + RATE_RECOVER_STEP)
@@ -0,0 +1,169 @@
+import asyncio
+import hashlib
+import json
+import os
+import time
+import uuid
+from collections.abc import Callable
+from typing import Any
+
+import pandas as pd
+
+from config.env import TushareConfig
+from module_tushare.task.tushare_api_executor import TushareApiExecutor
+from utils.log_util import logger
+
+try:
+    import pyarrow as pa
+except ImportError:
+    pa = None
+
+# 接口配置 cache_ttl 取该值时表示永久缓存（适用于已结束日期区间的历史数据，如 pro_bar）
+CACHE_TTL_PERMANENT = -1
+
+
+class ResponseCacheStats:
+    """
+    响应缓存命中统计
+    """
+
+    __slots__ = ('hits', 'misses')
+
+    def __init__(self) -> None:
+        self.hits = 0
+        self.misses = 0
+
+    def to_dict(self) -> dict[str, int]:
+        return {'cache_hits': self.hits, 'cache_misses': self.misses}
+
+
+class TushareResponseCache:
+    """
+    Tushare接口响应磁盘缓存
+
+    以接口代码和规范化后的参数计算内容哈希作为缓存键，每个响应保存为一个文件
+    （安装了 pyarrow 时为 Parquet，否则为 pickle），有效期由接口配置的 cache_ttl 决定：
+    为空或0不缓存，大于0为有效秒数，-1 为永久缓存。
+    重跑失败的流程、重放某一天或调试下游步骤时，相同参数的调用直接读取缓存，不再占用接口频率额度。
+    """
+
+    @classmethod
+    def is_enabled(cls, ttl: int | None) -> bool:
+        """
+        判断接口是否启用缓存
+
+        :param ttl: 接口配置的缓存有效期（秒）
+        :return: 是否启用
+        """
+        return bool(TushareConfig.tushare_cache_enabled and ttl and (ttl > 0 or ttl == CACHE_TTL_PERMANENT))
+
+    @classmethod
+    def make_key(cls, api_code: str, params: dict[str, Any]) -> str:
+        """
+        计算缓存键：参数按名称排序，忽略空值，字符串去除首尾空格
+
+        :param api_code: 接口代码
+        :param params: 接口参数
+        :return: 缓存键（SHA-256 十六进制字符串）
+        """
+        normalized = {
+            str(name): value.strip() if isinstance(value, str) else value
+            for name, value in params.items()
+            if value is not None and value != ''
+        }
+        payload = json.dumps([api_code, normalized], sort_keys=True, ensure_ascii=False, default=str)
+        return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+    @classmethod
+    def _get_path(cls, api_code: str, key: str) -> str:
+        suffix = 'parquet' if pa is not None else 'pkl'
+        return os.path.join(TushareConfig.tushare_cache_dir, api_code or '_', key[:2], f'{key}.{suffix}')
+
+    @classmethod
+    def load(cls, api_code: str, key: str, ttl: int) -> pd.DataFrame | None:
+        """
+        读取缓存（同步文件IO，应在线程中调用）
+
+        :param api_code: 接口代码
+        :param key: 缓存键
+        :param ttl: 缓存有效期（秒），-1 表示永久
+        :return: 缓存的数据，不存在、已过期或读取失败时返回None
+        """
+        path = cls._get_path(api_code, key)
+        try:
+            if ttl != CACHE_TTL_PERMANENT and time.time() - os.path.getmtime(path) > ttl:
+                os.remove(path)
+                return None
+            return pd.read_parquet(path) if pa is not None else pd.read_pickle(path)
+        except FileNotFoundError:
+            return None
+        except Exception as e:
+            logger.warning(f'读取Tushare接口 {api_code} 响应缓存失败，将重新调用接口: {e}')
+            return None
+
+    @classmethod
+    def store(cls, api_code: str, key: str, df: pd.DataFrame) -> None:
+        """
+        写入缓存（先写临时文件再原子替换，避免并发读到不完整的文件；同步文件IO，应在线程中调用）
+
+        :param api_code: 接口代码
+        :param key: 缓存键
+        :param df: 接口返回数据
+        :return: None
+        """
+        path = cls._get_path(api_code, key)
+        tmp_path = f'{path}.{uuid.uuid4().hex}.tmp'
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            if pa is not None:
+                df.to_parquet(tmp_path, index=False)
+            else:
+                df.to_pickle(tmp_path)
+            os.replace(tmp_path, path)
+        except Exception as e:
+            # 缓存写入失败（如列类型无法转换为Parquet）不影响本次调用结果
+            logger.warning(f'写入Tushare接口 {api_code} 响应缓存失败: {e}')
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+
+    @classmethod
+    async def fetch(
+        cls,
+        func: Callable[..., pd.DataFrame | None],
+        params: dict[str, Any],
+        api_code: str,
+        ttl: int | None = None,
+        rate_limit: int | None = None,
+        stats: ResponseCacheStats | None = None,
+    ) -> pd.DataFrame | None:
+        """
+        优先读取缓存，未命中时通过接口调用执行器调用接口并写入缓存
+
+        命中缓存时不经过限流器，也不占用接口调用线程；文件读写在默认线程池中进行。
+        空结果不写入缓存：接口客户端在HTTP请求失败时也返回空 DataFrame，缓存后会在有效期内一直返回无数据。
+
+        :param func: 同步的接口函数
+        :param params: 接口参数
+        :param api_code: 接口代码
+        :param ttl: 接口配置的缓存有效期（秒），为空或0表示不缓存，-1 表示永久
+        :param rate_limit: 接口每分钟调用上限
+        :param stats: 命中统计（可选）
+        :return: 接口返回数据
+        """
+        if not cls.is_enabled(ttl):
+            return await TushareApiExecutor.call(func, api_code=api_code, rate_limit=rate_limit, **params)
+
+        key = cls.make_key(api_code, params)
+        df = await asyncio.to_thread(cls.load, api_code, key, ttl)
+        if df is not None:
+            if stats is not None:
+                stats.hits += 1
+            logger.debug(f'Tushare接口 {api_code} 命中响应缓存，参数: {params}')
+            return df
+
+        df = await TushareApiExecutor.call(func, api_code=api_code, rate_limit=rate_limit, **params)
+        if stats is not None:
+            stats.misses += 1
+        if isinstance(df, pd.DataFrame) and not df.empty:
+            await asyncio.to_thread(cls.store, api_code, key, df)
+        return df
@@ -0,0 +1,114 @@
+import json
+from collections.abc import Iterable
+from typing import Any
+
+import pandas as pd
+
+# 流程参数中引用前一步结果的占位符
+PREVIOUS_STEP_PLACEHOLDER = 'previous_step'
+
+# NaN 彼此不相等，去重时统一用该键表示
+_NAN_KEY = object()
+
+
+class StreamingStepResult:
+    """
+    流式模式下的步骤结果（列式存储）
+
+    遍历模式下每个组合的数据写库后即可释放，只按列保留后续步骤引用到的字段的去重取值（按首次出现的顺序），
+    以及第一条完整记录（供变量参数和执行条件使用），内存占用与字段取值个数相关，与步骤总数据量无关。
+    后续步骤生成参数组合时，对遍历变量的取值与非流式模式（合并全部结果、去重后逐条提取）一致。
+    """
+
+    __slots__ = ('_seen', 'columns', 'first_record', 'row_count')
+
+    def __init__(self, fields: Iterable[str]) -> None:
+        self.columns: dict[str, list[Any]] = {field: [] for field in fields}
+        self._seen: dict[str, set] = {field: set() for field in self.columns}
+        self.first_record: dict[str, Any] | None = None
+        self.row_count = 0
+
+    def append(self, df: pd.DataFrame | None) -> None:
+        """
+        追加一批数据，只提取引用字段的新取值
+
+        :param df: 单个组合的接口返回数据
+        :return: None
+        """
+        if df is None or df.empty:
+            return
+        if self.first_record is None:
+            self.first_record = df.head(1).to_dict('records')[0]
+        self.row_count += len(df)
+        for field, values in self.columns.items():
+            if field not in df.columns:
+                continue
+            seen = self._seen[field]
+            for value in df[field].drop_duplicates().tolist():
+                key = _NAN_KEY if pd.isna(value) else value
+                if key not in seen:
+                    seen.add(key)
+                    values.append(value)
+
+    def field_values(self, field: str) -> list[Any] | None:
+        """
+        获取字段的去重取值
+
+        :param field: 字段名
+        :return: 取值列表，字段未被保留时返回None
+        """
+        return self.columns.get(field)
+
+    def __len__(self) -> int:
+        return self.row_count
+
+
+def _iter_param_sources(step_params: Any) -> Iterable[str]:
+    if not isinstance(step_params, dict):
+        return
+    for value in step_params.values():
+        if isinstance(value, dict) and value.get('type') in ('loop', 'variable'):
+            yield str(value.get('source') or '')
+        elif isinstance(value, str) and value.startswith('${') and value.endswith('}'):
+            yield value[2:-1]
+
+
+def iter_step_references(step: dict[str, Any]) -> Iterable[str]:
+    """
+    列出步骤参数和执行条件中引用的结果来源（如 stock_list.ts_code、previous_step.trade_date）
+
+    :param step: 步骤的缓存属性（需要 step_params、condition_expr）
+    :return: 引用来源
+    """
+    try:
+        yield from _iter_param_sources(json.loads(step.get('step_params') or '{}'))
+    except (json.JSONDecodeError, TypeError):
+        pass
+    try:
+        condition = json.loads(step.get('condition_expr') or '{}')
+        if isinstance(condition, dict) and condition.get('field'):
+            yield str(condition['field'])
+    except (json.JSONDecodeError, TypeError):
+        pass
+
+
+def find_referenced_fields(step_name: str, later_steps: Iterable[dict[str, Any]]) -> set[str] | None:
+    """
+    查找后续步骤参数和执行条件中引用的本步骤字段
+
+    引用形式包括 step_name.field 和 previous_step.field（previous_step 在执行时才能确定指向哪一步，按引用处理）。
+
+    :param step_name: 当前步骤名
+    :param later_steps: 后续步骤的缓存属性（需要 step_params、condition_expr）
+    :return: 被引用的字段集合；后续步骤引用了整个步骤结果（不带字段名）时返回None，表示无法只保留部分字段
+    """
+    fields: set[str] = set()
+    for later_step in later_steps:
+        for source in iter_step_references(later_step):
+            prefix, _, field = source.partition('.')
+            if prefix not in (step_name, PREVIOUS_STEP_PLACEHOLDER):
+                continue
+            if not field:
+                return None
+            fields.add(field)
+    return fields
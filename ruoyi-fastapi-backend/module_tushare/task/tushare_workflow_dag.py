@@ -0,0 +1,177 @@
+import asyncio
+import json
+from collections.abc import Awaitable, Callable, Container
+from typing import Any
+
+from module_tushare.task.tushare_step_result import PREVIOUS_STEP_PLACEHOLDER, iter_step_references
+from utils.log_util import logger
+
+
+def parse_step_ids(value: Any) -> list[int]:
+    """
+    解析步骤的前置/后置步骤ID列表（可视化编辑器以JSON数组字符串保存）
+
+    :param value: source_step_ids 或 target_step_ids 字段值
+    :return: 步骤ID列表，无法解析时返回空列表
+    """
+    if not value:
+        return []
+    if isinstance(value, str):
+        try:
+            value = json.loads(value)
+        except json.JSONDecodeError:
+            return []
+    if not isinstance(value, list):
+        return []
+    return [int(item) for item in value if isinstance(item, int) or (isinstance(item, str) and item.isdigit())]
+
+
+class WorkflowDag:
+    """
+    流程步骤依赖图
+
+    依赖关系取自可视化编辑器保存的连线（source_step_ids / target_step_ids），并补充参数和执行条件中的数据引用：
+    引用了其他步骤结果（step_name.field）的步骤依赖该步骤；引用 previous_step 但没有任何前置步骤的，
+    依赖按顺序排在它前面的最近一个步骤。没有依赖关系的分支可以并发执行，汇合节点等待全部前置步骤完成。
+    """
+
+    __slots__ = ('children', 'parents', 'positions', 'steps')
+
+    def __init__(self, steps: list[dict[str, Any]]) -> None:
+        """
+        :param steps: 按执行顺序排列的步骤缓存属性（需要 step_id、step_name、node_type、source_step_ids、
+                      target_step_ids、step_params、condition_expr）
+        """
+        self.steps = {step['step_id']: step for step in steps}
+        self.positions = {step['step_id']: position for position, step in enumerate(steps)}
+        self.parents: dict[int, set[int]] = {step_id: set() for step_id in self.steps}
+        self.children: dict[int, set[int]] = {step_id: set() for step_id in self.steps}
+
+        for step_id, step in self.steps.items():
+            for parent_id in parse_step_ids(step.get('source_step_ids')):
+                self._add_edge(parent_id, step_id)
+            for child_id in parse_step_ids(step.get('target_step_ids')):
+                self._add_edge(step_id, child_id)
+
+        step_ids_by_name = {step['step_name']: step_id for step_id, step in self.steps.items()}
+        for position, step in enumerate(steps):
+            step_id = step['step_id']
+            prefixes = {source.partition('.')[0] for source in iter_step_references(step)}
+            for prefix in prefixes:
+                # 只补充指向排在前面的步骤的引用，避免引用关系与连线构成环
+                if prefix in step_ids_by_name and self.positions[step_ids_by_name[prefix]] < position:
+                    self._add_edge(step_ids_by_name[prefix], step_id)
+            if PREVIOUS_STEP_PLACEHOLDER in prefixes and not self.parents[step_id]:
+                previous_task_steps = [
+                    previous_step for previous_step in steps[:position] if previous_step.get('node_type') == 'task'
+                ]
+                if previous_task_steps:
+                    self._add_edge(previous_task_steps[-1]['step_id'], step_id)
+
+    def _add_edge(self, parent_id: int, child_id: int) -> None:
+        if parent_id == child_id or parent_id not in self.steps or child_id not in self.steps:
+            return
+        self.parents[child_id].add(parent_id)
+        self.children[parent_id].add(child_id)
+
+    @classmethod
+    def build(cls, steps: list[dict[str, Any]]) -> 'WorkflowDag | None':
+        """
+        构建依赖图，流程没有任何连线或连线存在环时返回None（按步骤顺序串行执行）
+
+        :param steps: 按执行顺序排列的步骤缓存属性
+        :return: 依赖图
+        """
+        if not steps or any(step.get('step_id') is None for step in steps):
+            return None
+        if not any(step.get('source_step_ids') or step.get('target_step_ids') for step in steps):
+            return None
+        dag = cls(steps)
+        if dag.has_cycle():
+            logger.warning('流程步骤连线存在环，将按步骤顺序串行执行')
+            return None
+        return dag
+
+    def has_cycle(self) -> bool:
+        """
+        判断依赖图是否存在环（拓扑排序无法覆盖全部步骤）
+
+        :return: 是否存在环
+        """
+        in_degree = {step_id: len(parents) for step_id, parents in self.parents.items()}
+        ready = [step_id for step_id, degree in in_degree.items() if degree == 0]
+        visited = 0
+        while ready:
+            step_id = ready.pop()
+            visited += 1
+            for child_id in self.children[step_id]:
+                in_degree[child_id] -= 1
+                if in_degree[child_id] == 0:
+                    ready.append(child_id)
+        return visited < len(self.steps)
+
+    def descendants_of(self, step_id: int) -> list[dict[str, Any]]:
+        """
+        获取依赖图中位于步骤下游的全部步骤（只有下游步骤会在该步骤完成后执行并读取其结果）
+
+        :param step_id: 步骤ID
+        :return: 下游步骤的缓存属性，按执行顺序排列
+        """
+        descendant_ids: set[int] = set()
+        stack = list(self.children[step_id])
+        while stack:
+            child_id = stack.pop()
+            if child_id not in descendant_ids:
+                descendant_ids.add(child_id)
+                stack.extend(self.children[child_id])
+        return [self.steps[child_id] for child_id in sorted(descendant_ids, key=self.positions.__getitem__)]
+
+    def previous_step_of(self, step_id: int, produced: Container[str]) -> str | None:
+        """
+        确定步骤中 previous_step 占位符指向的步骤：已产出结果的前置步骤中顺序最靠后的一个
+
+        :param step_id: 步骤ID
+        :param produced: 已产出结果的步骤名
+        :return: 前一步的步骤名，没有时返回None
+        """
+        candidates = [
+            parent_id for parent_id in self.parents[step_id] if self.steps[parent_id]['step_name'] in produced
+        ]
+        if not candidates:
+            return None
+        return self.steps[max(candidates, key=self.positions.__getitem__)]['step_name']
+
+    async def run(self, execute: Callable[[int], Awaitable[None]], max_parallel: int) -> None:
+        """
+        按依赖关系调度执行全部步骤：前置步骤全部完成后即可开始，同时执行的步骤数不超过 max_parallel，
+        可同时开始的步骤按顺序优先。某个步骤抛出异常时取消其余正在执行的步骤并重新抛出该异常。
+
+        :param execute: 执行单个步骤的协程函数（参数为步骤ID）
+        :param max_parallel: 最大并行步骤数
+        :return: None
+        """
+        max_parallel = max(1, max_parallel)
+        pending_parents = {step_id: len(parents) for step_id, parents in self.parents.items()}
+        ready = sorted(
+            (step_id for step_id, count in pending_parents.items() if count == 0), key=self.positions.__getitem__
+        )
+        running: dict[asyncio.Task, int] = {}
+        try:
+            while ready or running:
+                while ready and len(running) < max_parallel:
+                    step_id = ready.pop(0)
+                    running[asyncio.create_task(execute(step_id))] = step_id
+                done, _ = await asyncio.wait(running, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    step_id = running.pop(task)
+                    task.result()
+                    for child_id in self.children[step_id]:
+                        pending_parents[child_id] -= 1
+                        if pending_parents[child_id] == 0:
+                            ready.append(child_id)
+                ready.sort(key=self.positions.__getitem__)
+        finally:
+            for task in running:
+                task.cancel()
+            if running:
+                await asyncio.gather(*running, return_exceptions=True)
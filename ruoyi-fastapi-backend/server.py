@@ -6,12 +6,16 @@ from fastapi.openapi.docs import get_redoc_html, get_swagger_ui_html
 from fastapi.responses import HTMLResponse
 
 from common.router import auto_register_routers
+from config.background_runtime import BackgroundRuntime
 from config.env import AppConfig
 from config.get_db import init_create_table
 from config.get_redis import RedisUtil
 from config.get_scheduler import SchedulerUtil
 from exceptions.handle import handle_exception
 from middlewares.handle import handle_middleware
+from module_tushare.dao.tushare_stock_index import TushareStockSearchIndex
+from module_tushare.task.tushare_api_executor import TushareApiExecutor
+from module_tushare.task.tushare_client import TushareClient
 from sub_applications.handle import handle_sub_applications
 from utils.common_util import worship
 from utils.log_util import logger
@@ -23,6 +27,7 @@ async def lifespan(app: FastAPI) -> AsyncGenerator[None, None]:
     logger.info(f'⏰️ {AppConfig.app_name}开始启动')
     worship()
     await init_create_table()
+    await TushareStockSearchIndex.refresh()
     app.state.redis = await RedisUtil.create_redis_pool()
     await RedisUtil.init_sys_dict(app.state.redis)
     await RedisUtil.init_sys_config(app.state.redis)
@@ -31,6 +36,9 @@ async def lifespan(app: FastAPI) -> AsyncGenerator[None, None]:
     yield
     await RedisUtil.close_redis_pool(app)
     await SchedulerUtil.close_system_scheduler()
+    BackgroundRuntime.shutdown()
+    TushareApiExecutor.shutdown()
+    TushareClient.shutdown()
 
 
 def setup_docs_static_resources(
@@ -0,0 +1,90 @@
+-- ----------------------------
+-- Tushare模块（MySQL）：旧库升级脚本
+-- 按顺序追加，每段只需执行一次；新环境直接执行 tushare_mysql.sql 即可
+-- ----------------------------
+
+-- 流程步骤：遍历并发数
+alter table tushare_workflow_step add column loop_concurrency int(11) default 1 comment '遍历并发数（遍历模式下同时进行的接口调用数，默认1）' after loop_mode;
+
+-- 接口配置：调用频率限制
+alter table tushare_api_config add column rate_limit int(11) comment '调用频率限制（每分钟最多调用次数，为空或0表示不限制）' after primary_key_fields;
+
+-- 流程步骤：流式模式
+alter table tushare_workflow_step add column stream_mode char(1) default '0' comment '流式模式（0否 1是，遍历模式下结果写库后不再保留，仅按列保留后续步骤引用的字段）' after loop_concurrency;
+
+-- 接口配置：响应缓存有效期
+alter table tushare_api_config add column cache_ttl int(11) comment '响应缓存有效期（单位：秒，为空或0表示不缓存，-1表示永久缓存）' after rate_limit;
+
+-- 运行检查点：遍历模式断点续跑
+create table if not exists tushare_download_checkpoint (
+  run_id          bigint(20)      not null                        comment '运行ID',
+  step_id         bigint(20)      not null                        comment '步骤ID',
+  combo_key       varchar(64)     not null                        comment '参数组合键（接口参数的SHA-256）',
+  combo_index     int(11)                                         comment '参数组合序号',
+  record_count    int(11)         default 0                       comment '写入记录数',
+  create_time     datetime        default current_timestamp       comment '创建时间',
+  primary key (run_id, step_id, combo_key)
+) engine=innodb comment='Tushare下载任务运行检查点表';
+
+-- 流程步骤：增量模式
+alter table tushare_workflow_step add column incremental_mode char(1) default '0' comment '增量模式（0否 1是，遍历模式下按目标表已有数据的交易日范围改写开始日期，已覆盖的组合跳过）' after stream_mode;
+
+-- 流程步骤：提交批次
+alter table tushare_workflow_step add column commit_every int(11) comment '提交批次大小（遍历模式下每写入多少个组合或多少条记录提交一次事务，为空使用默认值）' after incremental_mode;
+alter table tushare_workflow_step add column commit_unit char(1) default '0' comment '提交批次单位（0按组合数 1按记录数）' after commit_every;
+
+-- 下载日志：记录步骤ID，按任务和步骤累计统计
+alter table tushare_download_log add column step_id bigint(20) comment '步骤ID（流程配置任务的步骤日志）' after task_name;
+alter table tushare_download_log add index idx_task_step (task_id, step_id);
+-- 按日志名称中的步骤名回填历史日志的步骤ID
+update tushare_download_log l
+  join tushare_download_task t on l.task_id = t.task_id
+  join tushare_workflow_step s on s.workflow_id = t.workflow_id
+   set l.step_id = s.step_id
+ where l.step_id is null
+   and l.task_name like concat('%[', s.step_name, ']%');
+create table if not exists tushare_download_stat (
+  task_id         bigint(20)      not null                        comment '任务ID',
+  step_id         bigint(20)      not null                        comment '步骤ID（0表示任务合计）',
+  log_count       int(11)         default 0                       comment '日志数',
+  success_count   int(11)         default 0                       comment '成功日志数',
+  fail_count      int(11)         default 0                       comment '失败日志数',
+  total_records   bigint(20)      default 0                       comment '累计记录数',
+  total_duration  bigint(20)      default 0                       comment '累计执行时长（秒）',
+  duration_count  int(11)         default 0                       comment '记录了执行时长的日志数',
+  update_time     datetime        default current_timestamp       comment '更新时间',
+  primary key (task_id, step_id)
+) engine=innodb comment='Tushare下载日志统计表';
+-- 由历史日志重建统计
+delete from tushare_download_stat;
+insert into tushare_download_stat (task_id, step_id, log_count, success_count, fail_count, total_records, total_duration, duration_count, update_time)
+select task_id, 0, count(*), sum(case when status = '0' then 1 else 0 end), sum(case when status = '1' then 1 else 0 end),
+       coalesce(sum(record_count), 0), coalesce(sum(duration), 0), count(duration), current_timestamp
+  from tushare_download_log group by task_id;
+insert into tushare_download_stat (task_id, step_id, log_count, success_count, fail_count, total_records, total_duration, duration_count, update_time)
+select task_id, step_id, count(*), sum(case when status = '0' then 1 else 0 end), sum(case when status = '1' then 1 else 0 end),
+       coalesce(sum(record_count), 0), coalesce(sum(duration), 0), count(duration), current_timestamp
+  from tushare_download_log where step_id is not null group by task_id, step_id;
+
+-- 日线行情：(ts_code, trade_date) 主键，去掉 data_id 代理主键（同一股票同一交易日保留最新一条）
+-- 先删除键为空或非法的行并收窄键列，原 varchar(500) utf8mb4 上的联合索引超过 InnoDB 3072 字节的索引长度上限
+delete from tushare_pro_bar
+ where ts_code is null or trade_date is null or char_length(ts_code) > 16 or trade_date not regexp '^[0-9]{8}$';
+alter table tushare_pro_bar
+  modify ts_code varchar(16) not null comment '股票代码',
+  modify trade_date varchar(8) not null comment '交易日期（YYYYMMDD）';
+-- 动态建的表只有 data_id 主键，先建临时索引，避免去重自连接逐行全表扫描
+alter table tushare_pro_bar add index idx_pro_bar_dedup (ts_code, trade_date, data_id);
+delete b from tushare_pro_bar b
+  join tushare_pro_bar k on k.ts_code = b.ts_code and k.trade_date = b.trade_date and k.data_id > b.data_id;
+alter table tushare_pro_bar
+  drop index idx_pro_bar_dedup,
+  drop column data_id,
+  add primary key (ts_code, trade_date),
+  add index idx_pro_bar_trade_date (trade_date);
+
+-- 接口配置：通用表热点字段（热点列 hf_<字段名> 及索引在保存接口配置时按需创建并回填）
+alter table tushare_api_config add column hot_fields text comment '热点字段（JSON格式，在通用表中提取为带索引的独立列）' after cache_ttl;
+
+-- 运行记录：写入前按唯一键批内去重丢弃的记录数
+alter table tushare_download_run add column dedup_records int(11) default 0 comment '写入前批内去重丢弃的记录数' after fail_records;
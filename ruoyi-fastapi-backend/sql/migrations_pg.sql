@@ -0,0 +1,146 @@
+-- ----------------------------
+-- Tushare模块（PostgreSQL）：旧库升级脚本
+-- 按顺序追加，每段均可重复执行；新环境直接执行 tushare_pg.sql 即可
+-- ----------------------------
+
+-- 流程步骤：遍历并发数
+alter table tushare_workflow_step add column if not exists loop_concurrency integer default 1;
+comment on column tushare_workflow_step.loop_concurrency is '遍历并发数（遍历模式下同时进行的接口调用数，默认1）';
+
+-- 接口配置：调用频率限制
+alter table tushare_api_config add column if not exists rate_limit integer;
+comment on column tushare_api_config.rate_limit is '调用频率限制（每分钟最多调用次数，为空或0表示不限制）';
+
+-- 流程步骤：流式模式
+alter table tushare_workflow_step add column if not exists stream_mode char(1) default '0';
+comment on column tushare_workflow_step.stream_mode is '流式模式（0否 1是，遍历模式下结果写库后不再保留，仅按列保留后续步骤引用的字段）';
+
+-- 接口配置：响应缓存有效期
+alter table tushare_api_config add column if not exists cache_ttl integer;
+comment on column tushare_api_config.cache_ttl is '响应缓存有效期（单位：秒，为空或0表示不缓存，-1表示永久缓存）';
+
+-- 运行检查点：遍历模式断点续跑
+create table if not exists tushare_download_checkpoint (
+  run_id          bigint        not null,
+  step_id         bigint        not null,
+  combo_key       varchar(64)   not null,
+  combo_index     integer,
+  record_count    integer       default 0,
+  create_time     timestamp     default current_timestamp,
+  primary key (run_id, step_id, combo_key)
+);
+comment on table tushare_download_checkpoint is 'Tushare下载任务运行检查点表';
+comment on column tushare_download_checkpoint.run_id is '运行ID';
+comment on column tushare_download_checkpoint.step_id is '步骤ID';
+comment on column tushare_download_checkpoint.combo_key is '参数组合键（接口参数的SHA-256）';
+comment on column tushare_download_checkpoint.combo_index is '参数组合序号';
+comment on column tushare_download_checkpoint.record_count is '写入记录数';
+comment on column tushare_download_checkpoint.create_time is '创建时间';
+
+-- 流程步骤：增量模式
+alter table tushare_workflow_step add column if not exists incremental_mode char(1) default '0';
+comment on column tushare_workflow_step.incremental_mode is '增量模式（0否 1是，遍历模式下按目标表已有数据的交易日范围改写开始日期，已覆盖的组合跳过）';
+
+-- 流程步骤：提交批次
+alter table tushare_workflow_step add column if not exists commit_every integer;
+alter table tushare_workflow_step add column if not exists commit_unit char(1) default '0';
+comment on column tushare_workflow_step.commit_every is '提交批次大小（遍历模式下每写入多少个组合或多少条记录提交一次事务，为空使用默认值）';
+comment on column tushare_workflow_step.commit_unit is '提交批次单位（0按组合数 1按记录数）';
+
+-- 下载日志：记录步骤ID，按任务和步骤累计统计
+alter table tushare_download_log add column if not exists step_id bigint;
+comment on column tushare_download_log.step_id is '步骤ID（流程配置任务的步骤日志）';
+create index if not exists idx_task_step_log on tushare_download_log(task_id, step_id);
+-- 按日志名称中的步骤名回填历史日志的步骤ID
+update tushare_download_log l
+   set step_id = s.step_id
+  from tushare_download_task t
+  join tushare_workflow_step s on s.workflow_id = t.workflow_id
+ where l.step_id is null
+   and l.task_id = t.task_id
+   and l.task_name like '%[' || s.step_name || ']%';
+create table if not exists tushare_download_stat (
+  task_id         bigint        not null,
+  step_id         bigint        not null,
+  log_count       integer       default 0,
+  success_count   integer       default 0,
+  fail_count      integer       default 0,
+  total_records   bigint        default 0,
+  total_duration  bigint        default 0,
+  duration_count  integer       default 0,
+  update_time     timestamp     default current_timestamp,
+  primary key (task_id, step_id)
+);
+comment on table tushare_download_stat is 'Tushare下载日志统计表';
+comment on column tushare_download_stat.task_id is '任务ID';
+comment on column tushare_download_stat.step_id is '步骤ID（0表示任务合计）';
+comment on column tushare_download_stat.log_count is '日志数';
+comment on column tushare_download_stat.success_count is '成功日志数';
+comment on column tushare_download_stat.fail_count is '失败日志数';
+comment on column tushare_download_stat.total_records is '累计记录数';
+comment on column tushare_download_stat.total_duration is '累计执行时长（秒）';
+comment on column tushare_download_stat.duration_count is '记录了执行时长的日志数';
+comment on column tushare_download_stat.update_time is '更新时间';
+-- 由历史日志重建统计
+delete from tushare_download_stat;
+insert into tushare_download_stat (task_id, step_id, log_count, success_count, fail_count, total_records, total_duration, duration_count, update_time)
+select task_id, 0, count(*), sum(case when status = '0' then 1 else 0 end), sum(case when status = '1' then 1 else 0 end),
+       coalesce(sum(record_count), 0), coalesce(sum(duration), 0), count(duration), current_timestamp
+  from tushare_download_log group by task_id;
+insert into tushare_download_stat (task_id, step_id, log_count, success_count, fail_count, total_records, total_duration, duration_count, update_time)
+select task_id, step_id, count(*), sum(case when status = '0' then 1 else 0 end), sum(case when status = '1' then 1 else 0 end),
+       coalesce(sum(record_count), 0), coalesce(sum(duration), 0), count(duration), current_timestamp
+  from tushare_download_log where step_id is not null group by task_id, step_id;
+
+-- 日线行情：(ts_code, trade_date) 主键，按交易日期年度范围分区
+-- 原表改名为 tushare_pro_bar_bak 保留（按实体定义的字段迁移，同一股票同一交易日保留最新一条），确认无误后可删除
+do $$
+declare
+  y integer;
+begin
+  if exists (select 1 from pg_class c join pg_namespace n on n.oid = c.relnamespace
+              where n.nspname = 'public' and c.relname = 'tushare_pro_bar' and c.relkind = 'r') then
+    alter table tushare_pro_bar rename to tushare_pro_bar_bak;
+    alter index if exists tushare_pro_bar_pkey rename to tushare_pro_bar_bak_pkey;
+    create table tushare_pro_bar (
+      ts_code         varchar(16)       not null,
+      trade_date      varchar(8)        not null,
+      task_id         bigint            not null,
+      config_id       bigint            not null,
+      api_code        varchar(100)      not null,
+      download_date   varchar(20),
+      create_time     timestamp(0)      default current_timestamp,
+      open            double precision,
+      high            double precision,
+      low             double precision,
+      close           double precision,
+      pre_close       double precision,
+      change          double precision,
+      pct_chg         double precision,
+      vol             double precision,
+      amount          double precision,
+      primary key (ts_code, trade_date)
+    ) partition by range (trade_date);
+    create index idx_pro_bar_trade_date on tushare_pro_bar (trade_date);
+    comment on table tushare_pro_bar is 'Tushare Pro Bar数据表';
+    comment on column tushare_pro_bar.ts_code is '股票代码';
+    comment on column tushare_pro_bar.trade_date is '交易日期（YYYYMMDD）';
+    for y in select distinct left(trade_date, 4)::integer from tushare_pro_bar_bak where trade_date ~ '^[0-9]{8}$' loop
+      execute format('create table if not exists %I partition of tushare_pro_bar for values from (%L) to (%L)',
+                     'tushare_pro_bar_' || y, y || '0101', (y + 1) || '0101');
+    end loop;
+    insert into tushare_pro_bar (ts_code, trade_date, task_id, config_id, api_code, download_date, create_time, open, high, low, close, pre_close, change, pct_chg, vol, amount)
+    select distinct on (ts_code, trade_date) ts_code, trade_date, task_id, config_id, api_code, download_date, create_time, open, high, low, close, pre_close, change, pct_chg, vol, amount
+      from tushare_pro_bar_bak
+     where ts_code is not null and trade_date ~ '^[0-9]{8}$'
+     order by ts_code, trade_date, data_id desc;
+  end if;
+end $$;
+
+-- 接口配置：通用表热点字段（热点列 hf_<字段名> 及索引在保存接口配置时按需创建并回填）
+alter table tushare_api_config add column if not exists hot_fields text;
+comment on column tushare_api_config.hot_fields is '热点字段（JSON格式，在通用表中提取为带索引的独立列）';
+
+-- 运行记录：写入前按唯一键批内去重丢弃的记录数
+alter table tushare_download_run add column if not exists dedup_records integer default 0;
+comment on column tushare_download_run.dedup_records is '写入前批内去重丢弃的记录数';
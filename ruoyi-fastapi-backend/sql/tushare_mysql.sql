@@ -15,6 +15,9 @@ create table tushare_api_config (
   api_params          text                                        comment '接口参数（JSON格式）',
   data_fields         text                                        comment '数据字段（JSON格式，用于指定需要下载的字段）',
   primary_key_fields  text                                        comment '主键字段配置（JSON格式，为空则使用默认data_id主键）',
+  rate_limit          int(11)                                     comment '调用频率限制（每分钟最多调用次数，为空或0表示不限制）',
+  cache_ttl           int(11)                                     comment '响应缓存有效期（单位：秒，为空或0表示不缓存，-1表示永久缓存）',
+  hot_fields          text                                        comment '热点字段（JSON格式，在通用表中提取为带索引的独立列）',
   status              char(1)         default '0'                 comment '状态（0正常 1停用）',
   create_by           varchar(64)     default ''                  comment '创建者',
   create_time         datetime                                     comment '创建时间',
@@ -39,6 +42,7 @@ drop table if exists tushare_download_task;
 create table tushare_download_task (
   task_id             bigint(20)      not null auto_increment    comment '任务ID',
   task_name           varchar(100)    not null                    comment '任务名称',
+  step_id             bigint(20)                                  comment '步骤ID（流程配置任务的步骤日志）',
   config_id           bigint(20)                                   comment '接口配置ID（流程配置模式下可以为空）',
   workflow_id         bigint(20)                                   comment '流程配置ID（如果存在则执行流程，否则执行单个接口）',
   task_type           varchar(20)     default 'single'            comment '任务类型（single:单个接口 workflow:流程配置）',
@@ -47,7 +51,7 @@ create table tushare_download_task (
   end_date            varchar(20)                                 comment '结束日期（YYYYMMDD）',
   task_params         text                                        comment '任务参数（JSON格式，覆盖接口默认参数）',
   save_path           varchar(500)                                 comment '保存路径',
-  save_format         varchar(20)     default 'csv'              comment '保存格式（csv/excel/json）',
+  save_format         varchar(20)     default 'csv'              comment '保存格式（csv/excel/json/parquet）',
   save_to_db          char(1)         default '0'                 comment '是否保存到数据库（0否 1是）',
   data_table_name     varchar(100)                                comment '数据存储表名（为空则使用默认表tushare_data）',
   status              char(1)         default '0'                 comment '状态（0正常 1暂停）',
@@ -92,6 +96,7 @@ create table tushare_download_log (
   create_time         datetime                                     comment '创建时间',
   primary key (log_id),
   key idx_task_id (task_id),
+  key idx_task_step (task_id, step_id),
   key idx_config_id (config_id),
   key idx_create_time (create_time)
 ) engine=innodb auto_increment=1 comment = 'Tushare下载日志表';
@@ -160,6 +165,11 @@ create table tushare_workflow_step (
   layout_data          json                                        comment '完整的布局数据（JSON格式，存储节点位置、连接线等可视化信息）',
   data_table_name      varchar(100)                                comment '数据存储表名（为空则使用任务配置的表名或默认表名）',
   loop_mode            char(1)         default '0'                 comment '遍历模式（0否 1是，开启后所有变量参数都会遍历）',
+  loop_concurrency     int(11)         default 1                   comment '遍历并发数（遍历模式下同时进行的接口调用数，默认1）',
+  stream_mode          char(1)         default '0'                 comment '流式模式（0否 1是，遍历模式下结果写库后不再保留，仅按列保留后续步骤引用的字段）',
+  incremental_mode     char(1)         default '0'                 comment '增量模式（0否 1是，遍历模式下按目标表已有数据的交易日范围改写开始日期，已覆盖的组合跳过）',
+  commit_every         int(11)                                     comment '提交批次大小（遍历模式下每写入多少个组合或多少条记录提交一次事务，为空使用默认值）',
+  commit_unit          char(1)         default '0'                 comment '提交批次单位（0按组合数 1按记录数）',
   update_mode          char(1)         default '0'                 comment '数据更新方式（0仅插入 1忽略重复 2存在则更新 3先删除再插入）',
   unique_key_fields    text                                        comment '唯一键字段配置（JSON格式，为空则自动检测）',
   status               char(1)         default '0'                 comment '状态（0正常 1停用）',
@@ -266,6 +276,7 @@ CREATE TABLE tushare_download_run (
   total_records   INT(11)         DEFAULT 0                       COMMENT '本次处理总记录数',
   success_records INT(11)         DEFAULT 0                       COMMENT '成功记录数',
   fail_records    INT(11)         DEFAULT 0                       COMMENT '失败记录数',
+  dedup_records   INT(11)         DEFAULT 0                       COMMENT '写入前批内去重丢弃的记录数',
   error_message   TEXT                                            COMMENT '错误信息',
   create_time     DATETIME        DEFAULT CURRENT_TIMESTAMP       COMMENT '创建时间',
   update_time     DATETIME                                        COMMENT '更新时间',
@@ -275,3 +286,65 @@ CREATE TABLE tushare_download_run (
   KEY idx_start_time_run (start_time),
   KEY idx_end_time_run (end_time)
 ) ENGINE=InnoDB AUTO_INCREMENT=1 COMMENT='Tushare下载任务运行表（运行总览）';
+
+-- ----------------------------
+-- Tushare下载任务运行检查点表 MySQL 版本
+-- 遍历模式下每个已提交的参数组合一行，续跑时跳过；运行成功后清理
+-- ----------------------------
+DROP TABLE IF EXISTS tushare_download_checkpoint;
+
+CREATE TABLE tushare_download_checkpoint (
+  run_id          BIGINT(20)      NOT NULL                        COMMENT '运行ID',
+  step_id         BIGINT(20)      NOT NULL                        COMMENT '步骤ID',
+  combo_key       VARCHAR(64)     NOT NULL                        COMMENT '参数组合键（接口参数的SHA-256）',
+  combo_index     INT(11)                                         COMMENT '参数组合序号',
+  record_count    INT(11)         DEFAULT 0                       COMMENT '写入记录数',
+  create_time     DATETIME        DEFAULT CURRENT_TIMESTAMP       COMMENT '创建时间',
+  PRIMARY KEY (run_id, step_id, combo_key)
+) ENGINE=InnoDB COMMENT='Tushare下载任务运行检查点表';
+
+-- ----------------------------
+-- Tushare下载日志统计表 MySQL 版本
+-- 按任务（step_id = 0）和步骤累计下载日志数，与日志在同一事务中更新，任务统计接口直接读取
+-- ----------------------------
+DROP TABLE IF EXISTS tushare_download_stat;
+
+CREATE TABLE tushare_download_stat (
+  task_id         BIGINT(20)      NOT NULL                        COMMENT '任务ID',
+  step_id         BIGINT(20)      NOT NULL                        COMMENT '步骤ID（0表示任务合计）',
+  log_count       INT(11)         DEFAULT 0                       COMMENT '日志数',
+  success_count   INT(11)         DEFAULT 0                       COMMENT '成功日志数',
+  fail_count      INT(11)         DEFAULT 0                       COMMENT '失败日志数',
+  total_records   BIGINT(20)      DEFAULT 0                       COMMENT '累计记录数',
+  total_duration  BIGINT(20)      DEFAULT 0                       COMMENT '累计执行时长（秒）',
+  duration_count  INT(11)         DEFAULT 0                       COMMENT '记录了执行时长的日志数',
+  update_time     DATETIME        DEFAULT CURRENT_TIMESTAMP       COMMENT '更新时间',
+  PRIMARY KEY (task_id, step_id)
+) ENGINE=InnoDB COMMENT='Tushare下载日志统计表';
+
+-- ----------------------------
+-- Tushare Pro Bar数据表（日线行情）MySQL 版本
+-- 以 (ts_code, trade_date) 为主键
+-- ----------------------------
+DROP TABLE IF EXISTS tushare_pro_bar;
+
+CREATE TABLE tushare_pro_bar (
+  ts_code         VARCHAR(16)     NOT NULL                        COMMENT '股票代码',
+  trade_date      VARCHAR(8)      NOT NULL                        COMMENT '交易日期（YYYYMMDD）',
+  task_id         BIGINT(20)      NOT NULL                        COMMENT '任务ID',
+  config_id       BIGINT(20)      NOT NULL                        COMMENT '配置ID',
+  api_code        VARCHAR(100)    NOT NULL                        COMMENT '接口代码',
+  download_date   VARCHAR(20)                                     COMMENT '下载日期（YYYYMMDD）',
+  create_time     DATETIME        DEFAULT CURRENT_TIMESTAMP       COMMENT '创建时间',
+  open            DOUBLE                                          COMMENT '开盘价',
+  high            DOUBLE                                          COMMENT '最高价',
+  low             DOUBLE                                          COMMENT '最低价',
+  close           DOUBLE                                          COMMENT '收盘价',
+  pre_close       DOUBLE                                          COMMENT '昨收价',
+  `change`        DOUBLE                                          COMMENT '涨跌额',
+  pct_chg         DOUBLE                                          COMMENT '涨跌幅',
+  vol             DOUBLE                                          COMMENT '成交量',
+  amount          DOUBLE                                          COMMENT '成交额',
+  PRIMARY KEY (ts_code, trade_date),
+  KEY idx_pro_bar_trade_date (trade_date)
+) ENGINE=InnoDB COMMENT='Tushare Pro Bar数据表';
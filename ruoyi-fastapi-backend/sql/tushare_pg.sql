@@ -15,6 +15,9 @@ create table tushare_api_config (
   api_params          text,
   data_fields         text,
   primary_key_fields  text,
+  rate_limit          integer,
+  cache_ttl           integer,
+  hot_fields          text,
   status              char(1)        default '0',
   create_by           varchar(64)     default '',
   create_time         timestamp(0),
@@ -31,6 +34,9 @@ comment on column tushare_api_config.api_desc is '接口描述';
 comment on column tushare_api_config.api_params is '接口参数（JSON格式）';
 comment on column tushare_api_config.data_fields is '数据字段（JSON格式，用于指定需要下载的字段）';
 comment on column tushare_api_config.primary_key_fields is '主键字段配置（JSON格式，为空则使用默认data_id主键）';
+comment on column tushare_api_config.rate_limit is '调用频率限制（每分钟最多调用次数，为空或0表示不限制）';
+comment on column tushare_api_config.cache_ttl is '响应缓存有效期（单位：秒，为空或0表示不缓存，-1表示永久缓存）';
+comment on column tushare_api_config.hot_fields is '热点字段（JSON格式，在通用表中提取为带索引的独立列）';
 comment on column tushare_api_config.status is '状态（0正常 1停用）';
 comment on column tushare_api_config.create_by is '创建者';
 comment on column tushare_api_config.create_time is '创建时间';
@@ -91,7 +97,7 @@ comment on column tushare_download_task.start_date is '开始日期（YYYYMMDD
 comment on column tushare_download_task.end_date is '结束日期（YYYYMMDD）';
 comment on column tushare_download_task.task_params is '任务参数（JSON格式，覆盖接口默认参数）';
 comment on column tushare_download_task.save_path is '保存路径';
-comment on column tushare_download_task.save_format is '保存格式（csv/excel/json）';
+comment on column tushare_download_task.save_format is '保存格式（csv/excel/json/parquet）';
 comment on column tushare_download_task.save_to_db is '是否保存到数据库（0否 1是）';
 comment on column tushare_download_task.data_table_name is '数据存储表名（为空则使用默认表tushare_data）';
 comment on column tushare_download_task.status is '状态（0正常 1暂停）';
@@ -120,6 +126,7 @@ create table tushare_download_log (
   log_id              bigserial      not null,
   task_id             bigint         not null,
   task_name           varchar(100)   not null,
+  step_id             bigint,
   config_id           bigint         not null,
   api_name            varchar(100)   not null,
   download_date       varchar(20),
@@ -132,11 +139,13 @@ create table tushare_download_log (
   primary key (log_id)
 );
 create index idx_task_id on tushare_download_log(task_id);
+create index idx_task_step_log on tushare_download_log(task_id, step_id);
 create index idx_config_id on tushare_download_log(config_id);
 create index idx_create_time on tushare_download_log(create_time);
 comment on column tushare_download_log.log_id is '日志ID';
 comment on column tushare_download_log.task_id is '任务ID';
 comment on column tushare_download_log.task_name is '任务名称';
+comment on column tushare_download_log.step_id is '步骤ID（流程配置任务的步骤日志）';
 comment on column tushare_download_log.config_id is '接口配置ID';
 comment on column tushare_download_log.api_name is '接口名称';
 comment on column tushare_download_log.download_date is '下载日期（YYYYMMDD）';
@@ -232,6 +241,11 @@ create table tushare_workflow_step (
   layout_data          jsonb,
   data_table_name      varchar(100),
   loop_mode            char(1)        default '0',
+  loop_concurrency     integer        default 1,
+  stream_mode          char(1)        default '0',
+  incremental_mode     char(1)        default '0',
+  commit_every         integer,
+  commit_unit          char(1)        default '0',
   update_mode          char(1)        default '0',
   unique_key_fields    text,
   status               char(1)        default '0',
@@ -260,6 +274,11 @@ comment on column tushare_workflow_step.target_step_ids is '后置步骤ID列表
 comment on column tushare_workflow_step.layout_data is '完整的布局数据（JSONB格式，存储节点位置、连接线等可视化信息）';
 comment on column tushare_workflow_step.data_table_name is '数据存储表名（为空则使用任务配置的表名或默认表名）';
 comment on column tushare_workflow_step.loop_mode is '遍历模式（0否 1是，开启后所有变量参数都会遍历）';
+comment on column tushare_workflow_step.loop_concurrency is '遍历并发数（遍历模式下同时进行的接口调用数，默认1）';
+comment on column tushare_workflow_step.stream_mode is '流式模式（0否 1是，遍历模式下结果写库后不再保留，仅按列保留后续步骤引用的字段）';
+comment on column tushare_workflow_step.incremental_mode is '增量模式（0否 1是，遍历模式下按目标表已有数据的交易日范围改写开始日期，已覆盖的组合跳过）';
+comment on column tushare_workflow_step.commit_every is '提交批次大小（遍历模式下每写入多少个组合或多少条记录提交一次事务，为空使用默认值）';
+comment on column tushare_workflow_step.commit_unit is '提交批次单位（0按组合数 1按记录数）';
 comment on column tushare_workflow_step.update_mode is '数据更新方式（0仅插入 1忽略重复 2存在则更新 3先删除再插入）';
 comment on column tushare_workflow_step.unique_key_fields is '唯一键字段配置（JSON格式，为空则自动检测）';
 comment on column tushare_workflow_step.status is '状态（0正常 1停用）';
@@ -362,6 +381,7 @@ CREATE TABLE tushare_download_run (
   total_records   INTEGER       DEFAULT 0,                      -- 本次处理总记录数
   success_records INTEGER       DEFAULT 0,                      -- 成功记录数
   fail_records    INTEGER       DEFAULT 0,                      -- 失败记录数
+  dedup_records   INTEGER       DEFAULT 0,                      -- 写入前批内去重丢弃的记录数
   error_message   TEXT,                                         -- 错误信息
   create_time     TIMESTAMP     DEFAULT CURRENT_TIMESTAMP,      -- 创建时间
   update_time     TIMESTAMP                                     -- 更新时间
@@ -383,6 +403,107 @@ COMMENT ON COLUMN tushare_download_run.progress        IS '进度（0-100）';
 COMMENT ON COLUMN tushare_download_run.total_records   IS '本次处理总记录数';
 COMMENT ON COLUMN tushare_download_run.success_records IS '成功记录数';
 COMMENT ON COLUMN tushare_download_run.fail_records    IS '失败记录数';
+COMMENT ON COLUMN tushare_download_run.dedup_records   IS '写入前批内去重丢弃的记录数';
 COMMENT ON COLUMN tushare_download_run.error_message   IS '错误信息';
 COMMENT ON COLUMN tushare_download_run.create_time     IS '创建时间';
 COMMENT ON COLUMN tushare_download_run.update_time     IS '更新时间';
+
+-- ----------------------------
+-- Tushare下载任务运行检查点表 PostgreSQL 版本
+-- 遍历模式下每个已提交的参数组合一行，续跑时跳过；运行成功后清理
+-- ----------------------------
+DROP TABLE IF EXISTS tushare_download_checkpoint;
+
+CREATE TABLE tushare_download_checkpoint (
+  run_id          BIGINT        NOT NULL,                       -- 运行ID
+  step_id         BIGINT        NOT NULL,                       -- 步骤ID
+  combo_key       VARCHAR(64)   NOT NULL,                       -- 参数组合键（接口参数的SHA-256）
+  combo_index     INTEGER,                                      -- 参数组合序号
+  record_count    INTEGER       DEFAULT 0,                      -- 写入记录数
+  create_time     TIMESTAMP     DEFAULT CURRENT_TIMESTAMP,      -- 创建时间
+  PRIMARY KEY (run_id, step_id, combo_key)
+);
+
+COMMENT ON TABLE  tushare_download_checkpoint IS 'Tushare下载任务运行检查点表';
+COMMENT ON COLUMN tushare_download_checkpoint.run_id       IS '运行ID';
+COMMENT ON COLUMN tushare_download_checkpoint.step_id      IS '步骤ID';
+COMMENT ON COLUMN tushare_download_checkpoint.combo_key    IS '参数组合键（接口参数的SHA-256）';
+COMMENT ON COLUMN tushare_download_checkpoint.combo_index  IS '参数组合序号';
+COMMENT ON COLUMN tushare_download_checkpoint.record_count IS '写入记录数';
+COMMENT ON COLUMN tushare_download_checkpoint.create_time  IS '创建时间';
+
+-- ----------------------------
+-- Tushare下载日志统计表 PostgreSQL 版本
+-- 按任务（step_id = 0）和步骤累计下载日志数，与日志在同一事务中更新，任务统计接口直接读取
+-- ----------------------------
+DROP TABLE IF EXISTS tushare_download_stat;
+
+CREATE TABLE tushare_download_stat (
+  task_id         BIGINT        NOT NULL,                       -- 任务ID
+  step_id         BIGINT        NOT NULL,                       -- 步骤ID（0表示任务合计）
+  log_count       INTEGER       DEFAULT 0,                      -- 日志数
+  success_count   INTEGER       DEFAULT 0,                      -- 成功日志数
+  fail_count      INTEGER       DEFAULT 0,                      -- 失败日志数
+  total_records   BIGINT        DEFAULT 0,                      -- 累计记录数
+  total_duration  BIGINT        DEFAULT 0,                      -- 累计执行时长（秒）
+  duration_count  INTEGER       DEFAULT 0,                      -- 记录了执行时长的日志数
+  update_time     TIMESTAMP     DEFAULT CURRENT_TIMESTAMP,      -- 更新时间
+  PRIMARY KEY (task_id, step_id)
+);
+
+COMMENT ON TABLE  tushare_download_stat IS 'Tushare下载日志统计表';
+COMMENT ON COLUMN tushare_download_stat.task_id        IS '任务ID';
+COMMENT ON COLUMN tushare_download_stat.step_id        IS '步骤ID（0表示任务合计）';
+COMMENT ON COLUMN tushare_download_stat.log_count      IS '日志数';
+COMMENT ON COLUMN tushare_download_stat.success_count  IS '成功日志数';
+COMMENT ON COLUMN tushare_download_stat.fail_count     IS '失败日志数';
+COMMENT ON COLUMN tushare_download_stat.total_records  IS '累计记录数';
+COMMENT ON COLUMN tushare_download_stat.total_duration IS '累计执行时长（秒）';
+COMMENT ON COLUMN tushare_download_stat.duration_count IS '记录了执行时长的日志数';
+COMMENT ON COLUMN tushare_download_stat.update_time    IS '更新时间';
+
+-- ----------------------------
+-- Tushare Pro Bar数据表（日线行情）PostgreSQL 版本
+-- 以 (ts_code, trade_date) 为主键，按交易日期年度范围分区；年度分区（tushare_pro_bar_YYYY）在写入数据时自动创建
+-- ----------------------------
+DROP TABLE IF EXISTS tushare_pro_bar;
+
+CREATE TABLE tushare_pro_bar (
+  ts_code         VARCHAR(16)       NOT NULL,                   -- 股票代码
+  trade_date      VARCHAR(8)        NOT NULL,                   -- 交易日期（YYYYMMDD）
+  task_id         BIGINT            NOT NULL,                   -- 任务ID
+  config_id       BIGINT            NOT NULL,                   -- 配置ID
+  api_code        VARCHAR(100)      NOT NULL,                   -- 接口代码
+  download_date   VARCHAR(20),                                  -- 下载日期（YYYYMMDD）
+  create_time     TIMESTAMP(0)      DEFAULT CURRENT_TIMESTAMP,  -- 创建时间
+  open            DOUBLE PRECISION,                             -- 开盘价
+  high            DOUBLE PRECISION,                             -- 最高价
+  low             DOUBLE PRECISION,                             -- 最低价
+  close           DOUBLE PRECISION,                             -- 收盘价
+  pre_close       DOUBLE PRECISION,                             -- 昨收价
+  change          DOUBLE PRECISION,                             -- 涨跌额
+  pct_chg         DOUBLE PRECISION,                             -- 涨跌幅
+  vol             DOUBLE PRECISION,                             -- 成交量
+  amount          DOUBLE PRECISION,                             -- 成交额
+  PRIMARY KEY (ts_code, trade_date)
+) PARTITION BY RANGE (trade_date);
+
+CREATE INDEX idx_pro_bar_trade_date ON tushare_pro_bar (trade_date);
+
+COMMENT ON TABLE  tushare_pro_bar IS 'Tushare Pro Bar数据表';
+COMMENT ON COLUMN tushare_pro_bar.ts_code       IS '股票代码';
+COMMENT ON COLUMN tushare_pro_bar.trade_date    IS '交易日期（YYYYMMDD）';
+COMMENT ON COLUMN tushare_pro_bar.task_id       IS '任务ID';
+COMMENT ON COLUMN tushare_pro_bar.config_id     IS '配置ID';
+COMMENT ON COLUMN tushare_pro_bar.api_code      IS '接口代码';
+COMMENT ON COLUMN tushare_pro_bar.download_date IS '下载日期（YYYYMMDD）';
+COMMENT ON COLUMN tushare_pro_bar.create_time   IS '创建时间';
+COMMENT ON COLUMN tushare_pro_bar.open          IS '开盘价';
+COMMENT ON COLUMN tushare_pro_bar.high          IS '最高价';
+COMMENT ON COLUMN tushare_pro_bar.low           IS '最低价';
+COMMENT ON COLUMN tushare_pro_bar.close         IS '收盘价';
+COMMENT ON COLUMN tushare_pro_bar.pre_close     IS '昨收价';
+COMMENT ON COLUMN tushare_pro_bar.change        IS '涨跌额';
+COMMENT ON COLUMN tushare_pro_bar.pct_chg       IS '涨跌幅';
+COMMENT ON COLUMN tushare_pro_bar.vol           IS '成交量';
+COMMENT ON COLUMN tushare_pro_bar.amount        IS '成交额';
@@ -0,0 +1,32 @@
+"""
+后台任务运行时回归测试：多次提交的任务在同一工作线程中复用事件循环和数据库引擎。
+"""
+
+import asyncio
+from typing import Any
+
+import pytest
+
+from config.background_runtime import BackgroundRuntime
+from config.env import DataBaseConfig
+
+
+def test_jobs_reuse_worker_loop_and_engine(monkeypatch: pytest.MonkeyPatch) -> None:
+    """工作线程数为1时，先后执行的任务拿到同一个引擎和事件循环；关闭后再提交会重新创建线程池。"""
+    monkeypatch.setattr(DataBaseConfig, 'db_background_workers', 1)
+    monkeypatch.setattr(BackgroundRuntime, '_executor', None)
+    monkeypatch.setattr(BackgroundRuntime, '_runtimes', [])
+
+    async def job(engine: Any, value: int) -> tuple[Any, asyncio.AbstractEventLoop, int]:
+        await asyncio.sleep(0)
+        return engine, asyncio.get_running_loop(), value
+
+    first = BackgroundRuntime.run(job, 1)
+    second = BackgroundRuntime.submit(job, value=2).result()
+
+    assert first[0] is second[0] and first[1] is second[1]
+    assert (first[2], second[2]) == (1, 2)
+    assert len(BackgroundRuntime._runtimes) == 1
+
+    BackgroundRuntime.shutdown()
+    assert BackgroundRuntime._executor is None and BackgroundRuntime._runtimes == []
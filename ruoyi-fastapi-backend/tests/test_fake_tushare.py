@@ -0,0 +1,80 @@
+"""
+模拟Tushare接口回归测试：字段与真实接口一致、结果确定、前收盘价衔接上一交易日、可作为 ts.pro_bar 的 api，
+错误注入与重复行按配置生效，TushareClient.set_provider 可替换客户端。
+"""
+
+import pandas as pd
+import pytest
+import tushare as ts
+
+from benchmarks.fake_tushare import (
+    DAILY_FIELDS,
+    STOCK_BASIC_FIELDS,
+    TRADE_CAL_FIELDS,
+    FakeTushareError,
+    FakeTushareProvider,
+)
+from module_tushare.task.tushare_client import TushareClient
+
+
+def test_schemas_and_determinism() -> None:
+    """各接口字段与 Tushare 一致，同一参数多次调用及不同实例的结果相同。"""
+    stock_count = 10
+    provider = FakeTushareProvider(stock_count=stock_count)
+
+    assert tuple(provider.stock_basic().columns) == STOCK_BASIC_FIELDS
+    assert tuple(provider.trade_cal(start_date='20240101', end_date='20240107').columns) == TRADE_CAL_FIELDS
+    daily = provider.daily(trade_date='20240108')
+    assert tuple(daily.columns) == DAILY_FIELDS
+    assert len(daily) == stock_count
+    pd.testing.assert_frame_equal(daily, FakeTushareProvider(stock_count=stock_count).daily(trade_date='20240108'))
+    assert provider.stock_basic(fields='ts_code,name').columns.tolist() == ['ts_code', 'name']
+
+
+def test_calendar_and_pre_close_follow_trading_days() -> None:
+    """周末休市，周一的前收盘价等于上周五的收盘价。"""
+    provider = FakeTushareProvider(stock_count=2)
+    calendar = provider.trade_cal(start_date='20240105', end_date='20240108')
+
+    assert calendar['is_open'].tolist() == [1, 0, 0, 1]
+    assert calendar['pretrade_date'].tolist() == ['20240105', '20240105', '20240105', '20240104']
+    friday = provider.daily(trade_date='20240105').set_index('ts_code')
+    monday = provider.daily(trade_date='20240108').set_index('ts_code')
+    assert provider.daily(trade_date='20240106').empty
+    assert monday['pre_close'].tolist() == friday['close'].tolist()
+
+
+def test_pro_bar_uses_provider_as_api() -> None:
+    """ts.pro_bar 通过 api.daily 获取日线，按交易日期倒序返回区间内的交易日。"""
+    provider = FakeTushareProvider(stock_count=4)
+    df = ts.pro_bar(ts_code='000001.SZ', api=provider, start_date='20240102', end_date='20240109')
+
+    assert df['trade_date'].tolist() == ['20240109', '20240108', '20240105', '20240104', '20240103', '20240102']
+    assert set(df['ts_code']) == {'000001.SZ'}
+
+
+def test_error_injection_and_duplicates() -> None:
+    """错误按参数确定注入（error_once 时重试成功），重复行按比例追加。"""
+    stock_count = 200
+    provider = FakeTushareProvider(stock_count=stock_count, error_rate=1.0, error_apis={'daily'}, duplicate_rate=0.05)
+    with pytest.raises(FakeTushareError):
+        provider.daily(trade_date='20240108')
+    assert len(provider.stock_basic()) == stock_count + stock_count // 20
+    assert (provider.call_count, provider.error_count) == (2, 1)
+
+    provider = FakeTushareProvider(stock_count=stock_count, error_rate=1.0, error_once=True)
+    with pytest.raises(FakeTushareError):
+        provider.daily(trade_date='20240108')
+    assert len(provider.daily(trade_date='20240108')) == stock_count
+
+
+def test_set_provider_replaces_client(monkeypatch: pytest.MonkeyPatch) -> None:
+    """设置模拟接口后 get_client 返回模拟接口，传入None后恢复真实客户端。"""
+    monkeypatch.setattr(TushareClient, '_clients', {})
+    provider = FakeTushareProvider(stock_count=1)
+    TushareClient.set_provider(provider)
+    try:
+        assert TushareClient.get_client('token') is provider
+    finally:
+        TushareClient.set_provider(None)
+    assert isinstance(TushareClient.get_client('token'), TushareClient)
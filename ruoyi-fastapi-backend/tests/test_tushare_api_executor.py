@@ -0,0 +1,47 @@
+"""
+Tushare接口调用执行器回归测试：超时从调用开始执行时计算，并发调用数超过线程数时排队时间不计入超时。
+"""
+
+import asyncio
+import time
+from collections.abc import Iterator
+
+import pytest
+
+from config.env import TushareConfig
+from module_tushare.task.tushare_api_executor import TushareApiExecutor, TushareApiTimeoutError
+
+MAX_WORKERS = 2
+CALL_SECONDS = 0.2
+
+
+@pytest.fixture(autouse=True)
+def small_executor(monkeypatch: pytest.MonkeyPatch) -> Iterator[None]:
+    """使用线程数很小的独立线程池，测试结束后关闭。"""
+    monkeypatch.setattr(TushareConfig, 'tushare_api_max_workers', MAX_WORKERS)
+    monkeypatch.setattr(TushareApiExecutor, '_executor', None)
+    yield
+    TushareApiExecutor.shutdown()
+
+
+def slow_call(value: int) -> int:
+    """模拟耗时的同步接口调用。"""
+    time.sleep(CALL_SECONDS)
+    return value
+
+
+@pytest.mark.asyncio
+async def test_queued_time_not_counted_against_timeout() -> None:
+    """并发调用数为线程数的4倍，排队总时长超过超时时间，但每次调用本身不超时。"""
+    calls = MAX_WORKERS * 4
+    results = await asyncio.gather(
+        *(TushareApiExecutor.call(slow_call, i, api_code='daily', timeout=CALL_SECONDS * 2) for i in range(calls))
+    )
+    assert results == list(range(calls))
+
+
+@pytest.mark.asyncio
+async def test_running_call_times_out() -> None:
+    """调用本身超过超时时间时抛出超时异常。"""
+    with pytest.raises(TushareApiTimeoutError):
+        await TushareApiExecutor.call(slow_call, 1, api_code='daily', timeout=CALL_SECONDS / 4)
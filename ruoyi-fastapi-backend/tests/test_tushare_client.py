@@ -0,0 +1,81 @@
+"""
+Tushare接口客户端回归测试：同一token复用同一客户端和HTTP会话，返回格式与 tushare SDK 一致，按接口记录调用耗时和失败次数
+（经接口调用执行器调用时按配置的接口代码记录）。
+"""
+
+import asyncio
+import json
+from typing import Any
+
+import pytest
+
+from module_tushare.task.tushare_api_executor import TushareApiExecutor
+from module_tushare.task.tushare_client import TushareClient
+
+
+class FakeResponse:
+    def __init__(self, payload: dict[str, Any], ok: bool = True) -> None:
+        self.text = json.dumps(payload)
+        self.ok = ok
+
+    def __bool__(self) -> bool:
+        return self.ok
+
+
+class FakeSession:
+    def __init__(self) -> None:
+        self.requests = []
+
+    def post(self, url: str, json: dict[str, Any] | None = None, timeout: float | None = None) -> FakeResponse:
+        self.requests.append(json)
+        if json['api_name'] == 'bad_api':
+            return FakeResponse({'code': 40203, 'msg': '抱歉，您每分钟最多访问该接口200次', 'data': None})
+        if json['api_name'] == 'down_api':
+            return FakeResponse({}, ok=False)
+        return FakeResponse(
+            {'code': 0, 'msg': '', 'data': {'fields': ['ts_code', 'close'], 'items': [['000001.SZ', 10.5]]}}
+        )
+
+
+def test_client_reuses_session_and_records_latency(monkeypatch: pytest.MonkeyPatch) -> None:
+    """同一token取到同一客户端；调用经同一会话发出，成功和失败（含非 2xx 响应）都计入该接口的耗时统计。"""
+    monkeypatch.setattr(TushareClient, '_clients', {})
+    monkeypatch.setattr(TushareClient, '_latency', {})
+    client = TushareClient.get_client('token', timeout=5)
+    assert TushareClient.get_client('token', timeout=5) is client
+    session = FakeSession()
+    monkeypatch.setattr(client, '_get_session', lambda: session)
+
+    df = client.daily(ts_code='000001.SZ')
+    assert df.to_dict('records') == [{'ts_code': '000001.SZ', 'close': 10.5}]
+    client.query('daily', fields='ts_code,close', trade_date='20240102')
+    with pytest.raises(Exception, match='每分钟最多访问该接口'):
+        client.bad_api()
+    assert client.down_api().empty
+
+    assert [request['api_name'] for request in session.requests] == ['daily', 'daily', 'bad_api', 'down_api']
+    assert session.requests[1] == {
+        'api_name': 'daily',
+        'token': 'token',
+        'params': {'trade_date': '20240102'},
+        'fields': 'ts_code,close',
+    }
+    stats = TushareClient.get_latency_stats()
+    assert (stats['daily']['call_count'], stats['daily']['error_count']) == (2, 0)
+    assert (stats['bad_api']['call_count'], stats['bad_api']['error_count']) == (1, 1)
+    assert (stats['down_api']['call_count'], stats['down_api']['error_count']) == (1, 1)
+
+
+def test_latency_keyed_on_configured_api_code(monkeypatch: pytest.MonkeyPatch) -> None:
+    """经执行器调用时耗时计入配置的接口代码（pro_bar 内部的 daily 计入 pro_bar），直接调用仍按HTTP接口名。"""
+    monkeypatch.setattr(TushareClient, '_clients', {})
+    monkeypatch.setattr(TushareClient, '_latency', {})
+    client = TushareClient.get_client('token', timeout=5)
+    monkeypatch.setattr(client, '_get_session', FakeSession)
+
+    asyncio.run(TushareApiExecutor.call(client.daily, api_code='pro_bar', timeout=0, ts_code='000001.SZ'))
+    client.daily(ts_code='000001.SZ')
+
+    stats = TushareClient.get_latency_stats()
+    assert stats['pro_bar']['call_count'] == 1
+    assert stats['daily']['call_count'] == 1
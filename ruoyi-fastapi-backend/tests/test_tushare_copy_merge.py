@@ -0,0 +1,154 @@
+"""
+PostgreSQL COPY 暂存表写入回归测试：各更新模式生成的暂存表、合并语句，以及失败时回滚保存点并返回None。
+"""
+
+import asyncio
+from typing import Any
+
+import numpy as np
+import pytest
+
+from module_tushare.dao.tushare_dao import TushareDataDao
+
+SYSTEM_VALUES = {'task_id': 1, 'api_code': 'daily'}
+DF_COLUMNS = ['ts_code', 'trade_date', 'close']
+COLUMN_ARRAYS = [
+    np.array(['000001.SZ', '000002.SZ'], dtype=object),
+    np.array(['20240102', '20240102'], dtype=object),
+    np.array([10.5, None], dtype=object),
+]
+COLUMNS = '"task_id", "api_code", "ts_code", "trade_date", "close"'
+UNIQUE_KEYS = ['ts_code', 'trade_date']
+
+
+class FakeResult:
+    rowcount = 1
+
+
+class FakeSavepoint:
+    def __init__(self) -> None:
+        self.state = 'open'
+
+    async def commit(self) -> None:
+        self.state = 'committed'
+
+    async def rollback(self) -> None:
+        self.state = 'rolled_back'
+
+
+class FakeDriverConnection:
+    def __init__(self, error: Exception | None) -> None:
+        self.error = error
+        self.copied: list[tuple[str, list[tuple], list[str]]] = []
+
+    async def copy_records_to_table(self, table_name: str, records: Any, columns: list[str]) -> None:
+        if self.error is not None:
+            raise self.error
+        self.copied.append((table_name, list(records), columns))
+
+
+class FakeSession:
+    """记录执行的SQL语句，COPY 写入的记录保存在 driver_connection 中。"""
+
+    def __init__(self, copy_error: Exception | None = None) -> None:
+        self.statements: list[str] = []
+        self.savepoint = FakeSavepoint()
+        self.driver_connection = FakeDriverConnection(copy_error)
+
+    async def begin_nested(self) -> FakeSavepoint:
+        return self.savepoint
+
+    async def execute(self, statement: Any, params: Any = None) -> FakeResult:
+        self.statements.append(str(statement))
+        return FakeResult()
+
+    async def connection(self) -> 'FakeSession':
+        return self
+
+    async def get_raw_connection(self) -> 'FakeSession':
+        return self
+
+
+@pytest.fixture(autouse=True)
+def unique_constraint_exists(monkeypatch: pytest.MonkeyPatch) -> None:
+    async def exists(cls: type, db: Any, table_name: str, columns: list[str]) -> bool:
+        return True
+
+    monkeypatch.setattr(TushareDataDao, '_check_unique_constraint_exists', classmethod(exists))
+
+
+def copy_merge(update_mode: str, copy_error: Exception | None = None) -> tuple[FakeSession, int | None]:
+    db = FakeSession(copy_error)
+    written = asyncio.run(
+        TushareDataDao.copy_merge_postgresql(
+            db, 't_daily', SYSTEM_VALUES, DF_COLUMNS, COLUMN_ARRAYS, update_mode, UNIQUE_KEYS
+        )
+    )
+    return db, written
+
+
+def test_stage_table_and_copy_records() -> None:
+    """暂存表按目标表的写入列建表并带原始顺序列，COPY 写入系统列取值与各列数组组成的记录。"""
+    db, written = copy_merge('0')
+
+    stage_name = db.driver_connection.copied[0][0]
+    assert stage_name.startswith('_stage_')
+    assert db.statements[0] == f'CREATE TEMP TABLE "{stage_name}" AS SELECT {COLUMNS} FROM "t_daily" WITH NO DATA'
+    assert db.statements[1] == f'ALTER TABLE "{stage_name}" ADD COLUMN "__row_no" BIGSERIAL'
+    assert db.driver_connection.copied[0][1:] == (
+        [(1, 'daily', '000001.SZ', '20240102', 10.5), (1, 'daily', '000002.SZ', '20240102', None)],
+        ['task_id', 'api_code', *DF_COLUMNS],
+    )
+    assert (
+        db.statements[2]
+        == f'INSERT INTO "t_daily" ({COLUMNS}) SELECT {COLUMNS} FROM "{stage_name}" ORDER BY "__row_no"'
+    )
+    assert db.statements[-1] == f'DROP TABLE "{stage_name}"'
+    assert db.savepoint.state == 'committed'
+    assert written == len(COLUMN_ARRAYS[0])
+
+
+@pytest.mark.parametrize(
+    ('update_mode', 'merge_sql'),
+    [
+        (
+            '1',
+            'INSERT INTO "t_daily" ({columns}) SELECT {columns} FROM "{stage}" ORDER BY "__row_no" '
+            'ON CONFLICT ("ts_code", "trade_date") DO NOTHING',
+        ),
+        (
+            '2',
+            'INSERT INTO "t_daily" ({columns}) SELECT DISTINCT ON ("ts_code", "trade_date") {columns} FROM "{stage}" '
+            'ORDER BY "ts_code", "trade_date", "__row_no" DESC ON CONFLICT ("ts_code", "trade_date") DO UPDATE SET '
+            '"task_id" = EXCLUDED."task_id", "api_code" = EXCLUDED."api_code", "close" = EXCLUDED."close"',
+        ),
+    ],
+)
+def test_merge_statement_per_update_mode(update_mode: str, merge_sql: str) -> None:
+    """INSERT_IGNORE 按唯一键 DO NOTHING，UPSERT 批内重复键保留最后一条后 DO UPDATE 非键列。"""
+    db, _ = copy_merge(update_mode)
+
+    stage_name = db.driver_connection.copied[0][0]
+    assert db.statements[2:] == [merge_sql.format(columns=COLUMNS, stage=stage_name), f'DROP TABLE "{stage_name}"']
+
+
+def test_delete_insert_deletes_staged_keys_first() -> None:
+    """DELETE_INSERT 先按暂存表中的唯一键删除目标表数据，再按原始顺序插入。"""
+    db, _ = copy_merge('3')
+
+    stage_name = db.driver_connection.copied[0][0]
+    assert db.statements[2:] == [
+        f'DELETE FROM "t_daily" AS t USING (SELECT DISTINCT "ts_code", "trade_date" FROM "{stage_name}") AS s '
+        'WHERE t."ts_code" = s."ts_code" AND t."trade_date" = s."trade_date"',
+        f'INSERT INTO "t_daily" ({COLUMNS}) SELECT {COLUMNS} FROM "{stage_name}" ORDER BY "__row_no"',
+        f'DROP TABLE "{stage_name}"',
+    ]
+
+
+def test_copy_error_rolls_back_savepoint() -> None:
+    """COPY 失败时回滚保存点（暂存表随之撤销），返回None 由调用方回退到批量参数写入。"""
+    db, written = copy_merge('2', copy_error=ConnectionError('COPY 中断'))
+
+    assert written is None
+    assert db.savepoint.state == 'rolled_back'
+    assert not any(statement.startswith('INSERT') for statement in db.statements)
@@ -0,0 +1,120 @@
+"""
+通用表热点字段回归测试：配置解析与校验、按数据库类型生成的提取表达式、热点列实际类型与配置类型冲突检测。
+"""
+
+from typing import Any
+
+import pytest
+from sqlalchemy.dialects import postgresql
+
+from config.env import DataBaseConfig
+from module_tushare.dao.tushare_data_hot_field import DATA_TABLE, TushareDataHotFieldDao
+from module_tushare.dao.tushare_schema_registry import TableSchema, TushareSchemaRegistry
+
+
+def test_parse_hot_fields_accepts_list_and_mapping() -> None:
+    """JSON数组中的字段类型为 string，JSON对象按配置的类型，空配置为空。"""
+    assert TushareDataHotFieldDao.parse_hot_fields('["ts_code", "trade_date"]') == {
+        'ts_code': 'string',
+        'trade_date': 'string',
+    }
+    assert TushareDataHotFieldDao.parse_hot_fields('{"ts_code": "string", "close": "number"}') == {
+        'ts_code': 'string',
+        'close': 'number',
+    }
+    assert TushareDataHotFieldDao.parse_hot_fields(None) == {}
+    assert TushareDataHotFieldDao.parse_hot_fields('  ') == {}
+
+
+@pytest.mark.parametrize(
+    'hot_fields',
+    ['not json', '"ts_code"', '["Bad-Name"]', '["ts_code; drop table x"]', '{"close": "decimal"}', '[1]'],
+)
+def test_parse_hot_fields_rejects_invalid_config(hot_fields: str) -> None:
+    """字段名只能是小写标识符（会拼入列名和SQL），类型只能是 string 或 number。"""
+    with pytest.raises(ValueError):
+        TushareDataHotFieldDao.parse_hot_fields(hot_fields)
+
+
+def test_extract_expression_by_database(monkeypatch: pytest.MonkeyPatch) -> None:
+    """数值字段只提取 JSON 数值，字符串字段截断到列长度；PostgreSQL 与 MySQL 使用各自的 JSON 函数。"""
+    monkeypatch.setattr(DataBaseConfig, 'db_type', 'postgresql')
+    assert TushareDataHotFieldDao.extract_expression('ts_code', 'string') == "LEFT(data_content ->> 'ts_code', 64)"
+    assert "jsonb_typeof(data_content -> 'close') = 'number'" in TushareDataHotFieldDao.extract_expression(
+        'close', 'number'
+    )
+
+    monkeypatch.setattr(DataBaseConfig, 'db_type', 'mysql')
+    assert TushareDataHotFieldDao.extract_expression('ts_code', 'string') == (
+        "LEFT(NULLIF(JSON_UNQUOTE(JSON_EXTRACT(data_content, '$.\"ts_code\"')), 'null'), 64)"
+    )
+    assert 'JSON_TYPE(' in TushareDataHotFieldDao.extract_expression('close', 'number')
+
+
+@pytest.mark.asyncio
+async def test_hot_column_types_come_from_schema(monkeypatch: pytest.MonkeyPatch) -> None:
+    """热点列类型取表中的实际类型，配置类型与已有列不一致时报告冲突，未建列的字段不冲突。"""
+    schema = TableSchema(
+        DATA_TABLE,
+        ['data_id', 'hf_close', 'hf_ts_code'],
+        [],
+        column_types={'data_id': 'bigint', 'hf_close': 'character varying', 'hf_ts_code': 'character varying'},
+    )
+
+    async def get_schema(db: Any, table_name: str) -> TableSchema:
+        return schema
+
+    monkeypatch.setattr(TushareSchemaRegistry, 'get_schema', get_schema)
+    assert await TushareDataHotFieldDao.get_hot_columns(None) == {'hf_close': 'string', 'hf_ts_code': 'string'}
+    assert await TushareDataHotFieldDao.get_type_conflicts(
+        None, {'close': 'number', 'ts_code': 'string', 'vol': 'number'}
+    ) == {'close': 'string'}
+
+
+class FakeScalarResult:
+    def __init__(self, rows: list[Any]) -> None:
+        self.rows = rows
+
+    def scalars(self) -> 'FakeScalarResult':
+        return self
+
+    def all(self) -> list[Any]:
+        return self.rows
+
+
+class FakeSession:
+    """记录查询语句，返回固定的数据内容。"""
+
+    def __init__(self, rows: list[Any]) -> None:
+        self.rows = rows
+        self.statements: list[str] = []
+
+    async def execute(self, statement: Any) -> FakeScalarResult:
+        self.statements.append(str(statement.compile(dialect=postgresql.dialect())))
+        return FakeScalarResult(self.rows)
+
+
+@pytest.mark.asyncio
+async def test_data_content_filters_run_in_database(monkeypatch: pytest.MonkeyPatch) -> None:
+    """配置为热点字段且已建列的字段按热点列过滤，其余字段按 JSON 路径过滤；None 为字段有值，列表为 IN 条件。"""
+
+    async def get_api_hot_fields(db: Any, api_code: str) -> dict[str, str]:
+        return {'ts_code': 'string', 'close': 'number'}
+
+    async def get_hot_columns(db: Any) -> dict[str, str]:
+        return {'hf_ts_code': 'string'}
+
+    monkeypatch.setattr(TushareDataHotFieldDao, 'get_api_hot_fields', get_api_hot_fields)
+    monkeypatch.setattr(TushareDataHotFieldDao, 'get_hot_columns', get_hot_columns)
+    db = FakeSession([{'ts_code': '000001.SZ'}])
+
+    contents = await TushareDataHotFieldDao.get_data_content_list(
+        db, 'daily', {'ts_code': ['000001.SZ', '000002.SZ'], 'close': None, 'name': '平安银行'}, latest_download=True
+    )
+
+    assert contents == [{'ts_code': '000001.SZ'}]
+    statement = db.statements[0]
+    assert 'hf_ts_code IN (__[POSTCOMPILE_hf_ts_code_1])' in statement
+    assert "jsonb_typeof(data_content -> 'close') = 'number'" in statement and 'IS NOT NULL' in statement
+    assert 'CAST((tushare_data.data_content ->> %(data_content_1)s) AS VARCHAR) = %(param_1)s' in statement
+    assert 'tushare_data.download_date = (SELECT max(tushare_data.download_date)' in statement
@@ -0,0 +1,49 @@
+"""
+写入前批内去重回归测试：按唯一键保留首条/末条，唯一键含空值的行保留，按安全列名匹配原始列，并统计当前运行丢弃的行数。
+"""
+
+import pandas as pd
+
+from module_tushare.dao.tushare_dao import TushareDataDao
+
+DF = pd.DataFrame(
+    {
+        'ts_code': ['000001.SZ', '000001.SZ', '000002.SZ', '000001.SZ', None, None],
+        'trade_date': ['20240102', '20240103', '20240102', '20240102', '20240102', '20240102'],
+        'close': [10.0, 10.5, 20.0, 10.1, 1.0, 2.0],
+    }
+)
+
+
+def test_keep_last_and_first() -> None:
+    """重复唯一键按配置保留末条或首条，其余行顺序不变。"""
+    kept, dropped = TushareDataDao.deduplicate_by_unique_keys(DF, ['ts_code', 'trade_date'], keep='last')
+    assert dropped == 1
+    assert kept['close'].tolist() == [10.5, 20.0, 10.1, 1.0, 2.0]
+
+    kept, dropped = TushareDataDao.deduplicate_by_unique_keys(DF, ['ts_code', 'trade_date'], keep='first')
+    assert dropped == 1
+    assert kept['close'].tolist() == [10.0, 10.5, 20.0, 1.0, 2.0]
+
+
+def test_system_and_sanitized_key_columns() -> None:
+    """唯一键中的系统列不参与判断，原始列名按安全列名匹配；没有可判断的列时原样返回。"""
+    df = DF.rename(columns={'trade_date': 'trade-date'})
+    kept, dropped = TushareDataDao.deduplicate_by_unique_keys(df, ['api_code', 'ts_code', 'trade_date'])
+    assert dropped == 1
+    assert len(kept) == len(DF) - 1
+
+    kept, dropped = TushareDataDao.deduplicate_by_unique_keys(DF, ['api_code'])
+    assert dropped == 0
+    assert kept is DF
+
+
+def test_dedup_count_scoped_to_run() -> None:
+    """未开启统计时为0，结束统计后恢复。"""
+    assert TushareDataDao.get_dedup_count() == 0
+    token = TushareDataDao.begin_dedup_count()
+    try:
+        assert TushareDataDao.get_dedup_count() == 0
+    finally:
+        TushareDataDao.end_dedup_count(token)
+    assert TushareDataDao.get_dedup_count() == 0
@@ -0,0 +1,25 @@
+"""
+下载日志统计回归测试：一批日志汇总为任务合计行（step_id 为0）和各步骤行的累计增量。
+"""
+
+from module_tushare.dao.tushare_dao import TushareDownloadStatDao
+
+
+def test_aggregate_logs_by_task_and_step() -> None:
+    """流程步骤日志同时计入任务合计和所在步骤；没有步骤ID的日志只计入任务合计；未记录时长的日志不参与平均时长。"""
+    logs = [
+        {'task_id': 1, 'step_id': 12, 'status': '0', 'record_count': 6, 'duration': 3},
+        {'task_id': 1, 'step_id': 11, 'status': '1', 'record_count': None, 'duration': None},
+        {'task_id': 1, 'step_id': 12, 'status': '1', 'record_count': 0, 'duration': 1},
+        {'task_id': 2, 'step_id': None, 'status': '0', 'record_count': 2, 'duration': 5},
+    ]
+
+    increments = TushareDownloadStatDao.aggregate_logs(logs)
+
+    assert [(row['task_id'], row['step_id']) for row in increments] == [(1, 0), (1, 11), (1, 12), (2, 0)]
+    task_total, step_11, step_12, single = increments
+    assert (task_total['log_count'], task_total['success_count'], task_total['fail_count']) == (3, 1, 2)
+    assert (task_total['total_records'], task_total['total_duration'], task_total['duration_count']) == (6, 4, 2)
+    assert (step_11['fail_count'], step_11['total_records'], step_11['duration_count']) == (1, 0, 0)
+    assert (step_12['log_count'], step_12['total_records'], step_12['total_duration']) == (2, 6, 4)
+    assert (single['log_count'], single['total_records']) == (1, 2)
@@ -0,0 +1,49 @@
+"""
+Tushare 增量下载计划器回归测试：按已有数据的最早、最大交易日只请求缺失区间，已覆盖整个区间的组合跳过。
+"""
+
+import datetime
+
+from module_tushare.task.tushare_incremental_planner import IncrementalPlanner, normalize_date
+
+
+def test_plan_requests_only_missing_ranges() -> None:
+    """按已有数据的最早、最大交易日只请求之前和之后的缺失区间，已覆盖整个区间时跳过。"""
+    planner = IncrementalPlanner(
+        'tushare_pro_bar',
+        ['ts_code'],
+        {('000001.SZ',): ('20230101', '20240105'), ('000002.SZ',): ('20230101', '20240110')},
+    )
+    params = {'ts_code': '000001.SZ', 'start_date': '20230101', 'end_date': '20240110', 'adj': 'hfq'}
+
+    assert planner.plan(params) == [{**params, 'start_date': '20240106'}]
+    # 已覆盖到结束日期：跳过
+    assert planner.plan({**params, 'ts_code': '000002.SZ'}) == []
+    # 表中没有该键、已有数据早于开始日期、没有开始日期参数：原样请求
+    assert planner.plan({**params, 'ts_code': '600000.SH'}) == [{**params, 'ts_code': '600000.SH'}]
+    assert planner.plan({**params, 'start_date': '20240201', 'end_date': '20240301'}) == [
+        {**params, 'start_date': '20240201', 'end_date': '20240301'}
+    ]
+    assert planner.plan({'ts_code': '000001.SZ', 'trade_date': '20240102'}) == [
+        {'ts_code': '000001.SZ', 'trade_date': '20240102'}
+    ]
+
+
+def test_plan_requests_head_before_earliest_date() -> None:
+    """开始日期早于已有数据的最早交易日时补齐之前的区间，不会跳过已有数据之前的缺失部分。"""
+    planner = IncrementalPlanner('tushare_pro_bar', ['ts_code'], {('000001.SZ',): ('20240101', '20240110')})
+    params = {'ts_code': '000001.SZ', 'start_date': '20210415'}
+
+    assert planner.plan(params) == [
+        {**params, 'end_date': '20231231'},
+        {**params, 'start_date': '20240111'},
+    ]
+    assert planner.plan({**params, 'end_date': '20240105'}) == [{**params, 'end_date': '20231231'}]
+    assert planner.plan({**params, 'end_date': '20231001'}) == [{**params, 'end_date': '20231001'}]
+
+
+def test_normalize_date_accepts_common_formats() -> None:
+    assert normalize_date('2024-01-05') == '20240105'
+    assert normalize_date(20240105) == '20240105'
+    assert normalize_date(datetime.date(2024, 1, 5)) == '20240105'
+    assert normalize_date('today') is None
@@ -0,0 +1,140 @@
+"""
+DELETE_INSERT 模式按唯一键批量删除回归测试：在 SQLite 上对比批量删除语句与逐行删除的结果表内容，
+覆盖复合键、单列键、批内重复键、含 NULL 的键以及按参数上限分批；并按 MySQL、PostgreSQL 方言编译语句，
+校验标识符引号、绑定参数以及在 DELETE_BATCH_MAX_PARAMS 处的分批。
+"""
+
+from collections.abc import Sequence
+from typing import Any
+
+import pytest
+from sqlalchemy import Connection, Engine, Row, create_engine, text
+from sqlalchemy.dialects import mysql, postgresql
+from sqlalchemy.engine import Dialect
+
+from module_tushare.dao.tushare_dao import DELETE_BATCH_MAX_PARAMS, TushareDataDao
+
+KEY_FIELDS = ['ts_code', 'trade_date']
+
+
+def _create_table(engine: Engine) -> None:
+    with engine.begin() as conn:
+        conn.execute(
+            text('CREATE TABLE t_daily (data_id INTEGER PRIMARY KEY, ts_code TEXT, trade_date TEXT, close REAL)')
+        )
+        rows = [
+            {'ts_code': f'{code:06d}.SZ', 'trade_date': f'202501{day:02d}', 'close': code + day / 100}
+            for code in range(1, 21)
+            for day in range(1, 11)
+        ]
+        rows.append({'ts_code': None, 'trade_date': '20250101', 'close': 0.0})
+        rows.append({'ts_code': '000001.SZ', 'trade_date': None, 'close': 0.0})
+        conn.execute(
+            text('INSERT INTO t_daily (ts_code, trade_date, close) VALUES (:ts_code, :trade_date, :close)'), rows
+        )
+
+
+def _delete_row_by_row(conn: Connection, key_fields: list[str], key_rows: Sequence[Sequence[Any]]) -> None:
+    """原实现：每行一条 DELETE，NULL 使用 IS NULL。"""
+    for key_row in key_rows:
+        conditions = []
+        params = {}
+        for idx, (field, value) in enumerate(zip(key_fields, key_row, strict=True)):
+            if value is None:
+                conditions.append(f'"{field}" IS NULL')
+            else:
+                conditions.append(f'"{field}" = :key_{idx}')
+                params[f'key_{idx}'] = value
+        conn.execute(text('DELETE FROM "t_daily" WHERE ' + ' AND '.join(conditions)), params)
+
+
+def _table_contents(engine: Engine) -> Sequence[Row]:
+    with engine.connect() as conn:
+        return conn.execute(text('SELECT data_id, ts_code, trade_date, close FROM t_daily ORDER BY data_id')).all()
+
+
+@pytest.mark.parametrize(
+    ('key_fields', 'max_params'),
+    [(KEY_FIELDS, 30000), (KEY_FIELDS, 7), (['ts_code'], 30000), (['ts_code'], 3)],
+)
+def test_batched_key_delete_matches_row_by_row(key_fields: list[str], max_params: int) -> None:
+    """批量删除后的表内容与逐行删除完全一致。"""
+    key_rows = [(f'{code:06d}.SZ', f'202501{day:02d}') for code in range(3, 15) for day in (2, 5, 9)]
+    key_rows += key_rows[:5]  # 批内重复键
+    key_rows += [(None, '20250101'), ('000001.SZ', None), ('999999.SZ', '20250101')]
+    key_rows = [row[: len(key_fields)] for row in key_rows]
+
+    expected_engine = create_engine('sqlite://')
+    actual_engine = create_engine('sqlite://')
+    _create_table(expected_engine)
+    _create_table(actual_engine)
+
+    with expected_engine.begin() as conn:
+        _delete_row_by_row(conn, key_fields, key_rows)
+
+    statements = TushareDataDao.build_key_delete_statements('t_daily', key_fields, key_rows, '"', max_params=max_params)
+    with actual_engine.begin() as conn:
+        for delete_sql, delete_params in statements:
+            assert len(delete_params) <= max(max_params, len(key_fields))
+            conn.execute(text(delete_sql), delete_params)
+
+    assert _table_contents(actual_engine) == _table_contents(expected_engine)
+    assert len(statements) < len(key_rows)
+
+
+def test_composite_key_delete_uses_row_value_in_list() -> None:
+    """复合键的完整键值使用行值 IN 列表，且同一键只出现一次。"""
+    statements = TushareDataDao.build_key_delete_statements(
+        't_daily', KEY_FIELDS, [('000001.SZ', '20250102'), ('000001.SZ', '20250102'), ('000002.SZ', '20250102')], '`'
+    )
+    assert len(statements) == 1
+    delete_sql, delete_params = statements[0]
+    assert delete_sql == 'DELETE FROM `t_daily` WHERE (`ts_code`, `trade_date`) IN ((:k0_0, :k0_1), (:k1_0, :k1_1))'
+    assert delete_params == {'k0_0': '000001.SZ', 'k0_1': '20250102', 'k1_0': '000002.SZ', 'k1_1': '20250102'}
+
+
+@pytest.mark.parametrize(
+    ('dialect', 'quote_char', 'delete_sql'),
+    [
+        (
+            mysql.dialect(),
+            '`',
+            'DELETE FROM `t_daily` WHERE (`ts_code`, `trade_date`) IN ((%s, %s), (%s, %s))',
+        ),
+        (
+            postgresql.dialect(),
+            '"',
+            'DELETE FROM "t_daily" WHERE ("ts_code", "trade_date") IN ((%(k0_0)s, %(k0_1)s), (%(k1_0)s, %(k1_1)s))',
+        ),
+    ],
+)
+def test_key_delete_compiles_per_dialect(dialect: Dialect, quote_char: str, delete_sql: str) -> None:
+    """按目标方言编译后，行值 IN 与 IS NULL 语句的引号和绑定参数与方言一致。"""
+    key_rows = [('000001.SZ', '20250102'), ('000002.SZ', '20250102'), (None, '20250103')]
+    statements = TushareDataDao.build_key_delete_statements('t_daily', KEY_FIELDS, key_rows, quote_char)
+
+    compiled = [text(sql).compile(dialect=dialect) for sql, _ in statements]
+    assert str(compiled[0]) == delete_sql
+    null_sql = f'DELETE FROM {quote_char}t_daily{quote_char} WHERE ({quote_char}ts_code{quote_char} IS NULL AND '
+    assert str(compiled[1]).startswith(null_sql)
+    for statement, (_, params) in zip(compiled, statements, strict=True):
+        assert set(statement.params) == set(params)
+
+
+@pytest.mark.parametrize(
+    ('dialect', 'quote_char'),
+    [(mysql.dialect(), '`'), (postgresql.dialect(), '"')],
+)
+def test_key_delete_splits_at_default_param_limit(dialect: Dialect, quote_char: str) -> None:
+    """复合键行数超出 DELETE_BATCH_MAX_PARAMS 时分为两条语句，每条编译后的绑定参数不超过上限。"""
+    row_count = DELETE_BATCH_MAX_PARAMS // len(KEY_FIELDS) + 1
+    key_rows = [(f'{code:06d}.SZ', '20250102') for code in range(row_count)]
+    statements = TushareDataDao.build_key_delete_statements('t_daily', KEY_FIELDS, key_rows, quote_char)
+
+    assert [len(params) for _, params in statements] == [DELETE_BATCH_MAX_PARAMS, len(KEY_FIELDS)]
+    for sql, params in statements:
+        compiled = text(sql).compile(dialect=dialect)
+        assert set(compiled.params) == set(params)
+        if dialect.paramstyle == 'format':
+            assert len(compiled.positiontup) == len(params)
+    assert statements[1][1] == {'k0_0': key_rows[-1][0], 'k0_1': key_rows[-1][1]}
@@ -0,0 +1,75 @@
+"""
+日K线缓存回归测试：按日期区间截取、缺失值转为None、写入后从最早写入日期起追加，下载运行之外的写入直接移除缓存。
+"""
+
+import math
+from typing import Any
+
+import pandas as pd
+import pytest
+
+from config.env import TushareConfig
+from module_tushare.dao.tushare_kline_cache import KlineSeries, TushareKlineCache
+
+ROWS = [
+    ('20240102', 10.0, 10.5, 9.8, 10.2, 1.0),
+    ('20240103', 10.2, 10.6, 10.0, 10.4, None),
+    ('20240104', 10.4, 10.9, 10.3, 10.8, 3.85),
+]
+
+
+def test_columns_slice_by_date_range() -> None:
+    """区间两端均包含，缺失值为None；区间外或空区间返回空列表。"""
+    series = KlineSeries.from_rows('000001.SZ', ROWS)
+
+    columns = series.columns('20240103', '20240110')
+    assert columns['trade_date'] == ['20240103', '20240104']
+    assert columns['close'] == [10.4, 10.8]
+    assert columns['pct_chg'] == [None, 3.85]
+    assert series.columns(None, '20240102')['open'] == [10.0]
+    assert series.columns('20240105', '20240101')['trade_date'] == []
+
+
+def test_merged_replaces_tail_from_since() -> None:
+    """从写入的最早日期起用重新读取的数据替换，之前的数据保留。"""
+    series = KlineSeries.from_rows('000001.SZ', ROWS)
+    tail = KlineSeries.from_rows(
+        '000001.SZ', [('20240104', 10.4, 11.0, 10.3, 10.9, 4.8), ('20240105', 10.9, 11.2, 10.7, 11.1, 1.83)]
+    )
+
+    merged = series.merged('20240104', tail)
+
+    assert merged.dates == ['20240102', '20240103', '20240104', '20240105']
+    assert merged.columns()['close'] == [10.2, 10.4, 10.9, 11.1]
+    assert math.isnan(merged.values['pct_chg'][1])
+    assert merged.loaded_at == series.loaded_at
+
+
+@pytest.mark.asyncio
+async def test_record_writes_inside_and_outside_run(monkeypatch: pytest.MonkeyPatch) -> None:
+    """下载运行中记录每只股票的最早写入日期，运行之外的写入移除缓存。"""
+    monkeypatch.setattr(TushareConfig, 'tushare_kline_cache_size', 10)
+    TushareKlineCache.invalidate()
+    TushareKlineCache._store(KlineSeries.from_rows('000001.SZ', ROWS))
+    df = pd.DataFrame(
+        {'ts_code': ['000001.SZ', '000001.SZ', '600000.SH'], 'trade_date': ['20240105', '20240104', '20240105']}
+    )
+    loaded = []
+
+    async def load(cls: type, db: Any, ts_code: str, since: str | None = None) -> KlineSeries:
+        loaded.append((ts_code, since))
+        return KlineSeries.from_rows(ts_code, [('20240105', 10.9, 11.2, 10.7, 11.1, 1.83)])
+
+    monkeypatch.setattr(TushareKlineCache, '_load', classmethod(load))
+
+    token = TushareKlineCache.begin_run()
+    TushareKlineCache.record_writes('tushare_pro_bar', df)
+    TushareKlineCache.record_writes('tushare_daily', df)
+    await TushareKlineCache.end_run(token, None)
+
+    # 只有已缓存的股票会重新读取
+    assert loaded == [('000001.SZ', '20240104')]
+    assert TushareKlineCache._series['000001.SZ'].dates == ['20240102', '20240103', '20240105']
+
+    TushareKlineCache.record_writes('tushare_pro_bar', df)
+    assert '000001.SZ' not in TushareKlineCache._series
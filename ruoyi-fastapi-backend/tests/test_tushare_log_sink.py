@@ -0,0 +1,87 @@
+"""
+下载日志写入器回归测试：同一运行记录/任务的多次更新合并写入，关闭时写出全部缓存记录。
+"""
+
+import asyncio
+from typing import Any
+
+import pytest
+from sqlalchemy.ext.asyncio import create_async_engine
+
+from config.env import TushareConfig
+from module_tushare.dao.tushare_dao import TushareDownloadLogDao, TushareDownloadRunDao, TushareDownloadTaskDao
+from module_tushare.entity.do.tushare_do import TushareDownloadLog
+from module_tushare.task.tushare_log_sink import TushareLogSink
+
+
+def test_sink_coalesces_updates_and_flushes_on_close(monkeypatch: pytest.MonkeyPatch) -> None:
+    """定时写入关闭、阈值足够大时，记录只在 close 时一次写出；同一运行记录的状态更新合并为一条。"""
+    monkeypatch.setattr(TushareConfig, 'tushare_log_flush_interval', 0)
+    monkeypatch.setattr(TushareConfig, 'tushare_log_flush_size', 100)
+    written = {'logs': [], 'runs': [], 'tasks': []}
+
+    async def add_logs(db: Any, logs: list[dict[str, Any]]) -> None:
+        written['logs'].extend(logs)
+
+    async def update_run(db: Any, run_id: int, values: dict[str, Any]) -> None:
+        written['runs'].append((run_id, values))
+
+    async def edit_task(db: Any, task_id: int, values: dict[str, Any]) -> None:
+        written['tasks'].append((task_id, values))
+
+    monkeypatch.setattr(TushareDownloadLogDao, 'add_logs_dao', add_logs)
+    monkeypatch.setattr(TushareDownloadRunDao, 'update_run_values', update_run)
+    monkeypatch.setattr(TushareDownloadTaskDao, 'edit_task_dao', edit_task)
+
+    async def run() -> TushareLogSink:
+        async with TushareLogSink(bind=create_async_engine('postgresql+asyncpg://user@localhost/db')) as sink:
+            sink.update_run_status(1, status='RUNNING')
+            sink.add_log(TushareDownloadLog(task_id=1, task_name='daily', status='0', record_count=10))
+            sink.update_run_status(1, status='SUCCESS', progress=100, set_end_time=True)
+            sink.update_task_stats(1, {'run_count': 2})
+            assert (sink.pending_count, written['logs']) == (3, [])
+        return sink
+
+    sink = asyncio.run(run())
+    assert sink.pending_count == 0 and sink.flushed_logs == 1
+    assert written['logs'][0]['task_name'] == 'daily' and written['logs'][0]['create_time'] is not None
+    assert len(written['runs']) == 1
+    run_id, values = written['runs'][0]
+    assert (run_id, values['status'], values['progress']) == (1, 'SUCCESS', 100)
+    assert values['end_time'] is not None
+    assert written['tasks'] == [(1, {'run_count': 2})]
+
+
+def test_failed_flush_is_retried(monkeypatch: pytest.MonkeyPatch) -> None:
+    """写入失败的记录放回缓存，写入期间的新更新覆盖旧值；关闭时重试直到写入成功。"""
+    monkeypatch.setattr(TushareConfig, 'tushare_log_flush_interval', 0)
+    monkeypatch.setattr(TushareConfig, 'tushare_log_flush_size', 100)
+    monkeypatch.setattr('module_tushare.task.tushare_log_sink.CLOSE_FLUSH_RETRY_DELAY', 0)
+    failures = {'remaining': 2}
+    written = []
+
+    async def add_logs(db: Any, logs: list[dict[str, Any]]) -> None:
+        if failures['remaining']:
+            failures['remaining'] -= 1
+            raise ConnectionError('数据库连接中断')
+
+    async def update_run(db: Any, run_id: int, values: dict[str, Any]) -> None:
+        written.append((run_id, values))
+
+    monkeypatch.setattr(TushareDownloadLogDao, 'add_logs_dao', add_logs)
+    monkeypatch.setattr(TushareDownloadRunDao, 'update_run_values', update_run)
+
+    async def run() -> TushareLogSink:
+        sink = TushareLogSink(bind=create_async_engine('postgresql+asyncpg://user@localhost/db'))
+        sink.add_log(TushareDownloadLog(task_id=1, task_name='daily', status='0'))
+        sink.update_run_status(1, status='RUNNING', progress=50)
+        assert (await sink.flush(), sink.pending_count) == (False, 2)
+        sink.update_run_status(1, status='SUCCESS')
+        await sink.close()
+        return sink
+
+    sink = asyncio.run(run())
+    assert sink.pending_count == 0 and sink.flushed_logs == 1
+    assert len(written) == 1
+    run_id, values = written[0]
+    assert (run_id, values['status'], values['progress']) == (1, 'SUCCESS', 50)
@@ -0,0 +1,154 @@
+"""
+Tushare 遍历模式有序预取执行器回归测试：验证并发调用时结果仍按组合顺序产出，失败组合不影响其他组合，提前退出时等待已取消的调用结束。
+"""
+
+import asyncio
+import hashlib
+import threading
+import time
+
+import pandas as pd
+import pytest
+
+from module_tushare.task.tushare_api_executor import TushareApiExecutor, TushareApiTimeoutError
+from module_tushare.task.tushare_loop_executor import (
+    LOOP_COMMIT_EVERY_COMBOS,
+    LOOP_CONCURRENCY_MAX,
+    LoopCommitBatch,
+    ParamCombinationSet,
+    iter_prefetched,
+    make_combo_key,
+    normalize_loop_concurrency,
+    unique_in_order,
+)
+
+CONCURRENCY = 3
+# 模拟接口调用失败的组合
+FAILED_ITEM = 3
+
+
+def test_normalize_loop_concurrency_clamps_invalid_values() -> None:
+    """空值、非法值按 1 处理，超过上限按上限处理。"""
+    assert [normalize_loop_concurrency(value) for value in (None, 'abc', 0, '4')] == [1, 1, 1, 4]
+    assert normalize_loop_concurrency(10000) == LOOP_CONCURRENCY_MAX
+
+
+def test_param_combination_set_is_lazy_cartesian_product() -> None:
+    """组合数由各参数取值个数相乘得到，迭代顺序与逐个展开的笛卡尔积一致；任一参数无取值时没有组合。"""
+    codes, dates = ['A', 'B'], ['1', '2', '3']
+    combos = ParamCombinationSet(['ts_code', 'trade_date'], [codes, dates])
+
+    assert len(combos) == len(codes) * len(dates)
+    assert next(iter(combos)) == {'ts_code': 'A', 'trade_date': '1'}
+    assert [(c['ts_code'], c['trade_date']) for c in combos][-2:] == [('B', '2'), ('B', '3')]
+    assert not ParamCombinationSet(['ts_code'], [[]])
+    assert list(ParamCombinationSet([], [])) == []
+    assert unique_in_order(['B', 'A', 'B', 1, 1.0, ['x'], ['x']]) == ['B', 'A', 1, ['x']]
+
+
+@pytest.mark.asyncio
+async def test_iter_prefetched_keeps_order_and_limits_concurrency() -> None:
+    """后面的组合先返回时，产出顺序仍与输入一致，同时执行的调用数不超过并发数。"""
+    lock = threading.Lock()
+    running = {'current': 0, 'peak': 0}
+
+    def sync_fetch(item: int) -> int:
+        with lock:
+            running['current'] += 1
+            running['peak'] = max(running['peak'], running['current'])
+        # 越靠前的组合耗时越长，模拟乱序返回
+        time.sleep(0.01 * (6 - item))
+        with lock:
+            running['current'] -= 1
+        if item == FAILED_ITEM:
+            raise RuntimeError('接口调用失败')
+        return item * 10
+
+    async def fetch(item: int) -> int:
+        return await TushareApiExecutor.call(sync_fetch, item)
+
+    results = [(item, result) async for item, result in iter_prefetched(range(6), fetch, concurrency=CONCURRENCY)]
+
+    assert [item for item, _ in results] == list(range(6))
+    assert running['peak'] <= CONCURRENCY
+    assert results[FAILED_ITEM][1].error is not None
+    with pytest.raises(RuntimeError):
+        results[FAILED_ITEM][1].unwrap()
+    assert [result.unwrap() for item, result in results if item != FAILED_ITEM] == [0, 10, 20, 40, 50]
+
+
+@pytest.mark.asyncio
+async def test_iter_prefetched_waits_for_cancelled_fetches_on_close() -> None:
+    """消费方提前关闭迭代器时，已开始的后续调用被取消，且关闭返回前都已结束。"""
+    never_set = asyncio.Event()
+    finished: list[int] = []
+
+    async def fetch(item: int) -> pd.DataFrame:
+        try:
+            if item > 0:
+                await never_set.wait()
+            return pd.DataFrame({'item': [item]})
+        finally:
+            finished.append(item)
+
+    prefetched = iter_prefetched(range(CONCURRENCY), fetch, concurrency=CONCURRENCY)
+    first_item, _ = await prefetched.__anext__()
+    await prefetched.aclose()
+
+    assert first_item == 0
+    assert sorted(finished) == list(range(CONCURRENCY))
+
+
+@pytest.mark.asyncio
+async def test_api_executor_timeout_does_not_block_event_loop() -> None:
+    """慢接口超时后抛出 TushareApiTimeoutError，等待期间事件循环上的其他协程照常执行。"""
+    ticks = []
+    tick_count = 5
+
+    async def ticker() -> None:
+        for _ in range(tick_count):
+            ticks.append(1)
+            await asyncio.sleep(0.01)
+
+    ticker_task = asyncio.ensure_future(ticker())
+    with pytest.raises(TushareApiTimeoutError):
+        await TushareApiExecutor.call(time.sleep, 0.3, api_code='slow_api', timeout=0.1)
+    await ticker_task
+    assert len(ticks) == tick_count
+
+
+def test_combo_key_ignores_param_order() -> None:
+    """检查点的组合键只取决于参数内容，与参数顺序无关。"""
+    key = make_combo_key({'ts_code': '000001.SZ', 'start_date': '20240101'})
+
+    assert key == make_combo_key({'start_date': '20240101', 'ts_code': '000001.SZ'})
+    assert key != make_combo_key({'ts_code': '000002.SZ', 'start_date': '20240101'})
+    assert len(key) == len(hashlib.sha256().hexdigest())
+
+    # 日期表达式按未解析的表达式计算，隔天解析出的日期不同时键不变
+    day1 = make_combo_key({'ts_code': '000001.SZ', 'start_date': '20240101'}, {'start_date': 'today-1000'})
+    day2 = make_combo_key({'ts_code': '000001.SZ', 'start_date': '20240102'}, {'start_date': 'today-1000'})
+    assert day1 == day2
+    assert day1 != make_combo_key({'ts_code': '000002.SZ', 'start_date': '20240102'}, {'start_date': 'today-1000'})
+
+
+def test_commit_batch_by_combos_or_rows() -> None:
+    """按组合数或按记录数判断批次是否已满，未配置或配置非法时使用默认批次大小。"""
+    assert LoopCommitBatch(None).commit_every == LOOP_COMMIT_EVERY_COMBOS
+    assert LoopCommitBatch('abc', '1').commit_every > 0
+
+    by_combos = LoopCommitBatch('2', '0')
+    by_rows = LoopCommitBatch(100, '1')
+    for record_count in (60, 0):
+        by_combos.add(record_count)
+        by_rows.add(record_count)
+    assert by_combos.is_full
+    assert not by_rows.is_full
+    by_rows.add(40)
+    assert by_rows.is_full
+
+    by_rows.frames.append(pd.DataFrame({'close': [1.0]}))
+    by_rows.details.append({'combo_index': 1})
+    by_rows.reset()
+    assert (by_rows.combo_count, by_rows.record_count, by_rows.is_full) == (0, 0, False)
+    assert (by_rows.frames, by_rows.details) == ([], [])
@@ -0,0 +1,41 @@
+"""
+Tushare Parquet分区写入回归测试：按交易日分区追加写入，关闭时合并小文件，读取结果与写入数据一致。
+"""
+
+import os
+from pathlib import Path
+
+import pandas as pd
+import pytest
+
+from config.env import TushareConfig
+from module_tushare.task.tushare_parquet_writer import ParquetDatasetWriter
+
+
+def test_partitioned_append_and_compaction(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    """每次达到缓冲行数即写出一批文件，关闭后每个分区只剩一个文件，分区字段可由目录名还原。"""
+    monkeypatch.setattr(TushareConfig, 'tushare_parquet_flush_rows', 2)
+    writer = ParquetDatasetWriter(str(tmp_path), 'daily')
+    batches = [
+        pd.DataFrame({'ts_code': [code, code], 'trade_date': ['20240102', '20240103'], 'close': [1.0, 2.0]})
+        for code in ('000001.SZ', '000002.SZ', '600000.SH')
+    ]
+    for batch in batches:
+        writer.append(batch)
+    # 每批两行、两个分区，每个分区各写出一个文件
+    assert writer.written_files == len(batches) * 2
+
+    dataset_dir = writer.close()
+    partitions = sorted(os.listdir(dataset_dir))
+    assert partitions == ['trade_date=20240102', 'trade_date=20240103']
+    for partition in partitions:
+        assert len(os.listdir(os.path.join(dataset_dir, partition))) == 1
+
+    result = pd.read_parquet(dataset_dir)
+    result['trade_date'] = result['trade_date'].astype(str)
+    expected = pd.concat(batches, ignore_index=True)
+    sort_keys = ['trade_date', 'ts_code']
+    pd.testing.assert_frame_equal(
+        result[expected.columns].sort_values(sort_keys).reset_index(drop=True),
+        expected.sort_values(sort_keys).reset_index(drop=True),
+    )
@@ -0,0 +1,113 @@
+"""
+Tushare 接口限流器回归测试：验证进程内令牌桶的速率控制、频率限制错误识别以及触发限制后的自动降速，
+包括经 ts.pro_bar 调用时识别接口返回的频率限制错误。
+"""
+
+import json
+import time
+from typing import Any
+
+import pytest
+
+from config.env import TushareConfig
+from module_tushare.task.tushare_api_executor import TushareApiExecutor
+from module_tushare.task.tushare_client import TushareClient
+from module_tushare.task.tushare_download_task import resolve_api_func
+from module_tushare.task.tushare_rate_limiter import BURST_SECONDS, TushareRateLimiter
+
+# 突发容量内的调用应立即放行（秒）
+BURST_ELAPSED_MAX = 0.1
+# 超出突发容量后按每秒10次放行3次，至少等待的时间（秒）
+PACED_ELAPSED_MIN = 0.25
+
+
+@pytest.fixture(autouse=True)
+def local_rate_limiter(monkeypatch: pytest.MonkeyPatch) -> None:
+    """测试中不依赖Redis，使用进程内令牌桶。"""
+    monkeypatch.setattr(TushareConfig, 'tushare_rate_limit_redis', False)
+    monkeypatch.setattr(TushareRateLimiter, '_states', {})
+
+
+def test_is_quota_error_only_matches_recoverable_limits() -> None:
+    """按分钟的频率限制可重试，按天的额度用尽不重试。"""
+    assert TushareRateLimiter.is_quota_error(Exception('抱歉，您每分钟最多访问该接口200次'))
+    assert not TushareRateLimiter.is_quota_error(Exception('抱歉，您每天最多访问该接口100000次'))
+    assert not TushareRateLimiter.is_quota_error(ValueError('参数错误'))
+
+
+@pytest.mark.asyncio
+async def test_acquire_allows_burst_then_paces_to_rate() -> None:
+    """600次/分钟即每秒10次：突发容量内立即放行，超出部分按速率等待。"""
+    burst = 10 * BURST_SECONDS
+    start = time.monotonic()
+    for _ in range(burst):
+        await TushareRateLimiter.acquire('daily', 600)
+    assert time.monotonic() - start < BURST_ELAPSED_MAX
+
+    start = time.monotonic()
+    for _ in range(3):
+        await TushareRateLimiter.acquire('daily', 600)
+    assert time.monotonic() - start >= PACED_ELAPSED_MIN
+
+
+@pytest.mark.asyncio
+async def test_quota_error_learns_limit_and_lowers_rate() -> None:
+    """错误信息中的上限会被学习，速率降低后随调用成功逐步恢复。"""
+    error = Exception('抱歉，您每分钟最多访问该接口200次')
+    backoff = await TushareRateLimiter.report_quota_error('pro_bar', error, 1)
+    assert backoff > 0
+    assert TushareRateLimiter.get_effective_rate('pro_bar', None) == pytest.approx(200 / 60 * 0.5)
+    assert TushareRateLimiter.get_effective_rate('pro_bar', 120) == pytest.approx(120 / 60 * 0.5)
+
+    TushareRateLimiter.report_success('pro_bar')
+    assert TushareRateLimiter.get_effective_rate('pro_bar', None) > 200 / 60 * 0.5
+
+
+class FakeResponse:
+    def __init__(self, payload: dict[str, Any]) -> None:
+        self.text = json.dumps(payload)
+
+    def __bool__(self) -> bool:
+        return True
+
+
+class QuotaOnceSession:
+    """第一次请求返回频率限制错误，之后返回一行日线数据。"""
+
+    def __init__(self) -> None:
+        self.api_names: list[str] = []
+
+    def post(self, url: str, json: dict[str, Any] | None = None, timeout: float | None = None) -> FakeResponse:
+        self.api_names.append(json['api_name'])
+        if len(self.api_names) == 1:
+            payload = {'code': 40203, 'msg': '抱歉，您每分钟最多访问该接口500次', 'data': None}
+        else:
+            payload = {
+                'code': 0,
+                'msg': '',
+                'data': {'fields': ['ts_code', 'trade_date', 'close'], 'items': [['000001.SZ', '20240102', 10.5]]},
+            }
+        return FakeResponse(payload)
+
+
+@pytest.mark.asyncio
+async def test_pro_bar_quota_error_is_reported_and_retried(monkeypatch: pytest.MonkeyPatch) -> None:
+    """ts.pro_bar 把接口错误替换为 IOError 时，执行器仍按接口返回的频率限制错误降速重试，pro_bar 内部不再立即重试。"""
+    client = TushareClient('token', timeout=5)
+    session = QuotaOnceSession()
+    monkeypatch.setattr(client, '_get_session', lambda: session)
+    reported = []
+
+    async def report_quota_error(api_code: str, error: BaseException, attempt: int) -> float:
+        reported.append((api_code, str(error), attempt))
+        return 0.0
+
+    monkeypatch.setattr(TushareRateLimiter, 'report_quota_error', report_quota_error)
+
+    df = await TushareApiExecutor.call(
+        resolve_api_func(client, 'pro_bar'), api_code='pro_bar', ts_code='000001.SZ', start_date='20240102'
+    )
+
+    assert df['close'].tolist() == [10.5]
+    assert reported == [('pro_bar', '抱歉，您每分钟最多访问该接口500次', 1)]
+    assert session.api_names == ['daily', 'daily']
@@ -0,0 +1,86 @@
+"""
+Tushare 接口响应缓存回归测试：相同接口和参数第二次调用直接读取缓存，过期或未配置有效期时重新调用接口。
+"""
+
+import os
+import time
+from pathlib import Path
+from typing import Any
+
+import pandas as pd
+import pytest
+
+from config.env import TushareConfig
+from module_tushare.task.tushare_response_cache import CACHE_TTL_PERMANENT, ResponseCacheStats, TushareResponseCache
+
+
+@pytest.fixture
+def cache_dir(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> Path:
+    monkeypatch.setattr(TushareConfig, 'tushare_cache_enabled', True)
+    monkeypatch.setattr(TushareConfig, 'tushare_cache_dir', str(tmp_path))
+    return tmp_path
+
+
+@pytest.mark.asyncio
+async def test_identical_params_hit_cache(cache_dir: Path) -> None:
+    """参数顺序、空值和首尾空格不同但实际相同的调用命中缓存，不再调用接口。"""
+    calls = []
+
+    def daily(**params: Any) -> pd.DataFrame:
+        calls.append(params)
+        return pd.DataFrame({'ts_code': [params['ts_code']], 'close': [10.5]})
+
+    stats = ResponseCacheStats()
+    first = await TushareResponseCache.fetch(
+        daily, {'ts_code': '000001.SZ', 'trade_date': '20240102'}, 'daily', ttl=3600, stats=stats
+    )
+    second = await TushareResponseCache.fetch(
+        daily, {'trade_date': '20240102 ', 'ts_code': '000001.SZ', 'fields': None}, 'daily', ttl=3600, stats=stats
+    )
+
+    assert len(calls) == 1
+    pd.testing.assert_frame_equal(first, second)
+    assert stats.to_dict() == {'cache_hits': 1, 'cache_misses': 1}
+
+    # 未配置有效期的接口不读写缓存
+    await TushareResponseCache.fetch(daily, {'ts_code': '000001.SZ', 'trade_date': '20240102'}, 'daily', ttl=None)
+    assert calls == [{'ts_code': '000001.SZ', 'trade_date': '20240102'}] * 2
+
+
+@pytest.mark.asyncio
+async def test_expired_entry_is_refetched(cache_dir: Path) -> None:
+    """超过有效期的缓存被删除并重新调用接口；永久缓存不受文件时间影响。"""
+    calls = []
+
+    def pro_bar(**params: Any) -> pd.DataFrame:
+        calls.append(params)
+        return pd.DataFrame({'trade_date': ['20240102'], 'close': [len(calls)]})
+
+    params = {'ts_code': '000001.SZ', 'start_date': '20200101', 'end_date': '20201231'}
+    await TushareResponseCache.fetch(pro_bar, params, 'pro_bar', ttl=60)
+    key = TushareResponseCache.make_key('pro_bar', params)
+    path = TushareResponseCache._get_path('pro_bar', key)
+    stale = time.time() - 3600
+    os.utime(path, (stale, stale))
+
+    assert (await TushareResponseCache.fetch(pro_bar, params, 'pro_bar', ttl=60))['close'].tolist() == [2]
+    os.utime(path, (stale, stale))
+    cached = await TushareResponseCache.fetch(pro_bar, params, 'pro_bar', ttl=CACHE_TTL_PERMANENT)
+    assert cached['close'].tolist() == [2]
+    assert calls == [params, params]
+
+
+@pytest.mark.asyncio
+async def test_empty_result_is_not_cached(cache_dir: Path) -> None:
+    """空结果（包括HTTP请求失败时客户端返回的空 DataFrame）不写入缓存，下次调用重新请求接口。"""
+    calls = []
+
+    def daily(**params: Any) -> pd.DataFrame:
+        calls.append(params)
+        return pd.DataFrame() if len(calls) == 1 else pd.DataFrame({'close': [10.5]})
+
+    params = {'trade_date': '20240102'}
+    assert (await TushareResponseCache.fetch(daily, params, 'daily', ttl=CACHE_TTL_PERMANENT)).empty
+    assert len(await TushareResponseCache.fetch(daily, params, 'daily', ttl=CACHE_TTL_PERMANENT)) == 1
+    assert len(await TushareResponseCache.fetch(daily, params, 'daily', ttl=CACHE_TTL_PERMANENT)) == 1
+    assert calls == [params, params]
@@ -0,0 +1,81 @@
+"""
+Tushare 数据表结构缓存回归测试：验证已存在的表只加载一次，DDL 失效后重新加载，不存在的表不缓存。
+"""
+
+import asyncio
+from typing import Any
+
+import pytest
+
+from module_tushare.dao.tushare_schema_registry import TableSchema, TushareSchemaRegistry, UniqueIndexInfo
+
+
+@pytest.fixture
+def fake_catalog(monkeypatch: pytest.MonkeyPatch) -> tuple[dict[str, list[str]], list[str]]:
+    """用内存中的表定义代替数据库系统表查询，记录加载次数。"""
+    catalog = {'t_daily': ['ts_code', 'trade_date', 'close']}
+    loads = []
+
+    async def fake_load(cls: type, db: Any, table_name: str) -> TableSchema | None:
+        loads.append(table_name)
+        await asyncio.sleep(0)
+        columns = catalog.get(table_name)
+        if columns is None:
+            return None
+        return TableSchema(
+            table_name,
+            list(columns),
+            [UniqueIndexInfo('t_daily_pkey', ('ts_code', 'trade_date'), is_primary=True, is_constraint=True)],
+        )
+
+    monkeypatch.setattr(TushareSchemaRegistry, '_load', classmethod(fake_load))
+    monkeypatch.setattr(TushareSchemaRegistry, '_schemas', {})
+    monkeypatch.setattr(TushareSchemaRegistry, '_versions', {})
+    return catalog, loads
+
+
+@pytest.mark.asyncio
+async def test_schema_is_cached_until_invalidated(fake_catalog: tuple[dict[str, list[str]], list[str]]) -> None:
+    """重复查询同一张表只加载一次；invalidate 后重新加载到新结构。"""
+    catalog, loads = fake_catalog
+
+    for _ in range(5):
+        schema = await TushareSchemaRegistry.get_schema(None, 't_daily')
+        assert schema.has_unique_index(['trade_date', 'ts_code'])
+        assert schema.primary_key == ['ts_code', 'trade_date']
+    assert loads == ['t_daily']
+
+    catalog['t_daily'].append('vol')
+    TushareSchemaRegistry.invalidate('t_daily')
+    schema = await TushareSchemaRegistry.get_schema(None, 't_daily')
+    assert 'vol' in schema.column_set
+    assert loads == ['t_daily', 't_daily']
+
+
+@pytest.mark.asyncio
+async def test_missing_table_is_not_cached(fake_catalog: tuple[dict[str, list[str]], list[str]]) -> None:
+    """不存在的表每次都重新检查，建表后立即可见。"""
+    catalog, loads = fake_catalog
+
+    assert await TushareSchemaRegistry.table_exists(None, 't_new') is False
+    catalog['t_new'] = ['ts_code']
+    assert await TushareSchemaRegistry.table_exists(None, 't_new') is True
+    assert loads == ['t_new', 't_new']
+
+
+@pytest.mark.asyncio
+async def test_invalidate_during_load_discards_stale_result(
+    fake_catalog: tuple[dict[str, list[str]], list[str]],
+) -> None:
+    """加载过程中发生 DDL 失效时，本次加载结果不写入缓存。"""
+    _, loads = fake_catalog
+
+    load_task = asyncio.ensure_future(TushareSchemaRegistry.get_schema(None, 't_daily'))
+    await asyncio.sleep(0)
+    TushareSchemaRegistry.invalidate()
+    await load_task
+    await TushareSchemaRegistry.get_schema(None, 't_daily')
+    assert loads == ['t_daily', 't_daily']
+
+    with pytest.raises(ValueError):
+        await TushareSchemaRegistry.get_schema(None, 't_daily; drop table x')
@@ -0,0 +1,61 @@
+"""
+Tushare 流程步骤流式结果回归测试：流式模式只保留引用字段，生成的后续参数组合与保留全部结果时一致。
+"""
+
+import json
+
+import numpy as np
+import pandas as pd
+
+from module_tushare.task.tushare_download_task import generate_param_combinations, parse_step_params
+from module_tushare.task.tushare_step_result import StreamingStepResult, find_referenced_fields
+
+
+def test_find_referenced_fields_collects_params_and_conditions() -> None:
+    """参数（对象格式和 ${} 格式）与执行条件中的 step.field / previous_step.field 都算作引用。"""
+    later_steps = [
+        {
+            'step_params': json.dumps(
+                {
+                    'ts_code': {'type': 'loop', 'source': 'stock_list.ts_code'},
+                    'start_date': '${previous_step.list_date}',
+                    'fields': 'ts_code,close',
+                }
+            ),
+            'condition_expr': json.dumps({'field': 'stock_list.market', 'operator': 'eq', 'value': '主板'}),
+        },
+        {'step_params': json.dumps({'trade_date': '${other_step.trade_date}'}), 'condition_expr': None},
+    ]
+
+    assert find_referenced_fields('stock_list', later_steps) == {'ts_code', 'list_date', 'market'}
+    assert find_referenced_fields('stock_list', [{'step_params': '{"x": "${previous_step}"}'}]) is None
+
+
+def test_streaming_result_generates_same_combinations() -> None:
+    """分批追加的列式结果与合并去重后的记录列表生成相同的遍历组合。"""
+    batches = [
+        pd.DataFrame(
+            {'ts_code': ['000001.SZ', '000002.SZ'], 'trade_date': ['20240102', '20240102'], 'close': [1.0, 2.0]}
+        ),
+        pd.DataFrame(
+            {'ts_code': ['000002.SZ', '600000.SH'], 'trade_date': ['20240103', '20240103'], 'close': [2.5, np.nan]}
+        ),
+        pd.DataFrame({'ts_code': ['000001.SZ'], 'trade_date': ['20240102'], 'close': [1.0]}),
+    ]
+    stream_result = StreamingStepResult({'ts_code', 'trade_date'})
+    for batch in batches:
+        stream_result.append(batch)
+    full_records = pd.concat(batches, ignore_index=True).drop_duplicates().to_dict('records')
+
+    param_config = parse_step_params(
+        {'ts_code': '${daily.ts_code}', 'trade_date': {'type': 'loop', 'source': 'previous_step.trade_date'}},
+        {},
+        loop_mode=True,
+    )
+    streamed = list(generate_param_combinations(param_config, {'daily': stream_result}, 'daily'))
+    expected = list(generate_param_combinations(param_config, {'daily': full_records}, 'daily'))
+
+    assert streamed == expected
+    assert (len(streamed), len(stream_result)) == (6, 5)
+    assert stream_result.field_values('close') is None
+    assert stream_result.first_record == full_records[0]
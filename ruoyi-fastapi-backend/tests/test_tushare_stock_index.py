@@ -0,0 +1,88 @@
+"""
+股票搜索内存索引回归测试：完全匹配优先于前缀匹配、前缀匹配优先于子串匹配，支持拼音首字母，重复代码只保留第一行；
+物理表 tushare_stock_basic 为空时回退到通用表中的 stock_basic 数据。
+"""
+
+from typing import Any
+
+import pytest
+
+from module_tushare.dao.tushare_data_hot_field import TushareDataHotFieldDao
+from module_tushare.dao.tushare_schema_registry import TableSchema, TushareSchemaRegistry
+from module_tushare.dao.tushare_stock_index import (
+    STOCK_BASIC_TABLE,
+    StockSearchEntry,
+    StockSearchSnapshot,
+    TushareStockSearchIndex,
+)
+
+ROWS = [
+    {'ts_code': '600000.SH', 'symbol': '600000', 'name': '浦发银行', 'industry': '银行', 'cnspell': 'pfyh'},
+    {'ts_code': '000001.SZ', 'symbol': '000001', 'name': '平安银行', 'industry': '银行', 'cnspell': 'payh'},
+    {'ts_code': '601318.SH', 'symbol': '601318', 'name': '中国平安', 'industry': '保险', 'cnspell': 'zgpa'},
+    {'ts_code': '000002.SZ', 'symbol': '000002', 'name': '万科A', 'list_date': 19910129, 'cnspell': 'wka'},
+    {'ts_code': '000001.SZ', 'symbol': '000001', 'name': '重复行', 'cnspell': 'cfh'},
+]
+
+
+def codes(entries: list[StockSearchEntry]) -> list[str]:
+    return [entry.ts_code for entry in entries]
+
+
+def test_search_ranks_exact_prefix_then_substring() -> None:
+    """代码完全相等排在最前，其次为代码/名称/拼音首字母前缀，最后为子串匹配。"""
+    snapshot = StockSearchSnapshot.from_rows(ROWS)
+
+    # 重复代码只保留第一条
+    assert len(snapshot) == len(ROWS) - 1
+    assert codes(snapshot.search('000001')) == ['000001.SZ']
+    assert codes(snapshot.search('60')) == ['600000.SH', '601318.SH']
+    assert codes(snapshot.search('平安')) == ['000001.SZ', '601318.SH']
+    assert codes(snapshot.search('PA')) == ['000001.SZ', '601318.SH']
+    assert codes(snapshot.search('银行')) == ['000001.SZ', '600000.SH']
+    assert codes(snapshot.search('.sz', limit=1)) == ['000001.SZ']
+    assert snapshot.search('  ') == []
+    assert snapshot.search('不存在') == []
+
+
+def test_entries_are_normalized() -> None:
+    """重复代码保留第一行，日期等非字符串字段转为字符串，缺失字段为None。"""
+    snapshot = StockSearchSnapshot.from_rows(ROWS)
+    entry = snapshot.search('wka')[0]
+
+    assert snapshot.search('000001')[0].name == '平安银行'
+    assert entry.list_date == '19910129'
+    assert entry.area is None
+
+
+class EmptyTableSession:
+    def __init__(self) -> None:
+        self.statements: list[str] = []
+
+    async def execute(self, statement: Any) -> list[Any]:
+        self.statements.append(str(statement))
+        return []
+
+
+@pytest.mark.asyncio
+async def test_empty_stock_basic_table_falls_back_to_generic_data(monkeypatch: pytest.MonkeyPatch) -> None:
+    """tushare_stock_basic 表存在但没有数据时，从通用表中最近一次下载的 stock_basic 数据构建索引。"""
+    schema = TableSchema(STOCK_BASIC_TABLE, ['ts_code', 'symbol', 'name'], [])
+    fallback_calls = []
+
+    async def get_schema(db: Any, table_name: str) -> TableSchema:
+        return schema
+
+    async def get_data_content_list(db: Any, api_code: str, *args: Any, **kwargs: Any) -> list[Any]:
+        fallback_calls.append(api_code)
+        return [ROWS[0], 'invalid']
+
+    monkeypatch.setattr(TushareSchemaRegistry, 'get_schema', get_schema)
+    monkeypatch.setattr(TushareDataHotFieldDao, 'get_data_content_list', get_data_content_list)
+    session = EmptyTableSession()
+
+    rows = await TushareStockSearchIndex._fetch_rows(session)
+
+    assert session.statements == [f'SELECT ts_code, symbol, name FROM {STOCK_BASIC_TABLE}']
+    assert fallback_calls == ['stock_basic']
+    assert rows == [ROWS[0]]
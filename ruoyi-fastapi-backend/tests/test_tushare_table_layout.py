@@ -0,0 +1,63 @@
+"""
+固定存储结构数据表回归测试：日线表按写入数据的年份补齐缺少的年度分区，已存在的分区不重复创建。
+"""
+
+from typing import Any
+
+import pandas as pd
+import pytest
+
+from config.env import DataBaseConfig
+from module_tushare.dao.tushare_schema_registry import TableSchema, TushareSchemaRegistry
+from module_tushare.dao.tushare_table_layout import TushareTableLayout
+
+
+class FakeSession:
+    def __init__(self) -> None:
+        self.statements = []
+
+    async def execute(self, statement: Any, params: Any = None) -> None:
+        self.statements.append(str(statement))
+
+    async def flush(self) -> None:
+        pass
+
+
+@pytest.mark.asyncio
+async def test_ensure_partitions_creates_missing_years(monkeypatch: pytest.MonkeyPatch) -> None:
+    """只为数据中出现且尚不存在的年份建分区，非法日期忽略；非分区表不处理。"""
+    monkeypatch.setattr(DataBaseConfig, 'db_type', 'postgresql')
+    schema = TableSchema('tushare_pro_bar', ['ts_code', 'trade_date'], [], frozenset({'tushare_pro_bar_2024'}))
+
+    async def get_schema(cls: type, db: Any, table_name: str) -> TableSchema:
+        return schema
+
+    monkeypatch.setattr(TushareSchemaRegistry, 'get_schema', classmethod(get_schema))
+    df = pd.DataFrame(
+        {'ts_code': ['000001.SZ'] * 5, 'trade_date': ['20250102', '20231229', '20240102', None, '2024-01']}
+    )
+    db = FakeSession()
+
+    created = await TushareTableLayout.ensure_partitions(db, 'tushare_pro_bar', df)
+
+    assert created == ['tushare_pro_bar_2023', 'tushare_pro_bar_2025']
+    assert db.statements[0] == (
+        'CREATE TABLE IF NOT EXISTS "tushare_pro_bar_2023" PARTITION OF "tushare_pro_bar" '
+        "FOR VALUES FROM ('20230101') TO ('20240101')"
+    )
+
+    schema = TableSchema('tushare_pro_bar', ['ts_code', 'trade_date'], [])
+    assert await TushareTableLayout.ensure_partitions(FakeSession(), 'tushare_pro_bar', df) == []
+    assert await TushareTableLayout.ensure_partitions(FakeSession(), 't_daily', df) == []
+
+
+def test_drop_invalid_partition_rows() -> None:
+    """分区字段为空或不是 YYYYMMDD 的行写入前丢弃，其他表和没有分区字段的数据原样返回。"""
+    df = pd.DataFrame({'ts_code': ['000001.SZ'] * 4, 'trade_date': ['20240102', None, '2024-01-02', '20240103']})
+
+    kept = TushareTableLayout.drop_invalid_partition_rows('tushare_pro_bar', df)
+
+    assert kept['trade_date'].tolist() == ['20240102', '20240103']
+    assert TushareTableLayout.drop_invalid_partition_rows('t_daily', df) is df
+    no_date = df[['ts_code']]
+    assert TushareTableLayout.drop_invalid_partition_rows('tushare_pro_bar', no_date) is no_date
@@ -0,0 +1,98 @@
+"""
+Tushare 流程步骤依赖图回归测试：依赖关系取自连线并补充数据引用，独立分支并行执行，汇合步骤等待全部前置步骤。
+"""
+
+import asyncio
+import json
+from typing import Any
+
+import pytest
+
+from module_tushare.task.tushare_step_result import find_referenced_fields
+from module_tushare.task.tushare_workflow_dag import WorkflowDag, parse_step_ids
+
+
+def make_step(
+    step_id: int,
+    step_name: str,
+    node_type: str = 'task',
+    source: list[int] | None = None,
+    target: list[int] | None = None,
+    step_params: dict[str, Any] | None = None,
+) -> dict[str, Any]:
+    return {
+        'step_id': step_id,
+        'step_name': step_name,
+        'node_type': node_type,
+        'source_step_ids': json.dumps(source) if source else None,
+        'target_step_ids': json.dumps(target) if target else None,
+        'step_params': json.dumps(step_params) if step_params else None,
+        'condition_expr': None,
+    }
+
+
+STEPS = [
+    make_step(1, 'start', node_type='start', target=[2, 3]),
+    make_step(2, 'stock_basic', source=[1]),
+    make_step(3, 'trade_cal', source=[1]),
+    # 只连了 stock_basic，对 trade_cal 的依赖由参数引用补充
+    make_step(
+        4,
+        'daily',
+        source=[2],
+        step_params={
+            'ts_code': {'type': 'loop', 'source': 'stock_basic.ts_code'},
+            'trade_date': {'type': 'loop', 'source': 'trade_cal.cal_date'},
+        },
+    ),
+]
+
+
+def test_build_merges_edges_and_references() -> None:
+    """连线与参数引用共同决定前置步骤；没有连线或连线成环时不构建依赖图。"""
+    dag = WorkflowDag.build(STEPS)
+
+    assert dag.parents[4] == {2, 3}
+    assert dag.parents[2] == dag.parents[3] == {1}
+    assert dag.previous_step_of(4, {'stock_basic', 'trade_cal'}) == 'trade_cal'
+    assert dag.previous_step_of(2, set()) is None
+    assert WorkflowDag.build([make_step(1, 'a'), make_step(2, 'b')]) is None
+    assert WorkflowDag.build([make_step(1, 'a', source=[2]), make_step(2, 'b', source=[1])]) is None
+    assert parse_step_ids('[1, "2", "x"]') == [1, 2]
+
+
+def test_descendants_decide_referenced_fields() -> None:
+    """流式模式按下游步骤确定需保留的字段：并行分支上的步骤不在下游，排在前面的下游步骤也要计入。"""
+    steps = [
+        make_step(1, 'stock_basic', target=[3]),
+        # 与 stock_basic 并行的分支，previous_step 指向 trade_cal 而不是 stock_basic
+        make_step(2, 'trade_cal', target=[4]),
+        make_step(3, 'daily', step_params={'ts_code': {'type': 'loop', 'source': 'previous_step.ts_code'}}),
+        make_step(4, 'index_daily', step_params={'trade_date': {'type': 'loop', 'source': 'previous_step.cal_date'}}),
+    ]
+    dag = WorkflowDag.build(steps)
+
+    assert [step['step_id'] for step in dag.descendants_of(1)] == [3]
+    assert find_referenced_fields('stock_basic', dag.descendants_of(1)) == {'ts_code'}
+    assert find_referenced_fields('trade_cal', dag.descendants_of(2)) == {'cal_date'}
+    assert find_referenced_fields('daily', dag.descendants_of(3)) == set()
+    # 连线指向排在前面的步骤时，该步骤同样是下游步骤
+    reordered = WorkflowDag.build([make_step(1, 'daily'), make_step(2, 'stock_basic', target=[1])])
+    assert [step['step_id'] for step in reordered.descendants_of(2)] == [1]
+
+
+@pytest.mark.asyncio
+async def test_run_executes_independent_branches_concurrently() -> None:
+    """无依赖的分支同时执行，汇合步骤在全部前置步骤完成后才开始。"""
+    dag = WorkflowDag.build(STEPS)
+    events = []
+
+    async def execute(step_id: int) -> None:
+        events.append(('start', step_id))
+        await asyncio.sleep(0.01)
+        events.append(('end', step_id))
+
+    await dag.run(execute, max_parallel=4)
+
+    assert events.index(('start', 3)) < events.index(('end', 2))
+    assert events.index(('start', 4)) > max(events.index(('end', 2)), events.index(('end', 3)))
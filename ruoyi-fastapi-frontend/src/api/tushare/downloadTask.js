@@ -64,10 +64,26 @@ export function executeDownloadTask(taskId) {
   })
 }
 
+// 续跑Tushare下载任务最近一次未成功的运行
+export function resumeDownloadTask(taskId) {
+  return request({
+    url: '/tushare/downloadTask/resume/' + taskId,
+    method: 'post'
+  })
+}
+
 // 获取Tushare下载任务统计信息
 export function getDownloadTaskStatistics(taskId) {
   return request({
     url: '/tushare/downloadTask/statistics/' + taskId,
     method: 'get'
   })
-}
\ No newline at end of file
+}
+
+// 刷新Tushare数据表结构缓存
+export function refreshSchemaCache() {
+  return request({
+    url: '/tushare/downloadTask/refreshSchemaCache',
+    method: 'delete'
+  })
+}
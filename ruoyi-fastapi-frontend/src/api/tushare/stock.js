@@ -9,12 +9,25 @@ export function searchStockBasic(query) {
   })
 }
 
-// 获取日K线数据
+// 获取日K线数据（按列传输以减小响应体积，返回前还原为每个交易日一个对象）
 export function getDailyKline(query) {
   return request({
     url: '/tushare/stock/daily',
     method: 'get',
-    params: query
+    params: { ...query, format: 'columnar' }
+  }).then(res => {
+    const columns = res.data || {}
+    const tradeDates = columns.tradeDate || []
+    res.data = tradeDates.map((tradeDate, i) => ({
+      tsCode: columns.tsCode,
+      tradeDate,
+      open: columns.open[i],
+      high: columns.high[i],
+      low: columns.low[i],
+      close: columns.close[i],
+      pctChg: columns.pctChg[i]
+    }))
+    return res
   })
 }
 